@@ -5,3 +5,6 @@ class AcademicSessionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academic_sessions'
     verbose_name = 'Academic Sessions'
+
+    def ready(self):
+        import academic_sessions.signals  # noqa: F401
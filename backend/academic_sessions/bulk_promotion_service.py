@@ -0,0 +1,343 @@
+"""
+Set-based bulk promotion service.
+
+Resolves every requested promotion against grouped preloads: source
+enrollments, target session classes, existing target-year enrollments and a
+BatchRollAllocator for roll numbers. It then writes each chunk of students
+in one transaction with bulk inserts and updates. If a chunk hits an
+IntegrityError (a concurrent writer created one of the target enrollments or
+took a planned roll number), it is replayed student by student; a student
+whose roll was taken gets a fresh one from the database, so only students
+already enrolled by the other writer are reported as failed.
+"""
+
+import logging
+from types import SimpleNamespace
+
+from django.db import IntegrityError, transaction
+
+from .promotion_advisor_service import invalidate_promotion_advice
+
+logger = logging.getLogger(__name__)
+
+PROMOTION_CHUNK_SIZE = 200
+
+NO_SOURCE_REASON = 'No active source-year enrollment found.'
+EXISTING_TARGET_REASON = 'Student already has enrollment in target academic year.'
+
+
+class BulkPromotionService:
+    """Promote, repeat or graduate many students from one academic year to the next."""
+
+    def __init__(self, school_id: int, source_year_id: int, target_year_id: int,
+                 operation=None, actor_id=None, chunk_size: int = PROMOTION_CHUNK_SIZE):
+        self.school_id = school_id
+        self.source_year_id = source_year_id
+        self.target_year_id = target_year_id
+        self.operation = operation
+        self.actor_id = actor_id
+        self.chunk_size = chunk_size
+
+    # ── Loading ──
+
+    def _load(self, promotions):
+        from academic_sessions.models import SessionClass, StudentEnrollment
+        from academic_sessions.roll_allocator_service import BatchRollAllocator
+
+        student_ids = [promo.get('student_id') for promo in promotions]
+
+        self.source_enrollments = {}
+        for enrollment in StudentEnrollment.objects.filter(
+            school_id=self.school_id,
+            academic_year_id=self.source_year_id,
+            is_active=True,
+            student_id__in=student_ids,
+        ):
+            self.source_enrollments.setdefault(enrollment.student_id, enrollment)
+
+        self.target_enrollments = {}
+        for enrollment in StudentEnrollment.objects.filter(
+            school_id=self.school_id,
+            academic_year_id=self.target_year_id,
+            student_id__in=student_ids,
+        ):
+            self.target_enrollments.setdefault(enrollment.student_id, enrollment)
+
+        self.session_classes = SessionClass.objects.filter(
+            school_id=self.school_id,
+            academic_year_id=self.target_year_id,
+        ).in_bulk([
+            promo['target_session_class_id'] for promo in promotions
+            if promo.get('target_session_class_id')
+        ])
+
+        target_class_ids = {promo.get('target_class_id') for promo in promotions}
+        target_class_ids |= {sc.class_obj_id for sc in self.session_classes.values()}
+        self.rolls = BatchRollAllocator(
+            self.school_id, self.target_year_id, target_class_ids, student_ids=student_ids,
+        )
+
+    # ── Planning ──
+
+    def _plan(self, promo):
+        """Decide what happens to one student; raises ValueError for invalid requests."""
+        from academic_sessions.models import StudentEnrollment
+
+        student_id = promo.get('student_id')
+        target_class_id = promo.get('target_class_id')
+        target_session_class_id = promo.get('target_session_class_id')
+        new_roll_number = promo.get('new_roll_number', '')
+        action = promo.get('action', 'PROMOTE')  # PROMOTE, GRADUATE, REPEAT
+        plan = SimpleNamespace(student_id=student_id, action=action, old=None, new=None, existing=None)
+
+        old_enrollment = self.source_enrollments.get(student_id)
+        if not old_enrollment:
+            plan.kind, plan.reason = 'skip', NO_SOURCE_REASON
+            return plan
+        plan.old = old_enrollment
+        plan.previous_status = old_enrollment.status
+
+        if action == 'GRADUATE':
+            plan.kind = 'graduate'
+            return plan
+
+        resolved_target_session_class_id = None
+        if target_session_class_id:
+            target_session_class = self.session_classes.get(int(target_session_class_id))
+            if not target_session_class:
+                raise ValueError('Selected target session class was not found in the target academic year.')
+            if not target_session_class.class_obj_id:
+                raise ValueError('Selected target session class is not linked to a master class.')
+            if target_class_id and int(target_class_id) != target_session_class.class_obj_id:
+                raise ValueError('Target class does not match selected target session class.')
+            target_class_id = target_session_class.class_obj_id
+            resolved_target_session_class_id = target_session_class.id
+        elif old_enrollment.session_class_id and action == 'REPEAT':
+            resolved_target_session_class_id = old_enrollment.session_class_id
+
+        existing_target = self.target_enrollments.get(student_id)
+        if existing_target:
+            plan.kind, plan.reason, plan.existing = 'skip', EXISTING_TARGET_REASON, existing_target
+            return plan
+        if not target_class_id:
+            raise ValueError('A target class or target session class is required.')
+        target_class_id = int(target_class_id)
+
+        roll_number = self.rolls.resolve_roll(
+            target_class_id,
+            preferred_roll=new_roll_number or old_enrollment.roll_number,
+            exclude_student_id=student_id,
+        )
+        self.rolls.record(student_id, target_class_id, roll_number)
+        plan.kind = 'move'
+        plan.new_status = (
+            StudentEnrollment.Status.REPEAT if action == 'REPEAT' else StudentEnrollment.Status.PROMOTED
+        )
+        plan.new = StudentEnrollment(
+            school_id=self.school_id,
+            student_id=student_id,
+            academic_year_id=self.target_year_id,
+            session_class_id=resolved_target_session_class_id,
+            class_obj_id=target_class_id,
+            roll_number=roll_number,
+            status=StudentEnrollment.Status.ACTIVE,
+        )
+        # A repeated student later in the same batch sees this as an existing target.
+        self.target_enrollments[student_id] = plan.new
+        return plan
+
+    # ── Events ──
+
+    def _event(self, plan):
+        from academic_sessions.models import PromotionEvent, StudentEnrollment
+
+        common = {
+            'operation': self.operation,
+            'school_id': self.school_id,
+            'student_id': plan.student_id,
+            'source_academic_year_id': self.source_year_id,
+            'target_academic_year_id': self.target_year_id,
+            'created_by_id': self.actor_id,
+        }
+        if plan.kind == 'fail':
+            return PromotionEvent(
+                **common, event_type=PromotionEvent.EventType.FAILED,
+                reason=plan.reason, details={'action': plan.action},
+            )
+        if plan.kind == 'skip' and plan.old is None:
+            return PromotionEvent(**common, event_type=PromotionEvent.EventType.SKIPPED, reason=plan.reason)
+
+        old = plan.old
+        common.update(
+            source_enrollment=old,
+            source_class_id=old.class_obj_id,
+            source_session_class_id=old.session_class_id,
+            old_status=plan.previous_status,
+            old_roll_number=old.roll_number,
+        )
+        if plan.kind == 'skip':
+            existing = plan.existing
+            return PromotionEvent(
+                **common,
+                target_enrollment=existing,
+                target_class_id=existing.class_obj_id,
+                target_session_class_id=existing.session_class_id,
+                event_type=PromotionEvent.EventType.SKIPPED,
+                new_status=existing.status,
+                new_roll_number=existing.roll_number,
+                reason=plan.reason,
+            )
+        if plan.kind == 'graduate':
+            return PromotionEvent(
+                **common,
+                event_type=PromotionEvent.EventType.GRADUATED,
+                new_status=StudentEnrollment.Status.GRADUATED,
+                new_roll_number=old.roll_number,
+                details={'action': plan.action},
+            )
+        return PromotionEvent(
+            **common,
+            target_enrollment=plan.new,
+            target_class_id=plan.new.class_obj_id,
+            target_session_class_id=plan.new.session_class_id,
+            event_type=(
+                PromotionEvent.EventType.REPEATED if plan.action == 'REPEAT'
+                else PromotionEvent.EventType.PROMOTED
+            ),
+            new_status=plan.new_status,
+            new_roll_number=plan.new.roll_number,
+            details={'action': plan.action},
+        )
+
+    # ── Writing ──
+
+    def _apply(self, plans):
+        """Write a group of plans with bulk statements; call inside a transaction."""
+        from academic_sessions.models import PromotionEvent, StudentEnrollment
+        from students.models import Student
+
+        moves = [p for p in plans if p.kind == 'move']
+        graduates = [p for p in plans if p.kind == 'graduate']
+
+        if moves:
+            StudentEnrollment.objects.bulk_create([p.new for p in moves])
+        status_updates = {}
+        for plan in moves:
+            status_updates.setdefault(plan.new_status, []).append(plan.old.id)
+        if graduates:
+            status_updates[StudentEnrollment.Status.GRADUATED] = [p.old.id for p in graduates]
+        for new_status, enrollment_ids in status_updates.items():
+            StudentEnrollment.objects.filter(id__in=enrollment_ids).update(status=new_status)
+
+        if moves:
+            Student.objects.bulk_update([
+                Student(
+                    id=p.student_id, class_obj_id=p.new.class_obj_id,
+                    roll_number=p.new.roll_number, status=Student.Status.ACTIVE,
+                )
+                for p in moves
+            ], ['class_obj', 'roll_number', 'status'])
+        if graduates:
+            Student.objects.filter(id__in=[p.student_id for p in graduates]).update(
+                status=Student.Status.GRADUATED,
+            )
+
+        if self.operation:
+            PromotionEvent.objects.bulk_create([self._event(p) for p in plans])
+
+        # Bulk writes skip model signals, so drop cached promotion advice explicitly.
+        transaction.on_commit(lambda: invalidate_promotion_advice(self.school_id))
+
+    def _write_chunk(self, plans):
+        try:
+            with transaction.atomic():
+                self._apply(plans)
+            return
+        except IntegrityError:
+            logger.warning('Bulk promotion chunk hit an integrity error; retrying per student.')
+
+        for plan in plans:
+            try:
+                self._replay(plan)
+                continue
+            except IntegrityError as e:
+                error = e
+            # The planned roll may have been taken since the preload.
+            if plan.kind == 'move' and self._reresolve_roll(plan):
+                try:
+                    self._replay(plan)
+                    continue
+                except IntegrityError as e:
+                    error = e
+            plan.kind, plan.reason = 'fail', str(error)
+            with transaction.atomic():
+                self._apply([plan])
+
+    def _replay(self, plan):
+        if plan.new is not None:
+            plan.new.pk = None
+            plan.new._state.adding = True
+        with transaction.atomic():
+            self._apply([plan])
+
+    def _reresolve_roll(self, plan) -> bool:
+        """Move a plan to a roll that is free in the database; False if its roll already is."""
+        from academic_sessions.roll_allocator_service import RollAllocatorService
+
+        roll_number = RollAllocatorService(
+            self.school_id, self.target_year_id, plan.new.class_obj_id,
+        ).resolve_roll(preferred_roll=plan.new.roll_number, exclude_student_id=plan.student_id)
+        if roll_number == plan.new.roll_number:
+            return False
+        self.rolls.record(plan.student_id, plan.new.class_obj_id, roll_number)
+        plan.new.roll_number = roll_number
+        return True
+
+    # ── Entry point ──
+
+    def run(self, promotions, progress=None) -> dict:
+        """
+        Process promotions in order, chunk by chunk.
+
+        progress(done) is called after each chunk is committed. Returns
+        {'promoted': int, 'skipped': [...], 'errors': [...]}.
+        """
+        from academic_sessions.models import PromotionOperation
+
+        self._load(promotions)
+        promoted = 0
+        skipped = []
+        errors = []
+
+        for start in range(0, len(promotions), self.chunk_size):
+            plans = []
+            for promo in promotions[start:start + self.chunk_size]:
+                try:
+                    plans.append(self._plan(promo))
+                except ValueError as e:
+                    plans.append(SimpleNamespace(
+                        kind='fail', student_id=promo.get('student_id'),
+                        action=promo.get('action', 'PROMOTE'), reason=str(e), new=None,
+                    ))
+
+            self._write_chunk(plans)
+
+            for plan in plans:
+                if plan.kind == 'fail':
+                    errors.append({'student_id': plan.student_id, 'error': plan.reason})
+                elif plan.kind == 'skip':
+                    entry = {'student_id': plan.student_id, 'reason': plan.reason}
+                    if plan.existing is not None:
+                        entry['existing_enrollment_id'] = plan.existing.id
+                    skipped.append(entry)
+                else:
+                    promoted += 1
+
+            if self.operation:
+                PromotionOperation.objects.filter(id=self.operation.id).update(
+                    processed_count=promoted, skipped_count=len(skipped), error_count=len(errors),
+                )
+            if progress:
+                progress(min(start + self.chunk_size, len(promotions)))
+
+        return {'promoted': promoted, 'skipped': skipped, 'errors': errors}
@@ -79,3 +79,31 @@ def build_off_day_date_set(school_id, date_from, date_to, class_id=None, class_i
             off_dates.add(cursor)
         cursor += timedelta(days=1)
     return off_dates
+
+
+def build_school_off_day_date_set(school_id, date_from, date_to):
+    """
+    Like build_off_day_date_set for school-wide off days only (Sundays and
+    SCHOOL-scope entries), loaded with a single query for the whole window.
+    """
+    off_dates = set()
+    entries = SchoolCalendarEntry.objects.filter(
+        school_id=school_id,
+        is_active=True,
+        entry_kind=SchoolCalendarEntry.EntryKind.OFF_DAY,
+        scope=SchoolCalendarEntry.Scope.SCHOOL,
+        start_date__lte=date_to,
+        end_date__gte=date_from,
+    ).exclude(off_day_type='').values_list('start_date', 'end_date')
+    for start_date, end_date in entries:
+        cursor = max(start_date, date_from)
+        while cursor <= min(end_date, date_to):
+            off_dates.add(cursor)
+            cursor += timedelta(days=1)
+
+    cursor = date_from
+    while cursor <= date_to:
+        if cursor.weekday() == 6:
+            off_dates.add(cursor)
+        cursor += timedelta(days=1)
+    return off_dates
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic_sessions', '0012_rename_academic_se_school__f1331a_idx_academic_se_school__3d73df_idx_and_more'),
+        ('schools', '0015_add_module_entitlements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionHealthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('taken_at', models.DateTimeField()),
+                ('metrics', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_snapshots', to='academic_sessions.academicyear')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_health_snapshots', to='schools.school')),
+            ],
+            options={
+                'ordering': ['-snapshot_date'],
+                'constraints': [models.UniqueConstraint(fields=('school', 'academic_year', 'snapshot_date'), name='unique_health_snapshot_per_day')],
+            },
+        ),
+    ]
@@ -509,3 +509,41 @@ class PromotionEvent(models.Model):
 
     def __str__(self):
         return f"{self.student_id} - {self.get_event_type_display()}"
+
+
+class SessionHealthSnapshot(models.Model):
+    """
+    Daily persisted aggregates behind the session health report.
+
+    `metrics` holds grouped counters (attendance per date and per student,
+    fee totals per student, mark totals per exam subject, staff attendance
+    per date). The health service refreshes only the groups touched since
+    `taken_at` instead of re-aggregating the whole year.
+    """
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='session_health_snapshots',
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        related_name='health_snapshots',
+    )
+    snapshot_date = models.DateField()
+    taken_at = models.DateTimeField()
+    metrics = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-snapshot_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['school', 'academic_year', 'snapshot_date'],
+                name='unique_health_snapshot_per_day',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.academic_year} health @ {self.snapshot_date}"
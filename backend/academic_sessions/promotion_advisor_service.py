@@ -2,17 +2,45 @@
 AI Smart Promotion Advisor Service.
 
 Analyzes student exam performance, attendance, fee status, and trends
-to generate promotion recommendations (PROMOTE / NEEDS_REVIEW / RETAIN).
+to generate promotion recommendations (PROMOTE / NEEDS_REVIEW / RETAIN),
+for one class or for every class of an academic year in one pass.
 """
 
 import logging
+import time
 from collections import defaultdict
 
+from django.core.cache import cache
 from django.db.models import Q, Count, Avg, Sum, F, Case, When, Value, DecimalField
 
 logger = logging.getLogger(__name__)
 
 
+# Whole-year recommendations are cached per school and academic year. The
+# academic_sessions signals (and the bulk writers for marks, attendance and
+# fees) bump the version whenever the data behind them changes.
+ADVISOR_CACHE_SECONDS = 6 * 60 * 60
+
+RECOMMENDATION_PRIORITY = {'REPEAT': 0, 'NEEDS_REVIEW': 1, 'PROMOTE': 2, 'GRADUATE': 3}
+
+
+def _advisor_version_key(school_id: int) -> str:
+    return f'academic_sessions:promotion_advisor:version:{school_id}'
+
+
+def invalidate_promotion_advice(school_id: int):
+    """Drop cached whole-year promotion recommendations for a school."""
+    cache.set(_advisor_version_key(school_id), time.time_ns(), None)
+
+
+def summarize_recommendations(recommendations: list) -> dict:
+    return {
+        'promote': sum(1 for r in recommendations if r['recommendation'] == 'PROMOTE'),
+        'needs_review': sum(1 for r in recommendations if r['recommendation'] == 'NEEDS_REVIEW'),
+        'retain': sum(1 for r in recommendations if r['recommendation'] == 'RETAIN'),
+    }
+
+
 class PromotionAdvisorService:
     """Generates AI-driven promotion recommendations for students in a class."""
 
@@ -25,55 +53,77 @@ class PromotionAdvisorService:
         Analyze all students enrolled in the given class for the academic year
         and return a list of promotion recommendations.
         """
+        return self._recommend(class_ids=[class_id], manual_graduates=manual_graduates).get(class_id, [])
+
+    def get_school_recommendations(self) -> dict:
+        """
+        Recommendations for every class in the academic year, in one pass.
+
+        Enrollments, exams, marks, attendance and fee aggregates are loaded
+        once for the whole year. Returns {class_id: [recommendation, ...]};
+        cached until invalidate_promotion_advice() is called for the school.
+        """
+        version = cache.get(_advisor_version_key(self.school_id), 0)
+        key = f'academic_sessions:promotion_advisor:{self.school_id}:{self.academic_year_id}:{version}'
+        data = cache.get(key)
+        if data is None:
+            data = self._recommend()
+            cache.set(key, data, ADVISOR_CACHE_SECONDS)
+        return data
+
+    def _recommend(self, class_ids=None, manual_graduates: set = None) -> dict:
+        """Build recommendations for the given classes (all classes if None)."""
         from academic_sessions.models import StudentEnrollment
         from attendance.models import AttendanceRecord
         from finance.models import FeePayment
-        from examinations.models import StudentMark, ExamSubject, Exam
+        from examinations.models import StudentMark, Exam
 
-        # 1. Get all enrolled students for this class and year
-        enrollments = StudentEnrollment.objects.filter(
+        # 1. Get all enrolled students for these classes and year
+        enrollment_qs = StudentEnrollment.objects.filter(
             school_id=self.school_id,
             academic_year_id=self.academic_year_id,
-            class_obj_id=class_id,
             is_active=True,
-        ).select_related('student', 'class_obj')
+        )
+        if class_ids is not None:
+            enrollment_qs = enrollment_qs.filter(class_obj_id__in=class_ids)
+        enrollments = list(enrollment_qs.select_related('student', 'class_obj'))
+
+        if not enrollments:
+            return {}
 
         # Get highest grade_level for this school
         from students.models import Class
         highest_grade = Class.get_highest_grade_level(self.school_id)
         manual_graduates = manual_graduates or set()
 
-        if not enrollments.exists():
-            return []
+        student_ids = enrollment_qs.values('student_id')
 
-        student_ids = list(enrollments.values_list('student_id', flat=True))
-
-        # 2. Fetch all exams for this class and academic year
-        exams = Exam.objects.filter(
+        # 2. Fetch all exams for these classes and academic year, per class in date order
+        exam_qs = Exam.objects.filter(
             school_id=self.school_id,
             academic_year_id=self.academic_year_id,
-            class_obj_id=class_id,
             is_active=True,
-        ).order_by('start_date')
-
-        exam_ids = list(exams.values_list('id', flat=True))
+        )
+        if class_ids is not None:
+            exam_qs = exam_qs.filter(class_obj_id__in=class_ids)
+        exam_ids_by_class = defaultdict(list)
+        for exam_id, exam_class_id in exam_qs.order_by('start_date', 'id').values_list('id', 'class_obj_id'):
+            exam_ids_by_class[exam_class_id].append(exam_id)
 
-        # 3. Fetch all marks for these students in these exams
+        # 3. Fetch all marks for these students in these exams, keyed by the exam's class
         marks_qs = StudentMark.objects.filter(
             school_id=self.school_id,
             student_id__in=student_ids,
-            exam_subject__exam_id__in=exam_ids,
+            exam_subject__exam_id__in=exam_qs.values('id'),
         ).select_related('exam_subject', 'exam_subject__exam', 'exam_subject__subject')
 
-        # Build per-student marks data
+        # Build per-student marks data, plus per-exam marks for trend analysis
         student_marks = defaultdict(list)
-        for mark in marks_qs:
-            student_marks[mark.student_id].append(mark)
-
-        # Build per-student per-exam marks for trend analysis
         student_exam_marks = defaultdict(lambda: defaultdict(list))
         for mark in marks_qs:
-            student_exam_marks[mark.student_id][mark.exam_subject.exam_id].append(mark)
+            key = (mark.student_id, mark.exam_subject.exam.class_obj_id)
+            student_marks[key].append(mark)
+            student_exam_marks[key][mark.exam_subject.exam_id].append(mark)
 
         # 4. Fetch attendance data for these students in the academic year
         attendance_stats = {}
@@ -119,13 +169,14 @@ class PromotionAdvisorService:
             }
 
         # 6. Generate recommendations for each student
-        recommendations = []
+        by_class = defaultdict(list)
         for enrollment in enrollments:
             student = enrollment.student
             sid = student.id
+            key = (sid, enrollment.class_obj_id)
 
             # Exam performance
-            marks_list = student_marks.get(sid, [])
+            marks_list = student_marks.get(key, [])
             exam_data = self._analyze_exam_performance(marks_list)
 
             # Attendance
@@ -137,8 +188,8 @@ class PromotionAdvisorService:
             fee_paid_rate = fee['rate']
 
             # Trend analysis
-            exam_marks_by_exam = student_exam_marks.get(sid, {})
-            trend = self._analyze_trend(exam_marks_by_exam, exam_ids)
+            exam_marks_by_exam = student_exam_marks.get(key, {})
+            trend = self._analyze_trend(exam_marks_by_exam, exam_ids_by_class[enrollment.class_obj_id])
 
             # Confidence score
             confidence = self._calculate_confidence(marks_list, att, fee)
@@ -158,7 +209,7 @@ class PromotionAdvisorService:
                     exam_data, attendance_rate, fee_paid_rate, trend, risk_flags,
                 )
 
-            recommendations.append({
+            by_class[enrollment.class_obj_id].append({
                 'student_id': sid,
                 'student_name': student.name,
                 'roll_number': enrollment.roll_number,
@@ -176,10 +227,10 @@ class PromotionAdvisorService:
             })
 
         # Sort by recommendation priority: REPEAT first, then NEEDS_REVIEW, then PROMOTE, then GRADUATE
-        priority = {'REPEAT': 0, 'NEEDS_REVIEW': 1, 'PROMOTE': 2, 'GRADUATE': 3}
-        recommendations.sort(key=lambda r: (priority.get(r['recommendation'], 4), r['roll_number']))
+        for recommendations in by_class.values():
+            recommendations.sort(key=lambda r: (RECOMMENDATION_PRIORITY.get(r['recommendation'], 4), r['roll_number']))
 
-        return recommendations
+        return dict(by_class)
 
     def _analyze_exam_performance(self, marks_list: list) -> dict:
         """Analyze exam performance from a list of StudentMark objects."""
@@ -2,9 +2,13 @@
 Roll number allocation service.
 
 Provides deterministic roll allocation for enrollment buckets:
-(school, academic_year, class).
+(school, academic_year, class). New numbers come from a per-bucket
+IdentifierSequence (core.sequences), seeded from the highest existing roll.
 """
 
+from collections import Counter, defaultdict
+
+
 class RollAllocatorService:
     """Allocate roll numbers with conflict-safe checks."""
 
@@ -98,11 +102,109 @@ class RollAllocatorService:
 
         return enrollment_taken.exists() or student_taken.exists()
 
+    def _sequence_args(self, exclude_student_id=None):
+        from core.sequences import roll_scope
+
+        return {
+            'school_id': self.school_id,
+            'scope': roll_scope(self.class_obj_id, self.session_class_id),
+            'seed': lambda: self._current_numeric_max(exclude_student_id=exclude_student_id),
+            'academic_year_id': self.academic_year_id,
+        }
+
     def next_highest_roll(self, exclude_student_id=None):
-        return str(self._current_numeric_max(exclude_student_id=exclude_student_id) + 1)
+        from core.sequences import next_value
+
+        return str(next_value(
+            **self._sequence_args(exclude_student_id),
+            is_taken=lambda value: self.is_roll_taken(str(value), exclude_student_id=exclude_student_id),
+        ))
 
     def resolve_roll(self, preferred_roll=None, exclude_student_id=None):
+        from core.sequences import observe
+
         preferred = str(preferred_roll or '').strip()
         if preferred and not self.is_roll_taken(preferred, exclude_student_id=exclude_student_id):
+            # Keep later auto-allocated rolls ahead of a hand-picked one.
+            observe(value=self._to_int(preferred), **self._sequence_args(exclude_student_id))
             return preferred
         return self.next_highest_roll(exclude_student_id=exclude_student_id)
+
+
+class BatchRollAllocator:
+    """
+    In-memory RollAllocatorService for many class-level allocations at once.
+
+    Loads the target year's active enrollment rolls and the student snapshot
+    rolls for the given classes in two queries, then applies the same
+    taken / next-highest rules as RollAllocatorService.resolve_roll(). Each
+    allocation is recorded, so later students in the batch see earlier ones.
+    """
+
+    def __init__(self, school_id: int, academic_year_id: int, class_ids, student_ids=()):
+        from django.db.models import Q
+
+        from academic_sessions.models import StudentEnrollment
+        from students.models import Student
+
+        class_ids = {int(c) for c in class_ids if c}
+        self._enrolled = defaultdict(Counter)        # class -> roll -> active target enrollments
+        self._snapshot_rolls = defaultdict(Counter)  # class -> roll -> students holding it
+        self._snapshot = {}                          # student -> (class, roll)
+
+        for class_id, roll in StudentEnrollment.objects.filter(
+            school_id=school_id,
+            academic_year_id=academic_year_id,
+            is_active=True,
+            class_obj_id__in=class_ids,
+        ).values_list('class_obj_id', 'roll_number'):
+            self._enrolled[class_id][roll] += 1
+
+        for student_id, class_id, roll in Student.objects.filter(
+            Q(class_obj_id__in=class_ids) | Q(id__in=list(student_ids)),
+            school_id=school_id,
+        ).values_list('id', 'class_obj_id', 'roll_number'):
+            self._snapshot[student_id] = (class_id, roll)
+            self._snapshot_rolls[class_id][roll] += 1
+
+    def _snapshot_count(self, class_id, roll, exclude_student_id):
+        count = self._snapshot_rolls[class_id][roll]
+        if exclude_student_id and self._snapshot.get(exclude_student_id) == (class_id, roll):
+            count -= 1
+        return count
+
+    def is_roll_taken(self, class_id, roll_number, exclude_student_id=None):
+        roll = str(roll_number).strip()
+        if not roll:
+            return False
+        return (
+            self._enrolled[class_id][roll] > 0
+            or self._snapshot_count(class_id, roll, exclude_student_id) > 0
+        )
+
+    def next_highest_roll(self, class_id, exclude_student_id=None):
+        max_roll = 0
+        for roll, count in self._enrolled[class_id].items():
+            value = RollAllocatorService._to_int(roll)
+            if count > 0 and value is not None:
+                max_roll = max(max_roll, value)
+        for roll in self._snapshot_rolls[class_id]:
+            value = RollAllocatorService._to_int(roll)
+            if value is not None and self._snapshot_count(class_id, roll, exclude_student_id) > 0:
+                max_roll = max(max_roll, value)
+        return str(max_roll + 1)
+
+    def resolve_roll(self, class_id, preferred_roll=None, exclude_student_id=None):
+        preferred = str(preferred_roll or '').strip()
+        if preferred and not self.is_roll_taken(class_id, preferred, exclude_student_id=exclude_student_id):
+            return preferred
+        return self.next_highest_roll(class_id, exclude_student_id=exclude_student_id)
+
+    def record(self, student_id, class_id, roll_number):
+        """Reserve a roll: a new active enrollment plus the moved student snapshot."""
+        self._enrolled[class_id][roll_number] += 1
+        previous = self._snapshot.get(student_id)
+        if previous:
+            self._snapshot_rolls[previous[0]][previous[1]] -= 1
+        self._snapshot[student_id] = (class_id, roll_number)
+        self._snapshot_rolls[class_id][roll_number] += 1
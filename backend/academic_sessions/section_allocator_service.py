@@ -1,14 +1,21 @@
 """
 AI Smart Section Allocator Service.
 
-Distributes students across N sections using a balanced serpentine algorithm
-that ensures each section has a mix of high, medium, and low performers.
+Distributes students across N sections so that each section has a mix of high,
+medium, and low performers, a similar gender mix and size, and an even share of
+special-needs students. Siblings can be kept together or apart, and sections
+can be capped. The weighted search itself lives in section_balancer.
 """
 
 import logging
 from collections import defaultdict
 
+from django.db import DatabaseError, transaction
 from django.db.models import Avg, F, Q, Case, When, DecimalField
+from django.utils import timezone
+
+from .promotion_advisor_service import invalidate_promotion_advice
+from .section_balancer import DEFAULT_WEIGHTS, SIBLING_POLICIES, SectionBalancer
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +27,11 @@ class SectionAllocatorService:
         self.school_id = school_id
 
     def allocate_students(self, grade_id: int = None, academic_year_id: int = None,
-                          num_sections: int = 2, class_id: int = None) -> dict:
+                          num_sections: int = 2, class_id: int = None, weights: dict = None,
+                          sibling_policy: str = 'ignore', special_needs_ids=None,
+                          max_per_section: int = None, match_siblings_by_phone: bool = False) -> dict:
         """
-        Allocate students across N sections using serpentine distribution.
+        Allocate students across N sections balancing several weighted criteria.
 
         Supports two modes:
         - class_id: Split a single class into N section-classes.
@@ -30,14 +39,37 @@ class SectionAllocatorService:
 
         1. Gets students for the class or grade.
         2. Computes each student's average percentage from StudentMark.
-        3. Sorts by performance (descending) and distributes using serpentine/snake order.
-        4. Returns a preview with allocation details and balance metrics.
+        3. Starts from a serpentine split by performance and improves it with
+           SectionBalancer (score, size, gender, special needs, siblings).
+        4. Returns a preview with allocation details and per-criterion balance metrics.
+
+        weights: per-criterion weights, keys from DEFAULT_WEIGHTS.
+        sibling_policy: 'ignore', 'together' or 'apart'; siblings are the
+        confirmed sibling groups from finance.
+        match_siblings_by_phone: also treat students outside a confirmed group
+        who share a parent phone number as siblings.
+        special_needs_ids: students to spread evenly across sections.
+        max_per_section: hard capacity per section.
         """
         from students.models import Class, Student
         from academic_sessions.models import StudentEnrollment
 
         if num_sections < 2 or num_sections > 6:
             return {'success': False, 'error': 'Number of sections must be between 2 and 6.'}
+        if sibling_policy not in SIBLING_POLICIES:
+            return {'success': False, 'error': f'sibling_policy must be one of: {", ".join(SIBLING_POLICIES)}.'}
+        unknown = set(weights or {}) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            return {'success': False, 'error': f'Unknown weight criteria: {", ".join(sorted(unknown))}.'}
+        try:
+            weights = {key: float(value) for key, value in (weights or {}).items()}
+        except (TypeError, ValueError):
+            return {'success': False, 'error': 'Weights must be numbers.'}
+        if any(value < 0 for value in weights.values()):
+            return {'success': False, 'error': 'Weights cannot be negative.'}
+        if max_per_section is not None and max_per_section < 1:
+            return {'success': False, 'error': 'max_per_section must be at least 1.'}
+        special_needs_ids = set(special_needs_ids or [])
 
         source_name = None
         source_class = None
@@ -94,6 +126,8 @@ class SectionAllocatorService:
 
         # 4. Build student info list
         students_info = []
+        families = {}
+        confirmed_families = self._sibling_group_keys(student_ids) if sibling_policy != 'ignore' else {}
         student_objects = Student.objects.filter(
             id__in=student_ids, school_id=self.school_id,
         ).select_related('class_obj')
@@ -120,29 +154,44 @@ class SectionAllocatorService:
 
             if has_gender:
                 info['gender'] = getattr(student, 'gender', '') or ''
+            if special_needs_ids:
+                info['special_needs'] = student.id in special_needs_ids
 
             students_info.append(info)
+            families[student.id] = confirmed_families.get(student.id) or (
+                self._phone_family_key(student) if match_siblings_by_phone else ''
+            )
 
         # 5. Sort students by academic performance descending
         students_info.sort(key=lambda s: s['avg_score'], reverse=True)
 
-        # 6. Serpentine/snake allocation
-        section_labels = [chr(ord('A') + i) for i in range(num_sections)]
-        sections = {label: [] for label in section_labels}
-
-        for idx, student in enumerate(students_info):
-            # Determine which "round" we're in
-            round_num = idx // num_sections
-            pos_in_round = idx % num_sections
-
-            if round_num % 2 == 0:
-                # Forward: A, B, C, ...
-                section_label = section_labels[pos_in_round]
-            else:
-                # Reverse: ..., C, B, A
-                section_label = section_labels[num_sections - 1 - pos_in_round]
+        # Siblings share a family key; only groups of two or more get a sibling_group label
+        family_sizes = defaultdict(int)
+        for key in families.values():
+            if key:
+                family_sizes[key] += 1
+        sibling_groups = {}
+        for info in students_info:
+            key = families[info['student_id']]
+            info['family'] = key if family_sizes.get(key, 0) > 1 else None
+            if sibling_policy != 'ignore':
+                if info['family'] and info['family'] not in sibling_groups:
+                    sibling_groups[info['family']] = len(sibling_groups) + 1
+                info['sibling_group'] = sibling_groups.get(info['family'])
+
+        # 6. Weighted local search, starting from a serpentine split
+        try:
+            balanced = SectionBalancer(
+                students_info, num_sections, weights=weights, sibling_policy=sibling_policy,
+                max_per_section=max_per_section, balance_gender=has_gender,
+            ).solve()
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
 
-            sections[section_label].append(student)
+        section_labels = [chr(ord('A') + i) for i in range(num_sections)]
+        sections = dict(zip(section_labels, balanced))
+        for info in students_info:
+            info.pop('family')
 
         # 7. Build response
         section_results = []
@@ -171,6 +220,14 @@ class SectionAllocatorService:
                     g = s.get('gender', '') or 'Unknown'
                     gender_counts[g] += 1
                 section_data['gender_distribution'] = dict(gender_counts)
+            if special_needs_ids:
+                section_data['special_needs_count'] = sum(1 for s in section_students if s['special_needs'])
+            if sibling_policy != 'ignore':
+                group_counts = defaultdict(int)
+                for s in section_students:
+                    if s['sibling_group']:
+                        group_counts[s['sibling_group']] += 1
+                section_data['sibling_pairs'] = sum(n * (n - 1) // 2 for n in group_counts.values())
 
             section_results.append(section_data)
 
@@ -179,6 +236,33 @@ class SectionAllocatorService:
         score_variance = self._compute_variance(section_avg_scores)
         count_variance = self._compute_variance(section_counts)
 
+        criteria = {
+            'score': round(score_variance, 2),
+            'size': round(count_variance, 2),
+        }
+        if has_gender:
+            genders = sorted({g for s in section_results for g in s['gender_distribution']})
+            criteria['gender'] = {
+                g: round(self._compute_variance([s['gender_distribution'].get(g, 0) for s in section_results]), 2)
+                for g in genders
+            }
+        if special_needs_ids:
+            criteria['special_needs'] = round(
+                self._compute_variance([s['special_needs_count'] for s in section_results]), 2,
+            )
+        if sibling_policy != 'ignore':
+            group_sections = defaultdict(set)
+            for section in section_results:
+                for s in section['students']:
+                    if s['sibling_group']:
+                        group_sections[s['sibling_group']].add(section['section_name'])
+            criteria['siblings'] = {
+                'policy': sibling_policy,
+                'groups': len(sibling_groups),
+                'split_groups': sum(1 for labels in group_sections.values() if len(labels) > 1),
+                'pairs_sharing_section': sum(s['sibling_pairs'] for s in section_results),
+            }
+
         return {
             'success': True,
             'total_students': len(students_info),
@@ -188,6 +272,13 @@ class SectionAllocatorService:
             'balance_metrics': {
                 'score_variance': round(score_variance, 2),
                 'count_variance': round(count_variance, 2),
+                'criteria': criteria,
+            },
+            'weights': {**DEFAULT_WEIGHTS, **(weights or {})},
+            'constraints': {
+                'sibling_policy': sibling_policy,
+                'max_per_section': max_per_section,
+                'special_needs_count': sum(1 for s in students_info if s.get('special_needs')),
             },
         }
 
@@ -196,6 +287,9 @@ class SectionAllocatorService:
         """
         Apply the allocation preview: create/update Class records for each section
         and update student assignments.
+
+        Runs in a single transaction with one bulk update for the enrollments and
+        one Student update per section, so a failure leaves the class unsplit.
         """
         from students.models import Class, Student
         from academic_sessions.models import StudentEnrollment
@@ -210,69 +304,83 @@ class SectionAllocatorService:
 
         source_name = source_class.name
         grade_level = source_class.grade_level
+        sections = allocation_data.get('sections', [])
 
         sections_created = 0
         students_moved = 0
-        errors = []
-
-        for section_data in allocation_data.get('sections', []):
-            section_name = section_data['section_name']
-            class_name = f"{source_name}-{section_name}"
-
-            # Create or get the Class for this section
-            class_obj, created = Class.objects.get_or_create(
-                school_id=self.school_id,
-                name=class_name,
-                defaults={
-                    'section': section_name,
-                    'grade_level': grade_level,
-                    'is_active': True,
-                },
-            )
+        # student_id -> section Class; a student listed twice ends up in the last section.
+        target_class = {}
 
-            if created:
-                sections_created += 1
-            else:
-                if not class_obj.is_active:
-                    class_obj.is_active = True
-                    class_obj.save(update_fields=['is_active', 'updated_at'])
-
-            # Move students to this class
-            for student_info in section_data.get('students', []):
-                student_id = student_info['student_id']
-                try:
-                    # Update enrollment
-                    enrollment = StudentEnrollment.objects.filter(
+        try:
+            with transaction.atomic():
+                section_students = []
+                for section_data in sections:
+                    section_name = section_data['section_name']
+                    class_name = f"{source_name}-{section_name}"
+
+                    # Create or get the Class for this section
+                    class_obj, created = Class.objects.get_or_create(
                         school_id=self.school_id,
-                        student_id=student_id,
-                        academic_year_id=academic_year_id,
-                        is_active=True,
-                    ).first()
-
-                    if enrollment:
-                        enrollment.class_obj = class_obj
-                        enrollment.save(update_fields=['class_obj', 'updated_at'])
-
-                    # Also update student's current class_obj
-                    Student.objects.filter(
-                        id=student_id, school_id=self.school_id,
-                    ).update(class_obj=class_obj)
-
-                    students_moved += 1
-                except Exception as e:
-                    errors.append({
-                        'student_id': student_id,
-                        'error': str(e),
-                    })
+                        name=class_name,
+                        defaults={
+                            'section': section_name,
+                            'grade_level': grade_level,
+                            'is_active': True,
+                        },
+                    )
+
+                    if created:
+                        sections_created += 1
+                    else:
+                        if not class_obj.is_active:
+                            class_obj.is_active = True
+                            class_obj.save(update_fields=['is_active', 'updated_at'])
+
+                    student_ids = [info['student_id'] for info in section_data.get('students', [])]
+                    for student_id in student_ids:
+                        target_class[student_id] = class_obj
+                    section_students.append((class_obj, student_ids))
+                    students_moved += len(student_ids)
+
+                # Update enrollments (the first active one per student, as before)
+                enrollments = {}
+                for enrollment in StudentEnrollment.objects.filter(
+                    school_id=self.school_id,
+                    student_id__in=list(target_class),
+                    academic_year_id=academic_year_id,
+                    is_active=True,
+                ):
+                    enrollments.setdefault(enrollment.student_id, enrollment)
+
+                now = timezone.now()
+                for student_id, enrollment in enrollments.items():
+                    enrollment.class_obj = target_class[student_id]
+                    enrollment.updated_at = now
+                StudentEnrollment.objects.bulk_update(
+                    list(enrollments.values()), ['class_obj', 'updated_at'], batch_size=500,
+                )
+                # Bulk writes skip model signals; cached promotion advice is grouped by class.
+                transaction.on_commit(lambda: invalidate_promotion_advice(self.school_id))
+
+                # Also update students' current class_obj
+                for class_obj, student_ids in section_students:
+                    moved_here = [sid for sid in student_ids if target_class[sid] is class_obj]
+                    if moved_here:
+                        Student.objects.filter(
+                            id__in=moved_here, school_id=self.school_id,
+                        ).update(class_obj=class_obj)
+        except DatabaseError as e:
+            logger.exception('Section allocation failed for class %s', class_id)
+            return {'success': False, 'error': f'Allocation could not be applied: {e}'}
 
         return {
             'success': True,
             'sections_created': sections_created,
             'students_moved': students_moved,
-            'errors': errors,
+            'errors': [],
             'message': (
                 f'Allocation applied: {students_moved} students distributed '
-                f'across {len(allocation_data.get("sections", []))} sections.'
+                f'across {len(sections)} sections.'
             ),
         }
 
@@ -302,6 +410,27 @@ class SectionAllocatorService:
 
         return averages
 
+    def _sibling_group_keys(self, student_ids) -> dict:
+        """{student_id: family key} for students in an active confirmed sibling group."""
+        from finance.models import SiblingGroupMember
+
+        return {
+            student_id: f'group:{group_id}'
+            for student_id, group_id in SiblingGroupMember.objects.filter(
+                student_id__in=student_ids,
+                group__school_id=self.school_id,
+                group__is_active=True,
+            ).values_list('student_id', 'group_id')
+        }
+
+    @staticmethod
+    def _phone_family_key(student) -> str:
+        """Opt-in fallback: students sharing a parent phone number."""
+        from finance.sibling_detection import normalize_phone
+
+        phone = normalize_phone(student.parent_phone)
+        return f'phone:{phone}' if phone else ''
+
     @staticmethod
     def _model_has_field(model_class, field_name: str) -> bool:
         """Check if a Django model has a specific field."""
@@ -0,0 +1,275 @@
+"""
+Multi-criteria section balancing.
+
+Assigns students to N sections so that several weighted criteria are balanced
+at once: class size, average score, gender mix, special-needs students and,
+optionally, siblings kept apart. Siblings can instead be kept together, in
+which case each family is placed as one unit. A per-section capacity is a
+hard limit.
+
+The search starts from the serpentine split by score used by the original
+allocator and improves it by local search: a random student (or family) is
+moved to, or swapped with a student of, another random section whenever that
+lowers the weighted cost. Each step only re-scores the two sections involved,
+and the search stops once it goes stale, so a 500-student grade settles in a
+fraction of a second.
+"""
+
+import random
+import statistics
+from collections import Counter, defaultdict
+
+SIBLING_POLICIES = ('ignore', 'together', 'apart')
+
+DEFAULT_WEIGHTS = {
+    'score': 1.0,
+    'size': 1.0,
+    'gender': 1.0,
+    'special_needs': 1.0,
+    'siblings': 1.0,
+}
+
+
+def _pairs(count):
+    return count * (count - 1) // 2
+
+
+class _Unit:
+    """Students that always sit in the same section (one student or one family)."""
+
+    __slots__ = ('members', 'size', 'score_sum', 'genders', 'special', 'family')
+
+    def __init__(self, members, family=None):
+        self.members = members
+        self.size = len(members)
+        self.score_sum = sum(m['avg_score'] for m in members)
+        self.genders = Counter(m.get('gender') or 'Unknown' for m in members)
+        self.special = sum(1 for m in members if m.get('special_needs'))
+        self.family = family
+
+
+class SectionBalancer:
+    """Local-search allocator for weighted, capacity-capped section splits."""
+
+    def __init__(self, students: list, num_sections: int, weights: dict = None,
+                 sibling_policy: str = 'ignore', max_per_section: int = None,
+                 balance_gender: bool = True, seed: int = 0, iterations: int = None):
+        """
+        students: dicts with student_id, avg_score and optionally gender,
+        special_needs (bool) and family (a sibling group key, or None).
+        """
+        if sibling_policy not in SIBLING_POLICIES:
+            raise ValueError(f'sibling_policy must be one of {", ".join(SIBLING_POLICIES)}.')
+
+        self.num_sections = num_sections
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        if not balance_gender:
+            self.weights['gender'] = 0.0
+        if sibling_policy != 'apart':
+            self.weights['siblings'] = 0.0
+        self.sibling_policy = sibling_policy
+        self.rng = random.Random(seed)
+
+        family_sizes = Counter(s.get('family') for s in students if s.get('family'))
+        siblings = {family for family, size in family_sizes.items() if size > 1}
+
+        if sibling_policy == 'together':
+            families = defaultdict(list)
+            self.units = []
+            for s in students:
+                if s.get('family') in siblings:
+                    families[s['family']].append(s)
+                else:
+                    self.units.append(_Unit([s]))
+            self.units.extend(_Unit(members, family) for family, members in families.items())
+        else:
+            self.units = [
+                _Unit([s], s.get('family') if s.get('family') in siblings else None)
+                for s in students
+            ]
+
+        total = len(students)
+        self.capacity = max_per_section or total
+        if total > self.capacity * num_sections:
+            raise ValueError(
+                f'{total} students do not fit in {num_sections} sections of {self.capacity}.'
+            )
+        if any(unit.size > self.capacity for unit in self.units):
+            raise ValueError('A sibling group is larger than the section capacity.')
+
+        scores = [s['avg_score'] for s in students]
+        self.target_size = max(total / num_sections, 1.0)
+        self.mean_score = statistics.fmean(scores) if scores else 0.0
+        self.score_scale = (statistics.pstdev(scores) if len(scores) > 1 else 0.0) or 1.0
+        gender_totals = Counter()
+        for unit in self.units:
+            gender_totals.update(unit.genders)
+        self.gender_targets = {g: n / num_sections for g, n in gender_totals.items()}
+        self.special_target = sum(u.special for u in self.units) / num_sections
+        self.iterations = iterations if iterations is not None else min(40 * len(self.units), 40000)
+
+    # ── Cost model ──
+
+    def _section_cost(self, count, score_sum, genders, special, pairs):
+        w = self.weights
+        cost = w['size'] * ((count - self.target_size) / self.target_size) ** 2
+        if count:
+            cost += w['score'] * ((score_sum / count - self.mean_score) / self.score_scale) ** 2
+        if w['gender']:
+            for gender, expected in self.gender_targets.items():
+                cost += w['gender'] * ((genders.get(gender, 0) - expected) / max(1.0, expected)) ** 2
+        if w['special_needs'] and self.special_target:
+            cost += w['special_needs'] * (
+                (special - self.special_target) / max(1.0, self.special_target)
+            ) ** 2
+        return cost + w['siblings'] * pairs
+
+    def _cost_after(self, section, removed=(), added=()):
+        """Cost of a section with some units taken out and others put in."""
+        genders = dict(self.genders[section])
+        count = self.count[section]
+        score_sum = self.score_sum[section]
+        special = self.special[section]
+        family_delta = defaultdict(int)
+        for unit, sign in [(u, -1) for u in removed] + [(u, 1) for u in added]:
+            count += sign * unit.size
+            score_sum += sign * unit.score_sum
+            special += sign * unit.special
+            for gender, n in unit.genders.items():
+                genders[gender] = genders.get(gender, 0) + sign * n
+            if unit.family:
+                family_delta[unit.family] += sign * unit.size
+        pairs = self.pairs[section]
+        families = self.families[section]
+        for family, delta in family_delta.items():
+            pairs += _pairs(families[family] + delta) - _pairs(families[family])
+        return self._section_cost(count, score_sum, genders, special, pairs)
+
+    # ── Bookkeeping ──
+
+    def _place(self, index, section):
+        unit = self.units[index]
+        self.assignment[index] = section
+        self.members[section].append(index)
+        self.position[index] = len(self.members[section]) - 1
+        self.count[section] += unit.size
+        self.score_sum[section] += unit.score_sum
+        self.special[section] += unit.special
+        self.genders[section].update(unit.genders)
+        if unit.family:
+            self.pairs[section] += _pairs(self.families[section][unit.family] + unit.size) - _pairs(
+                self.families[section][unit.family]
+            )
+            self.families[section][unit.family] += unit.size
+        self.cost[section] = self._cost_after(section)
+
+    def _remove(self, index):
+        unit = self.units[index]
+        section = self.assignment[index]
+        members = self.members[section]
+        last = members.pop()
+        if last != index:
+            members[self.position[index]] = last
+            self.position[last] = self.position[index]
+        self.count[section] -= unit.size
+        self.score_sum[section] -= unit.score_sum
+        self.special[section] -= unit.special
+        self.genders[section].subtract(unit.genders)
+        if unit.family:
+            self.pairs[section] += _pairs(self.families[section][unit.family] - unit.size) - _pairs(
+                self.families[section][unit.family]
+            )
+            self.families[section][unit.family] -= unit.size
+
+    def _move(self, index, section):
+        old = self.assignment[index]
+        self._remove(index)
+        self.cost[old] = self._cost_after(old)
+        self._place(index, section)
+
+    # ── Search ──
+
+    def _initial_split(self):
+        """Serpentine by average score, skipping sections that are full."""
+        n = self.num_sections
+        order = sorted(
+            range(len(self.units)),
+            key=lambda i: (-self.units[i].size, -self.units[i].score_sum / self.units[i].size),
+        )
+        for idx, unit_index in enumerate(order):
+            round_num, pos = divmod(idx, n)
+            preferred = pos if round_num % 2 == 0 else n - 1 - pos
+            unit = self.units[unit_index]
+            candidates = [preferred] + sorted(
+                (s for s in range(n) if s != preferred), key=lambda s: self.count[s],
+            )
+            section = next(
+                (s for s in candidates if self.count[s] + unit.size <= self.capacity), None,
+            )
+            if section is None:
+                raise ValueError('Students cannot be placed within the section capacity.')
+            self._place(unit_index, section)
+
+    def solve(self) -> list:
+        """Return a list of sections, each a list of the input student dicts."""
+        n = self.num_sections
+        self.assignment = [None] * len(self.units)
+        self.position = [0] * len(self.units)
+        self.members = [[] for _ in range(n)]
+        self.count = [0] * n
+        self.score_sum = [0.0] * n
+        self.special = [0] * n
+        self.genders = [Counter() for _ in range(n)]
+        self.families = [Counter() for _ in range(n)]
+        self.pairs = [0] * n
+        self.cost = [0.0] * n
+
+        self._initial_split()
+
+        rng = self.rng
+        # Stop early once a few passes over the units bring no improvement.
+        patience, stale = 2 * len(self.units), 0
+        for _ in range(self.iterations if len(self.units) > 1 else 0):
+            if stale > patience:
+                break
+            u = rng.randrange(len(self.units))
+            a = self.assignment[u]
+            b = rng.randrange(n - 1)
+            if b >= a:
+                b += 1
+            unit = self.units[u]
+            current = self.cost[a] + self.cost[b]
+            best_delta, best_swap = -1e-9, None
+
+            if self.count[b] + unit.size <= self.capacity:
+                delta = self._cost_after(a, removed=[unit]) + self._cost_after(b, added=[unit]) - current
+                if delta < best_delta:
+                    best_delta, best_swap = delta, -1
+
+            if self.members[b]:
+                v = self.members[b][rng.randrange(len(self.members[b]))]
+                other = self.units[v]
+                if (self.count[a] - unit.size + other.size <= self.capacity
+                        and self.count[b] - other.size + unit.size <= self.capacity):
+                    delta = (
+                        self._cost_after(a, removed=[unit], added=[other])
+                        + self._cost_after(b, removed=[other], added=[unit])
+                        - current
+                    )
+                    if delta < best_delta:
+                        best_delta, best_swap = delta, v
+
+            if best_swap is None:
+                stale += 1
+                continue
+            stale = 0
+            self._move(u, b)
+            if best_swap != -1:
+                self._move(best_swap, a)
+
+        sections = [[] for _ in range(n)]
+        for index, section in enumerate(self.assignment):
+            sections[section].extend(self.units[index].members)
+        for section in sections:
+            section.sort(key=lambda s: s['avg_score'], reverse=True)
+        return sections
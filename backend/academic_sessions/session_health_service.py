@@ -3,19 +3,55 @@ AI Session Health Dashboard Service.
 
 Aggregates data across enrollment, attendance, fee collection, exam performance,
 and staff modules to produce a holistic health report for an academic session.
+The row-level aggregates are kept in daily SessionHealthSnapshot rows and only
+the groups touched since the latest snapshot are re-aggregated per request.
 Optionally generates an AI-powered natural-language summary via Groq LLM.
 """
 
 import json
 import logging
-from datetime import date
+from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.conf import settings
-from django.db.models import Avg, Count, Q, Sum, F
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# Bump to discard stored snapshots when the stored aggregates change shape.
+SNAPSHOT_VERSION = 1
+
+# Rows written while a snapshot was being taken may carry a slightly earlier
+# timestamp; re-reading their groups is harmless, missing them is not.
+SNAPSHOT_OVERLAP = timedelta(minutes=5)
+
+
+def _grouped(queryset, key: str, aggregates: dict) -> dict:
+    """{str(key value): [aggregate, ...]} in the order of `aggregates`."""
+    rows = queryset.values(key).annotate(**aggregates).order_by()
+    return {
+        str(row[key]): [_number(row[name]) for name in aggregates]
+        for row in rows
+    }
+
+
+def _number(value):
+    """JSON-friendly aggregate value (sums come back as Decimal or None)."""
+    if value is None:
+        return 0
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _rate_between(by_date: dict, start, end):
+    """Attendance rate over the days of by_date within [start, end]."""
+    start, end = str(start), str(end)
+    in_range = [counts for day, counts in by_date.items() if start <= day <= end]
+    total = sum(t for t, _ in in_range)
+    present = sum(p for _, p in in_range)
+    return round((present / total * 100), 1) if total > 0 else 0
+
 
 class SessionHealthService:
     """Generates a cross-module health report for a given academic year."""
@@ -39,11 +75,13 @@ class SessionHealthService:
         if not academic_year:
             return {'error': 'Academic year not found.', 'success': False}
 
+        aggregates = self.get_snapshot_metrics(academic_year)
+
         enrollment = self._enrollment_metrics(academic_year)
-        attendance = self._attendance_metrics(academic_year)
-        fee_collection = self._fee_collection_metrics(academic_year)
-        exam_performance = self._exam_performance_metrics(academic_year)
-        staff = self._staff_metrics(academic_year)
+        attendance = self._attendance_metrics(academic_year, aggregates['attendance'])
+        fee_collection = self._fee_collection_metrics(academic_year, aggregates['fees'])
+        exam_performance = self._exam_performance_metrics(academic_year, aggregates['marks'])
+        staff = self._staff_metrics(academic_year, aggregates['staff_attendance'])
 
         report_data = {
             'academic_year': {
@@ -107,18 +145,12 @@ class SessionHealthService:
             'enrollment_rate': enrollment_rate,
         }
 
-    def _attendance_metrics(self, academic_year) -> dict:
+    def _attendance_metrics(self, academic_year, aggregates: dict) -> dict:
         from academic_sessions.models import Term
-        from attendance.models import AttendanceRecord
-
-        # All records for this academic year
-        records = AttendanceRecord.objects.filter(
-            school_id=self.school_id,
-            academic_year=academic_year,
-        )
 
-        total_records = records.count()
-        present_records = records.filter(status='PRESENT').count()
+        by_date = aggregates['by_date']
+        total_records = sum(total for total, _ in by_date.values())
+        present_records = sum(present for _, present in by_date.values())
         average_attendance_rate = round(
             (present_records / total_records * 100), 1
         ) if total_records > 0 else 0
@@ -139,41 +171,18 @@ class SessionHealthService:
         previous_term_rate = None
 
         if current_term:
-            ct_records = records.filter(
-                date__gte=current_term.start_date,
-                date__lte=current_term.end_date,
-            )
-            ct_total = ct_records.count()
-            ct_present = ct_records.filter(status='PRESENT').count()
-            current_term_rate = round(
-                (ct_present / ct_total * 100), 1
-            ) if ct_total > 0 else 0
+            current_term_rate = _rate_between(by_date, current_term.start_date, current_term.end_date)
 
             # Previous term
             prev_term = terms.filter(order__lt=current_term.order).order_by('-order').first()
             if prev_term:
-                pt_records = records.filter(
-                    date__gte=prev_term.start_date,
-                    date__lte=prev_term.end_date,
-                )
-                pt_total = pt_records.count()
-                pt_present = pt_records.filter(status='PRESENT').count()
-                previous_term_rate = round(
-                    (pt_present / pt_total * 100), 1
-                ) if pt_total > 0 else 0
+                previous_term_rate = _rate_between(by_date, prev_term.start_date, prev_term.end_date)
 
         # Chronic absentees: students with < 75% attendance in this session
-        chronic_absentees = 0
-        student_stats = (
-            records.values('student_id')
-            .annotate(
-                total=Count('id'),
-                present=Count('id', filter=Q(status='PRESENT')),
-            )
+        chronic_absentees = sum(
+            1 for total, present in aggregates['by_student'].values()
+            if total > 0 and (present / total * 100) < 75
         )
-        for s in student_stats:
-            if s['total'] > 0 and (s['present'] / s['total'] * 100) < 75:
-                chronic_absentees += 1
 
         return {
             'average_attendance_rate': average_attendance_rate,
@@ -183,28 +192,15 @@ class SessionHealthService:
             'total_records': total_records,
         }
 
-    def _fee_collection_metrics(self, academic_year) -> dict:
-        from finance.models import FeePayment
-
-        payments = FeePayment.objects.filter(
-            school_id=self.school_id,
-            academic_year=academic_year,
-        )
-
-        agg = payments.aggregate(
-            total_expected=Sum('amount_due'),
-            total_collected=Sum('amount_paid'),
-        )
-
-        total_expected = float(agg['total_expected'] or 0)
-        total_collected = float(agg['total_collected'] or 0)
+    def _fee_collection_metrics(self, academic_year, aggregates: dict) -> dict:
+        by_student = aggregates['by_student'].values()
+        total_expected = sum(due for due, _, _ in by_student)
+        total_collected = sum(paid for _, paid, _ in by_student)
         collection_rate = round(
             (total_collected / total_expected * 100), 1
         ) if total_expected > 0 else 0
 
-        defaulting_students = payments.filter(
-            status__in=['UNPAID', 'PARTIAL'],
-        ).values('student_id').distinct().count()
+        defaulting_students = sum(1 for _, _, open_count in by_student if open_count > 0)
 
         return {
             'total_expected': total_expected,
@@ -213,8 +209,8 @@ class SessionHealthService:
             'defaulting_students': defaulting_students,
         }
 
-    def _exam_performance_metrics(self, academic_year) -> dict:
-        from examinations.models import Exam, StudentMark, ExamSubject
+    def _exam_performance_metrics(self, academic_year, aggregates: dict) -> dict:
+        from examinations.models import Exam, ExamSubject
 
         exams = Exam.objects.filter(
             school_id=self.school_id,
@@ -222,18 +218,18 @@ class SessionHealthService:
             is_active=True,
         )
 
+        # Exams can be deactivated without touching their marks, so the
+        # snapshot keeps every exam subject and the active ones are picked here.
         exam_subject_ids = ExamSubject.objects.filter(
             exam__in=exams, is_active=True,
         ).values_list('id', flat=True)
 
-        marks = StudentMark.objects.filter(
-            school_id=self.school_id,
-            exam_subject_id__in=exam_subject_ids,
-            marks_obtained__isnull=False,
-            is_absent=False,
-        )
-
-        total_marks_count = marks.count()
+        counted = [
+            aggregates['by_exam_subject'][key]
+            for key in map(str, exam_subject_ids)
+            if key in aggregates['by_exam_subject']
+        ]
+        total_marks_count = sum(count for count, _, _ in counted)
         if total_marks_count == 0:
             return {
                 'average_pass_rate': 0,
@@ -241,13 +237,8 @@ class SessionHealthService:
                 'total_exams': exams.count(),
             }
 
-        pass_count = 0
-        score_sum = 0
-        for m in marks.select_related('exam_subject').iterator():
-            pct = float(m.marks_obtained / m.exam_subject.total_marks * 100)
-            score_sum += pct
-            if m.marks_obtained >= m.exam_subject.passing_marks:
-                pass_count += 1
+        pass_count = sum(passed for _, passed, _ in counted)
+        score_sum = sum(score for _, _, score in counted)
 
         average_pass_rate = round((pass_count / total_marks_count * 100), 1)
         average_score = round(score_sum / total_marks_count, 1)
@@ -258,9 +249,9 @@ class SessionHealthService:
             'total_exams': exams.count(),
         }
 
-    def _staff_metrics(self, academic_year) -> dict:
+    def _staff_metrics(self, academic_year, aggregates: dict) -> dict:
         from academic_sessions.models import Term
-        from hr.models import StaffMember, StaffAttendance, LeaveApplication
+        from hr.models import StaffMember, LeaveApplication
 
         total_staff = StaffMember.objects.filter(
             school_id=self.school_id,
@@ -269,15 +260,9 @@ class SessionHealthService:
         ).count()
 
         # Staff attendance rate across the entire session date range
-        staff_attendance = StaffAttendance.objects.filter(
-            school_id=self.school_id,
-            date__gte=academic_year.start_date,
-            date__lte=academic_year.end_date,
-        )
-        sa_total = staff_attendance.count()
-        sa_present = staff_attendance.filter(
-            status__in=['PRESENT', 'LATE', 'HALF_DAY'],
-        ).count()
+        by_date = aggregates['by_date'].values()
+        sa_total = sum(total for total, _ in by_date)
+        sa_present = sum(present for _, present in by_date)
         staff_attendance_rate = round(
             (sa_present / sa_total * 100), 1
         ) if sa_total > 0 else 0
@@ -313,6 +298,173 @@ class SessionHealthService:
             'leaves_this_term': leaves_this_term,
         }
 
+    # ------------------------------------------------------------------
+    # Snapshot helpers
+    # ------------------------------------------------------------------
+
+    def _datasets(self, academic_year) -> dict:
+        """
+        Row sets behind the report and how each one is grouped.
+
+        Every grouping maps a key field to the aggregates stored per key, so a
+        changed row only requires re-aggregating the groups it belongs to.
+        """
+        from attendance.models import AttendanceRecord
+        from examinations.models import ExamSubject, StudentMark
+        from finance.models import FeePayment
+        from hr.models import StaffAttendance
+
+        attendance = {
+            'total': Count('id'),
+            'present': Count('id', filter=Q(status='PRESENT')),
+        }
+        scored = Q(marks_obtained__isnull=False, is_absent=False, exam_subject__total_marks__gt=0)
+
+        def touched_exam_subjects(since):
+            # Changing total or passing marks re-scores every mark of the subject.
+            return {'by_exam_subject': ExamSubject.objects.filter(
+                school_id=self.school_id,
+                exam__academic_year=academic_year,
+                updated_at__gt=since,
+            ).values_list('id', flat=True).order_by()}
+
+        return {
+            'attendance': {
+                'scope': AttendanceRecord.objects.filter(
+                    school_id=self.school_id,
+                    academic_year=academic_year,
+                ),
+                'groups': {
+                    'by_date': ('date', attendance),
+                    'by_student': ('student_id', attendance),
+                },
+            },
+            'fees': {
+                'scope': FeePayment.objects.filter(
+                    school_id=self.school_id,
+                    academic_year=academic_year,
+                ),
+                'groups': {
+                    'by_student': ('student_id', {
+                        'due': Sum('amount_due'),
+                        'paid': Sum('amount_paid'),
+                        'open': Count('id', filter=Q(status__in=['UNPAID', 'PARTIAL'])),
+                    }),
+                },
+            },
+            'marks': {
+                'scope': StudentMark.objects.filter(
+                    school_id=self.school_id,
+                    exam_subject__exam__academic_year=academic_year,
+                ),
+                'groups': {
+                    'by_exam_subject': ('exam_subject_id', {
+                        'count': Count('id', filter=scored),
+                        'passed': Count('id', filter=scored & Q(
+                            marks_obtained__gte=F('exam_subject__passing_marks'),
+                        )),
+                        'score_sum': Sum(
+                            ExpressionWrapper(
+                                F('marks_obtained') * 100 / F('exam_subject__total_marks'),
+                                output_field=FloatField(),
+                            ),
+                            filter=scored,
+                        ),
+                    }),
+                },
+                'touched': touched_exam_subjects,
+            },
+            'staff_attendance': {
+                'scope': StaffAttendance.objects.filter(
+                    school_id=self.school_id,
+                    date__gte=academic_year.start_date,
+                    date__lte=academic_year.end_date,
+                ),
+                'groups': {
+                    'by_date': ('date', {
+                        'total': Count('id'),
+                        'present': Count('id', filter=Q(status__in=['PRESENT', 'LATE', 'HALF_DAY'])),
+                    }),
+                },
+            },
+        }
+
+    def get_snapshot_metrics(self, academic_year) -> dict:
+        """
+        Aggregates as of now: the latest snapshot plus the rows changed since
+        it was taken. The first call of a day persists the result as that
+        day's snapshot.
+        """
+        from academic_sessions.models import SessionHealthSnapshot
+
+        latest = SessionHealthSnapshot.objects.filter(
+            school_id=self.school_id,
+            academic_year=academic_year,
+        ).order_by('-snapshot_date').first()
+
+        scope = [SNAPSHOT_VERSION, str(academic_year.start_date), str(academic_year.end_date)]
+        previous = latest.metrics if latest and latest.metrics.get('scope') == scope else {}
+        since = latest.taken_at if previous else None
+
+        now = timezone.now()
+        metrics = {'scope': scope}
+        for name, dataset in self._datasets(academic_year).items():
+            metrics[name] = self._sync_dataset(dataset, previous.get(name), since, now)
+
+        today = timezone.localdate()
+        if latest is None or latest.snapshot_date != today:
+            SessionHealthSnapshot.objects.update_or_create(
+                school_id=self.school_id,
+                academic_year=academic_year,
+                snapshot_date=today,
+                defaults={'taken_at': now, 'metrics': metrics},
+            )
+        return metrics
+
+    def _sync_dataset(self, dataset: dict, state, since, now) -> dict:
+        """Bring one dataset's grouped aggregates from `since` up to `now`."""
+        scope = dataset['scope']
+        if state is None:
+            counts = scope.aggregate(upto=Count('id', filter=Q(created_at__lte=now)))
+        else:
+            counts = scope.aggregate(
+                before=Count('id', filter=Q(created_at__lte=since)),
+                upto=Count('id', filter=Q(created_at__lte=now)),
+            )
+        # Deleted rows leave no trace to refresh from; a drop in the number of
+        # rows that already existed at the last snapshot means a full rebuild.
+        if state is None or counts['before'] != state['rows']:
+            state = {
+                name: _grouped(scope, key, aggregates)
+                for name, (key, aggregates) in dataset['groups'].items()
+            }
+            state['rows'] = counts['upto']
+            return state
+
+        touched = defaultdict(set)
+        key_fields = [key for key, _ in dataset['groups'].values()]
+        changed = (
+            scope.filter(updated_at__gt=since - SNAPSHOT_OVERLAP)
+            .values_list(*key_fields).order_by().distinct()
+        )
+        for row in changed:
+            for name, value in zip(dataset['groups'], row):
+                touched[name].add(value)
+        if 'touched' in dataset:
+            for name, keys in dataset['touched'](since - SNAPSHOT_OVERLAP).items():
+                touched[name].update(keys)
+
+        for name, keys in touched.items():
+            key, aggregates = dataset['groups'][name]
+            fresh = _grouped(scope.filter(**{f'{key}__in': keys}), key, aggregates)
+            for value in map(str, keys):
+                if value in fresh:
+                    state[name][value] = fresh[value]
+                else:
+                    state[name].pop(value, None)
+        state['rows'] = counts['upto']
+        return state
+
     # ------------------------------------------------------------------
     # AI Summary helpers
     # ------------------------------------------------------------------
@@ -263,8 +263,10 @@ class SessionSetupService:
         """
         Apply the reviewed setup preview — create or sync all entities.
 
-        Uses update_or_create patterns for idempotent sync support.
-        Safe to re-run without creating duplicates.
+        Existing target rows are loaded once per entity type and diffed in
+        memory against the preview; new rows are written with bulk_create and
+        changed rows with bulk_update. Re-running is idempotent: unchanged rows
+        are counted as updated but not written.
         """
         from academic_sessions.models import AcademicYear, Term
         from academics.models import ClassSubject, TimetableEntry
@@ -302,72 +304,76 @@ class SessionSetupService:
 
                 result['academic_year_id'] = new_year.id
 
-                # 2. Create or Update Terms
-                for term_data in preview_data.get('terms', []):
-                    term, created = Term.objects.update_or_create(
-                        school_id=self.school_id,
-                        academic_year=new_year,
-                        name=term_data['name'],
-                        defaults={
-                            'term_type': term_data.get('term_type', 'TERM'),
-                            'order': term_data['order'],
-                            'start_date': term_data['start_date'],
-                            'end_date': term_data['end_date'],
-                            'is_active': True,
-                        },
-                    )
-                    if created:
-                        result['terms_created'] += 1
-                    else:
-                        result['terms_updated'] += 1
+                # 2. Create or Update Terms — keyed by name within the new year
+                existing_terms = {
+                    term.name: term
+                    for term in Term.objects.filter(school_id=self.school_id, academic_year=new_year)
+                }
+                rows = [
+                    (term_data['name'], {
+                        'term_type': term_data.get('term_type', 'TERM'),
+                        'order': term_data['order'],
+                        'start_date': self._as_date(term_data['start_date']),
+                        'end_date': self._as_date(term_data['end_date']),
+                        'is_active': True,
+                    })
+                    for term_data in preview_data.get('terms', [])
+                ]
+                result['terms_created'], result['terms_updated'] = self._bulk_sync(
+                    Term, existing_terms, rows,
+                    lambda name: Term(school_id=self.school_id, academic_year=new_year, name=name),
+                )
 
                 # 3. Create or Update Class-Subject Mappings
-                # Unique constraint: (school, class_obj, subject) — academic_year in defaults
-                for cs_data in preview_data.get('class_subjects', []):
-                    cs, created = ClassSubject.objects.update_or_create(
-                        school_id=self.school_id,
-                        class_obj_id=cs_data['class_id'],
-                        subject_id=cs_data['subject_id'],
-                        defaults={
-                            'academic_year': new_year,
-                            'teacher_id': cs_data.get('teacher_id'),
-                            'periods_per_week': cs_data.get('periods_per_week', 1),
-                            'is_active': True,
-                        },
-                    )
-                    if created:
-                        result['class_subjects_created'] += 1
-                    else:
-                        result['class_subjects_updated'] += 1
+                # Matched on (school, class_obj, subject) — academic_year is moved to the new year
+                existing_cs = {}
+                for cs in ClassSubject.objects.filter(school_id=self.school_id).order_by('id'):
+                    key = (cs.class_obj_id, cs.subject_id)
+                    if key not in existing_cs or cs.academic_year_id == new_year.id:
+                        existing_cs[key] = cs
+                rows = [
+                    ((cs_data['class_id'], cs_data['subject_id']), {
+                        'academic_year_id': new_year.id,
+                        'teacher_id': cs_data.get('teacher_id'),
+                        'periods_per_week': cs_data.get('periods_per_week', 1),
+                        'is_active': True,
+                    })
+                    for cs_data in preview_data.get('class_subjects', [])
+                ]
+                result['class_subjects_created'], result['class_subjects_updated'] = self._bulk_sync(
+                    ClassSubject, existing_cs, rows,
+                    lambda key: ClassSubject(school_id=self.school_id, class_obj_id=key[0], subject_id=key[1]),
+                )
 
-                # 4. Clone/Update Timetable
+                # 4. Clone/Update Timetable — keyed by (class_obj, day, slot)
                 if preview_data.get('timetable_summary', {}).get('will_clone'):
                     source_year_id = preview_data['source_year']['id']
-                    source_entries = TimetableEntry.objects.filter(
-                        school_id=self.school_id,
-                    ).filter(
-                        **({'academic_year_id': source_year_id} if TimetableEntry.objects.filter(
-                            school_id=self.school_id, academic_year_id=source_year_id
-                        ).exists() else {})
+                    school_entries = list(TimetableEntry.objects.filter(school_id=self.school_id))
+                    source_entries = [e for e in school_entries if e.academic_year_id == source_year_id]
+                    if not source_entries:
+                        source_entries = school_entries
+
+                    existing_entries = {(e.class_obj_id, e.day, e.slot_id): e for e in school_entries}
+                    rows = [
+                        ((entry.class_obj_id, entry.day, entry.slot_id), {
+                            'academic_year_id': new_year.id,
+                            'subject_id': entry.subject_id,
+                            'teacher_id': entry.teacher_id,
+                            'room': entry.room,
+                        })
+                        for entry in source_entries
+                    ]
+                    created, updated = self._bulk_sync(
+                        TimetableEntry, existing_entries, rows,
+                        lambda key: TimetableEntry(
+                            school_id=self.school_id, class_obj_id=key[0], day=key[1], slot_id=key[2],
+                        ),
                     )
+                    result['timetable_entries_created'] = created
+                    result['timetable_entries_updated'] = updated
 
-                    for entry in source_entries:
-                        tt, created = TimetableEntry.objects.update_or_create(
-                            school_id=self.school_id,
-                            class_obj_id=entry.class_obj_id,
-                            day=entry.day,
-                            slot_id=entry.slot_id,
-                            defaults={
-                                'academic_year': new_year,
-                                'subject_id': entry.subject_id,
-                                'teacher_id': entry.teacher_id,
-                                'room': entry.room,
-                            },
-                        )
-                        if created:
-                            result['timetable_entries_created'] += 1
-                        else:
-                            result['timetable_entries_updated'] += 1
+                # Bulk writes skip model signals, so drop the academics caches explicitly.
+                transaction.on_commit(self._invalidate_academics_caches)
 
         except Exception as e:
             logger.error(f"Session setup failed: {e}")
@@ -376,6 +382,59 @@ class SessionSetupService:
 
         return result
 
+    @staticmethod
+    def _bulk_sync(model, existing: dict, rows: list, build):
+        """
+        Create or update rows of one model with a bulk_create and a bulk_update.
+
+        existing maps a lookup key to the current instance; rows is a list of
+        (key, field values). build(key) returns an unsaved instance for a new
+        key. Returns (created, updated) counts, where updated includes rows
+        that were already up to date, as update_or_create would report them.
+        """
+        from django.utils import timezone
+
+        to_create, changed, changed_fields = [], {}, set()
+        created = updated = 0
+        for key, values in rows:
+            instance = existing.get(key)
+            if instance is None:
+                instance = build(key)
+                existing[key] = instance
+                to_create.append(instance)
+                created += 1
+            else:
+                updated += 1
+            diff = [field for field, value in values.items() if getattr(instance, field) != value]
+            for field in diff:
+                setattr(instance, field, values[field])
+            if diff and instance.pk is not None:
+                changed[instance.pk] = instance
+                changed_fields.update(diff)
+
+        model.objects.bulk_create(to_create, batch_size=500)
+        if changed:
+            now = timezone.now()
+            for instance in changed.values():
+                instance.updated_at = now
+            model.objects.bulk_update(
+                list(changed.values()), sorted(changed_fields) + ['updated_at'], batch_size=500,
+            )
+        return created, updated
+
+    @staticmethod
+    def _as_date(value):
+        return date.fromisoformat(value) if isinstance(value, str) else value
+
+    def _invalidate_academics_caches(self):
+        from academics.ai_engine import invalidate_timetable_analyzers
+        from academics.analytics import invalidate_slot_attendance
+        from academics.occupancy import invalidate_teacher_occupancy
+
+        invalidate_teacher_occupancy(self.school_id)
+        invalidate_timetable_analyzers(self.school_id)
+        invalidate_slot_attendance(self.school_id)
+
     def _shift_date(self, d: date, years: int) -> date:
         """Shift a date by N years, handling leap year edge cases."""
         try:
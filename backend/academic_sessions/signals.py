@@ -0,0 +1,28 @@
+"""
+Django signals for academic_sessions app.
+Drops cached whole-year promotion recommendations when the enrollments,
+marks, attendance or fees behind them change.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='academic_sessions.StudentEnrollment')
+@receiver(post_delete, sender='academic_sessions.StudentEnrollment')
+@receiver(post_save, sender='examinations.Exam')
+@receiver(post_delete, sender='examinations.Exam')
+@receiver(post_save, sender='examinations.ExamSubject')
+@receiver(post_delete, sender='examinations.ExamSubject')
+@receiver(post_save, sender='examinations.StudentMark')
+@receiver(post_delete, sender='examinations.StudentMark')
+@receiver(post_save, sender='attendance.AttendanceRecord')
+@receiver(post_delete, sender='attendance.AttendanceRecord')
+@receiver(post_save, sender='finance.FeePayment')
+@receiver(post_delete, sender='finance.FeePayment')
+@receiver(post_save, sender='students.Student')
+@receiver(post_delete, sender='students.Student')
+@receiver(post_save, sender='students.Class')
+@receiver(post_delete, sender='students.Class')
+def invalidate_promotion_advice_on_change(sender, instance, **kwargs):
+    from .promotion_advisor_service import invalidate_promotion_advice
+    invalidate_promotion_advice(instance.school_id)
@@ -1925,9 +1925,10 @@ class PromotionAdvisorView(APIView):
         academic_year = request.data.get('academic_year')
         class_id = request.data.get('class_id')
 
-        if not academic_year or not class_id:
+        # Without class_id every class of the academic year is analyzed in one pass.
+        if not academic_year:
             return Response(
-                {'detail': 'academic_year and class_id are required.'},
+                {'detail': 'academic_year is required.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -1944,16 +1945,18 @@ class PromotionAdvisorView(APIView):
         task_kwargs = {
             'school_id': school_id,
             'academic_year_id': int(academic_year),
-            'class_id': int(class_id),
+            'class_id': int(class_id) if class_id else None,
         }
-        title = "Running promotion analysis"
+        title = "Running promotion analysis" if class_id else "Running promotion analysis for all classes"
 
-        enrollment_count = StudentEnrollment.objects.filter(
+        enrollments = StudentEnrollment.objects.filter(
             school_id=school_id,
             academic_year_id=int(academic_year),
-            class_obj_id=int(class_id),
             is_active=True,
-        ).count()
+        )
+        if class_id:
+            enrollments = enrollments.filter(class_obj_id=int(class_id))
+        enrollment_count = enrollments.count()
 
         if enrollment_count < 30:
             from core.task_utils import run_task_sync
@@ -2097,6 +2100,11 @@ class SectionAllocatorView(APIView):
         """
         POST with action='preview' (default): Returns allocation preview without making changes.
         POST with action='apply': Creates/updates Class records and moves students.
+
+        Optional balancing inputs: weights ({criterion: weight}), sibling_policy
+        ('ignore' | 'together' | 'apart'), special_needs_ids, max_per_section,
+        match_siblings_by_phone (also pair students outside a confirmed sibling
+        group who share a parent phone).
         """
         from .section_allocator_service import SectionAllocatorService
 
@@ -2129,13 +2137,38 @@ class SectionAllocatorView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        weights = request.data.get('weights') or None
+        sibling_policy = request.data.get('sibling_policy') or 'ignore'
+        match_siblings_by_phone = str(request.data.get('match_siblings_by_phone', '')).lower() in ('true', '1')
+        try:
+            max_per_section = request.data.get('max_per_section')
+            max_per_section = int(max_per_section) if max_per_section else None
+            special_needs_ids = [int(i) for i in request.data.get('special_needs_ids') or []]
+        except (ValueError, TypeError):
+            return Response(
+                {'detail': 'max_per_section and special_needs_ids must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if weights is not None and not isinstance(weights, dict):
+            return Response(
+                {'detail': 'weights must be an object of criterion: weight.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        options = {
+            'weights': weights,
+            'sibling_policy': sibling_policy,
+            'special_needs_ids': special_needs_ids,
+            'max_per_section': max_per_section,
+            'match_siblings_by_phone': match_siblings_by_phone,
+        }
+
         action = request.data.get('action', 'preview')
         service = SectionAllocatorService(school_id)
 
         if action == 'preview':
             result = service.allocate_students(
                 grade_id=grade_id, academic_year_id=academic_year_id,
-                num_sections=num_sections, class_id=class_id,
+                num_sections=num_sections, class_id=class_id, **options,
             )
             if not result.get('success'):
                 return Response(result, status=status.HTTP_400_BAD_REQUEST)
@@ -2144,7 +2177,7 @@ class SectionAllocatorView(APIView):
         elif action == 'apply':
             allocation = service.allocate_students(
                 grade_id=grade_id, academic_year_id=academic_year_id,
-                num_sections=num_sections, class_id=class_id,
+                num_sections=num_sections, class_id=class_id, **options,
             )
             if not allocation.get('success'):
                 return Response(allocation, status=status.HTTP_400_BAD_REQUEST)
@@ -10,17 +10,28 @@ import json
 import logging
 import random
 import statistics
+import time
 from dataclasses import dataclass, field
 from datetime import date
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Q, Sum
 
+from .occupancy import TeacherOccupancy
+
 logger = logging.getLogger(__name__)
 
 DAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT']
 
+# Objective weights shared by the single-class and school-wide models.
+SAME_DAY_REPEAT_PENALTY = 50
+MORNING_CORE_BONUS = 5
+# Every period left unscheduled costs more than any layout preference, so
+# the school-wide model stays feasible but only drops periods when forced.
+UNSCHEDULED_PERIOD_PENALTY = 1000
+
 
 # ── Result Dataclasses ──────────────────────────────────────────────────────
 
@@ -428,7 +439,7 @@ class ORToolsTimetableGenerator:
                 repeat = model.new_bool_var(f'repeat_s{s}_d{d}')
                 model.add(day_count >= 2).only_enforce_if(repeat)
                 model.add(day_count <= 1).only_enforce_if(repeat.negated())
-                penalties.append((repeat, 50))  # -50 for same-day repeats
+                penalties.append((repeat, SAME_DAY_REPEAT_PENALTY))
 
         # 6. Prefer morning slots for core (non-elective) subjects
         for s, cs in enumerate(self.class_subjects):
@@ -436,7 +447,7 @@ class ORToolsTimetableGenerator:
                 for d in range(num_days):
                     for p in range(num_slots):
                         if p < mid:  # Morning slot
-                            penalties.append((x[s, d, p], -5))  # +5 bonus (negative penalty)
+                            penalties.append((x[s, d, p], -MORNING_CORE_BONUS))  # bonus (negative penalty)
 
         # Build objective: minimize total penalty
         if penalties:
@@ -514,6 +525,490 @@ class ORToolsTimetableGenerator:
         )
 
 
+# ── School-wide OR-Tools Timetable Generator ───────────────────────────────
+
+@dataclass
+class SolverDemand:
+    """One class's weekly requirement for a subject in a timetable model."""
+    class_id: int
+    subject_id: int
+    teacher_id: Optional[int]
+    periods: int
+    is_core: bool = True
+
+
+@dataclass
+class SchoolTimetableGenerationResult:
+    grids: Dict[int, Dict[str, list]]   # class_id -> day -> [{slot_id, subject_id, ...}]
+    scores: Dict[int, float] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    success: bool = True
+    error: Optional[str] = None
+    status: str = ''
+    objective_value: Optional[float] = None
+    initial_objective: Optional[float] = None   # class-by-class starting point
+    solve_time: float = 0.0
+
+
+def solve_timetable_model(
+    demands: List[SolverDemand],
+    cells: List[Tuple[str, int]],
+    morning_slot_ids: Set[int],
+    teacher_busy: Optional[Dict[int, Set[Tuple[str, int]]]] = None,
+    hints: Optional[Set[Tuple[int, int, str, int]]] = None,
+    time_limit_seconds: float = 30,
+    num_workers: int = 0,
+) -> dict:
+    """
+    Build and solve one CP-SAT model covering every demand.
+
+    cells are the applicable (day, slot_id) pairs. teacher_busy holds
+    (day, slot_id) pairs each teacher already teaches outside the model;
+    teachers shared by several demands get a no-overlap constraint per cell.
+    hints are (class_id, subject_id, day, slot_id) placements to warm-start
+    from, typically the classes' current timetable.
+
+    Returns {status, assignments: [(demand_index, day, slot_id)],
+    unscheduled: {demand_index: periods}, objective_value, solve_time}.
+    """
+    from ortools.sat.python import cp_model
+
+    teacher_busy = teacher_busy or {}
+    hints = hints or set()
+    model = cp_model.CpModel()
+
+    cells_by_day: Dict[str, List[int]] = {}
+    for day, slot_id in cells:
+        cells_by_day.setdefault(day, []).append(slot_id)
+
+    x: Dict[Tuple[int, str, int], Any] = {}
+    by_class_cell: Dict[Tuple[int, str, int], list] = {}
+    by_teacher_cell: Dict[Tuple[int, str, int], list] = {}
+    terms, costs = [], []
+    # Unscheduled periods are charged as (required - placed) * penalty: a
+    # constant plus a negative cost per placement, so no auxiliary variable
+    # is needed and a warm-start hint fixes every variable in the model.
+    offset = 0
+    required_by_demand = {}
+
+    for i, demand in enumerate(demands):
+        busy = teacher_busy.get(demand.teacher_id, set()) if demand.teacher_id else set()
+        required = min(demand.periods, len(cells))
+        required_by_demand[i] = required
+        offset += required * UNSCHEDULED_PERIOD_PENALTY
+        demand_vars = []
+        for day, slot_id in cells:
+            if (day, slot_id) in busy:
+                continue
+            var = model.new_bool_var(f'x_{i}_{day}_{slot_id}')
+            x[i, day, slot_id] = var
+            demand_vars.append(var)
+            by_class_cell.setdefault((demand.class_id, day, slot_id), []).append(var)
+            if demand.teacher_id:
+                by_teacher_cell.setdefault((demand.teacher_id, day, slot_id), []).append(var)
+            terms.append(var)
+            costs.append(
+                -UNSCHEDULED_PERIOD_PENALTY
+                - (MORNING_CORE_BONUS if demand.is_core and slot_id in morning_slot_ids else 0)
+            )
+            if hints:
+                model.add_hint(var, (demand.class_id, demand.subject_id, day, slot_id) in hints)
+        model.add(sum(demand_vars) <= required)
+
+        # Same subject more than once a day.
+        for day, day_cells in cells_by_day.items():
+            day_slots = [slot_id for slot_id in day_cells if (i, day, slot_id) in x]
+            if len(day_slots) > 1:
+                repeat = model.new_bool_var(f'repeat_{i}_{day}')
+                model.add(sum(x[i, day, slot_id] for slot_id in day_slots) <= 1 + len(day_slots) * repeat)
+                terms.append(repeat)
+                costs.append(SAME_DAY_REPEAT_PENALTY)
+                if hints:
+                    hinted = sum(
+                        1 for slot_id in day_slots
+                        if (demand.class_id, demand.subject_id, day, slot_id) in hints
+                    )
+                    model.add_hint(repeat, hinted > 1)
+
+    # One subject per class per cell; one class per teacher per cell.
+    for group in list(by_class_cell.values()) + list(by_teacher_cell.values()):
+        if len(group) > 1:
+            model.add_at_most_one(group)
+
+    model.minimize(cp_model.LinearExpr.weighted_sum(terms, costs) + offset)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+    status = solver.solve(model)
+
+    result = {
+        'status': solver.status_name(status),
+        'assignments': [],
+        'unscheduled': {},
+        'objective_value': None,
+        'solve_time': solver.wall_time,
+    }
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return result
+
+    result['objective_value'] = solver.objective_value
+    result['assignments'] = [
+        (i, day, slot_id) for (i, day, slot_id), var in x.items() if solver.value(var)
+    ]
+    placed: Dict[int, int] = {}
+    for i, _, _ in result['assignments']:
+        placed[i] = placed.get(i, 0) + 1
+    result['unscheduled'] = {
+        i: required - placed.get(i, 0)
+        for i, required in required_by_demand.items() if placed.get(i, 0) < required
+    }
+    return result
+
+
+def timetable_objective(
+    demands: List[SolverDemand],
+    assignments: List[Tuple[int, str, int]],
+    num_cells: int,
+    morning_slot_ids: Set[int],
+) -> float:
+    """Objective value solve_timetable_model() gives a placement (lower is better)."""
+    placed: Dict[int, int] = {}
+    per_day: Dict[Tuple[int, str], int] = {}
+    value = 0
+    for i, day, slot_id in assignments:
+        placed[i] = placed.get(i, 0) + 1
+        per_day[i, day] = per_day.get((i, day), 0) + 1
+        if demands[i].is_core and slot_id in morning_slot_ids:
+            value -= MORNING_CORE_BONUS
+    value += SAME_DAY_REPEAT_PENALTY * sum(1 for count in per_day.values() if count > 1)
+    value += UNSCHEDULED_PERIOD_PENALTY * sum(
+        min(demand.periods, num_cells) - placed.get(i, 0) for i, demand in enumerate(demands)
+    )
+    return float(value)
+
+
+def solve_school_timetable(
+    demands: List[SolverDemand],
+    cells: List[Tuple[str, int]],
+    morning_slot_ids: Set[int],
+    teacher_busy: Optional[Dict[int, Set[Tuple[str, int]]]] = None,
+    hints: Optional[Set[Tuple[int, int, str, int]]] = None,
+    time_limit_seconds: float = 120,
+    neighbourhood_size: int = 4,
+    seed: int = 0,
+) -> dict:
+    """
+    Timetable several classes jointly with shared teacher constraints.
+
+    Small selections (up to neighbourhood_size classes) are one CP-SAT model.
+    Larger ones start from a class-by-class solution, warm-started from
+    hints, and spend the rest of the time budget on large neighbourhood
+    search: each round re-solves a few classes that share teachers as one
+    model, hinted with their current placement and with every other class
+    fixed, and keeps the result when the combined objective improves. A
+    single model over a whole school rarely beats the class-by-class start
+    within an interactive time budget, while these rounds do.
+
+    Returns the same keys as solve_timetable_model() plus
+    initial_objective (the class-by-class start) and rounds.
+    """
+    started = time.monotonic()
+    deadline = started + time_limit_seconds
+    teacher_busy = teacher_busy or {}
+
+    by_class: Dict[int, List[int]] = {}
+    for i, demand in enumerate(demands):
+        by_class.setdefault(demand.class_id, []).append(i)
+    class_ids = list(by_class)
+
+    if len(class_ids) <= neighbourhood_size:
+        solved = solve_timetable_model(
+            demands, cells, morning_slot_ids, teacher_busy=teacher_busy, hints=hints,
+            time_limit_seconds=time_limit_seconds,
+        )
+        return {**solved, 'initial_objective': solved['objective_value'], 'rounds': 1}
+
+    solution: Dict[int, List[Tuple[int, str, int]]] = {}
+    objective: Dict[int, float] = {}
+
+    def busy_outside(selected):
+        busy = {teacher_id: set(busy_cells) for teacher_id, busy_cells in teacher_busy.items()}
+        for class_id, placed in solution.items():
+            if class_id in selected:
+                continue
+            for i, day, slot_id in placed:
+                if demands[i].teacher_id:
+                    busy.setdefault(demands[i].teacher_id, set()).add((day, slot_id))
+        return busy
+
+    def class_objective(class_id, placed):
+        index = {i: n for n, i in enumerate(by_class[class_id])}
+        return timetable_objective(
+            [demands[i] for i in by_class[class_id]],
+            [(index[i], day, slot_id) for i, day, slot_id in placed],
+            len(cells), morning_slot_ids,
+        )
+
+    def solve_classes(selected, class_hints, limit):
+        indices = [i for class_id in selected for i in by_class[class_id]]
+        solved = solve_timetable_model(
+            [demands[i] for i in indices], cells, morning_slot_ids,
+            teacher_busy=busy_outside(set(selected)), hints=class_hints,
+            time_limit_seconds=max(limit, 0.1),
+        )
+        if solved['objective_value'] is None:
+            return None
+        placed = {class_id: [] for class_id in selected}
+        for n, day, slot_id in solved['assignments']:
+            i = indices[n]
+            placed[demands[i].class_id].append((i, day, slot_id))
+        return placed
+
+    # Class-by-class start, using at most half of the budget.
+    for n, class_id in enumerate(class_ids):
+        limit = (deadline - time.monotonic()) / (2 * (len(class_ids) - n))
+        placed = solve_classes([class_id], hints, limit)
+        solution[class_id] = placed[class_id] if placed else []
+        objective[class_id] = class_objective(class_id, solution[class_id])
+    initial_objective = sum(objective.values())
+
+    rng = random.Random(seed)
+    teachers = {
+        class_id: {demands[i].teacher_id for i in indices if demands[i].teacher_id}
+        for class_id, indices in by_class.items()
+    }
+    rounds = since_improvement = 0
+    while deadline - time.monotonic() > 0.5 and since_improvement < 3 * len(class_ids):
+        if rng.random() < 0.3:
+            anchor = max(class_ids, key=objective.get)
+        else:
+            anchor = rng.choice(class_ids)
+        linked = [c for c in class_ids if c != anchor and teachers[c] & teachers[anchor]]
+        rng.shuffle(linked)
+        if len(linked) < neighbourhood_size - 1:
+            rest = [c for c in class_ids if c != anchor and c not in linked]
+            linked += rng.sample(rest, min(len(rest), neighbourhood_size - 1 - len(linked)))
+        selected = [anchor] + linked[:neighbourhood_size - 1]
+
+        current = {
+            (demands[i].class_id, demands[i].subject_id, day, slot_id)
+            for class_id in selected for i, day, slot_id in solution[class_id]
+        }
+        placed = solve_classes(selected, current, min(5.0, deadline - time.monotonic()))
+        rounds += 1
+        since_improvement += 1
+        if placed is None:
+            continue
+        candidate = {class_id: class_objective(class_id, placed[class_id]) for class_id in selected}
+        if sum(candidate.values()) < sum(objective[class_id] for class_id in selected):
+            solution.update(placed)
+            objective.update(candidate)
+            since_improvement = 0
+
+    assignments = [a for placed in solution.values() for a in placed]
+    placed_count: Dict[int, int] = {}
+    for i, _, _ in assignments:
+        placed_count[i] = placed_count.get(i, 0) + 1
+    return {
+        'status': 'FEASIBLE',
+        'assignments': assignments,
+        'unscheduled': {
+            i: min(demand.periods, len(cells)) - placed_count.get(i, 0)
+            for i, demand in enumerate(demands)
+            if placed_count.get(i, 0) < min(demand.periods, len(cells))
+        },
+        'objective_value': sum(objective.values()),
+        'solve_time': time.monotonic() - started,
+        'initial_objective': initial_objective,
+        'rounds': rounds,
+    }
+
+
+class ORToolsSchoolTimetableGenerator:
+    """
+    Generates timetables for several classes at once with OR-Tools CP-SAT.
+
+    Unlike ORToolsTimetableGenerator, which fixes every other class's
+    timetable and solves one class at a time, teachers shared between the
+    selected classes are scheduled jointly (see solve_school_timetable), so
+    the result does not depend on generation order. Classes outside the
+    selection keep their timetable and block their teachers' slots. The
+    selected classes' current entries are used as a warm start. Periods that
+    cannot be placed are reported as warnings rather than making the whole
+    school infeasible.
+    """
+
+    DEFAULT_TIME_LIMIT_SECONDS = 120
+
+    def __init__(self, school_id: int, class_ids: Optional[List[int]] = None,
+                 time_limit_seconds: Optional[float] = None, use_hints: bool = True):
+        self.school_id = school_id
+        self.class_ids = list(class_ids) if class_ids else None
+        self.time_limit_seconds = time_limit_seconds or getattr(
+            settings, 'TIMETABLE_SOLVER_TIME_LIMIT_SECONDS', self.DEFAULT_TIME_LIMIT_SECONDS,
+        )
+        self.use_hints = use_hints
+        self.slots = []
+        self.class_subjects: Dict[int, list] = {}
+        self.teacher_busy_map: Dict[int, Set[Tuple[str, int]]] = {}
+        self.hints: Set[Tuple[int, int, str, int]] = set()
+
+    def _load_data(self):
+        from .models import ClassSubject, TimetableEntry, TimetableSlot
+
+        self.slots = list(
+            TimetableSlot.objects.filter(
+                school_id=self.school_id, slot_type='PERIOD', is_active=True
+            ).order_by('order')
+        )
+        class_subjects = ClassSubject.objects.filter(
+            school_id=self.school_id, is_active=True,
+        ).select_related('subject', 'teacher').order_by('class_obj_id', 'id')
+        if self.class_ids:
+            class_subjects = class_subjects.filter(class_obj_id__in=self.class_ids)
+        self.class_subjects = {}
+        for cs in class_subjects:
+            self.class_subjects.setdefault(cs.class_obj_id, []).append(cs)
+        if not self.class_ids:
+            self.class_ids = list(self.class_subjects)
+
+        self.teacher_busy_map = {}
+        self.hints = set()
+        entries = TimetableEntry.objects.filter(
+            school_id=self.school_id,
+        ).values_list('class_obj_id', 'subject_id', 'teacher_id', 'day', 'slot_id')
+        selected = set(self.class_ids)
+        for class_id, subject_id, teacher_id, day, slot_id in entries:
+            if class_id in selected:
+                if subject_id:
+                    self.hints.add((class_id, subject_id, day, slot_id))
+            elif teacher_id:
+                self.teacher_busy_map.setdefault(teacher_id, set()).add((day, slot_id))
+
+    def generate(self) -> SchoolTimetableGenerationResult:
+        try:
+            self._load_data()
+        except Exception as e:
+            return SchoolTimetableGenerationResult(
+                grids={}, success=False, error=f'Failed to load data: {e}'
+            )
+
+        if not self.slots:
+            return SchoolTimetableGenerationResult(
+                grids={}, success=False,
+                error='No time slots defined. Please create time slots first.'
+            )
+        if not self.class_subjects:
+            return SchoolTimetableGenerationResult(
+                grids={}, success=False,
+                error='No subjects assigned to the selected classes. Please assign subjects first.'
+            )
+
+        try:
+            import ortools  # noqa: F401
+        except ImportError:
+            return SchoolTimetableGenerationResult(
+                grids={}, success=False,
+                error='OR-Tools is not installed; school-wide generation is unavailable.'
+            )
+
+        cells = [
+            (day, slot.id) for slot in self.slots for day in DAYS
+            if slot.is_applicable_for_day(day)
+        ]
+        mid = len(self.slots) // 2
+        morning = {slot.id for slot in self.slots[:mid]}
+
+        demands = []
+        demand_cs = []
+        for class_id in self.class_ids:
+            for cs in self.class_subjects.get(class_id, []):
+                demands.append(SolverDemand(
+                    class_id=class_id,
+                    subject_id=cs.subject_id,
+                    teacher_id=cs.teacher_id,
+                    periods=cs.periods_per_week,
+                    is_core=not cs.subject.is_elective,
+                ))
+                demand_cs.append(cs)
+
+        warnings = []
+        for class_id, subjects in self.class_subjects.items():
+            required = sum(cs.periods_per_week for cs in subjects)
+            if required > len(cells):
+                warnings.append(
+                    f'Class {class_id}: required periods ({required}) exceed available '
+                    f'slots ({len(cells)}). Some subjects may not be fully scheduled.'
+                )
+
+        solved = solve_school_timetable(
+            demands, cells, morning,
+            teacher_busy=self.teacher_busy_map,
+            hints=self.hints if self.use_hints else None,
+            time_limit_seconds=self.time_limit_seconds,
+        )
+        if solved['objective_value'] is None:
+            return SchoolTimetableGenerationResult(
+                grids={}, success=False, status=solved['status'], solve_time=solved['solve_time'],
+                error=f"OR-Tools could not find a solution (status: {solved['status']}).",
+            )
+        if solved['status'] == 'FEASIBLE':
+            warnings.append('Solver found a feasible (not proven optimal) solution within the time limit.')
+        for i, missing in solved['unscheduled'].items():
+            cs = demand_cs[i]
+            warnings.append(
+                f'Class {cs.class_obj_id} {cs.subject.name}: scheduled '
+                f'{cs.periods_per_week - missing}/{cs.periods_per_week} periods per week'
+            )
+
+        grids: Dict[int, Dict[str, Dict[int, dict]]] = {
+            class_id: {day: {} for day in DAYS} for class_id in self.class_ids
+        }
+        day_subjects = {class_id: {day: [] for day in DAYS} for class_id in self.class_ids}
+        for i, day, slot_id in solved['assignments']:
+            cs = demand_cs[i]
+            grids[cs.class_obj_id][day][slot_id] = {
+                'slot_id': slot_id,
+                'subject_id': cs.subject_id,
+                'teacher_id': cs.teacher_id,
+                'subject_name': cs.subject.name,
+                'teacher_name': cs.teacher.full_name if cs.teacher else None,
+                'room': '',
+            }
+            day_subjects[cs.class_obj_id][day].append(cs.subject_id)
+
+        result_grids = {}
+        scores = {}
+        for class_id in self.class_ids:
+            result_grids[class_id] = {
+                day: [
+                    grids[class_id][day][slot.id] for slot in self.slots
+                    if slot.is_applicable_for_day(day) and slot.id in grids[class_id][day]
+                ]
+                for day in DAYS
+            }
+            scorer = TimetableQualityScorer.__new__(TimetableQualityScorer)
+            scorer.school_id = self.school_id
+            scorer.class_id = class_id
+            scores[class_id] = scorer._score_generated_grid(
+                grids[class_id], self.slots, self.class_subjects.get(class_id, []),
+                day_subjects[class_id],
+            )
+
+        return SchoolTimetableGenerationResult(
+            grids=result_grids,
+            scores=scores,
+            warnings=warnings,
+            success=True,
+            status=solved['status'],
+            objective_value=solved['objective_value'],
+            initial_objective=solved['initial_objective'],
+            solve_time=solved['solve_time'],
+        )
+
+
 # ── Conflict Resolver ───────────────────────────────────────────────────────
 
 class ConflictResolver:
@@ -526,7 +1021,6 @@ class ConflictResolver:
         self, teacher_id: int, day: str, slot_id: int,
         class_id: int, subject_id: Optional[int] = None
     ) -> ConflictResolution:
-        from hr.models import StaffMember, StaffQualification
         from .models import TimetableEntry, TimetableSlot, Subject
 
         resolution = ConflictResolution()
@@ -539,52 +1033,35 @@ class ConflictResolver:
                 pass
 
         # ── Alternative teachers ──
-        # Find teachers busy at this (day, slot)
-        busy_teacher_ids = set(
-            TimetableEntry.objects.filter(
-                school_id=self.school_id, day=day, slot_id=slot_id
-            ).values_list('teacher_id', flat=True)
-        )
-
-        available_teachers = StaffMember.objects.filter(
-            school_id=self.school_id, is_active=True, employment_status='ACTIVE'
-        ).exclude(id__in=busy_teacher_ids)
-
-        for teacher in available_teachers[:10]:
-            match_score = 0
-            match_reason = 'Available at this time'
-
-            if subject:
-                qualifications = StaffQualification.objects.filter(
-                    staff_member=teacher
-                ).values_list('qualification_name', flat=True)
-                for q in qualifications:
-                    if subject.name.lower() in q.lower() or q.lower() in subject.name.lower():
-                        match_score = 100
-                        match_reason = f'Qualified: {q}'
-                        break
-
-            resolution.alternative_teachers.append({
-                'teacher_id': teacher.id,
-                'teacher_name': teacher.full_name,
-                'qualification_match': match_score,
-                'reason': match_reason,
-            })
+        # Rank every active teacher who is free at this (day, slot)
+        ranker = SubstituteRanker(self.school_id)
+        candidates = ranker.rank([SubstitutePeriod(
+            day=day,
+            slot_id=slot_id,
+            subject_id=subject.id if subject else None,
+            subject_name=subject.name if subject else '',
+            class_id=class_id,
+        )], limit=10)[0]
+        resolution.alternative_teachers = [
+            {
+                'teacher_id': c['teacher_id'],
+                'teacher_name': c['teacher_name'],
+                'qualification_match': 100 if c['qualified'] else 0,
+                'score': c['score'],
+                'reason': c['reason'],
+                'reasons': c['reasons'],
+            }
+            for c in candidates
+        ]
 
-        resolution.alternative_teachers.sort(
-            key=lambda x: x['qualification_match'], reverse=True
-        )
+        occupancy = ranker.occupancy
 
         # ── Alternative slots ──
         period_slots = TimetableSlot.objects.filter(
             school_id=self.school_id, slot_type='PERIOD', is_active=True
         )
 
-        teacher_entries = set(
-            TimetableEntry.objects.filter(
-                school_id=self.school_id, teacher_id=teacher_id
-            ).values_list('day', 'slot_id')
-        )
+        teacher_entries = occupancy.teacher_slots(teacher_id)
         class_entries = set(
             TimetableEntry.objects.filter(
                 school_id=self.school_id, class_obj_id=class_id
@@ -615,16 +1092,14 @@ class ConflictResolver:
                 continue
 
             # Check: is the conflicting teacher free at this entry's (day, slot)?
-            conflicting_teacher_free = not TimetableEntry.objects.filter(
-                school_id=self.school_id, teacher_id=teacher_id,
-                day=entry.day, slot_id=entry.slot_id
-            ).exclude(class_obj_id=class_id).exists()
+            conflicting_teacher_free = occupancy.is_free(
+                teacher_id, entry.day, entry.slot_id, exclude_class_id=class_id
+            )
 
             # Check: is this entry's teacher free at the conflicting (day, slot)?
-            entry_teacher_free = not TimetableEntry.objects.filter(
-                school_id=self.school_id, teacher_id=entry.teacher_id,
-                day=day, slot_id=slot_id
-            ).exclude(class_obj_id=class_id).exists()
+            entry_teacher_free = occupancy.is_free(
+                entry.teacher_id, day, slot_id, exclude_class_id=class_id
+            )
 
             if conflicting_teacher_free and entry_teacher_free:
                 resolution.swap_suggestions.append({
@@ -863,6 +1338,33 @@ class TimetableQualityScorer:
         return round(constraint_score * 0.6 + dist_score * 0.4, 1)
 
 
+# ── Analyzer Cache ──────────────────────────────────────────────────────────
+
+# Workload and curriculum-gap analyses are memoized per school; the academics
+# signals bump the version whenever timetable entries, class subjects,
+# subjects, classes or staff qualifications change.
+ANALYZER_CACHE_SECONDS = 6 * 60 * 60
+
+
+def _analyzer_version_key(school_id: int) -> str:
+    return f'academics:analyzers:version:{school_id}'
+
+
+def invalidate_timetable_analyzers(school_id: int):
+    """Drop cached WorkloadAnalyzer and CurriculumGapAnalyzer results for a school."""
+    cache.set(_analyzer_version_key(school_id), time.time_ns(), None)
+
+
+def _cached_analysis(name: str, school_id: int, compute) -> dict:
+    version = cache.get(_analyzer_version_key(school_id), 0)
+    key = f'academics:analyzers:{name}:{school_id}:{version}'
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, ANALYZER_CACHE_SECONDS)
+    return data
+
+
 # ── Workload Analyzer ───────────────────────────────────────────────────────
 
 class WorkloadAnalyzer:
@@ -872,26 +1374,18 @@ class WorkloadAnalyzer:
         self.school_id = school_id
 
     def analyze(self) -> dict:
-        from hr.models import StaffMember
-        from .models import ClassSubject, TimetableEntry
+        return _cached_analysis('workload', self.school_id, self._analyze)
 
-        class_subjects = ClassSubject.objects.filter(
-            school_id=self.school_id, is_active=True
-        ).select_related('teacher', 'class_obj', 'subject')
-
-        entries = TimetableEntry.objects.filter(
-            school_id=self.school_id
-        ).select_related('teacher', 'slot', 'class_obj', 'subject')
+    def _analyze(self) -> dict:
+        from .models import ClassSubject, TimetableEntry
 
-        # Build per-teacher stats
+        # Build per-teacher stats from grouped rows
         teacher_stats: Dict[int, dict] = {}
 
-        for cs in class_subjects:
-            if not cs.teacher_id:
-                continue
-            stats = teacher_stats.setdefault(cs.teacher_id, {
-                'teacher_id': cs.teacher_id,
-                'teacher_name': cs.teacher.full_name,
+        def stats_for(row):
+            return teacher_stats.setdefault(row['teacher_id'], {
+                'teacher_id': row['teacher_id'],
+                'teacher_name': f"{row['teacher__first_name']} {row['teacher__last_name']}",
                 'assigned_periods_week': 0,
                 'timetabled_periods_week': 0,
                 'periods_per_day': {d: 0 for d in DAYS},
@@ -900,26 +1394,25 @@ class WorkloadAnalyzer:
                 'subjects_taught': set(),
                 'status': 'balanced',
             })
-            stats['assigned_periods_week'] += cs.periods_per_week
-            stats['classes_taught'].add(cs.class_obj.name)
-            stats['subjects_taught'].add(cs.subject.name)
 
-        for entry in entries:
-            if not entry.teacher_id:
-                continue
-            stats = teacher_stats.setdefault(entry.teacher_id, {
-                'teacher_id': entry.teacher_id,
-                'teacher_name': entry.teacher.full_name if entry.teacher else 'Unknown',
-                'assigned_periods_week': 0,
-                'timetabled_periods_week': 0,
-                'periods_per_day': {d: 0 for d in DAYS},
-                'max_periods_day': 0,
-                'classes_taught': set(),
-                'subjects_taught': set(),
-                'status': 'balanced',
-            })
-            stats['timetabled_periods_week'] += 1
-            stats['periods_per_day'][entry.day] = stats['periods_per_day'].get(entry.day, 0) + 1
+        for row in ClassSubject.objects.filter(
+            school_id=self.school_id, is_active=True, teacher__isnull=False
+        ).values(
+            'teacher_id', 'teacher__first_name', 'teacher__last_name', 'class_obj__name', 'subject__name',
+        ).annotate(periods=Sum('periods_per_week')).order_by():
+            stats = stats_for(row)
+            stats['assigned_periods_week'] += row['periods']
+            stats['classes_taught'].add(row['class_obj__name'])
+            stats['subjects_taught'].add(row['subject__name'])
+
+        for row in TimetableEntry.objects.filter(
+            school_id=self.school_id, teacher__isnull=False
+        ).values(
+            'teacher_id', 'teacher__first_name', 'teacher__last_name', 'day',
+        ).annotate(periods=Count('id')).order_by():
+            stats = stats_for(row)
+            stats['timetabled_periods_week'] += row['periods']
+            stats['periods_per_day'][row['day']] = stats['periods_per_day'].get(row['day'], 0) + row['periods']
 
         # Compute max_periods_day and status flags
         for stats in teacher_stats.values():
@@ -979,26 +1472,32 @@ class CurriculumGapAnalyzer:
         self.school_id = school_id
 
     def analyze(self) -> dict:
+        return _cached_analysis('curriculum_gaps', self.school_id, self._analyze)
+
+    def _analyze(self) -> dict:
         from students.models import Class
         from hr.models import StaffQualification
         from .models import ClassSubject, Subject, TimetableEntry
 
-        classes = Class.objects.filter(school_id=self.school_id, is_active=True)
-        subjects = Subject.objects.filter(
+        classes = list(Class.objects.filter(
+            school_id=self.school_id, is_active=True
+        ).values_list('id', 'name'))
+        subjects = list(Subject.objects.filter(
             school_id=self.school_id, is_active=True, is_elective=False
-        )
-        class_subjects = ClassSubject.objects.filter(
+        ).values('id', 'name', 'code'))
+        class_subjects = list(ClassSubject.objects.filter(
             school_id=self.school_id, is_active=True
-        ).select_related('class_obj', 'subject', 'teacher')
+        ).values(
+            'id', 'class_obj_id', 'subject_id', 'teacher_id', 'periods_per_week',
+            'class_obj__name', 'subject__name', 'teacher__first_name', 'teacher__last_name',
+        ))
 
         entries = TimetableEntry.objects.filter(
             school_id=self.school_id
-        ).values('class_obj_id', 'subject_id').annotate(count=Count('id'))
+        ).values('class_obj_id', 'subject_id').annotate(count=Count('id')).order_by()
 
         # Build lookup maps
-        cs_map: Dict[Tuple[int, int], Any] = {}
-        for cs in class_subjects:
-            cs_map[(cs.class_obj_id, cs.subject_id)] = cs
+        cs_keys = {(cs['class_obj_id'], cs['subject_id']) for cs in class_subjects}
 
         entry_counts: Dict[Tuple[int, int], int] = {}
         for e in entries:
@@ -1006,48 +1505,48 @@ class CurriculumGapAnalyzer:
 
         # 1. Missing required subjects
         missing_required = []
-        for cls in classes:
+        for class_id, class_name in classes:
             missing = []
             for subj in subjects:
-                if (cls.id, subj.id) not in cs_map:
+                if (class_id, subj['id']) not in cs_keys:
                     missing.append({
-                        'subject_id': subj.id,
-                        'subject_name': subj.name,
-                        'subject_code': subj.code,
+                        'subject_id': subj['id'],
+                        'subject_name': subj['name'],
+                        'subject_code': subj['code'],
                     })
             if missing:
                 missing_required.append({
-                    'class_id': cls.id,
-                    'class_name': cls.name,
+                    'class_id': class_id,
+                    'class_name': class_name,
                     'missing_subjects': missing,
                 })
 
         # 2. Unmet periods
         unmet_periods = []
         for cs in class_subjects:
-            actual = entry_counts.get((cs.class_obj_id, cs.subject_id), 0)
-            if actual < cs.periods_per_week:
+            actual = entry_counts.get((cs['class_obj_id'], cs['subject_id']), 0)
+            if actual < cs['periods_per_week']:
                 unmet_periods.append({
-                    'class_name': cs.class_obj.name,
-                    'subject_name': cs.subject.name,
-                    'required': cs.periods_per_week,
+                    'class_name': cs['class_obj__name'],
+                    'subject_name': cs['subject__name'],
+                    'required': cs['periods_per_week'],
                     'actual': actual,
-                    'deficit': cs.periods_per_week - actual,
+                    'deficit': cs['periods_per_week'] - actual,
                 })
 
         # 3. Unassigned teachers
         unassigned_teachers = []
         for cs in class_subjects:
-            if not cs.teacher_id:
+            if not cs['teacher_id']:
                 unassigned_teachers.append({
-                    'class_subject_id': cs.id,
-                    'class_name': cs.class_obj.name,
-                    'subject_name': cs.subject.name,
+                    'class_subject_id': cs['id'],
+                    'class_name': cs['class_obj__name'],
+                    'subject_name': cs['subject__name'],
                 })
 
         # 4. Qualification mismatches
         qualification_mismatches = []
-        teacher_ids = set(cs.teacher_id for cs in class_subjects if cs.teacher_id)
+        teacher_ids = set(cs['teacher_id'] for cs in class_subjects if cs['teacher_id'])
         qualifications = StaffQualification.objects.filter(
             staff_member_id__in=teacher_ids
         ).values_list('staff_member_id', 'qualification_name')
@@ -1057,19 +1556,19 @@ class CurriculumGapAnalyzer:
             teacher_quals.setdefault(tid, []).append(qname)
 
         for cs in class_subjects:
-            if not cs.teacher_id:
+            if not cs['teacher_id']:
                 continue
-            quals = teacher_quals.get(cs.teacher_id, [])
-            subject_name_lower = cs.subject.name.lower()
+            quals = teacher_quals.get(cs['teacher_id'], [])
+            subject_name_lower = cs['subject__name'].lower()
             has_match = any(
                 subject_name_lower in q.lower() or q.lower() in subject_name_lower
                 for q in quals
             )
             if not has_match and quals:
                 qualification_mismatches.append({
-                    'teacher_name': cs.teacher.full_name,
-                    'subject_name': cs.subject.name,
-                    'class_name': cs.class_obj.name,
+                    'teacher_name': f"{cs['teacher__first_name']} {cs['teacher__last_name']}",
+                    'subject_name': cs['subject__name'],
+                    'class_name': cs['class_obj__name'],
                     'teacher_qualifications': quals,
                 })
 
@@ -1087,6 +1586,140 @@ class CurriculumGapAnalyzer:
         }
 
 
+# ── Substitute Ranking ──────────────────────────────────────────────────────
+
+@dataclass
+class SubstitutePeriod:
+    """One period that needs another teacher."""
+    day: str
+    slot_id: int
+    subject_id: Optional[int] = None
+    subject_name: str = ''
+    class_id: Optional[int] = None
+    absent_teacher_id: Optional[int] = None
+
+
+class SubstituteRanker:
+    """
+    Scores every eligible staff member for a set of periods in one pass.
+
+    Staff, qualifications, class-subject assignments and the day's absences
+    are loaded once, and free slots and workload come from the school's
+    TeacherOccupancy index, so the query count does not depend on the number
+    of periods or candidates.
+    """
+
+    BASE_SCORE = 50
+    QUALIFIED_BONUS = 30
+    TEACHES_SUBJECT_BONUS = 15
+    TEACHES_CLASS_BONUS = 10
+    PERIOD_TODAY_PENALTY = 3
+
+    def __init__(self, school_id: int, date_obj: Optional[date] = None):
+        self.school_id = school_id
+        self.date_obj = date_obj
+        self._loaded = False
+
+    def _load(self):
+        from hr.models import StaffAttendance, StaffMember, StaffQualification
+        from .models import ClassSubject
+
+        self.staff = list(StaffMember.objects.filter(
+            school_id=self.school_id, is_active=True, employment_status='ACTIVE'
+        ).order_by('first_name', 'last_name', 'id'))
+
+        self.qualifications: Dict[int, List[str]] = {}
+        for tid, qname in StaffQualification.objects.filter(
+            staff_member__school_id=self.school_id
+        ).values_list('staff_member_id', 'qualification_name'):
+            self.qualifications.setdefault(tid, []).append(qname)
+
+        self.teacher_subjects: Dict[int, Set[int]] = {}
+        self.teacher_classes: Dict[int, Set[int]] = {}
+        for tid, subject_id, class_id in ClassSubject.objects.filter(
+            school_id=self.school_id, is_active=True, teacher__isnull=False
+        ).values_list('teacher_id', 'subject_id', 'class_obj_id'):
+            self.teacher_subjects.setdefault(tid, set()).add(subject_id)
+            self.teacher_classes.setdefault(tid, set()).add(class_id)
+
+        self.absent_on_date: Set[int] = set()
+        if self.date_obj:
+            self.absent_on_date = set(StaffAttendance.objects.filter(
+                school_id=self.school_id,
+                date=self.date_obj,
+                status__in=['ABSENT', 'ON_LEAVE'],
+            ).values_list('staff_member_id', flat=True))
+
+        self.occupancy = TeacherOccupancy.for_school(self.school_id)
+        self.day_load: Dict[Tuple[int, str], int] = {}
+        self.week_load: Dict[int, int] = {}
+        for (day, _slot_id), teachers in self.occupancy.cells.items():
+            for tid in teachers:
+                self.day_load[(tid, day)] = self.day_load.get((tid, day), 0) + 1
+                self.week_load[tid] = self.week_load.get(tid, 0) + 1
+        self._loaded = True
+
+    def _qualification_for(self, teacher_id: int, subject_name: str) -> Optional[str]:
+        if not subject_name:
+            return None
+        subject_lower = subject_name.lower()
+        for q in self.qualifications.get(teacher_id, []):
+            if subject_lower in q.lower() or q.lower() in subject_lower:
+                return q
+        return None
+
+    def _score(self, teacher, period: SubstitutePeriod) -> dict:
+        score = self.BASE_SCORE
+        reasons = []
+
+        qualification = self._qualification_for(teacher.id, period.subject_name)
+        if qualification:
+            score += self.QUALIFIED_BONUS
+            reasons.append(f'Qualified ({qualification})')
+        if period.subject_id and period.subject_id in self.teacher_subjects.get(teacher.id, ()):
+            score += self.TEACHES_SUBJECT_BONUS
+            reasons.append(f'Teaches {period.subject_name or "this subject"}')
+        if period.class_id and period.class_id in self.teacher_classes.get(teacher.id, ()):
+            score += self.TEACHES_CLASS_BONUS
+            reasons.append('Already teaches this class')
+
+        today_periods = self.day_load.get((teacher.id, period.day), 0)
+        score -= today_periods * self.PERIOD_TODAY_PENALTY
+        if not reasons:
+            reasons.append('Available')
+        reasons.append(f'{today_periods} period(s) that day')
+
+        return {
+            'teacher_id': teacher.id,
+            'teacher_name': teacher.full_name,
+            'score': max(0, score),
+            'qualified': qualification is not None,
+            'reason': reasons[0],
+            'reasons': reasons,
+            'today_periods': today_periods,
+            'week_periods': self.week_load.get(teacher.id, 0),
+        }
+
+    def rank(self, periods: List[SubstitutePeriod], limit: Optional[int] = 5) -> List[List[dict]]:
+        """Top candidates for each period, best first (ties go to the lighter week)."""
+        if not self._loaded:
+            self._load()
+
+        unavailable = self.absent_on_date | {
+            p.absent_teacher_id for p in periods if p.absent_teacher_id
+        }
+        ranked = []
+        for period in periods:
+            busy = self.occupancy.busy_teachers(period.day, period.slot_id)
+            candidates = [
+                self._score(teacher, period) for teacher in self.staff
+                if teacher.id not in unavailable and teacher.id not in busy
+            ]
+            candidates.sort(key=lambda c: (-c['score'], c['week_periods']))
+            ranked.append(candidates[:limit] if limit else candidates)
+        return ranked
+
+
 # ── Substitute Teacher Finder ───────────────────────────────────────────────
 
 class SubstituteTeacherFinder:
@@ -1098,7 +1731,7 @@ class SubstituteTeacherFinder:
         self.school_id = school_id
 
     def suggest(self, teacher_id: int, date_obj: date) -> dict:
-        from hr.models import StaffAttendance, StaffMember, StaffQualification
+        from hr.models import StaffMember
         from .models import TimetableEntry
 
         day_code = self.DAY_MAP.get(date_obj.weekday())
@@ -1116,9 +1749,9 @@ class SubstituteTeacherFinder:
             return {'error': 'Teacher not found.'}
 
         # Get absent teacher's entries for that day
-        entries = TimetableEntry.objects.filter(
+        entries = list(TimetableEntry.objects.filter(
             school_id=self.school_id, teacher_id=teacher_id, day=day_code
-        ).select_related('slot', 'subject', 'class_obj').order_by('slot__order')
+        ).select_related('slot', 'subject', 'class_obj').order_by('slot__order'))
 
         if not entries:
             return {
@@ -1128,85 +1761,28 @@ class SubstituteTeacherFinder:
                 'message': f'{absent_teacher.full_name} has no classes on {day_code}.',
             }
 
-        # Get teachers who are absent on that date
-        absent_on_date = set(
-            StaffAttendance.objects.filter(
-                school_id=self.school_id,
-                date=date_obj,
-                status__in=['ABSENT', 'ON_LEAVE'],
-            ).values_list('staff_member_id', flat=True)
-        )
-
-        # Get all active teachers
-        all_teachers = StaffMember.objects.filter(
-            school_id=self.school_id, is_active=True, employment_status='ACTIVE'
-        ).exclude(id=teacher_id)
-
-        # Get all qualifications
-        qualifications = StaffQualification.objects.filter(
-            staff_member__in=all_teachers
-        ).values_list('staff_member_id', 'qualification_name')
-        teacher_quals: Dict[int, List[str]] = {}
-        for tid, qname in qualifications:
-            teacher_quals.setdefault(tid, []).append(qname)
-
-        # Get all teacher entries for the day (to check availability)
-        day_entries = TimetableEntry.objects.filter(
-            school_id=self.school_id, day=day_code
-        ).values_list('teacher_id', 'slot_id')
-        teacher_slot_busy: Dict[int, Set[int]] = {}
-        for tid, sid in day_entries:
-            if tid:
-                teacher_slot_busy.setdefault(tid, set()).add(sid)
+        # Rank cover for every period in one pass
+        ranked = SubstituteRanker(self.school_id, date_obj).rank([
+            SubstitutePeriod(
+                day=day_code,
+                slot_id=entry.slot_id,
+                subject_id=entry.subject_id,
+                subject_name=entry.subject.name if entry.subject else '',
+                class_id=entry.class_obj_id,
+                absent_teacher_id=teacher_id,
+            )
+            for entry in entries
+        ])
 
-        # Build suggestions per entry
         results = []
-        for entry in entries:
-            substitutes = []
-            subject_name = entry.subject.name if entry.subject else ''
-
-            for teacher in all_teachers:
-                # Skip absent teachers
-                if teacher.id in absent_on_date:
-                    continue
-
-                # Skip teachers busy at this slot
-                if entry.slot_id in teacher_slot_busy.get(teacher.id, set()):
-                    continue
-
-                score = 50  # Base score
-                reason = 'Available'
-
-                # Qualification match
-                quals = teacher_quals.get(teacher.id, [])
-                if subject_name and any(
-                    subject_name.lower() in q.lower() or q.lower() in subject_name.lower()
-                    for q in quals
-                ):
-                    score += 30
-                    reason = f'Qualified ({subject_name})'
-
-                # Workload: fewer periods today = better
-                today_periods = len(teacher_slot_busy.get(teacher.id, set()))
-                score -= today_periods * 3
-
-                substitutes.append({
-                    'teacher_id': teacher.id,
-                    'teacher_name': teacher.full_name,
-                    'score': max(0, score),
-                    'reason': reason,
-                    'today_periods': today_periods,
-                })
-
-            substitutes.sort(key=lambda x: x['score'], reverse=True)
-
+        for entry, substitutes in zip(entries, ranked):
             results.append({
                 'slot_name': entry.slot.name,
                 'slot_start': entry.slot.start_time.strftime('%H:%M') if entry.slot.start_time else '',
                 'slot_end': entry.slot.end_time.strftime('%H:%M') if entry.slot.end_time else '',
-                'subject_name': subject_name,
+                'subject_name': entry.subject.name if entry.subject else '',
                 'class_name': entry.class_obj.name,
-                'suggested_substitutes': substitutes[:5],
+                'suggested_substitutes': substitutes,
             })
 
         return {
@@ -3,16 +3,41 @@ Academics Predictive Analytics.
 
 Aggregation queries for subject attendance patterns, teacher effectiveness,
 optimal slot recommendations, and attendance trends.
+
+Subject-by-slot attendance is cached per school and date range; the
+academics and attendance signals drop it when timetable entries, slots,
+subjects or attendance records change.
 """
 
 import logging
+import time
 from collections import defaultdict
 from datetime import date, timedelta
 
+from django.core.cache import cache
 from django.db.models import Count, Q, Avg
+from django.db.models.functions import ExtractIsoWeekDay
 
 logger = logging.getLogger(__name__)
 
+SLOT_ATTENDANCE_CACHE_SECONDS = 60 * 60
+
+
+def _slot_attendance_version_key(school_id):
+    return f'academics_analytics:slot_attendance:version:{school_id}'
+
+
+def _slot_attendance_cache_key(school_id, date_from, date_to):
+    return 'academics_analytics:slot_attendance:{}:{}:{}:{}'.format(
+        school_id, date_from or '', date_to or '',
+        cache.get(_slot_attendance_version_key(school_id), 0),
+    )
+
+
+def invalidate_slot_attendance(school_id):
+    """Drop every cached subject_attendance_by_slot() result for a school."""
+    cache.set(_slot_attendance_version_key(school_id), time.time_ns(), None)
+
 
 class AcademicsAnalytics:
     """Aggregation-based analytics for academic scheduling."""
@@ -21,38 +46,47 @@ class AcademicsAnalytics:
         self.school_id = school_id
 
     def subject_attendance_by_slot(self, date_from=None, date_to=None) -> dict:
-        """Compute attendance rates per subject grouped by morning/afternoon."""
+        """
+        Compute attendance rates per subject grouped by morning/afternoon.
+
+        Cached per school and date range; see invalidate_slot_attendance().
+        """
+        key = _slot_attendance_cache_key(self.school_id, date_from, date_to)
+        data = cache.get(key)
+        if data is None:
+            data = self._compute_subject_attendance_by_slot(date_from, date_to)
+            cache.set(key, data, SLOT_ATTENDANCE_CACHE_SECONDS)
+        return data
+
+    def _compute_subject_attendance_by_slot(self, date_from=None, date_to=None) -> dict:
         from attendance.models import AttendanceRecord
         from .models import TimetableEntry, TimetableSlot
 
-        slots = list(
+        slot_ids = list(
             TimetableSlot.objects.filter(
                 school_id=self.school_id, slot_type='PERIOD', is_active=True
-            ).order_by('order')
+            ).order_by('order').values_list('id', flat=True)
         )
-        if not slots:
+        if not slot_ids:
             return {'subjects': [], 'message': 'No time slots defined.'}
 
-        mid = len(slots) // 2
-        morning_slot_ids = {s.id for i, s in enumerate(slots) if i < mid}
-        afternoon_slot_ids = {s.id for i, s in enumerate(slots) if i >= mid}
-
-        entries = TimetableEntry.objects.filter(
-            school_id=self.school_id, subject__isnull=False
-        ).select_related('subject', 'class_obj', 'slot')
+        mid = len(slot_ids) // 2
+        morning_slot_ids = set(slot_ids[:mid])
 
-        # Build class-day-subject mapping from timetable
-        class_day_subject = defaultdict(set)
+        # Load the school timetable once: (class, day) -> [(subject, is_morning)]
+        class_day_entries = defaultdict(list)
         subject_slots = defaultdict(lambda: {'morning': 0, 'afternoon': 0, 'total': 0})
 
-        for entry in entries:
-            class_day_subject[(entry.class_obj_id, entry.day)].add(entry.subject_id)
-            key = entry.subject.name
-            if entry.slot_id in morning_slot_ids:
-                subject_slots[key]['morning'] += 1
+        for class_id, day, slot_id, subject_name in TimetableEntry.objects.filter(
+            school_id=self.school_id, subject__isnull=False
+        ).values_list('class_obj_id', 'day', 'slot_id', 'subject__name'):
+            is_morning = slot_id in morning_slot_ids
+            class_day_entries[(class_id, day)].append((subject_name, is_morning))
+            if is_morning:
+                subject_slots[subject_name]['morning'] += 1
             else:
-                subject_slots[key]['afternoon'] += 1
-            subject_slots[key]['total'] += 1
+                subject_slots[subject_name]['afternoon'] += 1
+            subject_slots[subject_name]['total'] += 1
 
         # Get attendance records
         att_qs = AttendanceRecord.objects.filter(school_id=self.school_id)
@@ -61,47 +95,33 @@ class AcademicsAnalytics:
         if date_to:
             att_qs = att_qs.filter(date__lte=date_to)
 
-        # Aggregate attendance by class and date
-        # AttendanceRecord -> Student -> class_obj (FK path)
-        class_date_attendance = att_qs.values(
-            'student__class_obj_id', 'date'
+        # Aggregate attendance by class and weekday; every date falling on the
+        # same weekday maps to the same timetable day, so the sums are identical
+        # to a per-date join. AttendanceRecord -> Student -> class_obj (FK path)
+        class_day_attendance = att_qs.values(
+            'student__class_obj_id', weekday=ExtractIsoWeekDay('date')
         ).annotate(
             total=Count('id'),
             present=Count('id', filter=Q(status='PRESENT')),
-        )
+        ).order_by()
 
-        # Map day-of-week to our DAY codes
-        day_map = {0: 'MON', 1: 'TUE', 2: 'WED', 3: 'THU', 4: 'FRI', 5: 'SAT'}
+        # Map ISO weekday to our DAY codes
+        day_map = {1: 'MON', 2: 'TUE', 3: 'WED', 4: 'THU', 5: 'FRI', 6: 'SAT'}
 
         # Compute per-subject attendance rates
         subject_rates = defaultdict(lambda: {'morning_total': 0, 'morning_present': 0,
                                               'afternoon_total': 0, 'afternoon_present': 0})
 
-        for record in class_date_attendance:
-            record_date = record['date']
-            day_code = day_map.get(record_date.weekday())
+        for record in class_day_attendance:
+            day_code = day_map.get(record['weekday'])
             if not day_code:
                 continue
 
-            class_id = record['student__class_obj_id']
-            subjects_for_day = class_day_subject.get((class_id, day_code), set())
-
-            from .models import TimetableEntry as TE
-            day_entries = TE.objects.filter(
-                school_id=self.school_id,
-                class_obj_id=class_id,
-                day=day_code,
-                subject__isnull=False,
-            ).select_related('subject', 'slot')
-
-            for entry in day_entries:
-                subj_name = entry.subject.name
-                if entry.slot_id in morning_slot_ids:
-                    subject_rates[subj_name]['morning_total'] += record['total']
-                    subject_rates[subj_name]['morning_present'] += record['present']
-                else:
-                    subject_rates[subj_name]['afternoon_total'] += record['total']
-                    subject_rates[subj_name]['afternoon_present'] += record['present']
+            day_entries = class_day_entries.get((record['student__class_obj_id'], day_code), ())
+            for subj_name, is_morning in day_entries:
+                half = 'morning' if is_morning else 'afternoon'
+                subject_rates[subj_name][f'{half}_total'] += record['total']
+                subject_rates[subj_name][f'{half}_present'] += record['present']
 
         results = []
         for name, data in subject_slots.items():
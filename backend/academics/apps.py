@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AcademicsConfig(AppConfig):
     name = 'academics'
+
+    def ready(self):
+        import academics.signals  # noqa: F401
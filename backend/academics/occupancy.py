@@ -0,0 +1,155 @@
+"""
+Per-school teacher occupancy index.
+
+Maps (day, slot) -> teacher -> {class_id: entry_id} for every timetable
+entry with a teacher, so teacher clash checks, swap suggestions and
+substitute search are dictionary lookups instead of one query per check.
+
+The index is built from a single query the first time a school needs it and
+kept in the cache under a per-school version. The TimetableEntry signals apply
+each save and delete to the cached copy once the transaction commits, holding
+a short cache lock for the read-modify-write; if the lock is taken or no index
+is cached, the version is bumped instead. Anything that changes entries
+without signals (queryset update(), bulk_create(), a teacher being removed)
+must call invalidate_teacher_occupancy() so the next reader rebuilds it.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+OCCUPANCY_CACHE_SECONDS = 60 * 60
+UPDATE_LOCK_SECONDS = 10
+
+
+def _version_key(school_id):
+    return f'academics:teacher_occupancy:version:{school_id}'
+
+
+def _cache_key(school_id, version):
+    return f'academics:teacher_occupancy:{school_id}:{version}'
+
+
+class TeacherOccupancy:
+    """Teacher (day, slot) occupancy for one school."""
+
+    def __init__(self, school_id: int, cells=None, entries=None):
+        self.school_id = school_id
+        # (day, slot_id) -> {teacher_id: {class_id: entry_id}}
+        self.cells = cells if cells is not None else {}
+        # entry_id -> (teacher_id, day, slot_id, class_id), to undo a moved entry
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def build(cls, school_id: int) -> 'TeacherOccupancy':
+        from .models import TimetableEntry
+
+        index = cls(school_id)
+        for entry_id, teacher_id, day, slot_id, class_id in TimetableEntry.objects.filter(
+            school_id=school_id, teacher__isnull=False,
+        ).values_list('id', 'teacher_id', 'day', 'slot_id', 'class_obj_id'):
+            index._add(entry_id, teacher_id, day, slot_id, class_id)
+        return index
+
+    @classmethod
+    def for_school(cls, school_id: int) -> 'TeacherOccupancy':
+        """Cached index for a school, built on first use."""
+        key = _cache_key(school_id, cache.get(_version_key(school_id), 0))
+        state = cache.get(key)
+        if state is not None:
+            return cls(school_id, *state)
+        index = cls.build(school_id)
+        # add(): never replace a copy a concurrent update has just patched. A
+        # build that raced an invalidation lands under the old version unread.
+        cache.add(key, (index.cells, index.entries), OCCUPANCY_CACHE_SECONDS)
+        return index
+
+    def _add(self, entry_id, teacher_id, day, slot_id, class_id):
+        self.cells.setdefault((day, slot_id), {}).setdefault(teacher_id, {})[class_id] = entry_id
+        self.entries[entry_id] = (teacher_id, day, slot_id, class_id)
+
+    def _discard(self, entry_id):
+        previous = self.entries.pop(entry_id, None)
+        if previous is None:
+            return
+        teacher_id, day, slot_id, class_id = previous
+        teachers = self.cells.get((day, slot_id), {})
+        classes = teachers.get(teacher_id, {})
+        if classes.get(class_id) == entry_id:
+            del classes[class_id]
+        if not classes:
+            teachers.pop(teacher_id, None)
+        if not teachers:
+            self.cells.pop((day, slot_id), None)
+
+    # ── Lookups ──
+
+    def conflicts(self, teacher_id, day, slot_id, exclude_class_id=None, exclude_entry_id=None) -> dict:
+        """{class_id: entry_id} of the teacher's other entries at (day, slot)."""
+        classes = self.cells.get((day, slot_id), {}).get(teacher_id, {})
+        return {
+            class_id: entry_id for class_id, entry_id in classes.items()
+            if class_id != exclude_class_id and entry_id != exclude_entry_id
+        }
+
+    def is_free(self, teacher_id, day, slot_id, exclude_class_id=None) -> bool:
+        return not self.conflicts(teacher_id, day, slot_id, exclude_class_id=exclude_class_id)
+
+    def busy_teachers(self, day, slot_id) -> set:
+        """Teachers with any entry at (day, slot)."""
+        return set(self.cells.get((day, slot_id), {}))
+
+    def teacher_slots(self, teacher_id, day=None) -> set:
+        """(day, slot_id) cells the teacher is booked in, optionally for one day."""
+        return {
+            (d, slot_id) for (d, slot_id), teachers in self.cells.items()
+            if teacher_id in teachers and (day is None or d == day)
+        }
+
+
+def invalidate_teacher_occupancy(school_id):
+    """Drop a school's cached index; the next reader rebuilds it."""
+    cache.set(_version_key(school_id), time.time_ns(), None)
+
+
+def _update_cached(school_id, apply):
+    lock_key = f'academics:teacher_occupancy:lock:{school_id}'
+    if not cache.add(lock_key, 1, UPDATE_LOCK_SECONDS):
+        # Another update is patching the index; rebuilding is always safe.
+        invalidate_teacher_occupancy(school_id)
+        return
+    try:
+        key = _cache_key(school_id, cache.get(_version_key(school_id), 0))
+        state = cache.get(key)
+        if state is None:
+            # Also orphans any build that read the database before this commit.
+            invalidate_teacher_occupancy(school_id)
+            return
+        index = TeacherOccupancy(school_id, *state)
+        apply(index)
+        cache.set(key, (index.cells, index.entries), OCCUPANCY_CACHE_SECONDS)
+    finally:
+        cache.delete(lock_key)
+
+
+def record_entry_saved(entry):
+    """Apply a saved TimetableEntry to the cached index once it commits."""
+    entry_id, teacher_id, day, slot_id, class_id = (
+        entry.id, entry.teacher_id, entry.day, entry.slot_id, entry.class_obj_id,
+    )
+
+    def apply(index):
+        index._discard(entry_id)
+        if teacher_id:
+            index._add(entry_id, teacher_id, day, slot_id, class_id)
+    transaction.on_commit(lambda: _update_cached(entry.school_id, apply))
+
+
+def record_entry_deleted(entry):
+    """Remove a deleted TimetableEntry from the cached index once it commits."""
+    entry_id = entry.id
+    transaction.on_commit(lambda: _update_cached(entry.school_id, lambda index: index._discard(entry_id)))
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Subject, ClassSubject, ClassTeacherAssignment, TimetableSlot, TimetableEntry
+from .occupancy import TeacherOccupancy
 
 
 # ── Subject ──────────────────────────────────────────────────────────────────
@@ -403,16 +404,14 @@ class TimetableEntryCreateSerializer(serializers.ModelSerializer):
         day = data.get('day')
         slot = data.get('slot')
         if teacher and day and slot and school_id:
-            conflict = TimetableEntry.objects.filter(
-                school_id=school_id,
-                teacher=teacher,
-                day=day,
-                slot=slot,
+            clashes = TeacherOccupancy.for_school(school_id).conflicts(
+                teacher.id, day, slot.id,
+                exclude_entry_id=self.instance.pk if self.instance else None,
             )
-            if self.instance:
-                conflict = conflict.exclude(pk=self.instance.pk)
-            if conflict.exists():
-                conflicting = conflict.first()
+            if clashes:
+                conflicting = TimetableEntry.objects.select_related('class_obj').get(
+                    id=min(clashes.values()),
+                )
                 raise serializers.ValidationError(
                     f'Teacher is already assigned to {conflicting.class_obj.name} '
                     f'at this time slot.'
@@ -426,6 +425,13 @@ class AutoGenerateRequestSerializer(serializers.Serializer):
     class_id = serializers.IntegerField()
 
 
+class SchoolAutoGenerateRequestSerializer(serializers.Serializer):
+    class_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=True,
+    )
+    time_limit = serializers.IntegerField(required=False, min_value=5, max_value=600)
+
+
 class ConflictResolutionRequestSerializer(serializers.Serializer):
     teacher = serializers.IntegerField()
     day = serializers.CharField(max_length=3)
@@ -0,0 +1,58 @@
+"""
+Django signals for academics app.
+Keeps the cached teacher occupancy index in step with timetable entries and
+drops cached slot attendance analytics and workload/curriculum-gap analyses
+when the data behind them changes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='academics.TimetableEntry')
+def update_occupancy_on_entry_save(sender, instance, **kwargs):
+    from .occupancy import record_entry_saved
+    record_entry_saved(instance)
+
+
+@receiver(post_delete, sender='academics.TimetableEntry')
+def update_occupancy_on_entry_delete(sender, instance, **kwargs):
+    from .occupancy import record_entry_deleted
+    record_entry_deleted(instance)
+
+
+@receiver(post_delete, sender='hr.StaffMember')
+def invalidate_occupancy_on_staff_delete(sender, instance, **kwargs):
+    # The teacher's entries are nulled with a queryset update, which skips signals.
+    from django.db import transaction
+    from .occupancy import invalidate_teacher_occupancy
+    school_id = instance.school_id
+    transaction.on_commit(lambda: invalidate_teacher_occupancy(school_id))
+
+
+@receiver(post_save, sender='academics.TimetableEntry')
+@receiver(post_delete, sender='academics.TimetableEntry')
+@receiver(post_save, sender='academics.ClassSubject')
+@receiver(post_delete, sender='academics.ClassSubject')
+@receiver(post_save, sender='academics.Subject')
+@receiver(post_delete, sender='academics.Subject')
+@receiver(post_save, sender='students.Class')
+@receiver(post_delete, sender='students.Class')
+@receiver(post_save, sender='hr.StaffMember')
+@receiver(post_delete, sender='hr.StaffMember')
+@receiver(post_save, sender='hr.StaffQualification')
+@receiver(post_delete, sender='hr.StaffQualification')
+def invalidate_analyzers_on_change(sender, instance, **kwargs):
+    from .ai_engine import invalidate_timetable_analyzers
+    invalidate_timetable_analyzers(instance.school_id)
+
+
+@receiver(post_save, sender='academics.TimetableEntry')
+@receiver(post_delete, sender='academics.TimetableEntry')
+@receiver(post_save, sender='academics.TimetableSlot')
+@receiver(post_delete, sender='academics.TimetableSlot')
+@receiver(post_save, sender='academics.Subject')
+@receiver(post_save, sender='attendance.AttendanceRecord')
+@receiver(post_delete, sender='attendance.AttendanceRecord')
+def invalidate_slot_attendance_on_change(sender, instance, **kwargs):
+    from .analytics import invalidate_slot_attendance
+    invalidate_slot_attendance(instance.school_id)
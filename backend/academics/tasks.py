@@ -52,3 +52,48 @@ def auto_generate_timetable_task(self, school_id, class_id, algorithm='greedy'):
         logger.exception(f"Timetable auto-generation failed: {e}")
         mark_task_failed(task_id, str(e))
         raise
+
+
+@shared_task(bind=True, time_limit=900)
+def auto_generate_school_timetable_task(self, school_id, class_ids=None, time_limit=None):
+    """Generate timetables for several classes (default: all) in one solve."""
+    from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
+    from academics.ai_engine import ORToolsSchoolTimetableGenerator
+
+    task_id = self.request.id
+
+    try:
+        update_task_progress(task_id, current=10, total=100)
+
+        generator = ORToolsSchoolTimetableGenerator(
+            school_id, class_ids=class_ids, time_limit_seconds=time_limit,
+        )
+        result = generator.generate()
+
+        update_task_progress(task_id, current=90, total=100)
+
+        if not result.success:
+            mark_task_failed(task_id, result.error)
+            return {'success': False, 'error': result.error}
+
+        result_data = {
+            'grids': {str(class_id): grid for class_id, grid in result.grids.items()},
+            'scores': {str(class_id): score for class_id, score in result.scores.items()},
+            'warnings': result.warnings,
+            'status': result.status,
+            'objective_value': result.objective_value,
+            'initial_objective': result.initial_objective,
+            'solve_time': round(result.solve_time, 2),
+            'algorithm': 'or_tools_school',
+            'message': (
+                f'Timetables generated for {len(result.grids)} classes '
+                f'in {result.solve_time:.1f}s.'
+            ),
+        }
+        mark_task_success(task_id, result_data=result_data)
+        return result_data
+
+    except Exception as e:
+        logger.exception(f"School timetable generation failed: {e}")
+        mark_task_failed(task_id, str(e))
+        raise
@@ -0,0 +1,109 @@
+"""
+Synthetic benchmark: school-wide CP-SAT timetable vs. class-by-class solves.
+
+Builds an in-memory school (no database) where every teacher is shared by
+several classes, then solves it two ways with solve_timetable_model():
+
+    sequential   one model per class in order, each class's placements
+                 becoming fixed busy slots for the next (what running
+                 ORToolsTimetableGenerator class by class does)
+    school_wide  solve_school_timetable() over all classes, as used by
+                 ORToolsSchoolTimetableGenerator
+
+Both use the same objective, so objective values are directly comparable
+(lower is better; every unscheduled period costs UNSCHEDULED_PERIOD_PENALTY).
+Run via `manage.py benchmark_timetable_solver`.
+"""
+
+import random
+import time
+
+from .ai_engine import (
+    DAYS, UNSCHEDULED_PERIOD_PENALTY, SolverDemand, solve_school_timetable, solve_timetable_model,
+)
+
+
+def build_synthetic_school(num_classes=30, periods_per_day=8, classes_per_teacher=8, seed=7):
+    """
+    Return (demands, cells, morning_slot_ids) for a synthetic school.
+
+    Each class needs eight subjects totalling 40 of its 48 weekly periods;
+    each subject's teachers each cover classes_per_teacher classes, so the
+    busiest teachers (8 classes x 6 periods) are booked in every slot.
+    """
+    rng = random.Random(seed)
+    subject_periods = [6, 6, 6, 5, 5, 4, 4, 4]
+    cells = [(day, slot_id) for slot_id in range(1, periods_per_day + 1) for day in DAYS]
+    morning = set(range(1, periods_per_day // 2 + 1))
+
+    demands = []
+    for subject_index, periods in enumerate(subject_periods):
+        subject_id = subject_index + 1
+        class_order = list(range(1, num_classes + 1))
+        rng.shuffle(class_order)
+        for position, class_id in enumerate(class_order):
+            teacher_id = subject_id * 1000 + position // classes_per_teacher
+            demands.append(SolverDemand(
+                class_id=class_id,
+                subject_id=subject_id,
+                teacher_id=teacher_id,
+                periods=periods,
+                is_core=subject_index < 5,
+            ))
+    demands.sort(key=lambda d: (d.class_id, d.subject_id))
+    return demands, cells, morning
+
+
+def _summary(objective, solve_time, unscheduled, **extra):
+    return {
+        'objective_value': objective,
+        'solve_time': round(solve_time, 3),
+        'unscheduled_periods': unscheduled,
+        **extra,
+    }
+
+
+def solve_sequential(demands, cells, morning, time_limit_per_class=30):
+    """Solve class by class, fixing each class's teachers before the next."""
+    teacher_busy = {}
+    objective = 0.0
+    unscheduled = 0
+    started = time.monotonic()
+    class_ids = sorted({d.class_id for d in demands})
+    for class_id in class_ids:
+        class_demands = [d for d in demands if d.class_id == class_id]
+        solved = solve_timetable_model(
+            class_demands, cells, morning,
+            teacher_busy=teacher_busy, time_limit_seconds=time_limit_per_class,
+        )
+        if solved['objective_value'] is None:
+            missing = sum(d.periods for d in class_demands)
+            unscheduled += missing
+            objective += missing * UNSCHEDULED_PERIOD_PENALTY
+            continue
+        objective += solved['objective_value']
+        unscheduled += sum(solved['unscheduled'].values())
+        for i, day, slot_id in solved['assignments']:
+            teacher_id = class_demands[i].teacher_id
+            if teacher_id:
+                teacher_busy.setdefault(teacher_id, set()).add((day, slot_id))
+    return _summary(objective, time.monotonic() - started, unscheduled, solves=len(class_ids))
+
+
+def solve_school_wide(demands, cells, morning, time_limit_seconds=120):
+    started = time.monotonic()
+    solved = solve_school_timetable(demands, cells, morning, time_limit_seconds=time_limit_seconds)
+    return _summary(
+        solved['objective_value'], time.monotonic() - started,
+        sum(solved['unscheduled'].values()), rounds=solved['rounds'],
+    )
+
+
+def run_benchmark(num_classes=30, time_limit_seconds=120, time_limit_per_class=30, seed=7):
+    demands, cells, morning = build_synthetic_school(num_classes=num_classes, seed=seed)
+    return {
+        'classes': num_classes,
+        'demands': len(demands),
+        'sequential': solve_sequential(demands, cells, morning, time_limit_per_class),
+        'school_wide': solve_school_wide(demands, cells, morning, time_limit_seconds),
+    }
@@ -23,13 +23,14 @@ from core.permissions import (
 from core.mixins import TenantQuerySetMixin, ensure_tenant_schools, ensure_tenant_school_id
 from core.class_scope import resolve_class_scope
 from .models import Subject, ClassSubject, ClassTeacherAssignment, TimetableSlot, TimetableEntry
+from .occupancy import TeacherOccupancy
 from .serializers import (
     SubjectSerializer, SubjectCreateSerializer, SubjectBulkCreateSerializer,
     ClassSubjectSerializer, ClassSubjectCreateSerializer,
     ClassTeacherAssignmentSerializer, ClassTeacherAssignmentCreateSerializer,
     TimetableSlotSerializer, TimetableSlotCreateSerializer,
     TimetableEntrySerializer, TimetableEntryCreateSerializer,
-    AutoGenerateRequestSerializer, SubstituteRequestSerializer,
+    AutoGenerateRequestSerializer, SchoolAutoGenerateRequestSerializer, SubstituteRequestSerializer,
     AcademicsAIChatMessageSerializer, AcademicsAIChatInputSerializer,
 )
 
@@ -832,24 +833,30 @@ class TimetableEntryViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mod
             ).first()
             academic_year_id = ay.id if ay else None
 
-        # Validate teacher conflicts
-        errors = []
+        # Validate teacher conflicts against the school's occupancy index
+        occupancy = TeacherOccupancy.for_school(school_id)
+        row_conflicts = []
         for idx, entry in enumerate(entries_data):
             teacher_id = entry.get('teacher')
             slot_id = entry.get('slot')
             if teacher_id and slot_id:
-                conflict = TimetableEntry.objects.filter(
-                    school_id=school_id,
-                    teacher_id=teacher_id,
-                    day=day.upper(),
-                    slot_id=slot_id,
-                ).exclude(class_obj_id=class_id)
-                if conflict.exists():
-                    c = conflict.first()
-                    errors.append(
-                        f'Row {idx + 1}: Teacher is already assigned to '
-                        f'{c.class_obj.name} at {c.slot.name}.'
-                    )
+                clashes = occupancy.conflicts(
+                    int(teacher_id), day.upper(), int(slot_id), exclude_class_id=int(class_id),
+                )
+                if clashes:
+                    row_conflicts.append((idx, min(clashes.values())))
+
+        errors = []
+        if row_conflicts:
+            clashing = TimetableEntry.objects.select_related('class_obj', 'slot').in_bulk(
+                [entry_id for _, entry_id in row_conflicts]
+            )
+            for idx, entry_id in row_conflicts:
+                c = clashing[entry_id]
+                errors.append(
+                    f'Row {idx + 1}: Teacher is already assigned to '
+                    f'{c.class_obj.name} at {c.slot.name}.'
+                )
 
         if errors:
             return Response({'detail': errors}, status=400)
@@ -910,18 +917,22 @@ class TimetableEntryViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mod
         if not all([school_id, teacher_id, day, slot_id]):
             return Response({'detail': 'teacher, day, and slot params required.'}, status=400)
 
-        conflicts = TimetableEntry.objects.filter(
-            school_id=school_id,
-            teacher_id=teacher_id,
-            day=day.upper(),
-            slot_id=slot_id,
-        ).select_related('class_obj', 'subject')
+        try:
+            clashes = TeacherOccupancy.for_school(school_id).conflicts(
+                int(teacher_id), day.upper(), int(slot_id),
+                exclude_class_id=int(exclude_class) if exclude_class else None,
+            )
+        except ValueError:
+            return Response({'detail': 'teacher, slot and exclude_class must be ids.'}, status=400)
 
-        if exclude_class:
-            conflicts = conflicts.exclude(class_obj_id=exclude_class)
+        conflicts = []
+        if clashes:
+            conflicts = TimetableEntry.objects.filter(
+                id__in=clashes.values(),
+            ).select_related('class_obj', 'subject')
 
         return Response({
-            'has_conflict': conflicts.exists(),
+            'has_conflict': bool(clashes),
             'conflicts': TimetableEntrySerializer(conflicts, many=True).data,
         })
 
@@ -984,6 +995,50 @@ class TimetableEntryViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mod
                 'message': 'Timetable generation started.',
             }, status=202)
 
+    @action(detail=False, methods=['post'])
+    def auto_generate_school(self, request):
+        """AI: Generate timetables for several classes (default: all) in one solve.
+
+        Shared teachers are scheduled jointly instead of class by class.
+        Optional: class_ids, time_limit (seconds). Always runs in the background.
+        """
+        serializer = SchoolAutoGenerateRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        school_id = _resolve_school_id(request)
+        if not school_id:
+            return Response({'detail': 'No school selected.'}, status=400)
+
+        class_ids = serializer.validated_data.get('class_ids') or None
+        if class_ids:
+            from students.models import Class
+            class_ids = list(Class.objects.filter(
+                school_id=school_id, id__in=class_ids,
+            ).values_list('id', flat=True))
+            if not class_ids:
+                return Response({'detail': 'No matching classes found.'}, status=404)
+
+        from core.models import BackgroundTask
+        from core.task_utils import dispatch_background_task
+        from .tasks import auto_generate_school_timetable_task
+
+        bg_task = dispatch_background_task(
+            celery_task_func=auto_generate_school_timetable_task,
+            task_type=BackgroundTask.TaskType.TIMETABLE_GENERATION,
+            title=f"Auto-generating timetables ({len(class_ids) if class_ids else 'all'} classes)",
+            school_id=school_id, user=request.user,
+            task_kwargs={
+                'school_id': school_id,
+                'class_ids': class_ids,
+                'time_limit': serializer.validated_data.get('time_limit'),
+            },
+            progress_total=100,
+        )
+        return Response({
+            'task_id': bg_task.celery_task_id,
+            'message': 'School timetable generation started.',
+        }, status=202)
+
     @action(detail=False, methods=['get'])
     def suggest_resolution(self, request):
         """AI: Suggest conflict resolution alternatives."""
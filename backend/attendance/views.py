@@ -20,6 +20,8 @@ from django.db.models import Count, Q
 from core.permissions import IsSchoolAdmin, HasSchoolAccess, CanConfirmAttendance, CanUploadAttendance, CanManualAttendance, ModuleAccessMixin, get_effective_role, ADMIN_ROLES, get_teacher_class_scope, get_teacher_session_class_scope, _get_session_class_student_ids
 from core.mixins import TenantQuerySetMixin, ensure_tenant_schools, ensure_tenant_school_id
 from academic_sessions.calendar_rules import is_off_day_for_date, off_day_types_for_date, build_off_day_date_set
+from academic_sessions.promotion_advisor_service import invalidate_promotion_advice
+from academics.analytics import invalidate_slot_attendance
 from .models import AttendanceUpload, AttendanceRecord
 from .serializers import (
     AttendanceUploadSerializer,
@@ -443,6 +445,8 @@ class AttendanceUploadViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.M
 
         to_create = []
         to_update = []
+        # bulk_update skips auto_now; set it so incremental readers see the change.
+        now = timezone.now()
         for student in all_students:
             att_status = (
                 AttendanceRecord.AttendanceStatus.ABSENT
@@ -456,6 +460,7 @@ class AttendanceUploadViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.M
                 record.status = att_status
                 record.source = AttendanceRecord.Source.IMAGE_AI
                 record.upload = upload
+                record.updated_at = now
                 to_update.append(record)
             else:
                 to_create.append(AttendanceRecord(
@@ -472,9 +477,12 @@ class AttendanceUploadViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.M
             AttendanceRecord.objects.bulk_create(to_create)
         if to_update:
             AttendanceRecord.objects.bulk_update(
-                to_update, ['school', 'academic_year', 'status', 'source', 'upload']
+                to_update, ['school', 'academic_year', 'status', 'source', 'upload', 'updated_at']
             )
         created_records = to_update + to_create
+        # Bulk writes skip model signals.
+        invalidate_slot_attendance(upload.school_id)
+        invalidate_promotion_advice(upload.school_id)
 
         # Update upload status
         upload.status = AttendanceUpload.Status.CONFIRMED
@@ -1037,7 +1045,7 @@ class AttendanceRecordViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.R
             return Response({'error': str(e)}, status=500)
 
     def _generate_register_pdf(self, request):
-        import urllib.request as urllib_request
+        from core.school_assets import get_school_logo
         from reportlab.lib.pagesizes import A4, landscape
         from reportlab.lib import colors
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -1167,10 +1175,10 @@ class AttendanceRecordViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.R
 
         # Build header: logo on left, school name + title centered
         logo_image = None
-        if getattr(school, 'logo', None):
+        logo_bytes = get_school_logo(school)
+        if logo_bytes:
             try:
-                logo_data = io.BytesIO(urllib_request.urlopen(school.logo, timeout=5).read())
-                logo_image = Image(logo_data, width=0.7*inch, height=0.7*inch)
+                logo_image = Image(io.BytesIO(logo_bytes), width=0.7*inch, height=0.7*inch)
                 logo_image.hAlign = 'LEFT'
             except Exception as e:
                 logger.warning(f"Could not load school logo: {e}")
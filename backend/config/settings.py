@@ -370,6 +370,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'finance.tasks.scan_all_siblings_task',
         'schedule': crontab(hour=2, minute=30),
     },
+    'cleanup-expired-reports': {
+        'task': 'reports.tasks.cleanup_expired_reports',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'daily-session-health-snapshots': {
+        'task': 'academic_sessions.tasks.refresh_session_health_snapshots',
+        'schedule': crontab(hour=1, minute=30),
+    },
 }
 
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
@@ -452,6 +460,13 @@ SUPABASE_URL = os.getenv('SUPABASE_URL', '').strip()
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', '').strip()
 SUPABASE_BUCKET = os.getenv('SUPABASE_BUCKET', 'atten-reg').strip()
 
+# Generated report artifacts: 'local' (MEDIA_ROOT) or 'supabase'
+REPORT_ARTIFACT_STORAGE = os.getenv('REPORT_ARTIFACT_STORAGE', 'local').strip()
+REPORT_ARTIFACT_RETENTION_DAYS = int(os.getenv('REPORT_ARTIFACT_RETENTION_DAYS', '30'))
+
+# Default time budget for school-wide timetable generation (seconds)
+TIMETABLE_SOLVER_TIME_LIMIT_SECONDS = int(os.getenv('TIMETABLE_SOLVER_TIME_LIMIT_SECONDS', '120'))
+
 # =============================================================================
 # WhatsApp Configuration
 # =============================================================================
@@ -15,6 +15,20 @@ DATABASES = {
     }
 }
 
+# Use an in-process cache so cache-backed counters behave deterministically
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'eduai-test-cache',
+    }
+}
+
+# Keep report artifacts and other media out of the working tree
+import tempfile  # noqa: E402
+MEDIA_ROOT = tempfile.mkdtemp(prefix='eduai-test-media-')
+REPORT_ARTIFACT_STORAGE = 'local'
+SCHOOL_ASSET_CACHE_DIR = tempfile.mkdtemp(prefix='eduai-test-assets-')
+
 # Speed up password hashing in tests
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
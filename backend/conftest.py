@@ -25,6 +25,17 @@ SEED_PREFIX = "PYTEST_"
 PASSWORD = "TestPass123!"
 
 
+# ── Cache isolation ──────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Clear the default cache so cached counters never leak between tests."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 # ── API helper fixtures ──────────────────────────────────────────────────────
 
 @pytest.fixture
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic_sessions', '0012_rename_academic_se_school__f1331a_idx_academic_se_school__3d73df_idx_and_more'),
+        ('core', '0003_backgroundtask_report_comments'),
+        ('schools', '0015_add_module_entitlements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdentifierSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='identifier_sequences', to='academic_sessions.academicyear')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='identifier_sequences', to='schools.school')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('academic_year__isnull', False)), fields=('school', 'scope', 'academic_year'), name='unique_identifier_sequence_per_year'), models.UniqueConstraint(condition=models.Q(('academic_year__isnull', True)), fields=('school', 'scope'), name='unique_identifier_sequence_per_school')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+
+EMPLOYEE_ID_RE = re.compile(r'^EMP-(\d+)$')
+
+
+def _to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def seed_identifier_sequences(apps, schema_editor):
+    IdentifierSequence = apps.get_model('core', 'IdentifierSequence')
+    StaffMember = apps.get_model('hr', 'StaffMember')
+    StudentEnrollment = apps.get_model('academic_sessions', 'StudentEnrollment')
+    Student = apps.get_model('students', 'Student')
+
+    sequences = {}
+
+    def bump(school_id, scope, academic_year_id, value):
+        if value is None:
+            return
+        key = (school_id, scope, academic_year_id)
+        sequences[key] = max(sequences.get(key, 0), value)
+
+    for school_id, employee_id in StaffMember.objects.filter(
+        employee_id__startswith='EMP-',
+    ).values_list('school_id', 'employee_id').iterator():
+        match = EMPLOYEE_ID_RE.match(employee_id.strip())
+        if match:
+            bump(school_id, 'employee_id', None, int(match.group(1)))
+
+    # Class-level buckets also count the rolls on the students' current class snapshot.
+    snapshot_max = defaultdict(int)
+    for school_id, class_id, roll in Student.objects.values_list(
+        'school_id', 'class_obj_id', 'roll_number',
+    ).iterator():
+        value = _to_int(roll)
+        if class_id and value is not None:
+            snapshot_max[(school_id, class_id)] = max(snapshot_max[(school_id, class_id)], value)
+
+    for school_id, year_id, class_id, session_class_id, roll in StudentEnrollment.objects.filter(
+        is_active=True,
+    ).values_list('school_id', 'academic_year_id', 'class_obj_id', 'session_class_id', 'roll_number').iterator():
+        if session_class_id:
+            bump(school_id, f'roll:session_class:{session_class_id}', year_id, _to_int(roll))
+        else:
+            bump(school_id, f'roll:class:{class_id}', year_id, _to_int(roll))
+            bump(school_id, f'roll:class:{class_id}', year_id, snapshot_max.get((school_id, class_id)))
+
+    IdentifierSequence.objects.bulk_create([
+        IdentifierSequence(school_id=school_id, scope=scope, academic_year_id=year_id, last_value=value)
+        for (school_id, scope, year_id), value in sequences.items()
+    ], batch_size=500, ignore_conflicts=True)
+
+
+def clear_identifier_sequences(apps, schema_editor):
+    apps.get_model('core', 'IdentifierSequence').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_identifiersequence'),
+        ('hr', '0001_initial'),
+        ('students', '0012_alter_class_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_identifier_sequences, clear_identifier_sequences),
+    ]
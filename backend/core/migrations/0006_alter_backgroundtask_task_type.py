@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_seed_identifier_sequences'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backgroundtask',
+            name='task_type',
+            field=models.CharField(choices=[('REPORT_GENERATION', 'Report Generation'), ('PAYSLIP_GENERATION', 'Payslip Generation'), ('TIMETABLE_GENERATION', 'Timetable Generation'), ('FEE_GENERATION', 'Fee Generation'), ('BULK_PROMOTION', 'Bulk Promotion'), ('PROMOTION_ADVISOR', 'Promotion Advisor'), ('FACE_ATTENDANCE', 'Face Attendance Processing'), ('REPORT_COMMENTS', 'Report Card Comments'), ('ACCOUNT_PROVISIONING', 'Account Provisioning')], max_length=30),
+        ),
+    ]
@@ -19,6 +19,8 @@ class BackgroundTask(models.Model):
         BULK_PROMOTION = 'BULK_PROMOTION', 'Bulk Promotion'
         PROMOTION_ADVISOR = 'PROMOTION_ADVISOR', 'Promotion Advisor'
         FACE_ATTENDANCE = 'FACE_ATTENDANCE', 'Face Attendance Processing'
+        REPORT_COMMENTS = 'REPORT_COMMENTS', 'Report Card Comments'
+        ACCOUNT_PROVISIONING = 'ACCOUNT_PROVISIONING', 'Account Provisioning'
 
     school = models.ForeignKey(
         'schools.School',
@@ -56,3 +58,43 @@ class BackgroundTask(models.Model):
 
     def __str__(self):
         return f"[{self.task_type}] {self.title} ({self.status})"
+
+
+class IdentifierSequence(models.Model):
+    """
+    Last number handed out for a per-school identifier, e.g. employee IDs or
+    the roll numbers of one class in one academic year. See core.sequences.
+    """
+
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='identifier_sequences',
+    )
+    scope = models.CharField(max_length=64)
+    academic_year = models.ForeignKey(
+        'academic_sessions.AcademicYear',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='identifier_sequences',
+    )
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['school', 'scope', 'academic_year'],
+                condition=models.Q(academic_year__isnull=False),
+                name='unique_identifier_sequence_per_year',
+            ),
+            models.UniqueConstraint(
+                fields=['school', 'scope'],
+                condition=models.Q(academic_year__isnull=True),
+                name='unique_identifier_sequence_per_school',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} ({self.school_id}/{self.academic_year_id or '-'}): {self.last_value}"
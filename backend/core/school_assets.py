@@ -0,0 +1,188 @@
+"""
+Cached loader for school branding images used in PDF generation.
+
+Logos and letterheads are stored as URLs on School. Fetching them on every
+render costs a network round trip per PDF (and a batch of report cards or
+payslips repeats it per page), so decoded images are cached per school in
+process memory and on local disk. Cache entries are keyed by a hash of the
+URL plus a per-school version kept in the shared Django cache: changing the
+URL misses the old entry, and re-uploads to the same URL call
+invalidate_school_assets() to bump the version for every worker. Failed
+downloads are remembered briefly so a batch render does not wait on the same
+timeout for every document.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# School attribute holding the URL for each asset kind.
+ASSET_FIELDS = {
+    'logo': 'logo',
+    'letterhead': 'letterhead_url',
+}
+
+FETCH_TIMEOUT_SECONDS = 15
+FAILURE_RETRY_SECONDS = 5 * 60
+MEMORY_CACHE_MAX_ENTRIES = 128
+
+_memory_cache = OrderedDict()   # (school_id, kind) -> (url_hash, bytes)
+_failures = {}                  # (school_id, kind, url_hash) -> monotonic time
+_lock = threading.Lock()
+
+
+def _cache_dir():
+    return getattr(
+        settings, 'SCHOOL_ASSET_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'eduai-school-assets'),
+    )
+
+
+def _version_key(school_id):
+    return f'school_assets:version:{school_id}'
+
+
+def _url_hash(school_id, url):
+    version = cache.get(_version_key(school_id)) or 0
+    return hashlib.sha256(f"{version}:{url}".encode('utf-8')).hexdigest()[:16]
+
+
+def _disk_path(school_id, kind, url_hash):
+    return os.path.join(_cache_dir(), f"{school_id}_{kind}_{url_hash}")
+
+
+def _remember(key, url_hash, data):
+    with _lock:
+        _memory_cache[key] = (url_hash, data)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_MAX_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _decode(data):
+    """Return data if it is a readable image, else None."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()
+    except Exception:
+        return None
+    return data
+
+
+def _read_disk(path):
+    try:
+        with open(path, 'rb') as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def _write_disk(school_id, kind, url_hash, data):
+    """Write the new entry and drop files cached for previous URLs."""
+    directory = _cache_dir()
+    prefix = f"{school_id}_{kind}_"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = _disk_path(school_id, kind, url_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and not name.startswith(f"{prefix}{url_hash}"):
+                os.remove(os.path.join(directory, name))
+    except OSError as e:
+        logger.warning("Could not write asset cache for school %s (%s): %s", school_id, kind, e)
+
+
+def _download(url):
+    resp = httpx.get(url, timeout=FETCH_TIMEOUT_SECONDS, follow_redirects=True)
+    resp.raise_for_status()
+    return resp.content
+
+
+def get_school_asset(school, kind):
+    """
+    Return the image bytes for a school's logo or letterhead, or None.
+
+    Lookup order: memory, local disk, network. None means the school has no
+    URL configured or the image could not be downloaded/decoded.
+    """
+    url = getattr(school, ASSET_FIELDS[kind], None)
+    if not url:
+        return None
+
+    key = (school.id, kind)
+    url_hash = _url_hash(school.id, url)
+
+    with _lock:
+        cached = _memory_cache.get(key)
+        if cached and cached[0] == url_hash:
+            _memory_cache.move_to_end(key)
+            return cached[1]
+        failed_at = _failures.get((school.id, kind, url_hash))
+    if failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY_SECONDS:
+        return None
+
+    data = _read_disk(_disk_path(school.id, kind, url_hash))
+    if data is not None and _decode(data) is not None:
+        _remember(key, url_hash, data)
+        return data
+
+    try:
+        data = _decode(_download(url))
+        if data is None:
+            raise ValueError('response is not a readable image')
+    except Exception as e:
+        logger.warning("Failed to fetch %s for school %s: %s", kind, school.id, e)
+        with _lock:
+            _failures[(school.id, kind, url_hash)] = time.monotonic()
+        return None
+
+    with _lock:
+        _failures.pop((school.id, kind, url_hash), None)
+    _write_disk(school.id, kind, url_hash, data)
+    _remember(key, url_hash, data)
+    return data
+
+
+def get_school_logo(school):
+    return get_school_asset(school, 'logo')
+
+
+def get_school_letterhead(school):
+    return get_school_asset(school, 'letterhead')
+
+
+def invalidate_school_assets(school_id):
+    """Forget cached assets for a school in every worker (e.g. after re-upload)."""
+    cache.set(_version_key(school_id), time.time_ns(), None)
+    with _lock:
+        for kind in ASSET_FIELDS:
+            _memory_cache.pop((school_id, kind), None)
+        for failure_key in [k for k in _failures if k[0] == school_id]:
+            del _failures[failure_key]
+    directory = _cache_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(f"{school_id}_"):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,142 @@
+"""
+Per-school identifier sequences.
+
+Each (school, scope, academic_year) key has one IdentifierSequence row
+holding the last number handed out. next_value() increments it with a
+single UPDATE, so concurrent callers queue on the row lock instead of
+racing on a max()-and-add-one scan. A missing row is seeded lazily from
+existing data by the caller's seed() function.
+
+Numbers chosen by hand (an explicit employee ID or roll number) can land
+ahead of the counter. observe() moves the counter past such values, and
+the optional is_taken() check resyncs from seed() if a manual value is
+ever handed out again.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import IdentifierSequence
+
+EMPLOYEE_ID_SCOPE = 'employee_id'
+EMPLOYEE_ID_PREFIX = 'EMP-'
+
+_EMPLOYEE_ID_RE = re.compile(r'^EMP-(\d+)$')
+
+
+def roll_scope(class_obj_id=None, session_class_id=None):
+    """Scope key for the roll numbers of one class or session class bucket."""
+    if session_class_id:
+        return f'roll:session_class:{int(session_class_id)}'
+    return f'roll:class:{int(class_obj_id)}'
+
+
+def parse_employee_number(employee_id):
+    """Return N for 'EMP-N', else None."""
+    match = _EMPLOYEE_ID_RE.match(str(employee_id or '').strip())
+    return int(match.group(1)) if match else None
+
+
+def format_employee_id(number):
+    return f'{EMPLOYEE_ID_PREFIX}{number:03d}'
+
+
+def _sequence_qs(school_id, scope, academic_year_id):
+    return IdentifierSequence.objects.filter(
+        school_id=school_id, scope=scope, academic_year_id=academic_year_id,
+    )
+
+
+def _ensure(school_id, scope, academic_year_id, seed):
+    """Create the sequence row from seed() if it does not exist yet."""
+    if _sequence_qs(school_id, scope, academic_year_id).exists():
+        return
+    try:
+        with transaction.atomic():
+            IdentifierSequence.objects.create(
+                school_id=school_id, scope=scope, academic_year_id=academic_year_id,
+                last_value=seed(),
+            )
+    except IntegrityError:
+        # Another request seeded it first.
+        pass
+
+
+def next_value(school_id, scope, seed, academic_year_id=None, is_taken=None):
+    """
+    Atomically take the next number for a sequence.
+
+    seed() returns the highest number already used in the data and is only
+    called when the row is missing or a manual value got in the way.
+    is_taken(value) is an optional cheap existence check.
+    """
+    qs = _sequence_qs(school_id, scope, academic_year_id)
+    with transaction.atomic():
+        _ensure(school_id, scope, academic_year_id, seed)
+        qs.update(last_value=F('last_value') + 1)
+        value = qs.values_list('last_value', flat=True).get()
+        if is_taken and is_taken(value):
+            value = max(value, seed() + 1)
+            qs.update(last_value=value)
+    return value
+
+
+def peek_value(school_id, scope, seed, academic_year_id=None):
+    """The number next_value() would hand out, without taking it."""
+    _ensure(school_id, scope, academic_year_id, seed)
+    return _sequence_qs(school_id, scope, academic_year_id).values_list('last_value', flat=True).get() + 1
+
+
+def observe(school_id, scope, value, seed, academic_year_id=None):
+    """Advance the sequence past a manually chosen number."""
+    if value is None:
+        return
+    _ensure(school_id, scope, academic_year_id, seed)
+    _sequence_qs(school_id, scope, academic_year_id).update(
+        last_value=Greatest(F('last_value'), int(value)),
+    )
+
+
+# ── Employee IDs ──
+
+def _max_employee_number(school_id):
+    from hr.models import StaffMember
+
+    numbers = (
+        parse_employee_number(value)
+        for value in StaffMember.objects.filter(
+            school_id=school_id, employee_id__startswith=EMPLOYEE_ID_PREFIX,
+        ).values_list('employee_id', flat=True)
+    )
+    return max((n for n in numbers if n is not None), default=0)
+
+
+def _employee_id_taken(school_id, number):
+    from hr.models import StaffMember
+
+    return StaffMember.objects.filter(school_id=school_id, employee_id=format_employee_id(number)).exists()
+
+
+def next_employee_id(school_id):
+    number = next_value(
+        school_id, EMPLOYEE_ID_SCOPE,
+        seed=lambda: _max_employee_number(school_id),
+        is_taken=lambda n: _employee_id_taken(school_id, n),
+    )
+    return format_employee_id(number)
+
+
+def peek_employee_id(school_id):
+    return format_employee_id(peek_value(
+        school_id, EMPLOYEE_ID_SCOPE, seed=lambda: _max_employee_number(school_id),
+    ))
+
+
+def observe_employee_id(school_id, employee_id):
+    observe(
+        school_id, EMPLOYEE_ID_SCOPE, parse_employee_number(employee_id),
+        seed=lambda: _max_employee_number(school_id),
+    )
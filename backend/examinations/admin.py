@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    ExamType, ExamGroup, Exam, ExamSubject, StudentMark, GradeScale,
+    ExamType, ExamGroup, Exam, ExamSubject, StudentMark, ExamResult, GradeScale,
     Question, ExamPaper, PaperQuestion, PaperUpload, PaperFeedback
 )
 
@@ -38,6 +38,14 @@ class StudentMarkAdmin(admin.ModelAdmin):
     search_fields = ('student__name',)
 
 
+@admin.register(ExamResult)
+class ExamResultAdmin(admin.ModelAdmin):
+    list_display = ('student', 'exam', 'percentage', 'is_pass', 'section_rank', 'class_rank')
+    list_filter = ('school', 'exam')
+    search_fields = ('student__name',)
+    readonly_fields = ('updated_at',)
+
+
 @admin.register(GradeScale)
 class GradeScaleAdmin(admin.ModelAdmin):
     list_display = ('grade_label', 'school', 'min_percentage', 'max_percentage', 'gpa_points')
@@ -4,22 +4,24 @@ AI Report Card Comment Generator.
 Generates personalized, professional comments for each student's exam marks
 based on their score, grade, pass/fail status, and attendance record.
 Uses Groq LLM (fast inference) to produce 2-3 sentence comments.
+
+Marks are sent to the model in batches (COMMENTS_PER_REQUEST items per
+call) and any item the model fails on, or omits from its reply, gets the
+rule-based comment instead. Runs from generate_exam_comments_task.
 """
 
+import json
 import logging
-from decimal import Decimal
 from django.conf import settings
+from django.db.models import Count, Q
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
-COMMENT_PROMPT_TEMPLATE = """Generate a short report card comment (2-3 sentences) for a student's subject performance.
+COMMENT_PROMPT_TEMPLATE = """Generate a short report card comment (2-3 sentences) for each of the following subject results.
 
-Subject: {subject_name}
-Marks obtained: {marks_obtained} out of {total_marks} ({percentage:.0f}%)
-Grade: {grade}
-Result: {result}
-Attendance rate: {attendance_pct:.0f}%
+Results (JSON):
+{items}
 
 Rules:
 - Be professional, encouraging, and constructive
@@ -28,23 +30,37 @@ Rules:
 - For average performance: note effort and suggest specific areas for improvement
 - For weak performance: be constructive, mention need for extra attention, suggest support
 - If attendance is below 80%, mention it as a factor affecting performance
-- Keep to exactly 2-3 sentences
+- Keep each comment to exactly 2-3 sentences
 - Do not use exclamation marks excessively
+- Write each comment independently; do not refer to other results
+
+Return ONLY a JSON array with one object per result, in the form
+[{{"id": <result id>, "comment": "<comment>"}}]"""
 
-Comment:"""
+COMMENTS_PER_REQUEST = 10
 
 
 class ReportCardCommentGenerator:
-    """Generates AI comments for student marks in an exam."""
+    """Generates AI comments for student marks in an exam.
 
-    def __init__(self, school):
+    llm_client is any object exposing chat.completions.create() like the
+    Groq client; it defaults to Groq when GROQ_API_KEY is set, otherwise
+    every comment is rule-based.
+    """
+
+    def __init__(self, school, llm_client=None, batch_size=COMMENTS_PER_REQUEST):
         self.school = school
+        self.batch_size = max(1, batch_size)
+        self._llm_client = llm_client
 
-    def generate_for_exam(self, exam_id):
+    def generate_for_exam(self, exam_id, force=False, progress=None):
         """Generate AI comments for all marks in an exam.
 
+        Marks that already have a comment are skipped unless force is set.
+        progress, if given, is called with (done, total) after each batch.
+
         Returns:
-            dict: {generated: int, errors: int, total: int, skipped: int}
+            dict: {generated: int, fallbacks: int, errors: int, total: int, skipped: int}
         """
         from .models import Exam, ExamSubject, StudentMark, GradeScale
 
@@ -53,7 +69,7 @@ class ReportCardCommentGenerator:
                 id=exam_id, school=self.school
             )
         except Exam.DoesNotExist:
-            return {'generated': 0, 'errors': 0, 'total': 0, 'skipped': 0,
+            return {'generated': 0, 'fallbacks': 0, 'errors': 0, 'total': 0, 'skipped': 0,
                     'error': 'Exam not found'}
 
         # Load grade scales
@@ -67,94 +83,141 @@ class ReportCardCommentGenerator:
         ).select_related('subject')
 
         # Get all marks that have been entered
-        marks = StudentMark.objects.filter(
+        marks = list(StudentMark.objects.filter(
             exam_subject__in=exam_subjects,
             school=self.school,
             marks_obtained__isnull=False,
             is_absent=False,
-        ).select_related('student', 'exam_subject', 'exam_subject__subject')
+        ).select_related('exam_subject', 'exam_subject__subject').order_by('student_id', 'id'))
 
-        if not marks.exists():
-            return {'generated': 0, 'errors': 0, 'total': 0, 'skipped': 0,
+        if not marks:
+            return {'generated': 0, 'fallbacks': 0, 'errors': 0, 'total': 0, 'skipped': 0,
                     'error': 'No marks entered yet'}
 
+        pending = [mark for mark in marks if force or not mark.ai_comment]
+        skipped = len(marks) - len(pending)
+
         # Pre-compute attendance rates for all students in this class
         attendance_rates = self._get_attendance_rates(exam.class_obj_id)
 
         generated = 0
+        fallbacks = 0
         errors = 0
-        skipped = 0
-        total = marks.count()
-
-        for mark in marks:
-            # Skip if already has a comment
-            if mark.ai_comment:
-                skipped += 1
-                continue
-
-            try:
-                comment = self._generate_single_comment(
-                    mark, grade_scales, attendance_rates
-                )
-                if comment:
-                    mark.ai_comment = comment
-                    mark.ai_comment_generated_at = timezone.now()
-                    mark.save(update_fields=['ai_comment', 'ai_comment_generated_at'])
-                    generated += 1
-                else:
-                    errors += 1
-            except Exception as e:
-                logger.warning(f"Comment generation failed for mark {mark.id}: {e}")
-                errors += 1
+        done = 0
+        if progress:
+            progress(0, len(pending))
+
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            ai_comments = self._generate_batch_comments(batch, grade_scales, attendance_rates)
+
+            now = timezone.now()
+            updated = []
+            for mark in batch:
+                comment = ai_comments.get(mark.id)
+                if not comment:
+                    try:
+                        comment = self._generate_rule_based_comment(
+                            mark, grade_scales, attendance_rates
+                        )
+                        fallbacks += 1
+                    except Exception as e:
+                        logger.warning(f"Comment generation failed for mark {mark.id}: {e}")
+                        errors += 1
+                        continue
+                mark.ai_comment = comment
+                mark.ai_comment_generated_at = now
+                updated.append(mark)
+
+            StudentMark.objects.bulk_update(updated, ['ai_comment', 'ai_comment_generated_at'])
+            generated += len(updated)
+            done += len(batch)
+            if progress:
+                progress(done, len(pending))
 
         return {
             'generated': generated,
+            'fallbacks': fallbacks,
             'errors': errors,
             'skipped': skipped,
-            'total': total,
+            'total': len(marks),
         }
 
-    def _generate_single_comment(self, mark, grade_scales, attendance_rates):
-        """Generate a comment for a single student mark."""
-        if not settings.GROQ_API_KEY:
-            return self._generate_rule_based_comment(mark, grade_scales, attendance_rates)
+    def _get_llm_client(self):
+        if self._llm_client is None and settings.GROQ_API_KEY:
+            from groq import Groq
+            self._llm_client = Groq(api_key=settings.GROQ_API_KEY)
+        return self._llm_client
 
-        percentage = float(mark.marks_obtained / mark.exam_subject.total_marks * 100)
-        grade = self._get_grade(percentage, grade_scales)
-        result = 'Pass' if mark.marks_obtained >= mark.exam_subject.passing_marks else 'Fail'
-        attendance_pct = attendance_rates.get(mark.student_id, 100)
+    def _generate_batch_comments(self, marks, grade_scales, attendance_rates):
+        """Ask the model for comments on several marks in one call.
 
-        prompt = COMMENT_PROMPT_TEMPLATE.format(
-            subject_name=mark.exam_subject.subject.name,
-            marks_obtained=mark.marks_obtained,
-            total_marks=mark.exam_subject.total_marks,
-            percentage=percentage,
-            grade=grade,
-            result=result,
-            attendance_pct=attendance_pct,
-        )
+        Returns {mark_id: comment} for the items the model answered; an
+        empty dict when no model is configured or the call fails.
+        """
+        client = self._get_llm_client()
+        if client is None:
+            return {}
 
         try:
-            from groq import Groq
-            client = Groq(api_key=settings.GROQ_API_KEY)
+            items = []
+            for mark in marks:
+                percentage = float(mark.marks_obtained / mark.exam_subject.total_marks * 100)
+                items.append({
+                    'id': mark.id,
+                    'subject': mark.exam_subject.subject.name,
+                    'marks_obtained': float(mark.marks_obtained),
+                    'total_marks': float(mark.exam_subject.total_marks),
+                    'percentage': round(percentage),
+                    'grade': self._get_grade(percentage, grade_scales),
+                    'result': 'Pass' if mark.marks_obtained >= mark.exam_subject.passing_marks else 'Fail',
+                    'attendance_pct': round(attendance_rates.get(mark.student_id, 100)),
+                })
 
             response = client.chat.completions.create(
                 model=settings.GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[{"role": "user", "content": COMMENT_PROMPT_TEMPLATE.format(
+                    items=json.dumps(items, indent=1),
+                )}],
                 temperature=0.4,
-                max_tokens=200,
-                timeout=15,
+                max_tokens=150 * len(items) + 100,
+                timeout=30,
             )
 
-            comment = response.choices[0].message.content.strip()
+            content = response.choices[0].message.content
+            if '```json' in content:
+                content = content.split('```json', 1)[1].split('```', 1)[0]
+            elif '```' in content:
+                content = content.split('```', 1)[1].split('```', 1)[0]
+            parsed = json.loads(content.strip())
+        except Exception as e:
+            logger.warning(f"Groq API call failed, using rule-based fallback: {e}")
+            return {}
+
+        if isinstance(parsed, dict):
+            parsed = parsed.get('comments', [])
+        if not isinstance(parsed, list):
+            return {}
+
+        wanted = {mark.id for mark in marks}
+        comments = {}
+        for entry in parsed:
+            if not isinstance(entry, dict):
+                continue
+            comment = entry.get('comment')
+            try:
+                mark_id = int(entry.get('id'))
+            except (TypeError, ValueError):
+                continue
+            if mark_id not in wanted or not isinstance(comment, str):
+                continue
+            comment = comment.strip()
             # Clean up any surrounding quotes
             if comment.startswith('"') and comment.endswith('"'):
                 comment = comment[1:-1]
-            return comment
-
-        except Exception as e:
-            logger.warning(f"Groq API call failed, using rule-based fallback: {e}")
-            return self._generate_rule_based_comment(mark, grade_scales, attendance_rates)
+            if comment:
+                comments[mark_id] = comment
+        return comments
 
     def _generate_rule_based_comment(self, mark, grade_scales, attendance_rates):
         """Fallback: generate a rule-based comment without LLM."""
@@ -200,24 +263,21 @@ class ReportCardCommentGenerator:
         return comment
 
     def _get_attendance_rates(self, class_obj_id):
-        """Get attendance rate for each student in the class."""
+        """Get attendance rate for each student in the class (one grouped query)."""
         from attendance.models import AttendanceRecord
 
         rates = {}
         try:
-            from students.models import Student
-            students = Student.objects.filter(
-                school=self.school, class_obj_id=class_obj_id, is_active=True
+            counts = AttendanceRecord.objects.filter(
+                school=self.school,
+                student__class_obj_id=class_obj_id,
+                student__is_active=True,
+            ).values('student_id').annotate(
+                total=Count('id'),
+                present=Count('id', filter=Q(status='PRESENT')),
             )
-
-            for student in students:
-                total = AttendanceRecord.objects.filter(
-                    school=self.school, student=student
-                ).count()
-                present = AttendanceRecord.objects.filter(
-                    school=self.school, student=student, status='PRESENT'
-                ).count()
-                rates[student.id] = (present / total * 100) if total > 0 else 100
+            for row in counts:
+                rates[row['student_id']] = row['present'] / row['total'] * 100
 
         except Exception as e:
             logger.debug(f"Could not compute attendance rates: {e}")
@@ -0,0 +1,220 @@
+"""
+Weighted term and annual result consolidation.
+
+Combines every published exam a class sat in a term (or, with no term, the
+whole academic year) into one result per student. Each exam type carries a
+weight (ExamType.weight): a subject's consolidated percentage is the
+weighted mean of its per-exam-type percentages, and the overall percentage
+is the weighted mean of each exam type's total percentage, the same formula
+ReportCardBuilder uses for weighted report cards. Absent or unentered papers
+count as zero and fail the subject.
+
+Marks and paper totals are summed in the database, grouped by (student,
+subject, exam type), so the cost does not grow with the number of exams.
+Results are cached per (class, academic year, term); refresh_exam_results()
+and the exam/exam-type signals drop the cached entry when a contributing
+mark, paper, exam or weight changes.
+"""
+
+import logging
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+
+logger = logging.getLogger(__name__)
+
+CONSOLIDATION_CACHE_SECONDS = 6 * 60 * 60
+
+TWO_PLACES = Decimal('0.01')
+
+
+def _version_key(scope, obj_id):
+    return f'exam_consolidation:version:{scope}:{obj_id}'
+
+
+def _cache_key(school_id, class_id, academic_year_id, term_id):
+    versions = cache.get_many([_version_key('school', school_id), _version_key('class', class_id)])
+    return 'exam_consolidation:{}:{}:{}:{}:{}:{}'.format(
+        school_id, class_id, academic_year_id, term_id or 'annual',
+        versions.get(_version_key('school', school_id), 0),
+        versions.get(_version_key('class', class_id), 0),
+    )
+
+
+def invalidate_consolidated_results(class_id=None, school_id=None):
+    """Drop cached consolidations for one class, or every class of a school."""
+    if class_id is not None:
+        cache.set(_version_key('class', class_id), time.time_ns(), None)
+    if school_id is not None:
+        cache.set(_version_key('school', school_id), time.time_ns(), None)
+
+
+def _weighted_percentage(parts):
+    """
+    parts: iterable of (weight, obtained, possible) per exam type.
+
+    Types with nothing possible are ignored. Falls back to plain
+    obtained/possible when every remaining weight is zero.
+    """
+    parts = [(w, o, p) for w, o, p in parts if p > 0]
+    if not parts:
+        return Decimal('0')
+    total_weight = sum((w for w, _, _ in parts), Decimal('0'))
+    if total_weight > 0:
+        value = sum((o / p * 100 * w for w, o, p in parts), Decimal('0')) / total_weight
+    else:
+        value = (
+            sum((o for _, o, _ in parts), Decimal('0'))
+            / sum((p for _, _, p in parts), Decimal('0')) * 100
+        )
+    return value.quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def compute_consolidated_results(school_id, class_obj, academic_year_id, term_id=None):
+    """Compute consolidated results for a class without touching the cache."""
+    from .models import Exam, ExamSubject, GradeScale, StudentMark
+    from .report_cards import _grade_for, class_enrollments
+    from .results import assign_ranks
+
+    exam_filter = {
+        'school_id': school_id,
+        'class_obj_id': class_obj.id,
+        'academic_year_id': academic_year_id,
+        'status': Exam.Status.PUBLISHED,
+        'is_active': True,
+    }
+    if term_id:
+        exam_filter['term_id'] = term_id
+    exams = list(Exam.objects.filter(**exam_filter).values(
+        'id', 'name', 'exam_type_id', 'exam_type__name', 'exam_type__weight',
+    ).order_by('start_date', 'id'))
+    exam_ids = [e['id'] for e in exams]
+    weights = {e['exam_type_id']: e['exam_type__weight'] for e in exams}
+
+    # Paper totals per (subject, exam type): the same for every student.
+    subjects = {}
+    papers = {}
+    for row in ExamSubject.objects.filter(
+        exam_id__in=exam_ids, is_active=True,
+    ).values('subject_id', 'subject__name', 'exam__exam_type_id').annotate(
+        possible=Sum('total_marks'), papers=Count('id'),
+    ).order_by('subject__name'):
+        subjects.setdefault(row['subject_id'], row['subject__name'])
+        papers.setdefault(row['subject_id'], []).append(
+            (row['exam__exam_type_id'], row['possible'], row['papers'])
+        )
+
+    enrollments = list(class_enrollments(school_id, academic_year_id, [class_obj.id]))
+
+    # Obtained marks and passed papers per (student, subject, exam type).
+    scored = {}
+    for row in StudentMark.objects.filter(
+        school_id=school_id,
+        exam_subject__exam_id__in=exam_ids,
+        exam_subject__is_active=True,
+        student_id__in=[e.student_id for e in enrollments],
+    ).values(
+        'student_id', 'exam_subject__subject_id', 'exam_subject__exam__exam_type_id',
+    ).annotate(
+        obtained=Sum('marks_obtained', filter=Q(is_absent=False)),
+        passed=Count('id', filter=Q(
+            is_absent=False, marks_obtained__gte=F('exam_subject__passing_marks'),
+        )),
+    ).order_by():
+        key = (row['student_id'], row['exam_subject__subject_id'], row['exam_subject__exam__exam_type_id'])
+        scored[key] = (row['obtained'] or Decimal('0'), row['passed'])
+
+    grade_scales = list(GradeScale.objects.filter(
+        school_id=school_id, is_active=True,
+    ).order_by('-min_percentage'))
+
+    standings = []
+    for enrollment in enrollments:
+        student_id = enrollment.student_id
+        type_totals = {}
+        subject_rows = []
+        all_pass = bool(subjects)
+
+        for subject_id, subject_name in subjects.items():
+            parts = []
+            obtained_sum = possible_sum = Decimal('0')
+            passed_sum = paper_sum = 0
+            for exam_type_id, possible, paper_count in papers[subject_id]:
+                obtained, passed = scored.get((student_id, subject_id, exam_type_id), (Decimal('0'), 0))
+                parts.append((weights[exam_type_id], obtained, possible))
+                obtained_sum += obtained
+                possible_sum += possible
+                passed_sum += passed
+                paper_sum += paper_count
+                totals = type_totals.setdefault(exam_type_id, [Decimal('0'), Decimal('0')])
+                totals[0] += obtained
+                totals[1] += possible
+
+            percentage = _weighted_percentage(parts)
+            subject_pass = passed_sum == paper_sum
+            all_pass = all_pass and subject_pass
+            subject_rows.append({
+                'subject_id': subject_id,
+                'subject_name': subject_name,
+                'marks_obtained': float(obtained_sum),
+                'total_marks': float(possible_sum),
+                'percentage': float(percentage),
+                'grade': _grade_for(float(percentage), grade_scales),
+                'is_pass': subject_pass,
+            })
+
+        percentage = _weighted_percentage(
+            (weights[exam_type_id], obtained, possible)
+            for exam_type_id, (obtained, possible) in type_totals.items()
+        )
+        standings.append(SimpleNamespace(
+            percentage=percentage,
+            row={
+                'student_id': student_id,
+                'student_name': enrollment.student.name,
+                'roll_number': enrollment.roll_number or enrollment.student.roll_number,
+                'enrollment_id': enrollment.id,
+                'marks_obtained': float(sum((t[0] for t in type_totals.values()), Decimal('0'))),
+                'total_marks': float(sum((t[1] for t in type_totals.values()), Decimal('0'))),
+                'percentage': float(percentage),
+                'grade': _grade_for(float(percentage), grade_scales),
+                'is_pass': all_pass,
+                'subjects': subject_rows,
+            },
+        ))
+
+    assign_ranks(standings, 'rank', 'dense_rank')
+    standings.sort(key=lambda s: (s.rank, s.row['student_name']))
+    results = [{**s.row, 'rank': s.rank, 'dense_rank': s.dense_rank} for s in standings]
+
+    return {
+        'class_id': class_obj.id,
+        'academic_year_id': academic_year_id,
+        'term_id': term_id,
+        'exams': [
+            {
+                'exam_id': e['id'],
+                'exam_name': e['name'],
+                'exam_type': e['exam_type__name'],
+                'weight': float(e['exam_type__weight']),
+            }
+            for e in exams
+        ],
+        'subjects': [{'subject_id': s_id, 'subject_name': name} for s_id, name in subjects.items()],
+        'results': results,
+        'passed': sum(1 for r in results if r['is_pass']),
+        'total_students': len(results),
+    }
+
+
+def get_consolidated_results(school_id, class_obj, academic_year_id, term_id=None):
+    """Cached compute_consolidated_results(); term_id None means the whole year."""
+    key = _cache_key(school_id, class_obj.id, academic_year_id, term_id)
+    data = cache.get(key)
+    if data is None:
+        data = compute_consolidated_results(school_id, class_obj, academic_year_id, term_id)
+        cache.set(key, data, CONSOLIDATION_CACHE_SECONDS)
+    return data
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-18 21:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('examinations', '0014_question_typed_payload_and_indexes'),
+        ('schools', '0015_add_module_entitlements'),
+        ('students', '0012_alter_class_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_obtained', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('total_possible', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('is_pass', models.BooleanField(default=False)),
+                ('section_rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('section_dense_rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('class_rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('class_dense_rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='examinations.exam')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_results', to='schools.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_results', to='students.student')),
+            ],
+            options={
+                'ordering': ['section_rank'],
+                'indexes': [models.Index(fields=['school', 'student'], name='examination_school__15769a_idx')],
+                'unique_together': {('exam', 'student')},
+            },
+        ),
+    ]
@@ -268,6 +268,53 @@ class StudentMark(models.Model):
         return self.marks_obtained >= self.exam_subject.passing_marks
 
 
+class ExamResult(models.Model):
+    """
+    Materialized per-student totals and ranks for an exam.
+
+    Maintained by examinations.results whenever marks or exam subjects
+    change. Section ranks are within the exam's class/section; class ranks
+    span the sibling exams (same year, term and exam type) of every section
+    at the same grade level. *_rank is competition ranking (1, 2, 2, 4) and
+    *_dense_rank is dense ranking (1, 2, 2, 3).
+    """
+
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='exam_results',
+    )
+    exam = models.ForeignKey(
+        Exam,
+        on_delete=models.CASCADE,
+        related_name='results',
+    )
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='exam_results',
+    )
+    total_obtained = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    total_possible = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    percentage = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    is_pass = models.BooleanField(default=False)
+    section_rank = models.PositiveIntegerField(null=True, blank=True)
+    section_dense_rank = models.PositiveIntegerField(null=True, blank=True)
+    class_rank = models.PositiveIntegerField(null=True, blank=True)
+    class_dense_rank = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('exam', 'student')
+        ordering = ['section_rank']
+        indexes = [
+            models.Index(fields=['school', 'student']),
+        ]
+
+    def __str__(self):
+        return f"{self.exam_id}/{self.student_id}: {self.percentage}% (#{self.section_rank})"
+
+
 class GradeScale(models.Model):
     """School-specific grade scale for letter grade calculation."""
 
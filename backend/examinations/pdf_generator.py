@@ -8,6 +8,8 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+from core.school_assets import get_school_logo
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,9 +108,10 @@ class ExamPaperPDFGenerator:
             )
             
             # Header with school logo (if available)
-            if self.school.logo_url:
+            logo_bytes = get_school_logo(self.school)
+            if logo_bytes:
                 try:
-                    logo = Image(self.school.logo_url, width=1*inch, height=1*inch)
+                    logo = Image(io.BytesIO(logo_bytes), width=1*inch, height=1*inch)
                     logo.hAlign = 'CENTER'
                     elements.append(logo)
                     elements.append(Spacer(1, 8))
@@ -0,0 +1,396 @@
+"""
+Report card computation shared by the single-student and batch endpoints.
+
+ReportCardBuilder loads everything that is common to a class/section for a
+session — school settings, grade scales, published exams, exam subjects and
+materialized exam results — once, and then builds any number of student
+cards from one marks query. ReportCardView uses it for a single enrollment;
+ReportCardBatchView and generate_report_cards_task use it for a whole class
+or section.
+"""
+
+import io
+import logging
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+
+def _grade_for(percentage, grade_scales):
+    for gs in grade_scales:
+        if float(gs.min_percentage) <= percentage <= float(gs.max_percentage):
+            return gs.grade_label
+    return '-'
+
+
+class ReportCardBuilder:
+    """Builds report cards for students enrolled in one class for one session."""
+
+    def __init__(self, school_id, class_obj, academic_year_id, term_id=None):
+        from schools.models import School
+        from .models import Exam, ExamResult, ExamSubject, GradeScale
+        from .results import refresh_exam_results
+
+        self.school_id = school_id
+        self.class_obj = class_obj
+        self.academic_year_id = academic_year_id
+
+        exam_filter = {
+            'school_id': school_id,
+            'class_obj': class_obj,
+            'is_active': True,
+            'status': Exam.Status.PUBLISHED,
+            'academic_year_id': academic_year_id,
+        }
+        if term_id:
+            exam_filter['term_id'] = term_id
+        self.exams = list(Exam.objects.filter(**exam_filter).select_related(
+            'exam_type', 'academic_year', 'term', 'class_obj',
+        ).order_by('start_date'))
+
+        # Exams that were never materialized are computed once here.
+        materialized = set(ExamResult.objects.filter(
+            exam__in=self.exams,
+        ).values_list('exam_id', flat=True).distinct())
+        for exam in self.exams:
+            if exam.id not in materialized:
+                refresh_exam_results(exam)
+
+        self.grade_scales = list(GradeScale.objects.filter(
+            school_id=school_id, is_active=True,
+        ).order_by('-min_percentage'))
+
+        self.exam_subjects = list(ExamSubject.objects.filter(
+            exam__in=self.exams, is_active=True,
+        ).select_related('subject'))
+        self.es_by_exam = {}
+        for es in self.exam_subjects:
+            self.es_by_exam.setdefault(es.exam_id, []).append(es)
+
+        self.school = School.objects.get(pk=school_id)
+        self.use_weighted = (
+            (self.school.exam_config or {}).get('weighted_average_enabled', False)
+            and len(self.exams) > 1
+        )
+
+    def build_many(self, enrollments):
+        """Return report cards for the enrollments, in the given order."""
+        from .models import ExamResult, StudentMark
+
+        enrollments = list(enrollments)
+        student_ids = [e.student_id for e in enrollments]
+
+        marks_by_student = {}
+        for mark in StudentMark.objects.filter(
+            exam_subject__in=self.exam_subjects,
+            student_id__in=student_ids,
+            school_id=self.school_id,
+        ):
+            marks_by_student.setdefault(mark.student_id, {})[mark.exam_subject_id] = mark
+
+        positions_by_student = {}
+        for result in ExamResult.objects.filter(exam__in=self.exams, student_id__in=student_ids):
+            positions_by_student.setdefault(result.student_id, {})[result.exam_id] = result
+
+        return [
+            self.build(
+                enrollment,
+                marks_by_student.get(enrollment.student_id, {}),
+                positions_by_student.get(enrollment.student_id, {}),
+            )
+            for enrollment in enrollments
+        ]
+
+    def build(self, enrollment, marks_lookup, positions):
+        """Build one card; marks_lookup maps exam_subject_id -> StudentMark."""
+        student = enrollment.student
+        exams = self.exams
+        grade_scales = self.grade_scales
+        es_by_exam = self.es_by_exam
+
+        all_subjects = {}
+        exam_data = []
+
+        for exam in exams:
+            exam_marks = {}
+
+            for es in es_by_exam.get(exam.id, []):
+                if es.subject_id not in all_subjects:
+                    all_subjects[es.subject_id] = es.subject.name
+
+                mark = marks_lookup.get(es.id)
+                exam_marks[es.subject_id] = {
+                    'total_marks': float(es.total_marks),
+                    'marks_obtained': float(mark.marks_obtained) if mark and mark.marks_obtained else None,
+                    'is_absent': mark.is_absent if mark else False,
+                    'ai_comment': mark.ai_comment if mark else '',
+                }
+
+            position = positions.get(exam.id)
+            exam_data.append({
+                'exam_id': exam.id,
+                'exam_name': exam.name,
+                'exam_type': exam.exam_type.name,
+                'term': exam.term.name if exam.term else None,
+                'marks': exam_marks,
+                'percentage': float(position.percentage) if position else None,
+                'rank': position.section_rank if position else None,
+                'class_rank': position.class_rank if position else None,
+            })
+
+        # Calculate overall totals
+        grand_total_obtained = Decimal('0')
+        grand_total_possible = Decimal('0')
+
+        if self.use_weighted:
+            # Weighted: group by exam_type, compute per-type percentage, apply weights
+            exam_type_data = {}
+            for exam in exams:
+                et_id = exam.exam_type_id
+                if et_id not in exam_type_data:
+                    exam_type_data[et_id] = {
+                        'weight': exam.exam_type.weight,
+                        'obtained': Decimal('0'),
+                        'possible': Decimal('0'),
+                    }
+                for es_item in es_by_exam.get(exam.id, []):
+                    mark = marks_lookup.get(es_item.id)
+                    if mark and mark.marks_obtained is not None and not mark.is_absent:
+                        exam_type_data[et_id]['obtained'] += mark.marks_obtained
+                    exam_type_data[et_id]['possible'] += es_item.total_marks
+
+            total_weight = sum(d['weight'] for d in exam_type_data.values() if d['possible'] > 0)
+            if total_weight > 0:
+                weighted_sum = Decimal('0')
+                for data in exam_type_data.values():
+                    if data['possible'] > 0:
+                        type_pct = data['obtained'] / data['possible'] * 100
+                        weighted_sum += type_pct * (data['weight'] / total_weight)
+                overall_pct = float(weighted_sum)
+            else:
+                overall_pct = 0
+
+            grand_total_obtained = sum((d['obtained'] for d in exam_type_data.values()), Decimal('0'))
+            grand_total_possible = sum((d['possible'] for d in exam_type_data.values()), Decimal('0'))
+        else:
+            # Simple average
+            for es_item in self.exam_subjects:
+                mark = marks_lookup.get(es_item.id)
+                if mark and mark.marks_obtained is not None and not mark.is_absent:
+                    grand_total_obtained += mark.marks_obtained
+                grand_total_possible += es_item.total_marks
+            overall_pct = float(grand_total_obtained / grand_total_possible * 100) if grand_total_possible > 0 else 0
+
+        overall_grade = _grade_for(overall_pct, grade_scales)
+
+        # Build flattened subject-level summary for the frontend
+        subject_summaries = []
+        for subj_id, subj_name in all_subjects.items():
+            subj_total = Decimal('0')
+            subj_obtained = Decimal('0')
+            subj_absent = False
+            subj_pass = True
+
+            for exam in exams:
+                for es_item in es_by_exam.get(exam.id, []):
+                    if es_item.subject_id == subj_id:
+                        mark = marks_lookup.get(es_item.id)
+                        subj_total += es_item.total_marks
+                        if mark and mark.marks_obtained is not None and not mark.is_absent:
+                            subj_obtained += mark.marks_obtained
+                            if mark.marks_obtained < es_item.passing_marks:
+                                subj_pass = False
+                        else:
+                            subj_pass = False
+                            if mark and mark.is_absent:
+                                subj_absent = True
+
+            subj_pct = float(subj_obtained / subj_total * 100) if subj_total > 0 else 0
+
+            subject_summaries.append({
+                'subject_name': subj_name,
+                'total_marks': float(subj_total),
+                'marks_obtained': float(subj_obtained),
+                'percentage': round(subj_pct, 2),
+                'grade': _grade_for(subj_pct, grade_scales),
+                'is_pass': subj_pass,
+                'is_absent': subj_absent,
+            })
+
+        roll_number = enrollment.roll_number or student.roll_number
+        return {
+            'student_name': student.name,
+            'roll_number': roll_number,
+            'class_name': enrollment.class_obj.name,
+            'school_name': self.school.name,
+            'academic_year_name': enrollment.academic_year.name,
+            'term_name': exams[0].term.name if exams and exams[0].term else None,
+            'enrollment_info': {
+                'enrollment_id': enrollment.id,
+                'class_at_report_session': enrollment.class_obj.name,
+                'current_class': student.class_obj.name if student.class_obj else None,
+                'academic_year_id': enrollment.academic_year_id,
+                'academic_year_name': enrollment.academic_year.name,
+            },
+            'student': {
+                'id': student.id,
+                'name': student.name,
+                'roll_number': roll_number,
+                'class_name': enrollment.class_obj.name,
+                'school_name': self.school.name,
+            },
+            'subjects': subject_summaries,
+            'exams': exam_data,
+            'summary': {
+                'total_marks': float(grand_total_possible),
+                'obtained_marks': float(grand_total_obtained),
+                'total_obtained': float(grand_total_obtained),
+                'total_possible': float(grand_total_possible),
+                'percentage': round(overall_pct, 2),
+                'grade': overall_grade,
+                'overall_pass': all(s['is_pass'] for s in subject_summaries) if subject_summaries else False,
+                'calculation_mode': 'weighted' if self.use_weighted else 'simple',
+            },
+            'grade_scales': [
+                {
+                    'grade_label': gs.grade_label,
+                    'min_percentage': float(gs.min_percentage),
+                    'max_percentage': float(gs.max_percentage),
+                    'gpa_points': float(gs.gpa_points),
+                }
+                for gs in grade_scales
+            ],
+        }
+
+
+def class_enrollments(school_id, academic_year_id, class_ids):
+    """Active enrollments for the classes, ordered for printing."""
+    from academic_sessions.models import StudentEnrollment
+
+    return StudentEnrollment.objects.filter(
+        school_id=school_id,
+        academic_year_id=academic_year_id,
+        class_obj_id__in=class_ids,
+        is_active=True,
+        student__is_active=True,
+    ).select_related(
+        'student', 'student__class_obj', 'class_obj', 'academic_year',
+    ).order_by('class_obj__grade_level', 'class_obj__section', 'roll_number', 'student__name')
+
+
+def build_class_report_cards(school_id, academic_year_id, class_objs, term_id=None, progress=None):
+    """
+    Build report cards for every active enrollment in the given classes.
+
+    One builder (shared exam/subject/grade data) per class, one marks query
+    per class. progress, if given, is called with the number of cards done.
+    """
+    enrollments = list(class_enrollments(school_id, academic_year_id, [c.id for c in class_objs]))
+    by_class = {}
+    for enrollment in enrollments:
+        by_class.setdefault(enrollment.class_obj_id, []).append(enrollment)
+
+    cards = []
+    for class_obj in class_objs:
+        class_enrollment_list = by_class.get(class_obj.id)
+        if not class_enrollment_list:
+            continue
+        builder = ReportCardBuilder(school_id, class_obj, academic_year_id, term_id)
+        cards.extend(builder.build_many(class_enrollment_list))
+        if progress:
+            progress(len(cards))
+    return cards
+
+
+def render_report_cards_pdf(school, cards):
+    """Render report cards into one PDF, one student per page."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle,
+    )
+
+    from core.school_assets import get_school_logo
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CardTitle', parent=styles['Heading1'], fontSize=16, spaceAfter=4, alignment=1)
+    subtitle_style = ParagraphStyle('CardSubtitle', parent=styles['Normal'], fontSize=10, alignment=1)
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563EB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F3F4F6')]),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ])
+    # Fetched once for the whole batch.
+    logo_bytes = get_school_logo(school)
+    generated_on = datetime.now().strftime('%d %B %Y')
+
+    elements = []
+    for index, card in enumerate(cards):
+        if index:
+            elements.append(PageBreak())
+        if logo_bytes:
+            logo = Image(io.BytesIO(logo_bytes), width=0.8*inch, height=0.8*inch)
+            logo.hAlign = 'CENTER'
+            elements.append(logo)
+        elements.append(Paragraph(escape(card['school_name']), title_style))
+        subtitle = f"Report Card - {card['academic_year_name']}"
+        if card['term_name']:
+            subtitle += f" ({card['term_name']})"
+        elements.append(Paragraph(escape(subtitle), subtitle_style))
+        elements.append(Spacer(1, 12))
+        elements.append(Paragraph(
+            f"<b>Name:</b> {escape(card['student_name'])} &nbsp;&nbsp; "
+            f"<b>Class:</b> {escape(card['class_name'])} &nbsp;&nbsp; "
+            f"<b>Roll #:</b> {escape(str(card['roll_number']))}",
+            styles['Normal'],
+        ))
+        elements.append(Spacer(1, 10))
+
+        rows = [['Subject', 'Total', 'Obtained', '%', 'Grade', 'Result']]
+        for subject in card['subjects']:
+            rows.append([
+                subject['subject_name'],
+                f"{subject['total_marks']:.0f}",
+                'Absent' if subject['is_absent'] else f"{subject['marks_obtained']:.0f}",
+                f"{subject['percentage']}",
+                subject['grade'],
+                'Pass' if subject['is_pass'] else 'Fail',
+            ])
+        summary = card['summary']
+        rows.append([
+            'Overall',
+            f"{summary['total_possible']:.0f}",
+            f"{summary['total_obtained']:.0f}",
+            f"{summary['percentage']}",
+            summary['grade'],
+            'Pass' if summary['overall_pass'] else 'Fail',
+        ])
+        table = Table(rows, repeatRows=1)
+        table.setStyle(table_style)
+        elements.append(table)
+
+        positions = [
+            f"{escape(exam['exam_name'])}: position {exam['rank']}"
+            for exam in card['exams'] if exam.get('rank')
+        ]
+        if positions:
+            elements.append(Spacer(1, 10))
+            elements.append(Paragraph('<br/>'.join(positions), styles['Normal']))
+
+        elements.append(Spacer(1, 20))
+        elements.append(Paragraph(f"Generated on {generated_on}", styles['Normal']))
+
+    if not elements:
+        elements.append(Paragraph('No report cards to print.', styles['Normal']))
+    doc.build(elements)
+    return buffer.getvalue()
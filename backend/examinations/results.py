@@ -0,0 +1,205 @@
+"""
+Materialized exam results (ExamResult) and ranking.
+
+Totals, percentage and pass status are stored per (exam, student) and kept
+current by refresh_exam_results(), which the mark/exam-subject signals and
+bulk mark entry call for just the students whose marks changed. Ranks are
+then recomputed from the stored percentages for the exam's whole grade
+group, so a mark edit costs a handful of queries instead of recomputing
+every student's totals on every results request.
+
+The result population matches ExamViewSet.results: active students whose
+current class is the exam's class. Read paths call ensure_exam_results() to
+materialize exams that have never been computed and to pick up students
+who joined or left the class since the last refresh.
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+RESULT_UPDATE_FIELDS = ['total_obtained', 'total_possible', 'percentage', 'is_pass', 'updated_at']
+RANK_FIELDS = ['section_rank', 'section_dense_rank', 'class_rank', 'class_dense_rank']
+
+
+def _population_ids(exam):
+    from students.models import Student
+
+    return set(Student.objects.filter(
+        school_id=exam.school_id,
+        class_obj_id=exam.class_obj_id,
+        is_active=True,
+    ).values_list('id', flat=True))
+
+
+def _peer_exam_ids(exam):
+    """Exams of every section at the exam's grade level for the same sitting."""
+    from .models import Exam
+
+    return list(Exam.objects.filter(
+        school_id=exam.school_id,
+        academic_year_id=exam.academic_year_id,
+        term_id=exam.term_id,
+        exam_type_id=exam.exam_type_id,
+        class_obj__grade_level=exam.class_obj.grade_level,
+        is_active=True,
+    ).values_list('id', flat=True))
+
+
+def compute_student_totals(exam, student_ids):
+    """
+    Return {student_id: (total_obtained, total_possible, percentage, is_pass)}.
+
+    Absent or unentered subjects count towards total_possible and fail the
+    student, as in the original results endpoint.
+    """
+    from .models import ExamSubject, StudentMark
+
+    exam_subjects = list(ExamSubject.objects.filter(
+        exam_id=exam.id, is_active=True,
+    ).values_list('id', 'total_marks', 'passing_marks'))
+    total_possible = sum((total for _, total, _ in exam_subjects), Decimal('0'))
+
+    marks = {
+        (student_id, es_id): (obtained, is_absent)
+        for student_id, es_id, obtained, is_absent in StudentMark.objects.filter(
+            school_id=exam.school_id,
+            exam_subject_id__in=[es_id for es_id, _, _ in exam_subjects],
+            student_id__in=student_ids,
+        ).values_list('student_id', 'exam_subject_id', 'marks_obtained', 'is_absent')
+    }
+
+    totals = {}
+    for student_id in student_ids:
+        total_obtained = Decimal('0')
+        all_pass = True
+        for es_id, _, passing_marks in exam_subjects:
+            obtained, is_absent = marks.get((student_id, es_id), (None, False))
+            if obtained is None or is_absent:
+                all_pass = False
+                continue
+            total_obtained += obtained
+            if obtained < passing_marks:
+                all_pass = False
+        percentage = (
+            (total_obtained / total_possible * 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            if total_possible > 0 else Decimal('0')
+        )
+        totals[student_id] = (total_obtained, total_possible, percentage, all_pass)
+    return totals
+
+
+def assign_ranks(rows, rank_attr, dense_attr):
+    """Set competition (1, 2, 2, 4) and dense (1, 2, 2, 3) ranks by percentage."""
+    previous = None
+    rank = dense = 0
+    for position, row in enumerate(sorted(rows, key=lambda r: r.percentage, reverse=True), start=1):
+        if row.percentage != previous:
+            rank = position
+            dense += 1
+            previous = row.percentage
+        setattr(row, rank_attr, rank)
+        setattr(row, dense_attr, dense)
+
+
+def _upsert_totals(exam, student_ids):
+    from .models import ExamResult
+
+    totals = compute_student_totals(exam, student_ids)
+    ExamResult.objects.bulk_create(
+        [
+            ExamResult(
+                school_id=exam.school_id,
+                exam_id=exam.id,
+                student_id=student_id,
+                total_obtained=obtained,
+                total_possible=possible,
+                percentage=percentage,
+                is_pass=is_pass,
+            )
+            for student_id, (obtained, possible, percentage, is_pass) in totals.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['exam', 'student'],
+        update_fields=RESULT_UPDATE_FIELDS,
+    )
+
+
+def rerank_exam_group(exam):
+    """Recompute section and class ranks for every exam in the grade group."""
+    from .models import Exam, ExamResult
+
+    peer_ids = _peer_exam_ids(exam)
+    materialized = set(ExamResult.objects.filter(
+        exam_id__in=peer_ids,
+    ).values_list('exam_id', flat=True).distinct())
+    for peer in Exam.objects.filter(id__in=set(peer_ids) - materialized - {exam.id}):
+        population = _population_ids(peer)
+        if population:
+            _upsert_totals(peer, population)
+
+    rows = list(ExamResult.objects.filter(exam_id__in=peer_ids).only(
+        'id', 'exam_id', 'percentage', *RANK_FIELDS,
+    ))
+    before = {row.id: tuple(getattr(row, f) for f in RANK_FIELDS) for row in rows}
+
+    by_exam = {}
+    for row in rows:
+        by_exam.setdefault(row.exam_id, []).append(row)
+    for exam_rows in by_exam.values():
+        assign_ranks(exam_rows, 'section_rank', 'section_dense_rank')
+    assign_ranks(rows, 'class_rank', 'class_dense_rank')
+
+    changed = [row for row in rows if tuple(getattr(row, f) for f in RANK_FIELDS) != before[row.id]]
+    if changed:
+        ExamResult.objects.bulk_update(changed, RANK_FIELDS, batch_size=500)
+
+
+def refresh_exam_results(exam, student_ids=None):
+    """
+    Recompute stored totals for the given students (all when None), then re-rank.
+
+    Students who are no longer part of the exam's population lose their row.
+    Cached consolidated (term/annual) results for the class are dropped.
+    """
+    from .consolidation import invalidate_consolidated_results
+    from .models import ExamResult
+
+    population = _population_ids(exam)
+    with transaction.atomic():
+        if student_ids is None:
+            targets = population
+            ExamResult.objects.filter(exam_id=exam.id).exclude(student_id__in=population).delete()
+        else:
+            student_ids = set(student_ids)
+            targets = student_ids & population
+            stale = student_ids - population
+            if stale:
+                ExamResult.objects.filter(exam_id=exam.id, student_id__in=stale).delete()
+        if targets:
+            _upsert_totals(exam, targets)
+        rerank_exam_group(exam)
+    invalidate_consolidated_results(class_id=exam.class_obj_id)
+
+
+def ensure_exam_results(exam, population_ids=None):
+    """
+    Return {student_id: ExamResult} for the exam, refreshing if the stored
+    rows do not cover exactly the current population.
+    """
+    from .models import ExamResult
+
+    if population_ids is None:
+        population_ids = _population_ids(exam)
+    else:
+        population_ids = set(population_ids)
+
+    results = {r.student_id: r for r in ExamResult.objects.filter(exam_id=exam.id)}
+    if set(results) != population_ids:
+        refresh_exam_results(exam)
+        results = {r.student_id: r for r in ExamResult.objects.filter(exam_id=exam.id)}
+    return results
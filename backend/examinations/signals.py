@@ -0,0 +1,77 @@
+"""
+Django signals for examinations app.
+Keeps materialized ExamResult rows in step with marks and exam subjects,
+and drops cached consolidated results when exams or exam-type weights change.
+"""
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Saves limited to these fields do not affect totals or ranks.
+NON_RESULT_MARK_FIELDS = {'ai_comment', 'ai_comment_generated_at', 'remarks', 'updated_at'}
+
+
+def _origin_model(origin):
+    return getattr(origin, 'model', type(origin))
+
+
+def _exam_for_subject(exam_subject_id):
+    from .models import Exam
+
+    return Exam.objects.select_related('class_obj').filter(exam_subjects__id=exam_subject_id).first()
+
+
+@receiver(post_save, sender='examinations.StudentMark')
+def refresh_results_on_mark_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= NON_RESULT_MARK_FIELDS:
+        return
+    exam = _exam_for_subject(instance.exam_subject_id)
+    if exam:
+        from .results import refresh_exam_results
+        refresh_exam_results(exam, [instance.student_id])
+
+
+@receiver(post_delete, sender='examinations.StudentMark')
+def refresh_results_on_mark_delete(sender, instance, origin=None, **kwargs):
+    # Cascades from deleting an exam, subject or student clean up results themselves.
+    if _origin_model(origin) is not sender:
+        return
+    exam = _exam_for_subject(instance.exam_subject_id)
+    if exam:
+        from .results import refresh_exam_results
+        refresh_exam_results(exam, [instance.student_id])
+
+
+@receiver(post_save, sender='examinations.ExamSubject')
+def refresh_results_on_subject_save(sender, instance, **kwargs):
+    """Total/passing marks or is_active changes affect every student."""
+    from .models import Exam
+    from .results import refresh_exam_results
+
+    exam = Exam.objects.select_related('class_obj').filter(id=instance.exam_id).first()
+    if exam:
+        refresh_exam_results(exam)
+
+
+@receiver(post_delete, sender='examinations.ExamSubject')
+def refresh_results_on_subject_delete(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is not sender:
+        return
+    refresh_results_on_subject_save(sender, instance)
+
+
+@receiver(post_save, sender='examinations.Exam')
+@receiver(post_delete, sender='examinations.Exam')
+def invalidate_consolidation_on_exam_change(sender, instance, **kwargs):
+    """Publishing, moving or deleting an exam changes which exams consolidate."""
+    from .consolidation import invalidate_consolidated_results
+    invalidate_consolidated_results(class_id=instance.class_obj_id)
+
+
+@receiver(post_save, sender='examinations.ExamType')
+def invalidate_consolidation_on_weight_change(sender, instance, **kwargs):
+    from .consolidation import invalidate_consolidated_results
+    invalidate_consolidated_results(school_id=instance.school_id)
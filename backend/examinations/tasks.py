@@ -110,3 +110,91 @@ def process_paper_upload_ocr(self, upload_id: int):
             'upload_id': upload_id,
             'error': str(e)
         }
+
+
+@shared_task(bind=True, time_limit=900)
+def generate_report_cards_task(self, school_id, user_id, academic_year_id, class_ids, term_id=None):
+    """Build report cards for whole classes/sections and store one combined PDF."""
+    from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
+    from django.contrib.auth import get_user_model
+    from reports.models import GeneratedReport
+    from reports.storage import store_report_artifact
+    from schools.models import School
+    from students.models import Class
+    from .report_cards import build_class_report_cards, render_report_cards_pdf
+
+    task_id = self.request.id
+
+    try:
+        school = School.objects.get(id=school_id)
+        class_objs = list(Class.objects.filter(school_id=school_id, id__in=class_ids).order_by(
+            'grade_level', 'section', 'name',
+        ))
+
+        cards = build_class_report_cards(
+            school_id, academic_year_id, class_objs, term_id=term_id,
+            progress=lambda done: update_task_progress(task_id, current=done),
+        )
+        content = render_report_cards_pdf(school, cards)
+
+        class_label = ', '.join(c.name + (f'-{c.section}' if c.section else '') for c in class_objs)
+        report = GeneratedReport(
+            school=school,
+            report_type='REPORT_CARDS',
+            title=f"Report Cards - {class_label}"[:200],
+            parameters={
+                'academic_year_id': academic_year_id,
+                'class_ids': list(class_ids),
+                'term_id': term_id,
+            },
+            format='PDF',
+            generated_by=get_user_model().objects.filter(id=user_id).first(),
+        )
+        store_report_artifact(report, content)
+
+        result_data = {
+            'report_id': report.id,
+            'cards': len(cards),
+            'download_url': f'/api/reports/{report.id}/download/',
+            'message': f'{len(cards)} report cards generated.',
+        }
+        mark_task_success(task_id, result_data=result_data)
+        return result_data
+
+    except Exception as e:
+        logger.exception(f"Report card batch failed: {e}")
+        mark_task_failed(task_id, str(e))
+        raise
+
+
+@shared_task(bind=True, time_limit=1800)
+def generate_exam_comments_task(self, school_id, exam_id, force=False):
+    """Generate report card comments for every entered mark in an exam."""
+    from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
+    from schools.models import School
+    from .ai_comments_service import ReportCardCommentGenerator
+
+    task_id = self.request.id
+
+    try:
+        school = School.objects.get(id=school_id)
+        generator = ReportCardCommentGenerator(school)
+        result = generator.generate_for_exam(
+            exam_id, force=force,
+            progress=lambda done, total: update_task_progress(task_id, current=done, total=total),
+        )
+        if result.get('error'):
+            mark_task_failed(task_id, result['error'])
+            return result
+
+        result['message'] = (
+            f"Generated {result['generated']} comments "
+            f"({result['skipped']} skipped, {result['errors']} errors)."
+        )
+        mark_task_success(task_id, result_data=result)
+        return result
+
+    except Exception as e:
+        logger.exception(f"Comment generation failed for exam {exam_id}: {e}")
+        mark_task_failed(task_id, str(e))
+        raise
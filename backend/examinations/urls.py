@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ExamTypeViewSet, ExamGroupViewSet, ExamViewSet, ExamSubjectViewSet,
-    StudentMarkViewSet, GradeScaleViewSet, ReportCardView,
+    StudentMarkViewSet, GradeScaleViewSet, ReportCardView, ReportCardBatchView,
+    ConsolidatedResultView,
     QuestionViewSet, ExamPaperViewSet, PaperUploadViewSet, PaperFeedbackViewSet,
 )
 
@@ -23,4 +24,6 @@ router.register(r'paper-feedback', PaperFeedbackViewSet, basename='paper-feedbac
 urlpatterns = [
     path('', include(router.urls)),
     path('report-card/', ReportCardView.as_view(), name='report-card'),
+    path('report-card/batch/', ReportCardBatchView.as_view(), name='report-card-batch'),
+    path('results/consolidated/', ConsolidatedResultView.as_view(), name='consolidated-results'),
 ]
@@ -2,7 +2,7 @@ import io
 from decimal import Decimal
 from django.db.models import Count, Q
 from django.http import HttpResponse
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
@@ -598,6 +598,7 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         Uses AI to generate 2-3 sentence comments based on each student's marks,
         grade, and attendance record. Comments can be edited by teachers after generation.
         Skips marks that already have AI comments (use force=true to regenerate all).
+        Runs as a background task; poll the returned task_id for the result.
         """
         exam = self.get_object()
         school_id = _resolve_school_id(request)
@@ -606,21 +607,26 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         if not school_id:
             return Response({'detail': 'No school selected.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # If force=true, clear existing AI comments first
-        if force:
-            StudentMark.objects.filter(
-                exam_subject__exam=exam,
-                school_id=school_id,
-            ).update(ai_comment='', ai_comment_generated_at=None)
-
-        from schools.models import School
-        school = School.objects.get(id=school_id)
+        from core.models import BackgroundTask
+        from core.task_utils import dispatch_background_task
+        from .tasks import generate_exam_comments_task
 
-        from .ai_comments_service import ReportCardCommentGenerator
-        generator = ReportCardCommentGenerator(school)
-        result = generator.generate_for_exam(exam.id)
-
-        return Response(result)
+        bg_task = dispatch_background_task(
+            celery_task_func=generate_exam_comments_task,
+            task_type=BackgroundTask.TaskType.REPORT_COMMENTS,
+            title=f"Generating report card comments for {exam.name}",
+            school_id=school_id,
+            user=request.user,
+            task_kwargs={
+                'school_id': school_id,
+                'exam_id': exam.id,
+                'force': bool(force),
+            },
+        )
+        return Response({
+            'task_id': bg_task.celery_task_id,
+            'message': 'Comment generation started.',
+        }, status=202)
 
     @action(detail=True, methods=['post'], url_path='populate-subjects')
     def populate_subjects(self, request, pk=None):
@@ -648,6 +654,9 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         created = []
         if new_exam_subjects:
             created = ExamSubject.objects.bulk_create(new_exam_subjects, ignore_conflicts=True)
+            # bulk_create skips signals; new subjects change every student's total.
+            from .results import refresh_exam_results
+            refresh_exam_results(exam)
 
         return Response({
             'added_count': len(created),
@@ -661,16 +670,20 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         exam_subjects = exam.exam_subjects.filter(is_active=True).select_related('subject')
 
         from students.models import Student
-        students = Student.objects.filter(
+        from .results import ensure_exam_results
+        students = list(Student.objects.filter(
             school_id=school_id,
             class_obj=exam.class_obj,
             is_active=True,
-        ).order_by('roll_number')
+        ).order_by('roll_number'))
 
         grade_scales = list(GradeScale.objects.filter(
             school_id=school_id, is_active=True,
         ).order_by('-min_percentage'))
 
+        # Totals and ranks come from the materialized ExamResult rows.
+        stored = ensure_exam_results(exam, [s.id for s in students])
+
         # Prefetch all marks in one query and build lookup dict
         all_marks = StudentMark.objects.filter(
             exam_subject__in=exam_subjects, school_id=school_id,
@@ -682,10 +695,6 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         results = []
         for student in students:
             marks_list = []
-            total_obtained = Decimal('0')
-            total_possible = Decimal('0')
-            all_pass = True
-
             for es in exam_subjects:
                 mark = marks_lookup.get((student.id, es.id))
                 obtained = mark.marks_obtained if mark and not mark.is_absent else None
@@ -702,34 +711,26 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
                     'ai_comment': mark.ai_comment if mark else '',
                 })
 
-                if obtained is not None:
-                    total_obtained += obtained
-                    total_possible += es.total_marks
-                    if obtained < es.passing_marks:
-                        all_pass = False
-                else:
-                    total_possible += es.total_marks
-                    all_pass = False
-
-            percentage = float(total_obtained / total_possible * 100) if total_possible > 0 else 0
-            grade_label = self._get_grade(percentage, grade_scales)
-
+            result = stored[student.id]
+            percentage = float(result.percentage)
             results.append({
                 'student_id': student.id,
                 'student_name': student.name,
                 'roll_number': student.roll_number,
                 'marks': marks_list,
-                'total_obtained': float(total_obtained),
-                'total_possible': float(total_possible),
-                'percentage': round(percentage, 2),
-                'grade': grade_label,
-                'is_pass': all_pass,
+                'total_obtained': float(result.total_obtained),
+                'total_possible': float(result.total_possible),
+                'percentage': percentage,
+                'grade': self._get_grade(percentage, grade_scales),
+                'is_pass': result.is_pass,
+                'rank': result.section_rank,
+                'dense_rank': result.section_dense_rank,
+                'class_rank': result.class_rank,
+                'class_dense_rank': result.class_dense_rank,
             })
 
-        # Calculate ranks
-        results.sort(key=lambda x: x['percentage'], reverse=True)
-        for i, r in enumerate(results):
-            r['rank'] = i + 1
+        # Competition ranking: equal percentages share a rank (1, 2, 2, 4)
+        results.sort(key=lambda x: x['rank'])
 
         return Response({
             'exam': ExamSerializer(exam).data,
@@ -744,43 +745,61 @@ class ExamViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet)
         school_id = _resolve_school_id(request)
         exam_subjects = exam.exam_subjects.filter(is_active=True).select_related('subject')
 
+        from django.db.models import Avg, F, Max, Min
         from students.models import Student
-        students = Student.objects.filter(
+        from .results import ensure_exam_results
+        student_ids = list(Student.objects.filter(
             school_id=school_id,
             class_obj=exam.class_obj,
             is_active=True,
-        )
-
-        # Prefetch all marks for this exam in one query
-        all_marks = StudentMark.objects.filter(
-            exam_subject__in=exam_subjects, school_id=school_id,
-            is_absent=False, marks_obtained__isnull=False,
-        )
-        # Group marks by exam_subject_id
-        marks_by_subject = {}
-        for m in all_marks:
-            marks_by_subject.setdefault(m.exam_subject_id, []).append(m)
+        ).values_list('id', flat=True))
+
+        # Per-subject statistics aggregated in the database
+        stats_by_subject = {
+            row['exam_subject_id']: row
+            for row in StudentMark.objects.filter(
+                exam_subject__in=exam_subjects, school_id=school_id,
+                is_absent=False, marks_obtained__isnull=False,
+            ).values('exam_subject_id').annotate(
+                appeared=Count('id'),
+                average=Avg('marks_obtained'),
+                highest=Max('marks_obtained'),
+                lowest=Min('marks_obtained'),
+                passed=Count('id', filter=Q(marks_obtained__gte=F('exam_subject__passing_marks'))),
+            )
+        }
 
         subject_stats = []
         for es in exam_subjects:
-            subject_marks = marks_by_subject.get(es.id, [])
-            marks_values = [float(m.marks_obtained) for m in subject_marks]
-            passed = sum(1 for m in subject_marks if m.marks_obtained >= es.passing_marks)
+            row = stats_by_subject.get(es.id)
+            appeared = row['appeared'] if row else 0
+            passed = row['passed'] if row else 0
             subject_stats.append({
                 'subject_name': es.subject.name,
                 'total_marks': float(es.total_marks),
-                'students_appeared': len(marks_values),
-                'average': round(sum(marks_values) / len(marks_values), 2) if marks_values else 0,
-                'highest': max(marks_values) if marks_values else 0,
-                'lowest': min(marks_values) if marks_values else 0,
+                'students_appeared': appeared,
+                'average': round(float(row['average']), 2) if row else 0,
+                'highest': float(row['highest']) if row else 0,
+                'lowest': float(row['lowest']) if row else 0,
                 'passed': passed,
-                'failed': len(marks_values) - passed,
+                'failed': appeared - passed,
             })
 
+        stored = list(ensure_exam_results(exam, student_ids).values())
+        percentages = [float(r.percentage) for r in stored]
+        overall_passed = sum(1 for r in stored if r.is_pass)
+
         return Response({
             'exam': ExamSerializer(exam).data,
-            'total_students': students.count(),
+            'total_students': len(student_ids),
             'subject_stats': subject_stats,
+            'overall': {
+                'average_percentage': round(sum(percentages) / len(percentages), 2) if percentages else 0,
+                'highest_percentage': max(percentages) if percentages else 0,
+                'lowest_percentage': min(percentages) if percentages else 0,
+                'passed': overall_passed,
+                'failed': len(stored) - overall_passed,
+            },
         })
 
     def _get_grade(self, percentage, grade_scales):
@@ -911,46 +930,114 @@ class StudentMarkViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        created = 0
-        updated = 0
-        errors = []
-
+        from django.db import transaction
         from academic_sessions.models import StudentEnrollment
+        from students.models import Student
+
+        errors = []
+        marks_model_field = StudentMark._meta.get_field('marks_obtained')
+        marks_field = serializers.DecimalField(
+            max_digits=marks_model_field.max_digits, decimal_places=marks_model_field.decimal_places,
+        )
+        absent_field = serializers.BooleanField()
 
+        # Validate every row before the upsert, so one bad row cannot fail the
+        # batch; later rows for the same student win, as they did when each row
+        # was written in turn.
+        rows = {}
+        occurrences = {}
         for entry in marks_data:
             student_id = entry.get('student_id')
-            marks_obtained = entry.get('marks_obtained')
-            is_absent = entry.get('is_absent', False)
-            remarks = entry.get('remarks', '')
-
-            if marks_obtained is not None:
-                marks_obtained = Decimal(str(marks_obtained))
+            try:
+                student_id = int(student_id)
+            except (TypeError, ValueError):
+                errors.append({'student_id': student_id, 'error': 'Invalid student_id.'})
+                continue
 
-            enrollment = StudentEnrollment.objects.filter(
+            try:
+                is_absent = absent_field.to_internal_value(entry.get('is_absent', False))
+            except serializers.ValidationError as e:
+                errors.append({'student_id': student_id, 'error': f'Invalid is_absent: {e.detail[0]}'})
+                continue
+            marks_obtained = entry.get('marks_obtained')
+            if marks_obtained is not None and not is_absent:
+                try:
+                    marks_obtained = marks_field.to_internal_value(marks_obtained)
+                except serializers.ValidationError as e:
+                    errors.append({'student_id': student_id, 'error': f'Invalid marks_obtained: {e.detail[0]}'})
+                    continue
+                if marks_obtained < 0:
+                    errors.append({'student_id': student_id, 'error': 'Marks cannot be negative.'})
+                    continue
+                if marks_obtained > exam_subject.total_marks:
+                    errors.append({
+                        'student_id': student_id,
+                        'error': f'Marks cannot exceed total marks ({exam_subject.total_marks}).',
+                    })
+                    continue
+
+            occurrences[student_id] = occurrences.get(student_id, 0) + 1
+            rows[student_id] = {
+                'marks_obtained': None if is_absent else marks_obtained,
+                'is_absent': is_absent,
+                'remarks': entry.get('remarks', '') or '',
+            }
+
+        exam = exam_subject.exam
+        known_students = set(Student.objects.filter(
+            school_id=school_id, id__in=rows,
+        ).values_list('id', flat=True))
+        for student_id in [sid for sid in rows if sid not in known_students]:
+            errors.append({'student_id': student_id, 'error': 'Student not found.'})
+            del rows[student_id]
+
+        # Newest active enrollment per student, resolved in one query.
+        enrollment_by_student = {}
+        for enrollment_id, student_id in StudentEnrollment.objects.filter(
+            school_id=school_id,
+            student_id__in=rows,
+            academic_year_id=exam.academic_year_id,
+            class_obj_id=exam.class_obj_id,
+        ).order_by('-is_active', '-created_at').values_list('id', 'student_id'):
+            enrollment_by_student.setdefault(student_id, enrollment_id)
+
+        existing = set(StudentMark.objects.filter(
+            school_id=school_id, exam_subject=exam_subject, student_id__in=rows,
+        ).values_list('student_id', flat=True))
+
+        marks = [
+            StudentMark(
                 school_id=school_id,
+                exam_subject=exam_subject,
                 student_id=student_id,
-                academic_year_id=exam_subject.exam.academic_year_id,
-                class_obj_id=exam_subject.exam.class_obj_id,
-            ).order_by('-is_active', '-created_at').first()
+                enrollment_id=enrollment_by_student.get(student_id),
+                **values,
+            )
+            for student_id, values in rows.items()
+        ]
 
-            try:
-                mark, was_created = StudentMark.objects.update_or_create(
-                    school_id=school_id,
-                    exam_subject=exam_subject,
-                    student_id=student_id,
-                    defaults={
-                        'marks_obtained': None if is_absent else marks_obtained,
-                        'is_absent': is_absent,
-                        'remarks': remarks,
-                        'enrollment': enrollment,
-                    },
+        try:
+            with transaction.atomic():
+                StudentMark.objects.bulk_create(
+                    marks,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['school', 'exam_subject', 'student'],
+                    update_fields=['marks_obtained', 'is_absent', 'remarks', 'enrollment', 'updated_at'],
                 )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-            except Exception as e:
-                errors.append({'student_id': student_id, 'error': str(e)})
+        except Exception as e:
+            errors.extend({'student_id': student_id, 'error': str(e)} for student_id in rows)
+            rows = {}
+
+        if rows:
+            # bulk_create skips signals; refresh stored results once for the batch.
+            from .results import refresh_exam_results
+            from academic_sessions.promotion_advisor_service import invalidate_promotion_advice
+            refresh_exam_results(exam, rows)
+            invalidate_promotion_advice(school_id)
+
+        created = sum(1 for student_id in rows if student_id not in existing)
+        updated = sum(occurrences[student_id] for student_id in rows) - created
 
         return Response({
             'created': created,
@@ -1196,204 +1283,111 @@ class ReportCardView(ModuleAccessMixin, APIView):
                 status=404,
             )
 
-        # Get exams for the class captured in the selected enrollment/session.
-        exam_filter = {
-            'school_id': school_id,
-            'class_obj': enrollment.class_obj,
-            'is_active': True,
-            'status': Exam.Status.PUBLISHED,
-            'academic_year_id': enrollment.academic_year_id,
-        }
-        if term_id:
-            exam_filter['term_id'] = term_id
-
-        exams = Exam.objects.filter(**exam_filter).select_related(
-            'exam_type', 'academic_year', 'term',
-        ).order_by('start_date')
-
-        grade_scales = list(GradeScale.objects.filter(
-            school_id=school_id, is_active=True,
-        ).order_by('-min_percentage'))
-
-        # Prefetch all exam subjects and marks for this student in one query
-        all_exam_subjects = ExamSubject.objects.filter(
-            exam__in=exams, is_active=True,
-        ).select_related('subject')
-        student_marks = StudentMark.objects.filter(
-            exam_subject__in=all_exam_subjects,
-            student=student,
-            school_id=school_id,
+        # Exams for the class captured in the selected enrollment/session.
+        from .report_cards import ReportCardBuilder
+        enrollment.student = student
+        builder = ReportCardBuilder(
+            school_id, enrollment.class_obj, enrollment.academic_year_id, term_id,
         )
-        marks_lookup = {m.exam_subject_id: m for m in student_marks}
+        return Response(builder.build_many([enrollment])[0])
 
-        # Group exam subjects by exam
-        es_by_exam = {}
-        for es in all_exam_subjects:
-            es_by_exam.setdefault(es.exam_id, []).append(es)
 
-        all_subjects = {}
-        exam_data = []
+class ReportCardBatchView(ModuleAccessMixin, APIView):
+    """
+    Report cards for a whole class (all sections of a grade) or one section.
 
-        for exam in exams:
-            exam_subjects = es_by_exam.get(exam.id, [])
-            exam_marks = {}
+    GET  returns every card as JSON, computed in one pass per section.
+    POST renders a combined PDF in the background (one page per student).
 
-            for es in exam_subjects:
-                if es.subject_id not in all_subjects:
-                    all_subjects[es.subject_id] = es.subject.name
+    Params: academic_year_id (required), class_id (one section) or
+    grade_level (every section at that level), optional term_id.
+    """
+    required_module = 'examinations'
+    permission_classes = [IsAuthenticated, IsSchoolAdminOrReadOnly, HasSchoolAccess]
 
-                mark = marks_lookup.get(es.id)
-                exam_marks[es.subject_id] = {
-                    'total_marks': float(es.total_marks),
-                    'marks_obtained': float(mark.marks_obtained) if mark and mark.marks_obtained else None,
-                    'is_absent': mark.is_absent if mark else False,
-                    'ai_comment': mark.ai_comment if mark else '',
-                }
+    def _resolve(self, request, params):
+        from students.models import Class
 
-            exam_data.append({
-                'exam_id': exam.id,
-                'exam_name': exam.name,
-                'exam_type': exam.exam_type.name,
-                'term': exam.term.name if exam.term else None,
-                'marks': exam_marks,
-            })
+        school_id = _resolve_school_id(request)
+        academic_year_id = params.get('academic_year_id')
+        class_id = params.get('class_id')
+        grade_level = params.get('grade_level')
 
-        # Determine weighted vs simple calculation
-        from schools.models import School
-        school = School.objects.get(pk=school_id)
-        use_weighted = (school.exam_config or {}).get('weighted_average_enabled', False)
-
-        # Calculate overall totals
-        grand_total_obtained = Decimal('0')
-        grand_total_possible = Decimal('0')
-
-        if use_weighted and exams.count() > 1:
-            # Weighted: group by exam_type, compute per-type percentage, apply weights
-            exam_type_data = {}
-            for exam in exams:
-                et_id = exam.exam_type_id
-                if et_id not in exam_type_data:
-                    exam_type_data[et_id] = {
-                        'weight': exam.exam_type.weight,
-                        'obtained': Decimal('0'),
-                        'possible': Decimal('0'),
-                    }
-                for es_item in es_by_exam.get(exam.id, []):
-                    mark = marks_lookup.get(es_item.id)
-                    if mark and mark.marks_obtained is not None and not mark.is_absent:
-                        exam_type_data[et_id]['obtained'] += mark.marks_obtained
-                    exam_type_data[et_id]['possible'] += es_item.total_marks
-
-            total_weight = sum(d['weight'] for d in exam_type_data.values() if d['possible'] > 0)
-            if total_weight > 0:
-                weighted_sum = Decimal('0')
-                for data in exam_type_data.values():
-                    if data['possible'] > 0:
-                        type_pct = data['obtained'] / data['possible'] * 100
-                        weighted_sum += type_pct * (data['weight'] / total_weight)
-                overall_pct = float(weighted_sum)
+        if not academic_year_id:
+            return None, Response({'detail': 'academic_year_id required.'}, status=400)
+        if not class_id and grade_level in (None, ''):
+            return None, Response({'detail': 'class_id or grade_level required.'}, status=400)
+
+        classes = Class.objects.filter(school_id=school_id, is_active=True)
+        try:
+            academic_year_id = int(academic_year_id)
+        except (TypeError, ValueError):
+            return None, Response({'detail': 'academic_year_id must be an integer.'}, status=400)
+        try:
+            if class_id:
+                classes = classes.filter(pk=int(class_id))
             else:
-                overall_pct = 0
+                classes = classes.filter(grade_level=int(grade_level))
+        except (TypeError, ValueError):
+            return None, Response({'detail': 'class_id/grade_level must be integers.'}, status=400)
 
-            grand_total_obtained = sum((d['obtained'] for d in exam_type_data.values()), Decimal('0'))
-            grand_total_possible = sum((d['possible'] for d in exam_type_data.values()), Decimal('0'))
-        else:
-            # Simple average
-            for es_item in all_exam_subjects:
-                mark = marks_lookup.get(es_item.id)
-                if mark and mark.marks_obtained is not None and not mark.is_absent:
-                    grand_total_obtained += mark.marks_obtained
-                grand_total_possible += es_item.total_marks
-            overall_pct = float(grand_total_obtained / grand_total_possible * 100) if grand_total_possible > 0 else 0
-
-        overall_grade = '-'
-        for gs in grade_scales:
-            if float(gs.min_percentage) <= overall_pct <= float(gs.max_percentage):
-                overall_grade = gs.grade_label
-                break
-
-        # Build flattened subject-level summary for the frontend
-        subject_summaries = []
-        for subj_id, subj_name in all_subjects.items():
-            subj_total = Decimal('0')
-            subj_obtained = Decimal('0')
-            subj_absent = False
-            subj_pass = True
-
-            for exam in exams:
-                for es_item in es_by_exam.get(exam.id, []):
-                    if es_item.subject_id == subj_id:
-                        mark = marks_lookup.get(es_item.id)
-                        subj_total += es_item.total_marks
-                        if mark and mark.marks_obtained is not None and not mark.is_absent:
-                            subj_obtained += mark.marks_obtained
-                            if mark.marks_obtained < es_item.passing_marks:
-                                subj_pass = False
-                        else:
-                            subj_pass = False
-                            if mark and mark.is_absent:
-                                subj_absent = True
-
-            subj_pct = float(subj_obtained / subj_total * 100) if subj_total > 0 else 0
-            subj_grade = '-'
-            for gs in grade_scales:
-                if float(gs.min_percentage) <= subj_pct <= float(gs.max_percentage):
-                    subj_grade = gs.grade_label
-                    break
-
-            subject_summaries.append({
-                'subject_name': subj_name,
-                'total_marks': float(subj_total),
-                'marks_obtained': float(subj_obtained),
-                'percentage': round(subj_pct, 2),
-                'grade': subj_grade,
-                'is_pass': subj_pass,
-                'is_absent': subj_absent,
-            })
+        class_objs = list(classes.order_by('grade_level', 'section', 'name'))
+        if not class_objs:
+            return None, Response({'detail': 'Class not found.'}, status=404)
 
-        return Response({
-            'student_name': student.name,
-            'roll_number': enrollment.roll_number or student.roll_number,
-            'class_name': enrollment.class_obj.name,
-            'school_name': student.school.name,
-            'academic_year_name': enrollment.academic_year.name,
-            'term_name': exams[0].term.name if exams and exams[0].term else None,
-            'enrollment_info': {
-                'enrollment_id': enrollment.id,
-                'class_at_report_session': enrollment.class_obj.name,
-                'current_class': student.class_obj.name if student.class_obj else None,
-                'academic_year_id': enrollment.academic_year_id,
-                'academic_year_name': enrollment.academic_year.name,
-            },
-            'student': {
-                'id': student.id,
-                'name': student.name,
-                'roll_number': enrollment.roll_number or student.roll_number,
-                'class_name': enrollment.class_obj.name,
-                'school_name': student.school.name,
-            },
-            'subjects': subject_summaries,
-            'exams': exam_data,
-            'summary': {
-                'total_marks': float(grand_total_possible),
-                'obtained_marks': float(grand_total_obtained),
-                'total_obtained': float(grand_total_obtained),
-                'total_possible': float(grand_total_possible),
-                'percentage': round(overall_pct, 2),
-                'grade': overall_grade,
-                'overall_pass': all(s['is_pass'] for s in subject_summaries) if subject_summaries else False,
-                'calculation_mode': 'weighted' if use_weighted and exams.count() > 1 else 'simple',
+        return {
+            'school_id': school_id,
+            'academic_year_id': academic_year_id,
+            'class_objs': class_objs,
+            'term_id': params.get('term_id') or None,
+        }, None
+
+    def get(self, request):
+        scope, error = self._resolve(request, request.query_params)
+        if error:
+            return error
+
+        from .report_cards import build_class_report_cards
+        cards = build_class_report_cards(
+            scope['school_id'], scope['academic_year_id'], scope['class_objs'],
+            term_id=scope['term_id'],
+        )
+        return Response({'count': len(cards), 'report_cards': cards})
+
+    def post(self, request):
+        scope, error = self._resolve(request, request.data)
+        if error:
+            return error
+
+        from core.models import BackgroundTask
+        from core.task_utils import dispatch_background_task
+        from .report_cards import class_enrollments
+        from .tasks import generate_report_cards_task
+
+        class_ids = [c.id for c in scope['class_objs']]
+        total = class_enrollments(
+            scope['school_id'], scope['academic_year_id'], class_ids,
+        ).count()
+
+        bg_task = dispatch_background_task(
+            celery_task_func=generate_report_cards_task,
+            task_type=BackgroundTask.TaskType.REPORT_GENERATION,
+            title=f"Generating report cards ({total} students)",
+            school_id=scope['school_id'],
+            user=request.user,
+            task_kwargs={
+                'school_id': scope['school_id'],
+                'user_id': request.user.id,
+                'academic_year_id': scope['academic_year_id'],
+                'class_ids': class_ids,
+                'term_id': scope['term_id'],
             },
-            'grade_scales': [
-                {
-                    'grade_label': gs.grade_label,
-                    'min_percentage': float(gs.min_percentage),
-                    'max_percentage': float(gs.max_percentage),
-                    'gpa_points': float(gs.gpa_points),
-                }
-                for gs in grade_scales
-            ],
-        })
+            progress_total=total,
+        )
+        return Response({
+            'task_id': bg_task.celery_task_id,
+            'message': f'Report card generation started for {total} students.',
+        }, status=202)
 
 
 # ===========================================
@@ -2259,3 +2253,39 @@ class PaperFeedbackViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Read
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.select_related('paper_upload', 'confirmed_by').order_by('-created_at')
+
+
+class ConsolidatedResultView(ModuleAccessMixin, APIView):
+    """
+    Weighted term or annual results for one class/section.
+
+    Combines the class's published exams using exam-type weights. Params:
+    class_id and academic_year_id (required), term_id (optional; omitted
+    means the whole academic year).
+    """
+    required_module = 'examinations'
+    permission_classes = [IsAuthenticated, IsSchoolAdminOrReadOnly, HasSchoolAccess]
+
+    def get(self, request):
+        from students.models import Class
+        from .consolidation import get_consolidated_results
+
+        school_id = _resolve_school_id(request)
+        class_id = request.query_params.get('class_id')
+        academic_year_id = request.query_params.get('academic_year_id')
+        term_id = request.query_params.get('term_id') or None
+
+        if not class_id or not academic_year_id:
+            return Response({'detail': 'class_id and academic_year_id required.'}, status=400)
+        try:
+            class_id = int(class_id)
+            academic_year_id = int(academic_year_id)
+            term_id = int(term_id) if term_id else None
+        except (TypeError, ValueError):
+            return Response({'detail': 'class_id, academic_year_id and term_id must be integers.'}, status=400)
+
+        class_obj = Class.objects.filter(school_id=school_id, pk=class_id).first()
+        if not class_obj:
+            return Response({'detail': 'Class not found.'}, status=404)
+
+        return Response(get_consolidated_results(school_id, class_obj, academic_year_id, term_id))
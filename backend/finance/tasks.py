@@ -8,6 +8,8 @@ from decimal import Decimal
 from celery import shared_task
 from django.utils import timezone
 
+from academic_sessions.promotion_advisor_service import invalidate_promotion_advice
+
 from .generation_planner import plan_scope_records
 
 logger = logging.getLogger(__name__)
@@ -275,6 +277,9 @@ def generate_monthly_fees_task(
                         batch_size=1000,
                     )
 
+        # Bulk writes skip model signals.
+        invalidate_promotion_advice(school_id)
+
         result_data = {
             'created': created_count,
             'updated': updated_count,
@@ -491,6 +496,9 @@ def generate_annual_fees_task(
                         batch_size=1000,
                     )
 
+        # Bulk writes skip model signals.
+        invalidate_promotion_advice(school_id)
+
         result_data = {
             'created': created_count,
             'updated': updated_count,
@@ -606,6 +614,9 @@ def generate_onetime_fees_task(
             if to_create:
                 FeePayment.objects.bulk_create(to_create, batch_size=1000)
 
+        # Bulk writes skip model signals.
+        invalidate_promotion_advice(school_id)
+
         result_data = {
             'created': created_count,
             'skipped': skipped_count,
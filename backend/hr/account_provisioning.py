@@ -0,0 +1,170 @@
+"""
+Bulk user-account provisioning for staff members.
+
+Usernames for the whole batch are checked against the database in one query
+and allocated in memory. Password hashing, which dominates the cost, runs in a
+thread pool (hashlib's PBKDF2 releases the GIL, and Celery's prefork workers
+are daemonic so they cannot start a process pool of their own). Users and
+school memberships are then bulk-inserted and linked to the staff rows with
+one bulk update.
+
+The shared default password is handed to the worker through a one-time cache
+entry, so only an opaque token travels through the Celery broker and result
+backend.
+"""
+
+import os
+import re
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+MAX_HASH_WORKERS = 8
+# Long enough to survive a queued task; the entry is deleted once read.
+PASSWORD_HANDOFF_SECONDS = 60 * 60
+
+
+def stash_password(password: str) -> str:
+    """Keep the password in the cache for a worker and return its token."""
+    token = secrets.token_urlsafe(32)
+    cache.set(f'hr_account_password:{token}', password, PASSWORD_HANDOFF_SECONDS)
+    return token
+
+
+def take_password(token: str):
+    """Read and forget a stashed password; None if it expired or was already used."""
+    key = f'hr_account_password:{token}'
+    password = cache.get(key)
+    cache.delete(key)
+    return password
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^a-z0-9_]', '', value)
+
+
+def candidate_usernames(staff) -> list:
+    """Usernames to try for a staff member, in order of preference."""
+    base = _slug(f'{staff.first_name}_{staff.last_name}'.lower().replace(' ', '_')) or 'staff'
+    fallback = _slug(staff.employee_id.lower().replace('-', '_')) if staff.employee_id else f'{base}_{staff.id}'
+    candidates = []
+    for username in (base, fallback, f'{base}_{staff.id}'):
+        if username and username not in candidates:
+            candidates.append(username)
+    return candidates
+
+
+def hash_passwords(password: str, count: int, progress=None) -> list:
+    """`count` independently salted hashes of the same password."""
+    if count <= 0:
+        return []
+    workers = max(1, min(count, os.cpu_count() or 1, MAX_HASH_WORKERS))
+    hashes = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for done, hashed in enumerate(executor.map(lambda _: make_password(password), range(count)), start=1):
+            hashes.append(hashed)
+            if progress:
+                progress(done)
+    return hashes
+
+
+def provision_staff_accounts(school_id: int, staff_ids, password: str, role: str, progress=None) -> dict:
+    """
+    Create and link user accounts for the given staff members.
+
+    Returns the per-staff report: created, skipped (already linked) and
+    errors (no free username or a failed insert), with their counts.
+    """
+    from schools.models import UserSchoolMembership
+    from .models import StaffMember
+
+    User = get_user_model()
+
+    staff_members = list(StaffMember.objects.filter(id__in=staff_ids, school_id=school_id).select_related('user'))
+
+    created = []
+    skipped = []
+    errors = []
+
+    pending = []
+    for staff in staff_members:
+        if staff.user is not None:
+            skipped.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'reason': 'Already has account'})
+        else:
+            pending.append((staff, candidate_usernames(staff)))
+
+    # 1 query: which candidate usernames are already taken
+    taken = set(User.objects.filter(
+        username__in={username for _, candidates in pending for username in candidates},
+    ).values_list('username', flat=True))
+
+    assignments = []
+    for staff, candidates in pending:
+        username = next((u for u in candidates if u not in taken), None)
+        if username is None:
+            errors.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'error': 'Could not generate unique username'})
+            continue
+        taken.add(username)
+        assignments.append((staff, username))
+
+    users = [
+        User(
+            username=username,
+            email=staff.email or '',
+            first_name=staff.first_name,
+            last_name=staff.last_name,
+            role=role,
+            school_id=school_id,
+            password=hashed,
+        )
+        for (staff, username), hashed in zip(assignments, hash_passwords(password, len(assignments), progress))
+    ]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            linked = list(zip(assignments, users))
+    except IntegrityError:
+        # A username was taken after the availability check; insert one by one
+        # so only the conflicting staff members are reported as errors.
+        linked = []
+        for (staff, username), user in zip(assignments, users):
+            user.pk = None
+            try:
+                with transaction.atomic():
+                    user.save()
+                linked.append(((staff, username), user))
+            except IntegrityError as e:
+                errors.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'error': str(e)})
+
+    if linked:
+        now = timezone.now()
+        UserSchoolMembership.objects.bulk_create([
+            UserSchoolMembership(user=user, school_id=school_id, role=role, is_default=True, is_active=True)
+            for _, user in linked
+        ], ignore_conflicts=True)
+        for (staff, _), user in linked:
+            staff.user = user
+            staff.updated_at = now
+        StaffMember.objects.bulk_update([staff for (staff, _), _ in linked], ['user', 'updated_at'])
+
+    for (staff, username), _ in linked:
+        created.append({
+            'staff_id': staff.id,
+            'username': username,
+            'name': f'{staff.first_name} {staff.last_name}',
+        })
+
+    return {
+        'created_count': len(created),
+        'skipped_count': len(skipped),
+        'error_count': len(errors),
+        'created': created,
+        'skipped': skipped,
+        'errors': errors,
+    }
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staffattendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0002_staffattendance_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='attendance_breakdown',
+            field=models.JSONField(blank=True, default=dict, help_text='Absences, half days, late marks and unpaid leave behind the attendance deductions'),
+        ),
+    ]
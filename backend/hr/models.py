@@ -332,6 +332,11 @@ class Payslip(models.Model):
     deductions_breakdown = models.JSONField(default=dict)
     working_days = models.IntegerField(default=0)
     present_days = models.IntegerField(default=0)
+    attendance_breakdown = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Absences, half days, late marks and unpaid leave behind the attendance deductions',
+    )
     status = models.CharField(
         max_length=10,
         choices=Status.choices,
@@ -497,6 +502,7 @@ class StaffAttendance(models.Model):
         related_name='marked_staff_attendance',
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('school', 'staff_member', 'date')
@@ -0,0 +1,152 @@
+"""
+Attendance- and leave-aware payroll amounts.
+
+Per-staff absences, half days, late marks and unpaid leave for a pay period are
+loaded with grouped queries for all staff at once, then turned into payslip
+amounts in memory. A day's pay is the gross salary divided by the period's
+working days (calendar days minus Sundays and school-wide off days).
+"""
+
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Count, Exists, OuterRef, Q
+
+# Every LATES_PER_DEDUCTED_DAY late marks in a period cost one day's pay.
+LATES_PER_DEDUCTED_DAY = 3
+HALF_DAY_FRACTION = Decimal('0.5')
+
+CENTS = Decimal('0.01')
+
+
+def pay_period(month: int, year: int):
+    """First and last day of the month."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def load_attendance_adjustments(school_id: int, staff_ids, month: int, year: int):
+    """
+    Returns (working_days, {staff_id: counts}) for the pay period, where counts
+    has absent_days, half_days, late_marks, unpaid_leave_days and present_days.
+
+    Absences on days covered by approved leave are not counted as absences;
+    approved leave under an UNPAID policy counts as unpaid leave instead.
+    """
+    from academic_sessions.calendar_rules import build_school_off_day_date_set
+    from .models import LeaveApplication, LeavePolicy, StaffAttendance
+
+    period_start, period_end = pay_period(month, year)
+    off_days = build_school_off_day_date_set(school_id, period_start, period_end)
+    working_dates = [
+        period_start + timedelta(days=offset)
+        for offset in range((period_end - period_start).days + 1)
+        if period_start + timedelta(days=offset) not in off_days
+    ]
+    working_date_set = set(working_dates)
+    adjustments = defaultdict(lambda: {
+        'present_days': 0, 'absent_days': 0, 'half_days': 0, 'late_marks': 0, 'unpaid_leave_days': 0,
+    })
+
+    on_leave = LeaveApplication.objects.filter(
+        staff_member_id=OuterRef('staff_member_id'),
+        status=LeaveApplication.Status.APPROVED,
+        start_date__lte=OuterRef('date'),
+        end_date__gte=OuterRef('date'),
+    )
+    rows = (
+        StaffAttendance.objects.filter(
+            school_id=school_id,
+            staff_member_id__in=staff_ids,
+            date__in=working_dates,
+        )
+        .annotate(on_leave=Exists(on_leave))
+        .values('staff_member_id')
+        .annotate(
+            present=Count('id', filter=Q(status__in=['PRESENT', 'LATE', 'HALF_DAY'])),
+            absent=Count('id', filter=Q(status='ABSENT', on_leave=False)),
+            half=Count('id', filter=Q(status='HALF_DAY')),
+            late=Count('id', filter=Q(status='LATE')),
+        )
+        .order_by()
+    )
+    for row in rows:
+        counts = adjustments[row['staff_member_id']]
+        counts['present_days'] = row['present']
+        counts['absent_days'] = row['absent']
+        counts['half_days'] = row['half']
+        counts['late_marks'] = row['late']
+
+    unpaid_leaves = LeaveApplication.objects.filter(
+        school_id=school_id,
+        staff_member_id__in=staff_ids,
+        status=LeaveApplication.Status.APPROVED,
+        leave_policy__leave_type=LeavePolicy.LeaveType.UNPAID,
+        start_date__lte=period_end,
+        end_date__gte=period_start,
+    ).values_list('staff_member_id', 'start_date', 'end_date')
+    unpaid_dates = defaultdict(set)
+    for staff_id, start_date, end_date in unpaid_leaves:
+        cursor = max(start_date, period_start)
+        while cursor <= min(end_date, period_end):
+            if cursor in working_date_set:
+                unpaid_dates[staff_id].add(cursor)
+            cursor += timedelta(days=1)
+    for staff_id, dates in unpaid_dates.items():
+        adjustments[staff_id]['unpaid_leave_days'] = len(dates)
+
+    return len(working_dates), adjustments
+
+
+def compute_payslip_amounts(salary, working_days: int, counts: dict) -> dict:
+    """
+    Payslip amount fields for one staff member: the salary structure's
+    allowances and deductions plus itemized attendance deductions.
+    """
+    allowances = {key: Decimal(str(value)) for key, value in salary.allowances.items()}
+    deductions = {key: Decimal(str(value)) for key, value in salary.deductions.items()}
+    gross = salary.basic_salary + sum(allowances.values(), Decimal('0'))
+    per_day = (gross / working_days).quantize(CENTS, ROUND_HALF_UP) if working_days else Decimal('0')
+
+    deducted_days = {
+        'absent_days': Decimal(counts['absent_days']),
+        'half_days': Decimal(counts['half_days']) * HALF_DAY_FRACTION,
+        'late_marks': Decimal(counts['late_marks'] // LATES_PER_DEDUCTED_DAY),
+        'unpaid_leave': Decimal(counts['unpaid_leave_days']),
+    }
+    attendance_deductions = {}
+    for key, days in deducted_days.items():
+        if days:
+            attendance_deductions[key] = (per_day * days).quantize(CENTS, ROUND_HALF_UP)
+
+    # Attendance deductions never take the net below zero.
+    structure_deductions = sum(deductions.values(), Decimal('0'))
+    room = max(gross - structure_deductions, Decimal('0'))
+    for key, amount in attendance_deductions.items():
+        attendance_deductions[key] = min(amount, room)
+        room -= attendance_deductions[key]
+
+    total_deductions = structure_deductions + sum(attendance_deductions.values(), Decimal('0'))
+    deductions_breakdown = dict(salary.deductions)
+    deductions_breakdown.update({key: float(amount) for key, amount in attendance_deductions.items() if amount})
+
+    return {
+        'basic_salary': salary.basic_salary,
+        'total_allowances': gross - salary.basic_salary,
+        'total_deductions': total_deductions,
+        'net_salary': gross - total_deductions,
+        'allowances_breakdown': salary.allowances,
+        'deductions_breakdown': deductions_breakdown,
+        'working_days': working_days,
+        'present_days': counts['present_days'],
+        'attendance_breakdown': {
+            'per_day_rate': float(per_day),
+            'absent_days': counts['absent_days'],
+            'half_days': counts['half_days'],
+            'late_marks': counts['late_marks'],
+            'lates_per_deducted_day': LATES_PER_DEDUCTED_DAY,
+            'unpaid_leave_days': counts['unpaid_leave_days'],
+            'deductions': {key: float(amount) for key, amount in attendance_deductions.items()},
+        },
+    }
@@ -0,0 +1,191 @@
+"""
+Payslip PDF rendering.
+
+PayslipRenderer draws one payslip per page onto an FPDF document. The school
+logo is fetched once per renderer, and within one document fpdf2 embeds it as
+a single image resource shared by every page, so a month's payslips can be
+rendered into a merged PDF (or a zip of per-staff PDFs) without repeating the
+per-request setup for every staff member.
+"""
+
+import io
+import logging
+import zipfile
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+LOGO_HEIGHT = 18
+COLUMN_WIDTHS = [130, 60]
+
+
+def payslip_filename(payslip):
+    staff_name = payslip.staff_member.full_name.replace(' ', '_')
+    return f"payslip_{staff_name}_{payslip.month}_{payslip.year}.pdf"
+
+
+class PayslipRenderer:
+    """Renders payslips of one school, sharing the logo and header setup."""
+
+    def __init__(self, school):
+        from core.school_assets import get_school_logo
+
+        self.school = school
+        self.logo_bytes = get_school_logo(school)
+        self.generated_on = datetime.now().strftime("%d %B %Y at %I:%M %p")
+        contact_parts = [part for part in (school.contact_email, school.contact_phone) if part]
+        self.contact_line = ' | '.join(contact_parts)
+
+    def new_document(self):
+        from fpdf import FPDF
+
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        return pdf
+
+    def render(self, payslip) -> bytes:
+        """A single payslip as its own PDF."""
+        pdf = self.new_document()
+        self.add_page(pdf, payslip)
+        return bytes(pdf.output())
+
+    def render_merged(self, payslips, progress=None) -> bytes:
+        """All payslips in one PDF, one page each."""
+        pdf = self.new_document()
+        for done, payslip in enumerate(payslips, start=1):
+            self.add_page(pdf, payslip)
+            if progress:
+                progress(done)
+        return bytes(pdf.output())
+
+    def render_zip(self, payslips, progress=None) -> bytes:
+        """A zip with one PDF per payslip."""
+        buffer = io.BytesIO()
+        used_names = set()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for done, payslip in enumerate(payslips, start=1):
+                name = payslip_filename(payslip)
+                if name in used_names:
+                    name = name.replace('.pdf', f'_{payslip.id}.pdf')
+                used_names.add(name)
+                archive.writestr(name, self.render(payslip))
+                if progress:
+                    progress(done)
+        return buffer.getvalue()
+
+    def add_page(self, pdf, payslip):
+        pdf.add_page()
+        self._header(pdf)
+
+        # Title
+        pdf.set_font('Helvetica', 'B', 14)
+        month_name = MONTHS[payslip.month - 1] if 1 <= payslip.month <= 12 else str(payslip.month)
+        pdf.cell(0, 10, f'Payslip - {month_name} {payslip.year}', ln=True, align='C')
+        pdf.ln(5)
+
+        # Staff details
+        staff = payslip.staff_member
+        details = [
+            ('Employee Name', staff.full_name),
+            ('Employee ID', staff.employee_id or 'N/A'),
+            ('Department', staff.department.name if staff.department else 'N/A'),
+            ('Designation', staff.designation.name if staff.designation else 'N/A'),
+            ('Status', payslip.get_status_display()),
+        ]
+        if payslip.payment_date:
+            details.append(('Payment Date', str(payslip.payment_date)))
+
+        for label, value in details:
+            pdf.set_font('Helvetica', 'B', 10)
+            pdf.cell(50, 7, f'{label}:', 0, 0)
+            pdf.set_font('Helvetica', '', 10)
+            pdf.cell(0, 7, str(value), ln=True)
+
+        pdf.ln(5)
+
+        # Earnings table
+        col_w = COLUMN_WIDTHS
+        pdf.set_font('Helvetica', 'B', 11)
+        pdf.cell(0, 8, 'Earnings', ln=True)
+        pdf.set_font('Helvetica', '', 10)
+        pdf.cell(col_w[0], 7, 'Basic Salary', 1)
+        pdf.cell(col_w[1], 7, str(payslip.basic_salary), 1, ln=True, align='R')
+
+        if payslip.allowances_breakdown:
+            for key, value in payslip.allowances_breakdown.items():
+                label = key.replace('_', ' ').title()
+                pdf.cell(col_w[0], 7, label, 1)
+                pdf.cell(col_w[1], 7, str(value), 1, ln=True, align='R')
+
+        pdf.set_font('Helvetica', 'B', 10)
+        gross = float(payslip.basic_salary) + float(payslip.total_allowances)
+        pdf.cell(col_w[0], 7, 'Gross Salary', 1)
+        pdf.cell(col_w[1], 7, f'{gross:,.2f}', 1, ln=True, align='R')
+
+        pdf.ln(5)
+
+        # Deductions table
+        pdf.set_font('Helvetica', 'B', 11)
+        pdf.cell(0, 8, 'Deductions', ln=True)
+        pdf.set_font('Helvetica', '', 10)
+
+        if payslip.deductions_breakdown:
+            for key, value in payslip.deductions_breakdown.items():
+                label = key.replace('_', ' ').title()
+                pdf.cell(col_w[0], 7, label, 1)
+                pdf.cell(col_w[1], 7, str(value), 1, ln=True, align='R')
+
+        pdf.set_font('Helvetica', 'B', 10)
+        pdf.cell(col_w[0], 7, 'Total Deductions', 1)
+        pdf.cell(col_w[1], 7, str(payslip.total_deductions), 1, ln=True, align='R')
+
+        pdf.ln(8)
+
+        # Net salary
+        pdf.set_font('Helvetica', 'B', 12)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(col_w[0], 10, 'Net Salary', 1, 0, fill=True)
+        pdf.cell(col_w[1], 10, str(payslip.net_salary), 1, ln=True, align='R', fill=True)
+
+        pdf.ln(15)
+
+        # Signatures
+        pdf.set_font('Helvetica', '', 10)
+        pdf.cell(95, 7, '_________________________', 0, 0, align='C')
+        pdf.cell(95, 7, '_________________________', 0, ln=True, align='C')
+        pdf.cell(95, 7, 'Employee Signature', 0, 0, align='C')
+        pdf.cell(95, 7, 'Authorized Signature', 0, ln=True, align='C')
+
+        pdf.ln(10)
+
+        # Footer
+        pdf.set_font('Helvetica', 'I', 8)
+        pdf.cell(0, 5, f'Generated on {self.generated_on}', ln=True, align='C')
+
+    def _header(self, pdf):
+        school = self.school
+        if self.logo_bytes:
+            try:
+                pdf.image(io.BytesIO(self.logo_bytes), x=(210 - LOGO_HEIGHT) / 2, y=pdf.get_y(), h=LOGO_HEIGHT)
+                pdf.ln(LOGO_HEIGHT + 2)
+            except Exception as e:
+                # Don't retry a logo that fpdf can't decode on every page.
+                self.logo_bytes = None
+                logger.warning("Failed to render school logo for payslip: %s", e)
+
+        pdf.set_font('Helvetica', 'B', 16)
+        pdf.cell(0, 10, school.name, ln=True, align='C')
+        if school.address:
+            pdf.set_font('Helvetica', '', 9)
+            pdf.cell(0, 5, school.address, ln=True, align='C')
+        if self.contact_line:
+            pdf.set_font('Helvetica', '', 8)
+            pdf.cell(0, 5, self.contact_line, ln=True, align='C')
+
+        pdf.ln(3)
+        pdf.set_draw_color(0, 0, 0)
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        pdf.ln(5)
@@ -230,7 +230,7 @@ class PayslipSerializer(serializers.ModelSerializer):
             'month', 'year',
             'basic_salary', 'total_allowances', 'total_deductions', 'net_salary',
             'allowances_breakdown', 'deductions_breakdown',
-            'working_days', 'present_days',
+            'working_days', 'present_days', 'attendance_breakdown',
             'status', 'status_display',
             'payment_date', 'notes',
             'generated_by', 'generated_by_name',
@@ -238,7 +238,7 @@ class PayslipSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             'id', 'school', 'staff_member_name', 'staff_employee_id',
-            'department_name', 'status_display', 'generated_by_name',
+            'department_name', 'attendance_breakdown', 'status_display', 'generated_by_name',
             'created_at', 'updated_at',
         ]
 
@@ -10,20 +10,17 @@ logger = logging.getLogger(__name__)
 
 @shared_task(bind=True, time_limit=600)
 def generate_payslips_task(self, school_id, user_id, month, year):
-    """Bulk generate payslips for all active staff."""
+    """Bulk generate payslips for all active staff, deducting absences, half days, late marks and unpaid leave."""
     from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
 
     task_id = self.request.id
 
     try:
-        from decimal import Decimal
         from datetime import date
         from django.db.models import Q
-        from django.contrib.auth import get_user_model
         from hr.models import StaffMember, SalaryStructure, Payslip
+        from hr.payroll import compute_payslip_amounts, load_attendance_adjustments
 
-        User = get_user_model()
-        user = User.objects.get(id=user_id)
         today = date.today()
 
         # 1 query: all active staff
@@ -52,33 +49,33 @@ def generate_payslips_task(self, school_id, user_id, month, year):
             if sal.staff_member_id not in salary_map:
                 salary_map[sal.staff_member_id] = sal
 
+        # 3 queries: school off days, grouped attendance counts, unpaid leave
+        pending_ids = [
+            staff.id for staff in active_staff
+            if staff.id not in existing_staff_ids and staff.id in salary_map
+        ]
+        working_days, adjustments = load_attendance_adjustments(school_id, pending_ids, month, year)
+
         # Build payslips to create
         to_create = []
         already_exists = 0
         no_salary = 0
 
-        for i, staff in enumerate(active_staff):
+        for staff in active_staff:
             if staff.id in existing_staff_ids:
                 already_exists += 1
             elif staff.id not in salary_map:
                 no_salary += 1
             else:
-                salary = salary_map[staff.id]
                 to_create.append(Payslip(
                     school_id=school_id,
                     staff_member=staff,
                     month=month,
                     year=year,
-                    basic_salary=salary.basic_salary,
-                    total_allowances=sum(Decimal(str(v)) for v in salary.allowances.values()),
-                    total_deductions=sum(Decimal(str(v)) for v in salary.deductions.values()),
-                    net_salary=salary.net_salary,
-                    allowances_breakdown=salary.allowances,
-                    deductions_breakdown=salary.deductions,
                     status='DRAFT',
-                    generated_by=user,
+                    generated_by_id=user_id,
+                    **compute_payslip_amounts(salary_map[staff.id], working_days, adjustments[staff.id]),
                 ))
-            update_task_progress(task_id, current=i + 1)
 
         # 1 query: bulk insert
         if to_create:
@@ -103,3 +100,116 @@ def generate_payslips_task(self, school_id, user_id, month, year):
         logger.exception(f"Payslip generation failed: {e}")
         mark_task_failed(task_id, str(e))
         raise
+
+
+# Progress is written every PAYSLIP_EXPORT_PROGRESS_EVERY pages rather than per page.
+PAYSLIP_EXPORT_PROGRESS_EVERY = 25
+
+
+@shared_task(bind=True, time_limit=900)
+def export_payslips_task(self, school_id, user_id, month, year, output_format='PDF',
+                         status=None, department_id=None, payslip_ids=None):
+    """Render a pay period's payslips into one merged PDF (or a zip of PDFs) and store it as a report."""
+    from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
+    from django.contrib.auth import get_user_model
+    from reports.models import GeneratedReport
+    from reports.storage import store_report_artifact
+    from schools.models import School
+    from hr.models import Payslip
+    from hr.payslip_pdf import MONTHS, PayslipRenderer
+
+    task_id = self.request.id
+
+    try:
+        school = School.objects.get(id=school_id)
+        payslips = Payslip.objects.filter(school_id=school_id, month=month, year=year).select_related(
+            'staff_member', 'staff_member__department', 'staff_member__designation',
+        ).order_by('staff_member__first_name', 'staff_member__last_name', 'id')
+        if status:
+            payslips = payslips.filter(status=status.upper())
+        if department_id:
+            payslips = payslips.filter(staff_member__department_id=department_id)
+        if payslip_ids:
+            payslips = payslips.filter(id__in=payslip_ids)
+        payslips = list(payslips)
+        total = len(payslips)
+        if not total:
+            mark_task_failed(task_id, 'No payslips match the selected filters.')
+            return {'count': 0}
+        update_task_progress(task_id, current=0, total=total)
+
+        def progress(done):
+            if done % PAYSLIP_EXPORT_PROGRESS_EVERY == 0 and done < total:
+                update_task_progress(task_id, current=done)
+
+        renderer = PayslipRenderer(school)
+        if output_format == 'ZIP':
+            content = renderer.render_zip(payslips, progress=progress)
+        else:
+            output_format = 'PDF'
+            content = renderer.render_merged(payslips, progress=progress)
+
+        month_name = MONTHS[month - 1] if 1 <= month <= 12 else str(month)
+        report = GeneratedReport(
+            school=school,
+            report_type='PAYSLIPS',
+            title=f"Payslips - {month_name} {year}",
+            parameters={
+                'month': month,
+                'year': year,
+                'status': status,
+                'department_id': department_id,
+                'payslip_ids': list(payslip_ids) if payslip_ids else None,
+            },
+            format=output_format,
+            generated_by=get_user_model().objects.filter(id=user_id).first(),
+        )
+        store_report_artifact(report, content)
+
+        result_data = {
+            'report_id': report.id,
+            'payslips': total,
+            'format': output_format,
+            'download_url': f'/api/reports/{report.id}/download/',
+            'message': f'{total} payslip(s) exported.',
+        }
+        mark_task_success(task_id, result_data=result_data)
+        return result_data
+
+    except Exception as e:
+        logger.exception(f"Payslip export failed: {e}")
+        mark_task_failed(task_id, str(e))
+        raise
+
+
+@shared_task(bind=True, time_limit=1800)
+def bulk_create_staff_accounts_task(self, school_id, staff_ids, password_token, default_role):
+    """Provision user accounts for a batch of staff members, hashing passwords in a thread pool."""
+    from core.task_utils import update_task_progress, mark_task_success, mark_task_failed
+    from hr.account_provisioning import provision_staff_accounts, take_password
+
+    task_id = self.request.id
+
+    try:
+        default_password = take_password(password_token)
+        if not default_password:
+            raise ValueError('The default password expired before the task ran. Please submit the request again.')
+
+        def progress(done):
+            if done % 25 == 0:
+                update_task_progress(task_id, current=done)
+
+        result_data = provision_staff_accounts(
+            school_id, staff_ids, default_password, default_role, progress=progress,
+        )
+        result_data['message'] = (
+            f"{result_data['created_count']} account(s) created, "
+            f"{result_data['skipped_count']} skipped, {result_data['error_count']} error(s)."
+        )
+        mark_task_success(task_id, result_data=result_data)
+        return result_data
+
+    except Exception as e:
+        logger.exception(f"Staff account provisioning failed: {e}")
+        mark_task_failed(task_id, str(e))
+        raise
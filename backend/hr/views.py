@@ -9,6 +9,7 @@ from decimal import Decimal
 
 from django.db import transaction
 from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -250,30 +251,11 @@ class StaffMemberViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
 
         return queryset
 
-    def _generate_next_employee_id(self, school_id):
-        """Generate next employee ID like EMP-001, EMP-002, etc."""
-        last = (
-            StaffMember.objects.filter(school_id=school_id, employee_id__startswith='EMP-')
-            .order_by('-employee_id')
-            .values_list('employee_id', flat=True)
-            .first()
-        )
-        if last:
-            try:
-                num = int(last.split('-', 1)[1]) + 1
-            except (ValueError, IndexError):
-                num = 1
-        else:
-            num = 1
-        return f'EMP-{num:03d}'
-
     def perform_create(self, serializer):
         school_id = _resolve_school_id(self.request)
         if not school_id:
             from rest_framework.exceptions import ValidationError
             raise ValidationError({'detail': 'No school associated with your account.'})
-        if not serializer.validated_data.get('employee_id'):
-            serializer.validated_data['employee_id'] = self._generate_next_employee_id(school_id)
 
         # Optionally create a linked user account
         create_user = self.request.data.get('create_user_account', False)
@@ -322,6 +304,14 @@ class StaffMemberViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
                 defaults={'role': user_role, 'is_default': True, 'is_active': True},
             )
 
+        # Take the next EMP-NNN only once validation has passed, so rejected requests leave no gaps.
+        if serializer.validated_data.get('employee_id'):
+            from core.sequences import observe_employee_id
+            observe_employee_id(school_id, serializer.validated_data['employee_id'])
+        else:
+            from core.sequences import next_employee_id
+            serializer.validated_data['employee_id'] = next_employee_id(school_id)
+
         staff = serializer.save(school_id=school_id, user=linked_user) if linked_user else serializer.save(school_id=school_id)
 
     def perform_destroy(self, instance):
@@ -515,11 +505,7 @@ class StaffMemberViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
 
     @action(detail=False, methods=['post'], url_path='bulk-create-accounts')
     def bulk_create_accounts(self, request):
-        """Bulk create user accounts for multiple staff members."""
-        import re
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-
+        """Bulk create user accounts for multiple staff members; large batches run in the background."""
         staff_ids = request.data.get('staff_ids', [])
         default_password = request.data.get('default_password', '')
         default_role = request.data.get('default_role', 'TEACHER')
@@ -542,70 +528,48 @@ class StaffMemberViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
         if not school_id:
             return Response({'error': 'No school associated.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        staff_members = StaffMember.objects.filter(
-            id__in=staff_ids, school_id=school_id,
-        ).select_related('user')
+        staff_count = StaffMember.objects.filter(id__in=staff_ids, school_id=school_id).count()
 
-        created = []
-        skipped = []
-        errors = []
+        from .account_provisioning import stash_password
+        from .tasks import bulk_create_staff_accounts_task
 
-        for staff in staff_members:
-            if staff.user is not None:
-                skipped.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'reason': 'Already has account'})
-                continue
+        task_kwargs = {
+            'school_id': school_id,
+            'staff_ids': list(staff_ids),
+            'password_token': stash_password(default_password),
+            'default_role': default_role,
+        }
 
-            # Auto-generate username
-            base = re.sub(r'[^a-z0-9_]', '', f'{staff.first_name}_{staff.last_name}'.lower().replace(' ', '_'))
-            if not base:
-                base = 'staff'
-            username = base
-            if User.objects.filter(username=username).exists():
-                username = re.sub(r'[^a-z0-9_]', '', staff.employee_id.lower().replace('-', '_')) if staff.employee_id else f'{base}_{staff.id}'
-            if User.objects.filter(username=username).exists():
-                username = f'{base}_{staff.id}'
-            if User.objects.filter(username=username).exists():
-                errors.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'error': 'Could not generate unique username'})
-                continue
+        from core.models import BackgroundTask
+        title = f"Creating user accounts for {staff_count} staff"
 
+        if staff_count < 50:
+            from core.task_utils import run_task_sync
             try:
-                user = User(
-                    username=username,
-                    email=staff.email or '',
-                    first_name=staff.first_name,
-                    last_name=staff.last_name,
-                    role=default_role,
-                    school_id=school_id,
-                )
-                user.set_password(default_password)
-                user.save()
-
-                from schools.models import UserSchoolMembership
-                UserSchoolMembership.objects.get_or_create(
-                    user=user,
-                    school_id=school_id,
-                    defaults={'role': default_role, 'is_default': True, 'is_active': True},
+                bg_task = run_task_sync(
+                    bulk_create_staff_accounts_task, BackgroundTask.TaskType.ACCOUNT_PROVISIONING,
+                    title, school_id, request.user, task_kwargs=task_kwargs, progress_total=staff_count,
                 )
-
-                staff.user = user
-                staff.save(update_fields=['user'])
-
-                created.append({
-                    'staff_id': staff.id,
-                    'username': username,
-                    'name': f'{staff.first_name} {staff.last_name}',
-                })
             except Exception as e:
-                errors.append({'staff_id': staff.id, 'name': f'{staff.first_name} {staff.last_name}', 'error': str(e)})
-
-        return Response({
-            'created_count': len(created),
-            'skipped_count': len(skipped),
-            'error_count': len(errors),
-            'created': created,
-            'skipped': skipped,
-            'errors': errors,
-        })
+                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            if not bg_task.result_data:
+                return Response(
+                    {'error': bg_task.error_message or 'Account creation failed.', 'task_id': bg_task.celery_task_id},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            return Response({'task_id': bg_task.celery_task_id, **bg_task.result_data})
+        else:
+            from core.task_utils import dispatch_background_task
+            bg_task = dispatch_background_task(
+                celery_task_func=bulk_create_staff_accounts_task,
+                task_type=BackgroundTask.TaskType.ACCOUNT_PROVISIONING,
+                title=title, school_id=school_id, user=request.user,
+                task_kwargs=task_kwargs, progress_total=staff_count,
+            )
+            return Response({
+                'task_id': bg_task.celery_task_id,
+                'message': f'Account creation started for {staff_count} staff members.',
+            }, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['get'], url_path='next-employee-id')
     def next_employee_id(self, request):
@@ -613,7 +577,8 @@ class StaffMemberViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelV
         school_id = _resolve_school_id(request)
         if not school_id:
             return Response({'detail': 'No school associated.'}, status=400)
-        return Response({'next_employee_id': self._generate_next_employee_id(school_id)})
+        from core.sequences import peek_employee_id
+        return Response({'next_employee_id': peek_employee_id(school_id)})
 
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
@@ -1003,149 +968,73 @@ class PayslipViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewS
             'paid_count': status_counts.get('PAID', 0),
         })
 
+    @action(detail=False, methods=['post'], url_path='export-pdf')
+    def export_pdf(self, request):
+        """Render a month's payslips (optionally filtered) into one PDF or a zip in the background."""
+        school_id = _resolve_school_id(request)
+        if not school_id:
+            return Response({'detail': 'No school selected.'}, status=400)
+
+        month = request.data.get('month')
+        year = request.data.get('year')
+        if not month or not year:
+            return Response({'detail': 'month and year are required.'}, status=400)
+
+        output_format = str(request.data.get('format', 'PDF')).upper()
+        if output_format not in ('PDF', 'ZIP'):
+            return Response({'detail': 'format must be PDF or ZIP.'}, status=400)
+
+        task_kwargs = {
+            'school_id': school_id,
+            'user_id': request.user.id,
+            'month': int(month),
+            'year': int(year),
+            'output_format': output_format,
+            'status': request.data.get('status') or None,
+            'department_id': request.data.get('department') or None,
+            'payslip_ids': request.data.get('ids') or None,
+        }
+        payslips = Payslip.objects.filter(school_id=school_id, month=int(month), year=int(year))
+        if task_kwargs['status']:
+            payslips = payslips.filter(status=task_kwargs['status'].upper())
+        if task_kwargs['department_id']:
+            payslips = payslips.filter(staff_member__department_id=task_kwargs['department_id'])
+        if task_kwargs['payslip_ids']:
+            payslips = payslips.filter(id__in=task_kwargs['payslip_ids'])
+        total = payslips.count()
+        if not total:
+            return Response({'detail': 'No payslips match the selected filters.'}, status=400)
+
+        from core.models import BackgroundTask
+        from core.task_utils import dispatch_background_task
+        from .tasks import export_payslips_task
+
+        bg_task = dispatch_background_task(
+            celery_task_func=export_payslips_task,
+            task_type=BackgroundTask.TaskType.PAYSLIP_GENERATION,
+            title=f"Exporting payslips for {int(month)}/{int(year)} ({total})",
+            school_id=school_id,
+            user=request.user,
+            task_kwargs=task_kwargs,
+            progress_total=total,
+        )
+        return Response({
+            'task_id': bg_task.celery_task_id,
+            'message': f'Payslip export started for {total} payslips.',
+        }, status=202)
+
     @action(detail=True, methods=['get'], url_path='download-pdf')
     def download_pdf(self, request, pk=None):
         """Generate and return a PDF payslip."""
         payslip = self.get_object()
         school = payslip.school
 
-        from fpdf import FPDF
         from django.http import HttpResponse
-        from datetime import datetime
-        import io
-        import httpx
-        import logging
-
-        logger = logging.getLogger(__name__)
+        from .payslip_pdf import PayslipRenderer, payslip_filename
 
-        MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
-                  'July', 'August', 'September', 'October', 'November', 'December']
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-
-        # School logo + header
-        logo_height = 0
-        if school.logo:
-            try:
-                resp = httpx.get(school.logo, timeout=10, follow_redirects=True)
-                resp.raise_for_status()
-                logo_path = io.BytesIO(resp.content)
-                logo_height = 18
-                pdf.image(logo_path, x=(210 - logo_height) / 2, y=pdf.get_y(), h=logo_height)
-                pdf.ln(logo_height + 2)
-            except Exception as e:
-                logger.warning("Failed to fetch school logo for payslip: %s", e)
-
-        pdf.set_font('Helvetica', 'B', 16)
-        pdf.cell(0, 10, school.name, ln=True, align='C')
-        if school.address:
-            pdf.set_font('Helvetica', '', 9)
-            pdf.cell(0, 5, school.address, ln=True, align='C')
-        contact_parts = []
-        if school.contact_email:
-            contact_parts.append(school.contact_email)
-        if school.contact_phone:
-            contact_parts.append(school.contact_phone)
-        if contact_parts:
-            pdf.set_font('Helvetica', '', 8)
-            pdf.cell(0, 5, ' | '.join(contact_parts), ln=True, align='C')
-
-        pdf.ln(3)
-        pdf.set_draw_color(0, 0, 0)
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        pdf.ln(5)
-
-        # Title
-        pdf.set_font('Helvetica', 'B', 14)
-        month_name = MONTHS[payslip.month - 1] if 1 <= payslip.month <= 12 else str(payslip.month)
-        pdf.cell(0, 10, f'Payslip - {month_name} {payslip.year}', ln=True, align='C')
-        pdf.ln(5)
-
-        # Staff details
-        staff = payslip.staff_member
-        details = [
-            ('Employee Name', staff.full_name),
-            ('Employee ID', staff.employee_id or 'N/A'),
-            ('Department', staff.department.name if staff.department else 'N/A'),
-            ('Designation', staff.designation.name if staff.designation else 'N/A'),
-            ('Status', payslip.get_status_display()),
-        ]
-        if payslip.payment_date:
-            details.append(('Payment Date', str(payslip.payment_date)))
-
-        for label, value in details:
-            pdf.set_font('Helvetica', 'B', 10)
-            pdf.cell(50, 7, f'{label}:', 0, 0)
-            pdf.set_font('Helvetica', '', 10)
-            pdf.cell(0, 7, str(value), ln=True)
-
-        pdf.ln(5)
-
-        # Earnings table
-        col_w = [130, 60]
-        pdf.set_font('Helvetica', 'B', 11)
-        pdf.cell(0, 8, 'Earnings', ln=True)
-        pdf.set_font('Helvetica', '', 10)
-        pdf.cell(col_w[0], 7, 'Basic Salary', 1)
-        pdf.cell(col_w[1], 7, str(payslip.basic_salary), 1, ln=True, align='R')
-
-        if payslip.allowances_breakdown:
-            for key, value in payslip.allowances_breakdown.items():
-                label = key.replace('_', ' ').title()
-                pdf.cell(col_w[0], 7, label, 1)
-                pdf.cell(col_w[1], 7, str(value), 1, ln=True, align='R')
-
-        pdf.set_font('Helvetica', 'B', 10)
-        gross = float(payslip.basic_salary) + float(payslip.total_allowances)
-        pdf.cell(col_w[0], 7, 'Gross Salary', 1)
-        pdf.cell(col_w[1], 7, f'{gross:,.2f}', 1, ln=True, align='R')
-
-        pdf.ln(5)
-
-        # Deductions table
-        pdf.set_font('Helvetica', 'B', 11)
-        pdf.cell(0, 8, 'Deductions', ln=True)
-        pdf.set_font('Helvetica', '', 10)
-
-        if payslip.deductions_breakdown:
-            for key, value in payslip.deductions_breakdown.items():
-                label = key.replace('_', ' ').title()
-                pdf.cell(col_w[0], 7, label, 1)
-                pdf.cell(col_w[1], 7, str(value), 1, ln=True, align='R')
-
-        pdf.set_font('Helvetica', 'B', 10)
-        pdf.cell(col_w[0], 7, 'Total Deductions', 1)
-        pdf.cell(col_w[1], 7, str(payslip.total_deductions), 1, ln=True, align='R')
-
-        pdf.ln(8)
-
-        # Net salary
-        pdf.set_font('Helvetica', 'B', 12)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(col_w[0], 10, 'Net Salary', 1, 0, fill=True)
-        pdf.cell(col_w[1], 10, str(payslip.net_salary), 1, ln=True, align='R', fill=True)
-
-        pdf.ln(15)
-
-        # Signatures
-        pdf.set_font('Helvetica', '', 10)
-        pdf.cell(95, 7, '_________________________', 0, 0, align='C')
-        pdf.cell(95, 7, '_________________________', 0, ln=True, align='C')
-        pdf.cell(95, 7, 'Employee Signature', 0, 0, align='C')
-        pdf.cell(95, 7, 'Authorized Signature', 0, ln=True, align='C')
-
-        pdf.ln(10)
-
-        # Footer
-        pdf.set_font('Helvetica', 'I', 8)
-        pdf.cell(0, 5, f'Generated on {datetime.now().strftime("%d %B %Y at %I:%M %p")}', ln=True, align='C')
-
-        staff_name = staff.full_name.replace(' ', '_')
-        filename = f"payslip_{staff_name}_{payslip.month}_{payslip.year}.pdf"
-        response = HttpResponse(bytes(pdf.output()), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        content = PayslipRenderer(school).render(payslip)
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{payslip_filename(payslip)}"'
         return response
 
 
@@ -1505,6 +1394,8 @@ class StaffAttendanceViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mo
 
         to_create = []
         to_update = []
+        # bulk_update skips auto_now; set it so incremental readers see the change.
+        now = timezone.now()
 
         for staff_id, payload in normalized_records.items():
             existing = existing_by_staff.get(staff_id)
@@ -1514,6 +1405,7 @@ class StaffAttendanceViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mo
                 existing.check_out = payload['check_out']
                 existing.notes = payload['notes']
                 existing.marked_by = request.user
+                existing.updated_at = now
                 to_update.append(existing)
             else:
                 to_create.append(StaffAttendance(
@@ -1533,7 +1425,7 @@ class StaffAttendanceViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.Mo
             if to_update:
                 StaffAttendance.objects.bulk_update(
                     to_update,
-                    ['status', 'check_in', 'check_out', 'notes', 'marked_by'],
+                    ['status', 'check_in', 'check_out', 'notes', 'marked_by', 'updated_at'],
                     batch_size=500,
                 )
 
@@ -362,3 +362,95 @@ class NotificationEngine:
                 failed += 1
 
         return {'sent': sent, 'failed': failed, 'skipped': skipped}
+
+
+def send_in_app_batch(items: list) -> list:
+    """
+    Persist many IN_APP notifications with a fixed number of queries.
+
+    In-app delivery is just the NotificationLog row (see InAppChannel), so a
+    batch can skip per-recipient dispatch. School config and recipient opt-outs
+    are still honoured exactly like NotificationEngine.send().
+
+    Args:
+        items: List of dicts with keys:
+            - school (School)
+            - event_type (str)
+            - recipient_user (User)
+            - recipient_type (str, default 'STAFF')
+            - title (str)
+            - body (str)
+            - student (Student, optional)
+
+    Returns:
+        list: Created NotificationLog entries (skipped items are omitted)
+    """
+    from .models import NotificationLog, NotificationPreference, SchoolNotificationConfig
+
+    if not items:
+        return []
+
+    school_ids = {item['school'].id for item in items}
+    user_ids = {item['recipient_user'].id for item in items}
+    event_types = {item['event_type'] for item in items}
+
+    disabled_school_ids = set(
+        SchoolNotificationConfig.objects
+        .filter(school_id__in=school_ids, in_app_enabled=False)
+        .values_list('school_id', flat=True)
+    )
+    opted_out = set(
+        NotificationPreference.objects
+        .filter(
+            school_id__in=school_ids,
+            user_id__in=user_ids,
+            channel='IN_APP',
+            event_type__in=event_types,
+            is_enabled=False,
+        )
+        .values_list('school_id', 'user_id', 'event_type')
+    )
+
+    now = timezone.now()
+    logs = []
+    for item in items:
+        school = item['school']
+        recipient_user = item['recipient_user']
+        if school.id in disabled_school_ids:
+            logger.info(
+                f"Channel IN_APP disabled for school {school.name}",
+                extra={'reason_code': REASON_SKIPPED_DUE_TO_CONFIG, 'channel': 'IN_APP'},
+            )
+            continue
+        if (school.id, recipient_user.id, item['event_type']) in opted_out:
+            logger.info(
+                f"Notification opted out: {item['event_type']}/IN_APP for {recipient_user.id}",
+                extra={'reason_code': REASON_SKIPPED_DUE_TO_CONFIG, 'channel': 'IN_APP'},
+            )
+            continue
+        logs.append(NotificationLog(
+            school=school,
+            channel='IN_APP',
+            event_type=item['event_type'],
+            recipient_type=item.get('recipient_type', 'STAFF'),
+            recipient_identifier=str(recipient_user.id),
+            recipient_user=recipient_user,
+            student=item.get('student'),
+            title=item['title'],
+            body=item['body'],
+            status='SENT',
+            sent_at=now,
+        ))
+
+    if logs:
+        from .unread_counter import adjust_unread_count
+
+        # bulk_create() skips post_save, so bump the unread counters here.
+        NotificationLog.objects.bulk_create(logs)
+        per_user = {}
+        for log in logs:
+            per_user[log.recipient_user_id] = per_user.get(log.recipient_user_id, 0) + 1
+        for user_id, delta in per_user.items():
+            adjust_unread_count(user_id, delta)
+        logger.info(f"In-app notifications created in batch: {len(logs)}")
+    return logs
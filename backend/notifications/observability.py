@@ -28,9 +28,15 @@ def mark_log_failed(log, reason_code, error=None, retriable=False, extra_metadat
     if extra_metadata:
         payload.update(extra_metadata)
 
+    was_failed = log.status == 'FAILED'
     log.status = 'FAILED'
     log.metadata = merge_metadata(log.metadata, payload)
     log.save(update_fields=['status', 'metadata'])
+
+    if not was_failed and log.channel == 'IN_APP':
+        # FAILED logs are excluded from the bell badge.
+        from .unread_counter import invalidate_unread_count
+        invalidate_unread_count(log.recipient_user_id)
     return log
 
 
@@ -0,0 +1,20 @@
+"""
+Django signals for notifications app.
+Keeps the cached unread counter in step with new in-app logs.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .unread_counter import adjust_unread_count
+
+
+@receiver(post_save, sender='notifications.NotificationLog')
+def bump_unread_count_on_create(sender, instance, created, **kwargs):
+    """Count a newly created, unread IN_APP log towards its recipient's badge."""
+    if not created:
+        return
+    if instance.channel != 'IN_APP' or not instance.recipient_user_id:
+        return
+    if instance.read_at is not None or instance.status == 'FAILED':
+        return
+    adjust_unread_count(instance.recipient_user_id, 1)
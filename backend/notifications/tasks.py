@@ -199,17 +199,17 @@ def send_class_teacher_attendance_reminders():
     - Student attendance is not yet marked for class/date
     """
     from schools.models import School
-    from .triggers import trigger_class_teacher_attendance_pending
+    from .triggers import trigger_class_teacher_attendance_pending_for_schools
 
     today = timezone.localdate()
-    schools = School.objects.filter(is_active=True)
+    schools = list(School.objects.filter(is_active=True))
     total_sent = 0
 
-    for school in schools:
-        try:
-            total_sent += trigger_class_teacher_attendance_pending(school, today)
-        except Exception as e:
-            logger.error(f"Class-teacher attendance reminder failed for {school.name}: {e}")
+    try:
+        sent_by_school = trigger_class_teacher_attendance_pending_for_schools(schools, today)
+        total_sent = sum(sent_by_school.values())
+    except Exception as e:
+        logger.error(f"Class-teacher attendance reminders failed: {e}")
 
     logger.info(f"Class-teacher attendance reminders complete: {total_sent} teachers notified")
     return {'total_sent': total_sent, 'date': str(today)}
@@ -225,6 +225,7 @@ def process_notification_queue():
     """
     from .models import NotificationLog
     from .engine import NotificationEngine
+    from .unread_counter import invalidate_unread_count
 
     cutoff = timezone.now() - timezone.timedelta(minutes=1)
 
@@ -264,9 +265,12 @@ def process_notification_queue():
                 body=log.body,
             )
             if success:
+                was_failed = log.status == 'FAILED'
                 log.status = 'SENT'
                 log.sent_at = timezone.now()
                 log.save(update_fields=['status', 'sent_at'])
+                if was_failed and log.channel == 'IN_APP':
+                    invalidate_unread_count(log.recipient_user_id)
             else:
                 mark_log_failed(
                     log,
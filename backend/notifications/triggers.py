@@ -427,134 +427,265 @@ def _get_admin_users(school):
     return get_admin_users(school)
 
 
-def trigger_class_teacher_attendance_pending(school, target_date=None):
+def _off_day_class_keys(school_ids, target_date):
     """
-    Notify class teachers at/after 11:00 if student attendance is still not marked.
+    Resolve OFF days for many schools with one calendar query.
 
-    Conditions:
-    1) Day is NOT an OFF day for that class
-    2) Teacher is marked PRESENT for that date
-    3) No student attendance record exists for that class/date
+    Returns (off_school_ids, off_class_keys) where off_class_keys holds
+    (school_id, class_id) pairs covered by CLASS-scoped entries. Mirrors
+    academic_sessions.calendar_rules.is_off_day_for_date (Sundays included).
+    """
+    from academic_sessions.models import SchoolCalendarEntry
+
+    if target_date.weekday() == 6:
+        return set(school_ids), set()
+
+    rows = (
+        SchoolCalendarEntry.objects
+        .filter(
+            school_id__in=school_ids,
+            is_active=True,
+            entry_kind=SchoolCalendarEntry.EntryKind.OFF_DAY,
+            start_date__lte=target_date,
+            end_date__gte=target_date,
+        )
+        .exclude(off_day_type='')
+        .values_list('school_id', 'scope', 'classes__id')
+    )
+
+    off_school_ids = set()
+    off_class_keys = set()
+    for school_id, scope, class_id in rows:
+        if scope == SchoolCalendarEntry.Scope.SCHOOL:
+            off_school_ids.add(school_id)
+        elif class_id:
+            off_class_keys.add((school_id, class_id))
+    return off_school_ids, off_class_keys
+
+
+def collect_class_teacher_attendance_pending(schools, target_date):
+    """
+    Compute pending class-teacher attendance reminders for many schools at once.
+
+    Uses a fixed number of grouped queries (assignments, calendar, staff
+    attendance, class rosters, marked attendance, dedupe) regardless of how
+    many schools or assignments are involved.
+
+    Returns:
+        list of dicts ready for engine.send_in_app_batch()
     """
-    from django.db.models import Q
-    from academic_sessions.calendar_rules import is_off_day_for_date
     from academics.models import ClassTeacherAssignment
+    from academic_sessions.models import StudentEnrollment
     from attendance.models import AttendanceRecord
     from hr.models import StaffAttendance
     from students.models import Student
-    from .engine import NotificationEngine
-    from .models import NotificationLog
-
-    local_now = timezone.localtime()
-    target_date = target_date or local_now.date()
+    from .models import NotificationLog, SchoolNotificationConfig
 
-    config = _get_config(school)
-    if config and not config.class_teacher_attendance_reminder_enabled:
-        return 0
+    schools_by_id = {school.id: school for school in schools}
+    if not schools_by_id:
+        return []
 
-    # Guard to avoid early execution if task is manually invoked before 11:00.
-    if local_now.hour < 11 and target_date == local_now.date():
-        return 0
+    disabled_school_ids = set(
+        SchoolNotificationConfig.objects
+        .filter(
+            school_id__in=schools_by_id.keys(),
+            class_teacher_attendance_reminder_enabled=False,
+        )
+        .values_list('school_id', flat=True)
+    )
+    school_ids = set(schools_by_id) - disabled_school_ids
+    if not school_ids:
+        return []
 
-    engine = NotificationEngine(school)
-    assignments = (
+    assignments = list(
         ClassTeacherAssignment.objects
         .filter(
-            school=school,
+            school_id__in=school_ids,
             is_active=True,
+            teacher__user__isnull=False,
         )
         .filter(Q(academic_year__isnull=True) | Q(academic_year__is_current=True))
         .select_related('teacher', 'teacher__user', 'class_obj', 'session_class')
+        .order_by('school_id', 'id')
     )
-
-    sent = 0
-    for assignment in assignments:
-        teacher = assignment.teacher
-        teacher_user = getattr(teacher, 'user', None)
-        if not teacher_user:
-            continue
-
-        class_obj = assignment.class_obj
-        if not class_obj:
-            continue
-
-        if is_off_day_for_date(school.id, target_date, class_id=class_obj.id):
-            continue
-
-        is_teacher_present = StaffAttendance.objects.filter(
-            school=school,
-            staff_member=teacher,
+    if not assignments:
+        return []
+
+    off_school_ids, off_class_keys = _off_day_class_keys(school_ids, target_date)
+    assignments = [
+        a for a in assignments
+        if a.school_id not in off_school_ids
+        and (a.school_id, a.class_obj_id) not in off_class_keys
+    ]
+    if not assignments:
+        return []
+
+    present_staff_ids = set(
+        StaffAttendance.objects
+        .filter(
+            school_id__in=school_ids,
+            staff_member_id__in={a.teacher_id for a in assignments},
             date=target_date,
             status=StaffAttendance.Status.PRESENT,
-        ).exists()
-        if not is_teacher_present:
-            continue
-
-        students_qs = Student.objects.filter(
-            school=school,
-            is_active=True,
         )
-        attendance_qs = AttendanceRecord.objects.filter(
-            school=school,
-            date=target_date,
+        .values_list('school_id', 'staff_member_id')
+    )
+    assignments = [a for a in assignments if (a.school_id, a.teacher_id) in present_staff_ids]
+    if not assignments:
+        return []
+
+    # Classes are keyed by (school_id, academic_year_id or None, class_id).
+    year_assignments = [a for a in assignments if a.academic_year_id]
+    legacy_assignments = [a for a in assignments if not a.academic_year_id]
+    class_ids = {a.class_obj_id for a in assignments}
+
+    rostered_keys = set()
+    marked_keys = set()
+    if year_assignments:
+        year_ids = {a.academic_year_id for a in year_assignments}
+        rostered_keys.update(
+            StudentEnrollment.objects
+            .filter(
+                student__school_id__in=school_ids,
+                student__is_active=True,
+                academic_year_id__in=year_ids,
+                class_obj_id__in=class_ids,
+                is_active=True,
+            )
+            .values_list('student__school_id', 'academic_year_id', 'class_obj_id')
+            .distinct()
         )
-
-        if assignment.academic_year_id:
-            students_qs = students_qs.filter(
-                enrollments__academic_year_id=assignment.academic_year_id,
-                enrollments__class_obj_id=class_obj.id,
-                enrollments__is_active=True,
-            ).distinct()
-            attendance_qs = attendance_qs.filter(
-                student__enrollments__academic_year_id=assignment.academic_year_id,
-                student__enrollments__class_obj_id=class_obj.id,
+        marked_keys.update(
+            AttendanceRecord.objects
+            .filter(
+                school_id__in=school_ids,
+                date=target_date,
+                student__enrollments__academic_year_id__in=year_ids,
+                student__enrollments__class_obj_id__in=class_ids,
                 student__enrollments__is_active=True,
-            ).distinct()
-        else:
-            students_qs = students_qs.filter(class_obj=class_obj)
-            attendance_qs = attendance_qs.filter(student__class_obj=class_obj)
+            )
+            .values_list(
+                'school_id',
+                'student__enrollments__academic_year_id',
+                'student__enrollments__class_obj_id',
+            )
+            .distinct()
+        )
+    if legacy_assignments:
+        rostered_keys.update(
+            (school_id, None, class_id)
+            for school_id, class_id in (
+                Student.objects
+                .filter(school_id__in=school_ids, is_active=True, class_obj_id__in=class_ids)
+                .values_list('school_id', 'class_obj_id')
+                .distinct()
+            )
+        )
+        marked_keys.update(
+            (school_id, None, class_id)
+            for school_id, class_id in (
+                AttendanceRecord.objects
+                .filter(
+                    school_id__in=school_ids,
+                    date=target_date,
+                    student__class_obj_id__in=class_ids,
+                )
+                .values_list('school_id', 'student__class_obj_id')
+                .distinct()
+            )
+        )
 
-        if not students_qs.exists():
-            continue
-        if attendance_qs.exists():
+    already_sent = set(
+        NotificationLog.objects
+        .filter(
+            school_id__in=school_ids,
+            channel='IN_APP',
+            event_type='GENERAL',
+            recipient_user_id__in={a.teacher.user_id for a in assignments},
+            title__startswith='Attendance Reminder - ',
+            created_at__date=target_date,
+        )
+        .values_list('school_id', 'recipient_user_id', 'title', 'body')
+    )
+
+    pending = []
+    for assignment in assignments:
+        key = (assignment.school_id, assignment.academic_year_id, assignment.class_obj_id)
+        if key not in rostered_keys or key in marked_keys:
             continue
 
+        teacher = assignment.teacher
+        teacher_user = teacher.user
+        class_obj = assignment.class_obj
         class_label = class_obj.name
         if assignment.session_class and assignment.session_class.section:
             class_label = f"{class_obj.name} - {assignment.session_class.section}"
 
-        full_name = teacher.full_name
         title = f"Attendance Reminder - {class_label}"
-        body = f"Dear {full_name}, you are class teacher of class {class_label}, Please mark attendance"
+        body = f"Dear {teacher.full_name}, you are class teacher of class {class_label}, Please mark attendance"
 
-        already_sent = NotificationLog.objects.filter(
-            school=school,
-            channel='IN_APP',
-            event_type='GENERAL',
-            recipient_user=teacher_user,
-            title=title,
-            body=body,
-            created_at__date=target_date,
-        ).exists()
-        if already_sent:
+        dedupe_key = (assignment.school_id, teacher_user.id, title, body)
+        if dedupe_key in already_sent:
             continue
+        already_sent.add(dedupe_key)
 
-        engine.send(
-            event_type='GENERAL',
-            channel='IN_APP',
-            context={},
-            recipient_identifier=str(teacher_user.id),
-            recipient_type='STAFF',
-            recipient_user=teacher_user,
-            title=title,
-            body=body,
-        )
-        sent += 1
+        pending.append({
+            'school': schools_by_id[assignment.school_id],
+            'event_type': 'GENERAL',
+            'recipient_user': teacher_user,
+            'recipient_type': 'STAFF',
+            'title': title,
+            'body': body,
+        })
+    return pending
+
+
+def trigger_class_teacher_attendance_pending_for_schools(schools, target_date=None):
+    """
+    Notify class teachers at/after 11:00 if student attendance is still not marked.
+
+    Conditions:
+    1) Day is NOT an OFF day for that class
+    2) Teacher is marked PRESENT for that date
+    3) No student attendance record exists for that class/date
+
+    The pending set is resolved with grouped queries across all given schools
+    and delivered with one batched in-app insert.
+
+    Returns:
+        dict: {school_id: sent_count}
+    """
+    from .engine import send_in_app_batch
+
+    local_now = timezone.localtime()
+    target_date = target_date or local_now.date()
+
+    # Guard to avoid early execution if task is manually invoked before 11:00.
+    if local_now.hour < 11 and target_date == local_now.date():
+        return {}
+
+    pending = collect_class_teacher_attendance_pending(schools, target_date)
+    logs = send_in_app_batch(pending)
+
+    sent_by_school = {}
+    for log in logs:
+        sent_by_school[log.school_id] = sent_by_school.get(log.school_id, 0) + 1
 
     logger.info(
-        f"Class-teacher attendance reminders sent: {sent} for {school.name} on {target_date}"
+        f"Class-teacher attendance reminders sent: {len(logs)} across "
+        f"{len(sent_by_school)} schools on {target_date}"
     )
-    return sent
+    return sent_by_school
+
+
+def trigger_class_teacher_attendance_pending(school, target_date=None):
+    """
+    Notify one school's class teachers if student attendance is still not marked.
+
+    See trigger_class_teacher_attendance_pending_for_schools() for conditions.
+    """
+    sent_by_school = trigger_class_teacher_attendance_pending_for_schools([school], target_date)
+    return sent_by_school.get(school.id, 0)
 
 
 def trigger_class_teacher_fee_pending(school, month, year):
@@ -0,0 +1,79 @@
+"""
+Cached per-user unread counter for in-app notifications.
+
+The bell badge is polled by every web and mobile client, so the count is kept
+in the cache and adjusted when IN_APP logs are created or marked read instead
+of running COUNT(*) over NotificationLog on each poll. A cache miss (cold
+start, eviction, TTL expiry or explicit invalidation) reconciles the counter
+against the table, which bounds any drift to UNREAD_COUNT_TTL_SECONDS.
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_TTL_SECONDS = 15 * 60
+
+
+def _cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_queryset(user_id):
+    """Source-of-truth queryset for a user's unread in-app notifications."""
+    from .models import NotificationLog
+
+    return NotificationLog.objects.filter(
+        recipient_user_id=user_id,
+        channel='IN_APP',
+        read_at__isnull=True,
+    ).exclude(status='FAILED')
+
+
+def reconcile_unread_count(user_id):
+    """Recount unread notifications from the table and refresh the cache."""
+    count = unread_queryset(user_id).count()
+    cache.set(_cache_key(user_id), count, UNREAD_COUNT_TTL_SECONDS)
+    return count
+
+
+def get_unread_count(user_id):
+    """Return the cached unread count, reconciling on a cache miss."""
+    count = cache.get(_cache_key(user_id))
+    if count is None:
+        return reconcile_unread_count(user_id)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Apply a delta to a cached counter.
+
+    Missing counters are left missing: the next read reconciles them, so
+    there is nothing to adjust. A negative result means the cache drifted
+    and is dropped for the same reason. django-redis returns None instead of
+    raising when Redis is unreachable (DJANGO_REDIS_IGNORE_EXCEPTIONS).
+    """
+    if not user_id or not delta:
+        return
+    key = _cache_key(user_id)
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        return
+    if value is not None and value < 0:
+        cache.delete(key)
+
+
+def set_unread_count(user_id, count):
+    """Store a known-exact count (e.g. 0 after mark-all-read)."""
+    if user_id:
+        cache.set(_cache_key(user_id), count, UNREAD_COUNT_TTL_SECONDS)
+
+
+def invalidate_unread_count(user_id):
+    """Drop a counter so the next read reconciles it against the table."""
+    if user_id:
+        cache.delete(_cache_key(user_id))
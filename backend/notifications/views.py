@@ -27,6 +27,7 @@ from .serializers import (
     BroadcastNotificationSerializer,
 )
 from .engine import NotificationEngine
+from .unread_counter import adjust_unread_count, get_unread_count, set_unread_count
 
 
 class NotificationTemplateViewSet(ModuleAccessMixin, TenantQuerySetMixin, viewsets.ModelViewSet):
@@ -132,13 +133,7 @@ class UnreadCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        count = NotificationLog.objects.filter(
-            recipient_user=request.user,
-            channel='IN_APP',
-            read_at__isnull=True,
-        ).exclude(status='FAILED').count()
-
-        return Response({'unread_count': count})
+        return Response({'unread_count': get_unread_count(request.user.id)})
 
 
 class MarkReadView(APIView):
@@ -154,9 +149,16 @@ class MarkReadView(APIView):
         except NotificationLog.DoesNotExist:
             return Response({'error': 'Not found'}, status=404)
 
+        was_unread = (
+            log.channel == 'IN_APP'
+            and log.read_at is None
+            and log.status != 'FAILED'
+        )
         log.read_at = timezone.now()
         log.status = 'READ'
         log.save(update_fields=['read_at', 'status'])
+        if was_unread:
+            adjust_unread_count(request.user.id, -1)
         return Response({'status': 'read'})
 
 
@@ -170,6 +172,7 @@ class MarkAllReadView(APIView):
             channel='IN_APP',
             read_at__isnull=True,
         ).update(read_at=timezone.now(), status='READ')
+        set_unread_count(request.user.id, 0)
 
         return Response({'marked_read': updated})
 
@@ -8,7 +8,6 @@ import re
 import logging
 from datetime import datetime
 
-import httpx
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
@@ -16,6 +15,8 @@ from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+from core.school_assets import get_school_letterhead
+
 logger = logging.getLogger(__name__)
 
 PAGE_WIDTH, PAGE_HEIGHT = A4
@@ -55,18 +56,12 @@ class LetterPDFGenerator:
         return base
 
     def _fetch_letterhead(self):
-        """Download letterhead image from school's Supabase URL."""
-        url = getattr(self.school, 'letterhead_url', None)
-        if not url:
-            logger.info("No letterhead_url for school %s, using white background", self.school.id)
-            return None
-        try:
-            resp = httpx.get(url, timeout=15, follow_redirects=True)
-            resp.raise_for_status()
-            return ImageReader(io.BytesIO(resp.content))
-        except Exception as e:
-            logger.warning("Failed to fetch letterhead for school %s: %s", self.school.id, e)
+        """Load the school's letterhead image through the shared asset cache."""
+        data = get_school_letterhead(self.school)
+        if not data:
+            logger.info("No letterhead for school %s, using white background", self.school.id)
             return None
+        return ImageReader(io.BytesIO(data))
 
     def _draw_background(self, c):
         """Draw letterhead image as full-page background, or white fallback."""
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_customletter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Content hash of school/type/format/parameters/data version (see reports.result_cache)', max_length=64),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:00
+
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+import reports.storage
+
+
+def move_blobs_to_storage(apps, schema_editor):
+    """Write existing in-database report blobs to the artifact storage."""
+    GeneratedReport = apps.get_model('reports', 'GeneratedReport')
+    pending = (
+        GeneratedReport.objects
+        .filter(file_content__isnull=False, file='')
+        .values_list('id', flat=True)
+    )
+    for report_id in pending.iterator(chunk_size=100):
+        report = GeneratedReport.objects.get(id=report_id)
+        content = bytes(report.file_content)
+        ext = 'xlsx' if report.format == 'XLSX' else 'pdf'
+        report.file_size = len(content)
+        report.file.save(f"{report.report_type.lower()}.{ext}", ContentFile(content), save=False)
+        report.file_content = None
+        report.save(update_fields=['file', 'file_size', 'file_content'])
+
+
+def restore_blobs_from_storage(apps, schema_editor):
+    GeneratedReport = apps.get_model('reports', 'GeneratedReport')
+    for report in GeneratedReport.objects.exclude(file='').iterator(chunk_size=100):
+        with report.file.open('rb') as fh:
+            report.file_content = fh.read()
+        report.save(update_fields=['file_content'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_generatedreport_cache_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='file',
+            field=models.FileField(blank=True, default='', help_text='Rendered artifact in the report storage backend (see reports.storage)', max_length=255, storage=reports.storage.get_report_artifact_storage, upload_to=reports.storage.report_artifact_upload_path),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='file_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(move_blobs_to_storage, restore_blobs_from_storage),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_generatedreport_file_storage'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='generatedreport',
+            name='file_content',
+        ),
+    ]
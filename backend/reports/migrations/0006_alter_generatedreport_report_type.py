@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_remove_generatedreport_file_content'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='report_type',
+            field=models.CharField(choices=[('ATTENDANCE_DAILY', 'Daily Attendance'), ('ATTENDANCE_MONTHLY', 'Monthly Attendance'), ('ATTENDANCE_TERM', 'Term Attendance'), ('FEE_COLLECTION', 'Fee Collection Summary'), ('FEE_DEFAULTERS', 'Fee Defaulters List'), ('FEE_RECEIPT', 'Fee Receipt'), ('STUDENT_PROGRESS', 'Student Progress Report'), ('CLASS_RESULT', 'Class Result Summary'), ('STUDENT_COMPREHENSIVE', 'Student Comprehensive Report'), ('REPORT_CARDS', 'Report Cards (Batch)')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_alter_generatedreport_report_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='format',
+            field=models.CharField(choices=[('PDF', 'PDF'), ('XLSX', 'Excel'), ('ZIP', 'Zip Archive')], default='PDF', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='report_type',
+            field=models.CharField(choices=[('ATTENDANCE_DAILY', 'Daily Attendance'), ('ATTENDANCE_MONTHLY', 'Monthly Attendance'), ('ATTENDANCE_TERM', 'Term Attendance'), ('FEE_COLLECTION', 'Fee Collection Summary'), ('FEE_DEFAULTERS', 'Fee Defaulters List'), ('FEE_RECEIPT', 'Fee Receipt'), ('STUDENT_PROGRESS', 'Student Progress Report'), ('CLASS_RESULT', 'Class Result Summary'), ('STUDENT_COMPREHENSIVE', 'Student Comprehensive Report'), ('REPORT_CARDS', 'Report Cards (Batch)'), ('PAYSLIPS', 'Payslips (Batch)')], max_length=30),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from .storage import get_report_artifact_storage, report_artifact_upload_path
+
 
 class GeneratedReport(models.Model):
     """Tracks generated reports for download and audit."""
@@ -15,11 +17,14 @@ class GeneratedReport(models.Model):
         ('STUDENT_PROGRESS', 'Student Progress Report'),
         ('CLASS_RESULT', 'Class Result Summary'),
         ('STUDENT_COMPREHENSIVE', 'Student Comprehensive Report'),
+        ('REPORT_CARDS', 'Report Cards (Batch)'),
+        ('PAYSLIPS', 'Payslips (Batch)'),
     ]
 
     FORMAT_CHOICES = [
         ('PDF', 'PDF'),
         ('XLSX', 'Excel'),
+        ('ZIP', 'Zip Archive'),
     ]
 
     school = models.ForeignKey(
@@ -31,8 +36,23 @@ class GeneratedReport(models.Model):
     title = models.CharField(max_length=200)
     parameters = models.JSONField(default=dict, blank=True)
     file_url = models.URLField(blank=True, default='')
-    file_content = models.BinaryField(null=True, blank=True, help_text='In-memory report for direct download')
+    file = models.FileField(
+        upload_to=report_artifact_upload_path,
+        storage=get_report_artifact_storage,
+        max_length=255,
+        blank=True,
+        default='',
+        help_text='Rendered artifact in the report storage backend (see reports.storage)',
+    )
+    file_size = models.PositiveIntegerField(default=0)
     format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='PDF')
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        db_index=True,
+        help_text='Content hash of school/type/format/parameters/data version (see reports.result_cache)',
+    )
     generated_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
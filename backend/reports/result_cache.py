@@ -0,0 +1,137 @@
+"""
+Content-addressed cache for generated report artifacts.
+
+A report is identified by a hash of (school, report type, format, normalized
+parameters, data-version watermark). The watermark is a cheap aggregate over
+the source tables a report reads, scoped to the school, so any insert, delete
+or save on those tables yields a new key and the next request regenerates.
+Repeat requests for unchanged data reuse the existing GeneratedReport.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import date
+
+from django.apps import apps
+from django.db.models import Count, Max
+
+logger = logging.getLogger(__name__)
+
+_STUDENT_SOURCES = [
+    'students.Student',
+    'students.Class',
+    'academic_sessions.StudentEnrollment',
+]
+_ATTENDANCE_SOURCES = ['attendance.AttendanceRecord'] + _STUDENT_SOURCES
+_FEE_SOURCES = ['finance.FeePayment'] + _STUDENT_SOURCES
+_ACADEMIC_SOURCES = [
+    'examinations.StudentMark',
+    'examinations.ExamSubject',
+    'examinations.Exam',
+] + _STUDENT_SOURCES
+
+# Source tables whose changes invalidate each report type.
+REPORT_SOURCE_MODELS = {
+    'ATTENDANCE_DAILY': _ATTENDANCE_SOURCES,
+    'ATTENDANCE_MONTHLY': _ATTENDANCE_SOURCES,
+    'FEE_COLLECTION': _FEE_SOURCES,
+    'FEE_DEFAULTERS': _FEE_SOURCES,
+    'CLASS_RESULT': _ACADEMIC_SOURCES,
+    'STUDENT_PROGRESS': _ACADEMIC_SOURCES,
+    'STUDENT_COMPREHENSIVE': (
+        ['attendance.AttendanceRecord', 'finance.FeePayment'] + _ACADEMIC_SOURCES
+    ),
+}
+
+
+# Period parameters the generators default to the current date when omitted.
+_PERIOD_DEFAULTS = {
+    'ATTENDANCE_DAILY': lambda today: {'date': today.isoformat()},
+    'ATTENDANCE_MONTHLY': lambda today: {'month': today.month, 'year': today.year},
+    'FEE_COLLECTION': lambda today: {'month': today.month, 'year': today.year},
+    'FEE_DEFAULTERS': lambda today: {'month': today.month, 'year': today.year},
+}
+
+
+def resolve_period_parameters(report_type, parameters):
+    """
+    Fill in the period a generator would pick for missing date/month/year
+    parameters, so a parameterless daily or monthly report keys on the day
+    or month it covers.
+    """
+    resolved = dict(parameters or {})
+    defaults = _PERIOD_DEFAULTS.get(report_type)
+    if defaults:
+        for key, value in defaults(date.today()).items():
+            if resolved.get(key) in (None, ''):
+                resolved[key] = value
+    return resolved
+
+
+def _normalize_value(value):
+    if isinstance(value, dict):
+        return normalize_parameters(value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    return str(value)
+
+
+def normalize_parameters(parameters):
+    """Drop empty values and stringify scalars so equivalent requests hash alike."""
+    normalized = {}
+    for key, value in (parameters or {}).items():
+        if value in (None, '', [], {}):
+            continue
+        normalized[str(key)] = _normalize_value(value)
+    return normalized
+
+
+def data_watermark(school_id, report_type):
+    """
+    Return a fingerprint of the school's rows in every source table.
+
+    Each table contributes (row count, max id, latest updated_at), so
+    inserts, deletes and model saves all move the watermark.
+    """
+    watermark = []
+    for label in REPORT_SOURCE_MODELS.get(report_type, []):
+        model = apps.get_model(label)
+        stats = model.objects.filter(school_id=school_id).aggregate(
+            rows=Count('id'),
+            max_id=Max('id'),
+            latest=Max('updated_at'),
+        )
+        watermark.append([
+            label,
+            stats['rows'],
+            stats['max_id'],
+            stats['latest'].isoformat() if stats['latest'] else None,
+        ])
+    return watermark
+
+
+def report_cache_key(school_id, report_type, format, parameters):
+    """Content hash identifying a report artifact for the current data version."""
+    payload = {
+        'school': school_id,
+        'report_type': report_type,
+        'format': format,
+        'parameters': normalize_parameters(resolve_period_parameters(report_type, parameters)),
+        'watermark': data_watermark(school_id, report_type),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def find_cached_report(school_id, cache_key):
+    """Return the newest stored artifact for a cache key, if any."""
+    from .models import GeneratedReport
+
+    return (
+        GeneratedReport.objects
+        .filter(school_id=school_id, cache_key=cache_key)
+        .exclude(file='')
+        .order_by('-created_at')
+        .first()
+    )
@@ -11,7 +11,7 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
         model = GeneratedReport
         fields = [
             'id', 'school', 'report_type', 'title', 'parameters',
-            'file_url', 'format', 'generated_by', 'created_at',
+            'file_url', 'file_size', 'format', 'generated_by', 'created_at',
         ]
         read_only_fields = fields
 
@@ -0,0 +1,21 @@
+"""
+Django signals for reports app.
+Removes stored artifacts when their GeneratedReport row is deleted.
+"""
+import logging
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_delete, sender='reports.GeneratedReport')
+def delete_report_artifact(sender, instance, **kwargs):
+    """Delete the artifact file so storage does not accumulate orphans."""
+    if not instance.file:
+        return
+    try:
+        instance.file.delete(save=False)
+    except Exception as e:
+        logger.warning(f"Failed to delete artifact {instance.file.name}: {e}")
@@ -0,0 +1,110 @@
+"""
+Pluggable storage for generated report artifacts.
+
+Rendered PDFs/XLSX files live outside the database so report rows stay small
+and downloads can be streamed. The backend is chosen by the
+REPORT_ARTIFACT_STORAGE setting:
+
+    'local'     FileSystemStorage under MEDIA_ROOT (default)
+    'supabase'  the Supabase bucket configured for core.storage
+"""
+
+import os
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from core.storage import storage_service
+
+
+REPORT_CONTENT_TYPES = {
+    'PDF': 'application/pdf',
+    'XLSX': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'ZIP': 'application/zip',
+}
+
+REPORT_EXTENSIONS = {
+    'PDF': 'pdf',
+    'XLSX': 'xlsx',
+    'ZIP': 'zip',
+}
+
+
+@deconstructible
+class ReportArtifactSupabaseStorage(Storage):
+    """Store report artifacts in the Supabase bucket under reports/ prefix."""
+
+    def _normalize(self, name: str) -> str:
+        return name.replace('\\', '/').lstrip('/').strip()
+
+    def _save(self, name, content):
+        if not storage_service.is_configured():
+            raise ImproperlyConfigured('Supabase storage is not configured for report artifacts.')
+
+        path = self._normalize(name)
+        file_bytes = content.read()
+        content_type = getattr(content, 'content_type', 'application/octet-stream')
+
+        storage_service.client.storage.from_(storage_service.bucket).upload(
+            path=path,
+            file=file_bytes,
+            file_options={'content-type': content_type},
+        )
+
+        return path
+
+    def _open(self, name, mode='rb'):
+        path = self._normalize(name)
+        data = storage_service.client.storage.from_(storage_service.bucket).download(path)
+        return ContentFile(data, name=os.path.basename(path))
+
+    def exists(self, name):
+        # Paths are generated uniquely in upload_to.
+        return False
+
+    def size(self, name):
+        return len(self._open(name).read())
+
+    def url(self, name):
+        path = self._normalize(name)
+        return storage_service.client.storage.from_(storage_service.bucket).get_public_url(path)
+
+    def delete(self, name):
+        path = self._normalize(name)
+        storage_service.delete_file(path)
+
+
+def get_report_artifact_storage():
+    """Return the storage backend selected by REPORT_ARTIFACT_STORAGE."""
+    backend = getattr(settings, 'REPORT_ARTIFACT_STORAGE', 'local')
+    if backend == 'supabase':
+        return ReportArtifactSupabaseStorage()
+    if backend == 'local':
+        return FileSystemStorage()
+    raise ImproperlyConfigured(f"Unknown REPORT_ARTIFACT_STORAGE backend: {backend!r}")
+
+
+def report_artifact_upload_path(instance, filename):
+    created_at = getattr(instance, 'created_at', None) or timezone.now()
+    return f"reports/{instance.school_id}/{created_at:%Y/%m}/{uuid4().hex}_{filename}"
+
+
+def report_filename(report):
+    """Download filename for a report, e.g. report_42.pdf."""
+    ext = REPORT_EXTENSIONS.get(report.format, 'pdf')
+    return f"report_{report.id}.{ext}" if report.id else f"report.{ext}"
+
+
+def store_report_artifact(report, content, save=True):
+    """Write rendered bytes to the artifact storage and attach them to the report."""
+    artifact = ContentFile(content)
+    artifact.content_type = REPORT_CONTENT_TYPES.get(report.format, 'application/octet-stream')
+    ext = REPORT_EXTENSIONS.get(report.format, 'pdf')
+    slug = report.report_type.lower()
+    report.file_size = len(content)
+    report.file.save(f"{slug}.{ext}", artifact, save=save)
@@ -4,10 +4,24 @@ Background tasks for report generation.
 
 import logging
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
 
+def _report_result_data(report, cached=False):
+    label = report.report_type.replace('_', ' ').title()
+    return {
+        'report_id': report.id,
+        'report_type': report.report_type,
+        'format': report.format,
+        'download_url': f'/api/reports/{report.id}/download/',
+        'message': f'{label} report ready (unchanged data).' if cached else f'{label} report generated.',
+        'cached': cached,
+    }
+
+
 @shared_task(bind=True, max_retries=1, time_limit=600)
 def generate_report_task(self, school_id, user_id, report_type, format, parameters):
     """Generate a report asynchronously and store the result."""
@@ -20,6 +34,7 @@ def generate_report_task(self, school_id, user_id, report_type, format, paramete
 
         # Step 1: Load generator
         from reports.views import _get_generator_class
+        from reports.result_cache import find_cached_report, report_cache_key
         from schools.models import School
 
         school = School.objects.get(id=school_id)
@@ -28,6 +43,14 @@ def generate_report_task(self, school_id, user_id, report_type, format, paramete
             mark_task_failed(task_id, f"Unknown report type: {report_type}")
             return {'success': False, 'error': f"Unknown report type: {report_type}"}
 
+        # Reuse an artifact already rendered for the same request and data version.
+        cache_key = report_cache_key(school_id, report_type, format, parameters)
+        cached = find_cached_report(school_id, cache_key)
+        if cached:
+            result_data = _report_result_data(cached, cached=True)
+            mark_task_success(task_id, result_data=result_data)
+            return result_data
+
         update_task_progress(task_id, current=1)
 
         # Step 2: Generate content
@@ -41,23 +64,20 @@ def generate_report_task(self, school_id, user_id, report_type, format, paramete
         from django.contrib.auth import get_user_model
         User = get_user_model()
 
-        report = GeneratedReport.objects.create(
+        from reports.storage import store_report_artifact
+
+        report = GeneratedReport(
             school=school,
             report_type=report_type,
             title=f"{report_type.replace('_', ' ').title()} Report",
             parameters=parameters,
             format=format,
-            file_content=content,
+            cache_key=cache_key,
             generated_by=User.objects.get(id=user_id),
         )
+        store_report_artifact(report, content)
 
-        result_data = {
-            'report_id': report.id,
-            'report_type': report_type,
-            'format': format,
-            'download_url': f'/api/reports/{report.id}/download/',
-            'message': f'{report_type.replace("_", " ").title()} report generated.',
-        }
+        result_data = _report_result_data(report)
 
         mark_task_success(task_id, result_data=result_data)
         return result_data
@@ -66,3 +86,28 @@ def generate_report_task(self, school_id, user_id, report_type, format, paramete
         logger.exception(f"Report generation failed: {e}")
         mark_task_failed(task_id, str(e))
         raise
+
+
+@shared_task
+def cleanup_expired_reports(days=None):
+    """
+    Delete generated reports older than the retention window.
+
+    Args:
+        days: Retention in days (defaults to REPORT_ARTIFACT_RETENTION_DAYS)
+    """
+    from reports.models import GeneratedReport
+
+    if days is None:
+        days = settings.REPORT_ARTIFACT_RETENTION_DAYS
+    cutoff_date = timezone.now() - timezone.timedelta(days=days)
+
+    # Artifacts are removed from storage by the post_delete signal.
+    deleted_count = 0
+    for report in GeneratedReport.objects.filter(created_at__lt=cutoff_date).iterator():
+        report.delete()
+        deleted_count += 1
+
+    logger.info(f"Cleaned up {deleted_count} expired generated reports")
+
+    return {'deleted_count': deleted_count}
@@ -10,7 +10,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import permissions as drf_permissions
@@ -90,8 +90,13 @@ class GenerateReportView(APIView):
             'parameters': data.get('parameters', {}),
         }
 
-        if fmt == 'XLSX':
-            # XLSX generation is fast — run synchronously
+        from .result_cache import find_cached_report, report_cache_key
+        cache_key = report_cache_key(school_id, data['report_type'], fmt, task_kwargs['parameters'])
+        cached_hit = find_cached_report(school_id, cache_key) is not None
+
+        if fmt == 'XLSX' or cached_hit:
+            # XLSX generation is fast, and a cache hit only looks up the
+            # existing artifact — run synchronously
             from core.task_utils import run_task_sync
             try:
                 bg_task = run_task_sync(
@@ -135,21 +140,24 @@ class ReportDownloadView(APIView):
         except GeneratedReport.DoesNotExist:
             return Response({'error': 'Report not found'}, status=404)
 
-        if not report.file_content:
+        if not report.file:
             return Response({'error': 'Report content not available'}, status=404)
 
-        content = bytes(report.file_content)
+        from .storage import REPORT_CONTENT_TYPES, report_filename
 
-        if report.format == 'XLSX':
-            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            ext = 'xlsx'
-        else:
-            content_type = 'application/pdf'
-            ext = 'pdf'
+        try:
+            artifact = report.file.open('rb')
+        except (FileNotFoundError, OSError):
+            logger.warning(f"Artifact missing for report {report.id}: {report.file.name}")
+            return Response({'error': 'Report content not available'}, status=404)
 
-        response = HttpResponse(content, content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename="report_{report.id}.{ext}"'
-        return response
+        # Stream from storage rather than buffering the whole file.
+        return FileResponse(
+            artifact,
+            as_attachment=True,
+            filename=report_filename(report),
+            content_type=REPORT_CONTENT_TYPES.get(report.format, 'application/pdf'),
+        )
 
 
 class ReportListView(APIView):
@@ -475,6 +475,10 @@ class SchoolViewSet(TenantQuerySetMixin, viewsets.ReadOnlyModelViewSet):
 
             url = storage_service.upload_school_asset(file, school.id, asset_type)
 
+            # Same storage path is reused on re-upload, so drop cached PDF assets.
+            from core.school_assets import invalidate_school_assets
+            invalidate_school_assets(school.id)
+
             if asset_type == 'logo':
                 school.logo = url
                 school.save(update_fields=['logo', 'updated_at'])
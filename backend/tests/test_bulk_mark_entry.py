@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from academic_sessions.models import StudentEnrollment
+from academics.models import Subject
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from students.models import Student
+
+
+BULK_URL = '/api/examinations/marks/bulk_entry/'
+
+
+@pytest.fixture
+def mark_env(seed_data):
+    school = seed_data['school_a']
+    class_obj = seed_data['classes'][0]
+    exam_type = ExamType.objects.create(school=school, name='Bulk Mid Term', weight=Decimal('50'))
+    exam = Exam.objects.create(
+        school=school, academic_year=seed_data['academic_year'], term=seed_data['terms'][0],
+        exam_type=exam_type, class_obj=class_obj, name='Bulk Mid Term', status='MARKS_ENTRY',
+    )
+    subject = Subject.objects.create(school=school, name='Bulk Maths', code='BMATH')
+    exam_subject = ExamSubject.objects.create(
+        school=school, exam=exam, subject=subject,
+        total_marks=Decimal('100'), passing_marks=Decimal('33'),
+    )
+    students = [
+        Student.objects.create(school=school, class_obj=class_obj, roll_number=f'B{i}', name=f'Bulk {i}')
+        for i in range(40)
+    ]
+    for student in students:
+        StudentEnrollment.objects.create(
+            school=school, student=student, academic_year=seed_data['academic_year'],
+            class_obj=class_obj, roll_number=student.roll_number,
+        )
+    return {**seed_data, 'exam_subject': exam_subject, 'bulk_students': students}
+
+
+@pytest.mark.django_db
+class TestBulkMarkEntry:
+
+    def _post(self, env, api, marks):
+        resp = api.post(BULK_URL, {
+            'exam_subject_id': env['exam_subject'].id, 'marks': marks,
+        }, env['tokens']['admin'], env['SID_A'])
+        assert resp.status_code == 200, resp.content
+        return resp.json()
+
+    def test_query_count_is_independent_of_class_size(self, mark_env, api):
+        students = mark_env['bulk_students']
+        with CaptureQueriesContext(connection) as small:
+            self._post(mark_env, api, [
+                {'student_id': s.id, 'marks_obtained': 50} for s in students[:5]
+            ])
+        with CaptureQueriesContext(connection) as large:
+            data = self._post(mark_env, api, [
+                {'student_id': s.id, 'marks_obtained': 60} for s in students
+            ])
+
+        assert data['created'] == 35 and data['updated'] == 5
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_upsert_sets_enrollment_and_reports_bad_rows(self, mark_env, api):
+        students = mark_env['bulk_students']
+        data = self._post(mark_env, api, [
+            {'student_id': students[0].id, 'marks_obtained': 45, 'remarks': 'ok'},
+            {'student_id': students[1].id, 'marks_obtained': 80, 'is_absent': True},
+            {'student_id': students[2].id, 'marks_obtained': 'abc'},
+            {'student_id': 999999, 'marks_obtained': 10},
+            {'student_id': 'x', 'marks_obtained': 10},
+        ])
+
+        assert data['created'] == 2 and data['updated'] == 0
+        assert sorted(str(e['student_id']) for e in data['errors']) == sorted(
+            [str(students[2].id), '999999', 'x'],
+        )
+        first = StudentMark.objects.get(exam_subject=mark_env['exam_subject'], student=students[0])
+        assert first.marks_obtained == Decimal('45') and first.remarks == 'ok'
+        assert first.enrollment.student_id == students[0].id
+        absent = StudentMark.objects.get(exam_subject=mark_env['exam_subject'], student=students[1])
+        assert absent.is_absent and absent.marks_obtained is None
+
+        data = self._post(mark_env, api, [
+            {'student_id': students[0].id, 'marks_obtained': 55},
+        ])
+        assert data == {'created': 0, 'updated': 1, 'errors': [], 'message': '1 marks saved.'}
+        first.refresh_from_db()
+        assert first.marks_obtained == Decimal('55') and first.remarks == ''
+
+    def test_out_of_range_and_string_flags_are_checked_per_row(self, mark_env, api):
+        students = mark_env['bulk_students']
+        data = self._post(mark_env, api, [
+            {'student_id': students[0].id, 'marks_obtained': 12345678},
+            {'student_id': students[1].id, 'marks_obtained': 101},
+            {'student_id': students[2].id, 'marks_obtained': -1},
+            {'student_id': students[3].id, 'marks_obtained': '12.345'},
+            {'student_id': students[4].id, 'marks_obtained': 70, 'is_absent': 'maybe'},
+            {'student_id': students[5].id, 'marks_obtained': 70, 'is_absent': 'false'},
+            {'student_id': students[6].id, 'marks_obtained': 70, 'is_absent': 'true'},
+        ])
+
+        assert data['created'] == 2 and data['updated'] == 0
+        errors = {e['student_id']: e['error'] for e in data['errors']}
+        assert set(errors) == {s.id for s in students[:5]}
+        assert errors[students[1].id] == 'Marks cannot exceed total marks (100.00).'
+        assert errors[students[2].id] == 'Marks cannot be negative.'
+        assert errors[students[4].id].startswith('Invalid is_absent')
+        present = StudentMark.objects.get(exam_subject=mark_env['exam_subject'], student=students[5])
+        assert not present.is_absent and present.marks_obtained == Decimal('70')
+        absent = StudentMark.objects.get(exam_subject=mark_env['exam_subject'], student=students[6])
+        assert absent.is_absent and absent.marks_obtained is None
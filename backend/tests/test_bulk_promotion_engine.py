@@ -0,0 +1,180 @@
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.bulk_promotion_service import (
+    EXISTING_TARGET_REASON, NO_SOURCE_REASON, BulkPromotionService,
+)
+from academic_sessions.models import AcademicYear, PromotionEvent, PromotionOperation, StudentEnrollment
+from students.models import Class, Student
+
+
+@pytest.fixture
+def promo_env(seed_data):
+    school = seed_data['school_a']
+    source_year = seed_data['academic_year']
+    target_year = AcademicYear.objects.create(
+        school=school, name='Promo Target', start_date=date(2026, 4, 1), end_date=date(2027, 3, 31),
+    )
+    grade_5 = Class.objects.create(school=school, name='Promo 5', grade_level=5)
+    grade_6 = Class.objects.create(school=school, name='Promo 6', grade_level=6)
+    # A current grade-6 student still holds roll 1 in the class snapshot.
+    Student.objects.create(school=school, class_obj=grade_6, roll_number='1', name='Senior')
+    operation = PromotionOperation.objects.create(
+        school=school, source_academic_year=source_year, target_academic_year=target_year,
+        operation_type=PromotionOperation.OperationType.BULK_PROMOTE,
+    )
+    return {
+        **seed_data, 'source_year': source_year, 'target_year': target_year,
+        'grade_5': grade_5, 'grade_6': grade_6, 'operation': operation,
+    }
+
+
+def _students(env, count, start=1):
+    students = []
+    for i in range(start, start + count):
+        student = Student.objects.create(
+            school=env['school_a'], class_obj=env['grade_5'], roll_number=str(i), name=f'Promo {i}',
+        )
+        StudentEnrollment.objects.create(
+            school=env['school_a'], student=student, academic_year=env['source_year'],
+            class_obj=env['grade_5'], roll_number=str(i),
+        )
+        students.append(student)
+    return students
+
+
+def _service(env, **kwargs):
+    return BulkPromotionService(
+        env['school_a'].id, env['source_year'].id, env['target_year'].id,
+        operation=env['operation'], **kwargs,
+    )
+
+
+@pytest.mark.django_db
+class TestBulkPromotionService:
+
+    def test_mixed_batch_outcomes_rolls_and_events(self, promo_env):
+        env = promo_env
+        s1, s2, s3, s4 = _students(env, 4)
+        no_source = Student.objects.create(
+            school=env['school_a'], class_obj=env['grade_5'], roll_number='9', name='New',
+        )
+        StudentEnrollment.objects.create(
+            school=env['school_a'], student=s4, academic_year=env['target_year'],
+            class_obj=env['grade_6'], roll_number='40',
+        )
+
+        outcome = _service(env).run([
+            {'student_id': s1.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'},
+            {'student_id': s2.id, 'target_class_id': env['grade_6'].id, 'new_roll_number': '1', 'action': 'PROMOTE'},
+            {'student_id': s3.id, 'action': 'GRADUATE'},
+            {'student_id': s4.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'},
+            {'student_id': no_source.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'},
+            {'student_id': s2.id, 'target_session_class_id': 999999, 'action': 'PROMOTE'},
+        ])
+
+        assert outcome['promoted'] == 3
+        assert [(s['student_id'], s['reason']) for s in outcome['skipped']] == [
+            (s4.id, EXISTING_TARGET_REASON), (no_source.id, NO_SOURCE_REASON),
+        ]
+        assert outcome['errors'] == [{
+            'student_id': s2.id,
+            'error': 'Selected target session class was not found in the target academic year.',
+        }]
+
+        # Roll 1 is held by the senior, so both fall through to the next roll after 40.
+        target_rolls = dict(StudentEnrollment.objects.filter(
+            academic_year=env['target_year'], student__in=[s1, s2],
+        ).values_list('student_id', 'roll_number'))
+        assert target_rolls == {s1.id: '41', s2.id: '42'}
+        s1.refresh_from_db()
+        assert (s1.class_obj_id, s1.roll_number) == (env['grade_6'].id, '41')
+        s3.refresh_from_db()
+        assert s3.status == Student.Status.GRADUATED
+        assert StudentEnrollment.objects.get(student=s1, academic_year=env['source_year']).status == 'PROMOTED'
+        assert StudentEnrollment.objects.get(student=s3, academic_year=env['source_year']).status == 'GRADUATED'
+
+        events = PromotionEvent.objects.filter(operation=env['operation'])
+        assert sorted(events.values_list('event_type', flat=True)) == sorted([
+            'PROMOTED', 'PROMOTED', 'GRADUATED', 'SKIPPED', 'SKIPPED', 'FAILED',
+        ])
+        promoted = events.get(student=s1)
+        assert promoted.target_enrollment.roll_number == '41'
+        assert (promoted.old_status, promoted.new_status) == ('ACTIVE', 'PROMOTED')
+        env['operation'].refresh_from_db()
+        assert (env['operation'].processed_count, env['operation'].skipped_count, env['operation'].error_count) == (3, 2, 1)
+
+    def test_query_count_does_not_grow_with_students(self, promo_env):
+        env = promo_env
+        few = _students(promo_env, 3)
+        many = _students(promo_env, 30, start=100)
+
+        def promote(students):
+            return [{'student_id': s.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'} for s in students]
+
+        with CaptureQueriesContext(connection) as small:
+            assert _service(env).run(promote(few))['promoted'] == 3
+        with CaptureQueriesContext(connection) as large:
+            assert _service(env).run(promote(many))['promoted'] == 30
+        assert len(large.captured_queries) == len(small.captured_queries)
+        assert StudentEnrollment.objects.filter(academic_year=env['target_year']).count() == 33
+
+    def test_integrity_error_only_fails_the_clashing_student(self, promo_env, monkeypatch):
+        env = promo_env
+        students = _students(env, 5)
+        clashing = students[2]
+        original_load = BulkPromotionService._load
+
+        def load_then_race(service, promotions):
+            original_load(service, promotions)
+            # Another request enrolls one student after the preload.
+            StudentEnrollment.objects.create(
+                school=env['school_a'], student=clashing, academic_year=env['target_year'],
+                class_obj=env['grade_6'], roll_number='77',
+            )
+
+        monkeypatch.setattr(BulkPromotionService, '_load', load_then_race)
+        progress = []
+        outcome = _service(env, chunk_size=2).run(
+            [{'student_id': s.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'} for s in students],
+            progress=progress.append,
+        )
+
+        assert outcome['promoted'] == 4
+        assert [e['student_id'] for e in outcome['errors']] == [clashing.id]
+        assert progress == [2, 4, 5]
+        assert PromotionEvent.objects.get(operation=env['operation'], student=clashing).event_type == 'FAILED'
+        assert StudentEnrollment.objects.filter(academic_year=env['target_year']).count() == 5
+
+    def test_roll_taken_after_preload_is_reresolved_instead_of_failed(self, promo_env, monkeypatch):
+        env = promo_env
+        students = _students(env, 4, start=10)
+        original_load = BulkPromotionService._load
+
+        def load_then_race(service, promotions):
+            original_load(service, promotions)
+            # Another request takes a roll the batch has already planned.
+            newcomer = Student.objects.create(school=env['school_a'], class_obj=env['grade_6'], name='Newcomer')
+            StudentEnrollment.objects.create(
+                school=env['school_a'], student=newcomer, academic_year=env['target_year'],
+                class_obj=env['grade_6'], roll_number='12',
+            )
+
+        monkeypatch.setattr(BulkPromotionService, '_load', load_then_race)
+        outcome = _service(env).run(
+            [{'student_id': s.id, 'target_class_id': env['grade_6'].id, 'action': 'PROMOTE'} for s in students],
+        )
+
+        assert outcome['promoted'] == 4 and outcome['errors'] == []
+        rolls = dict(StudentEnrollment.objects.filter(
+            academic_year=env['target_year'], student__in=students,
+        ).values_list('student_id', 'roll_number'))
+        assert rolls[students[0].id] == '10' and rolls[students[1].id] == '11'
+        assert '12' not in rolls.values() and len(set(rolls.values())) == 4
+        assert Student.objects.get(id=students[2].id).roll_number == rolls[students[2].id]
+        assert PromotionEvent.objects.get(
+            operation=env['operation'], student=students[2],
+        ).new_roll_number == rolls[students[2].id]
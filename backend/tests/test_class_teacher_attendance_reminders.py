@@ -0,0 +1,164 @@
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from academic_sessions.models import SchoolCalendarEntry, StudentEnrollment
+from academics.models import ClassTeacherAssignment
+from attendance.models import AttendanceRecord
+from hr.models import StaffAttendance
+from notifications.models import NotificationLog, SchoolNotificationConfig
+from notifications.triggers import (
+    trigger_class_teacher_attendance_pending,
+    trigger_class_teacher_attendance_pending_for_schools,
+)
+
+
+# A Wednesday in the past so the 11:00 same-day guard never applies.
+TARGET_DATE = date(2025, 11, 12)
+
+
+@pytest.mark.django_db
+class TestClassTeacherAttendancePending:
+
+    def _setup(self, seed_data):
+        school = seed_data['school_a']
+        class_1, class_2, class_3 = seed_data['classes']
+        staff = seed_data['staff']
+        ay = seed_data['academic_year']
+
+        # class_1: legacy assignment (no academic year) -> roster via Student.class_obj
+        ClassTeacherAssignment.objects.create(
+            school=school, class_obj=class_1, teacher=staff[0], is_active=True,
+        )
+        # class_2: year-scoped assignment -> roster via StudentEnrollment
+        ClassTeacherAssignment.objects.create(
+            school=school, academic_year=ay, class_obj=class_2, teacher=staff[1], is_active=True,
+        )
+        for student in seed_data['students']:
+            if student.class_obj_id == class_2.id:
+                StudentEnrollment.objects.create(
+                    school=school,
+                    student=student,
+                    academic_year=ay,
+                    class_obj=class_2,
+                    roll_number=student.roll_number,
+                    status=StudentEnrollment.Status.ACTIVE,
+                    is_active=True,
+                )
+        # class_3: teacher not present -> never reminded
+        ClassTeacherAssignment.objects.create(
+            school=school, class_obj=class_3, teacher=staff[2], is_active=True,
+        )
+
+        for member in staff[:2]:
+            StaffAttendance.objects.create(
+                school=school,
+                staff_member=member,
+                date=TARGET_DATE,
+                status=StaffAttendance.Status.PRESENT,
+            )
+        StaffAttendance.objects.create(
+            school=school,
+            staff_member=staff[2],
+            date=TARGET_DATE,
+            status=StaffAttendance.Status.ABSENT,
+        )
+        return school
+
+    def _reminder_recipients(self, school):
+        return set(
+            NotificationLog.objects
+            .filter(
+                school=school,
+                channel='IN_APP',
+                event_type='GENERAL',
+                title__startswith='Attendance Reminder - ',
+            )
+            .values_list('recipient_user_id', flat=True)
+        )
+
+    def test_reminds_present_teachers_of_unmarked_classes(self, seed_data):
+        school = self._setup(seed_data)
+        staff = seed_data['staff']
+
+        sent = trigger_class_teacher_attendance_pending(school, TARGET_DATE)
+
+        assert sent == 2
+        assert self._reminder_recipients(school) == {staff[0].user_id, staff[1].user_id}
+        log = NotificationLog.objects.get(recipient_user_id=staff[0].user_id)
+        assert log.status == 'SENT'
+        assert log.recipient_type == 'STAFF'
+        assert log.title == f"Attendance Reminder - {seed_data['classes'][0].name}"
+
+    def test_marked_attendance_suppresses_reminder(self, seed_data):
+        school = self._setup(seed_data)
+        class_1, class_2, _ = seed_data['classes']
+
+        for class_obj in (class_1, class_2):
+            student = next(s for s in seed_data['students'] if s.class_obj_id == class_obj.id)
+            AttendanceRecord.objects.create(
+                school=school,
+                student=student,
+                date=TARGET_DATE,
+                status=AttendanceRecord.AttendanceStatus.PRESENT,
+            )
+
+        assert trigger_class_teacher_attendance_pending(school, TARGET_DATE) == 0
+        assert not self._reminder_recipients(school)
+
+    def test_class_scoped_off_day_skips_only_that_class(self, seed_data):
+        school = self._setup(seed_data)
+        class_1 = seed_data['classes'][0]
+        staff = seed_data['staff']
+
+        entry = SchoolCalendarEntry.objects.create(
+            school=school,
+            academic_year=seed_data['academic_year'],
+            name='Class trip',
+            entry_kind=SchoolCalendarEntry.EntryKind.OFF_DAY,
+            off_day_type=SchoolCalendarEntry.OffDayType.OTHER,
+            scope=SchoolCalendarEntry.Scope.CLASS,
+            start_date=TARGET_DATE,
+            end_date=TARGET_DATE,
+        )
+        entry.classes.add(class_1)
+
+        assert trigger_class_teacher_attendance_pending(school, TARGET_DATE) == 1
+        assert self._reminder_recipients(school) == {staff[1].user_id}
+
+    def test_sunday_and_disabled_config_send_nothing(self, seed_data):
+        school = self._setup(seed_data)
+
+        assert trigger_class_teacher_attendance_pending(school, date(2025, 11, 16)) == 0
+
+        SchoolNotificationConfig.objects.update_or_create(
+            school=school,
+            defaults={'class_teacher_attendance_reminder_enabled': False},
+        )
+        assert trigger_class_teacher_attendance_pending(school, TARGET_DATE) == 0
+        assert not self._reminder_recipients(school)
+
+    def test_dedupes_against_reminders_already_sent_that_day(self, seed_data):
+        school = self._setup(seed_data)
+
+        trigger_class_teacher_attendance_pending(school, TARGET_DATE)
+        NotificationLog.objects.filter(school=school).update(
+            created_at=timezone.make_aware(datetime(2025, 11, 12, 11, 0)),
+        )
+
+        assert trigger_class_teacher_attendance_pending(school, TARGET_DATE) == 0
+        assert NotificationLog.objects.filter(school=school).count() == 2
+
+    def test_query_count_does_not_grow_with_assignments(self, seed_data):
+        school = self._setup(seed_data)
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = trigger_class_teacher_attendance_pending_for_schools(
+                [school, seed_data['school_b']], TARGET_DATE,
+            )
+
+        assert result == {school.id: 2}
+        assert len(ctx.captured_queries) <= 12
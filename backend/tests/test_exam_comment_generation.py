@@ -0,0 +1,131 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.models import Subject
+from attendance.models import AttendanceRecord
+from core.models import BackgroundTask
+from examinations.ai_comments_service import ReportCardCommentGenerator
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from students.models import Class, Student
+
+
+class StubLLM:
+    """Mimics client.chat.completions.create(); answers from a callable."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        prompt = kwargs['messages'][0]['content']
+        items = json.loads(prompt.split('Results (JSON):\n', 1)[1].split('\n\nRules:', 1)[0])
+        self.calls.append(items)
+        content = self.reply(items)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _comments_for(items):
+    return json.dumps([{'id': item['id'], 'comment': f"AI comment {item['id']}."} for item in items])
+
+
+@pytest.fixture
+def exam_env(seed_data):
+    """A 6-student class with marks in two subjects and some attendance."""
+    school = seed_data['school_a']
+    class_obj = Class.objects.create(school=school, name='Comments Class', grade_level=12)
+    exam = Exam.objects.create(
+        school=school, academic_year=seed_data['academic_year'], term=seed_data['terms'][0],
+        exam_type=ExamType.objects.create(school=school, name='Comment Term'),
+        class_obj=class_obj, name='Comment Exam',
+    )
+    students = [
+        Student.objects.create(school=school, class_obj=class_obj, roll_number=str(i), name=f'C{i}')
+        for i in range(1, 7)
+    ]
+    for code in ('CEN', 'CMA'):
+        exam_subject = ExamSubject.objects.create(
+            school=school, exam=exam,
+            subject=Subject.objects.create(school=school, name=f'Subject {code}', code=code),
+            total_marks=Decimal('100'), passing_marks=Decimal('33'),
+        )
+        for i, student in enumerate(students):
+            StudentMark.objects.create(
+                school=school, exam_subject=exam_subject, student=student,
+                marks_obtained=Decimal(40 + i * 10),
+            )
+    for day in range(4):
+        AttendanceRecord.objects.create(
+            school=school, student=students[0], date=date.today() - timedelta(days=day),
+            status='PRESENT' if day == 0 else 'ABSENT',
+        )
+    return {**seed_data, 'exam': exam, 'students': students}
+
+
+@pytest.mark.django_db
+class TestExamCommentGeneration:
+
+    def test_marks_are_batched_per_model_call(self, exam_env):
+        llm = StubLLM(_comments_for)
+        generator = ReportCardCommentGenerator(exam_env['school_a'], llm_client=llm, batch_size=5)
+
+        result = generator.generate_for_exam(exam_env['exam'].id)
+
+        assert result == {'generated': 12, 'fallbacks': 0, 'errors': 0, 'skipped': 0, 'total': 12}
+        assert [len(items) for items in llm.calls] == [5, 5, 2]
+        low_attendance = [i for items in llm.calls for i in items if i['attendance_pct'] == 25]
+        assert len(low_attendance) == 2
+        mark = StudentMark.objects.filter(exam_subject__exam=exam_env['exam']).first()
+        assert mark.ai_comment == f'AI comment {mark.id}.'
+
+        # Existing comments are kept unless forced.
+        again = ReportCardCommentGenerator(exam_env['school_a'], llm_client=llm, batch_size=5)
+        assert again.generate_for_exam(exam_env['exam'].id)['skipped'] == 12
+
+    def test_failed_or_partial_replies_fall_back_per_item(self, exam_env):
+        def reply(items):
+            if len(llm.calls) == 1:
+                return 'not json'
+            return _comments_for(items[1:])  # drops the first item
+
+        llm = StubLLM(reply)
+        generator = ReportCardCommentGenerator(exam_env['school_a'], llm_client=llm, batch_size=6)
+
+        result = generator.generate_for_exam(exam_env['exam'].id)
+
+        assert result['generated'] == 12
+        assert result['fallbacks'] == 7
+        dropped = StudentMark.objects.get(id=llm.calls[1][0]['id'])
+        assert dropped.ai_comment.startswith(('Outstanding', 'Good', 'Satisfactory', 'Needs', 'Requires'))
+        answered = StudentMark.objects.get(id=llm.calls[1][1]['id'])
+        assert answered.ai_comment == f'AI comment {answered.id}.'
+
+    def test_attendance_rates_use_one_query(self, exam_env):
+        generator = ReportCardCommentGenerator(exam_env['school_a'])
+        with CaptureQueriesContext(connection) as ctx:
+            rates = generator._get_attendance_rates(exam_env['exam'].class_obj_id)
+        assert len(ctx.captured_queries) == 1
+        assert rates == {exam_env['students'][0].id: 25.0}
+
+    def test_endpoint_dispatches_background_task(self, exam_env, api, settings):
+        settings.GROQ_API_KEY = ''
+        StudentMark.objects.filter(exam_subject__exam=exam_env['exam']).update(ai_comment='old')
+
+        resp = api.post(
+            f"/api/examinations/exams/{exam_env['exam'].id}/generate-comments/", {'force': True},
+            exam_env['tokens']['admin'], exam_env['SID_A'],
+        )
+
+        assert resp.status_code == 202, resp.content
+        task = BackgroundTask.objects.get(celery_task_id=resp.json()['task_id'])
+        assert task.task_type == BackgroundTask.TaskType.REPORT_COMMENTS
+        assert task.status == BackgroundTask.Status.SUCCESS
+        assert task.result_data['generated'] == 12
+        assert task.progress_total == 12
+        assert not StudentMark.objects.filter(exam_subject__exam=exam_env['exam'], ai_comment='old').exists()
@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+import pytest
+
+from academics.models import Subject
+from examinations.models import Exam, ExamResult, ExamSubject, ExamType, StudentMark
+from examinations.results import assign_ranks
+from students.models import Class, Student
+
+
+class _Row:
+    def __init__(self, percentage):
+        self.percentage = Decimal(percentage)
+
+
+@pytest.fixture
+def sections(seed_data):
+    """Two sections of one grade sitting the same mid-term, one subject each."""
+    school = seed_data['school_a']
+    exam_type = ExamType.objects.create(school=school, name='Rank Mid Term')
+    subject = Subject.objects.create(school=school, name='Rank Maths', code='RMATH')
+    env = {}
+    for section in ('A', 'B'):
+        class_obj = Class.objects.create(school=school, name='Grade 9', section=section, grade_level=11)
+        exam = Exam.objects.create(
+            school=school, academic_year=seed_data['academic_year'], term=seed_data['terms'][0],
+            exam_type=exam_type, class_obj=class_obj, name=f'Mid Term 9{section}',
+        )
+        exam_subject = ExamSubject.objects.create(
+            school=school, exam=exam, subject=subject,
+            total_marks=Decimal('100'), passing_marks=Decimal('33'),
+        )
+        students = [
+            Student.objects.create(school=school, class_obj=class_obj, roll_number=str(i), name=f'9{section} #{i}')
+            for i in range(1, 5)
+        ]
+        env[section] = {'exam': exam, 'exam_subject': exam_subject, 'students': students}
+    return {**seed_data, **env}
+
+
+def _enter(section, marks):
+    for student, value in zip(section['students'], marks):
+        StudentMark.objects.update_or_create(
+            school=student.school, exam_subject=section['exam_subject'], student=student,
+            defaults={'marks_obtained': None if value is None else Decimal(value), 'is_absent': value is None},
+        )
+
+
+@pytest.mark.django_db
+class TestExamResults:
+
+    def test_assign_ranks_competition_and_dense(self):
+        rows = [_Row(p) for p in ('90', '75', '90', '60', '75')]
+        assign_ranks(rows, 'rank', 'dense')
+        assert [(r.rank, r.dense) for r in rows] == [(1, 1), (3, 2), (1, 1), (5, 3), (3, 2)]
+
+    def test_results_endpoint_reports_tied_ranks(self, sections, api):
+        _enter(sections['A'], ['80', '95', '80', None])
+
+        resp = api.get(f"/api/examinations/exams/{sections['A']['exam'].id}/results/",
+                       sections['tokens']['admin'], sections['SID_A'])
+        assert resp.status_code == 200
+        rows = resp.json()['results']
+
+        assert [(r['roll_number'], r['rank'], r['dense_rank']) for r in rows] == [
+            ('2', 1, 1), ('1', 2, 2), ('3', 2, 2), ('4', 4, 3),
+        ]
+        absent = rows[-1]
+        assert absent['percentage'] == 0 and absent['is_pass'] is False
+        assert rows[0]['total_obtained'] == 95 and rows[0]['total_possible'] == 100
+
+    def test_class_rank_spans_sections_and_updates_incrementally(self, sections):
+        _enter(sections['A'], ['80', '95', '70', '40'])
+        _enter(sections['B'], ['90', '80', '60', '30'])
+
+        def class_ranks():
+            return {
+                (r.student.name): (r.section_rank, r.class_rank, r.class_dense_rank)
+                for r in ExamResult.objects.select_related('student')
+            }
+
+        ranks = class_ranks()
+        assert ranks['9A #2'] == (1, 1, 1)
+        assert ranks['9B #1'] == (1, 2, 2)
+        assert ranks['9A #1'] == (2, 3, 3)
+        assert ranks['9B #2'] == (2, 3, 3)
+        assert ranks['9B #4'] == (4, 8, 7)
+
+        # Editing one mark re-ranks both sections.
+        mark = StudentMark.objects.get(student=sections['B']['students'][3])
+        mark.marks_obtained = Decimal('99')
+        mark.save()
+        ranks = class_ranks()
+        assert ranks['9B #4'] == (1, 1, 1)
+        assert ranks['9A #2'] == (1, 2, 2)
+
+        mark.delete()
+        assert ExamResult.objects.get(student=sections['B']['students'][3]).percentage == 0
+
+    def test_subject_change_and_roster_change_refresh(self, sections, api):
+        section = sections['A']
+        _enter(section, ['50', '50', '50', '50'])
+
+        section['exam_subject'].total_marks = Decimal('200')
+        section['exam_subject'].save()
+        assert set(ExamResult.objects.filter(exam=section['exam']).values_list('percentage', flat=True)) == {
+            Decimal('25.00'),
+        }
+
+        leaver = section['students'][0]
+        leaver.is_active = False
+        leaver.save()
+        resp = api.get(f"/api/examinations/exams/{section['exam'].id}/class_summary/",
+                       sections['tokens']['admin'], sections['SID_A'])
+        assert resp.status_code == 200
+        assert resp.json()['overall']['passed'] == 3
+        assert not ExamResult.objects.filter(exam=section['exam'], student=leaver).exists()
+        assert ExamResult.objects.filter(exam=section['exam']).count() == 3
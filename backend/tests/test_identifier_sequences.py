@@ -0,0 +1,135 @@
+import importlib
+import random
+import threading
+import time
+
+import pytest
+from django.apps import apps
+from django.db import OperationalError, connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.models import StudentEnrollment
+from academic_sessions.roll_allocator_service import RollAllocatorService
+from core.models import IdentifierSequence
+from core.sequences import EMPLOYEE_ID_SCOPE, next_employee_id, roll_scope
+from hr.models import StaffMember
+from students.models import Student
+
+
+STAFF_URL = '/api/hr/staff/'
+
+
+def _staff(school, employee_id, name='Seq'):
+    return StaffMember.objects.create(school=school, first_name=name, last_name=employee_id, employee_id=employee_id)
+
+
+@pytest.mark.django_db
+class TestEmployeeIdSequence:
+
+    def test_auto_ids_are_numeric_and_skip_past_manual_ones(self, seed_data, api):
+        token, sid, school = seed_data['tokens']['admin'], seed_data['SID_A'], seed_data['school_a']
+        _staff(school, 'EMP-999')
+        _staff(school, 'EMP-1000')
+
+        resp = api.get(f'{STAFF_URL}next-employee-id/', token, sid)
+        assert resp.json() == {'next_employee_id': 'EMP-1001'}
+        # Previewing does not consume the number.
+        assert api.get(f'{STAFF_URL}next-employee-id/', token, sid).json() == {'next_employee_id': 'EMP-1001'}
+
+        resp = api.post(STAFF_URL, {'first_name': 'Auto', 'last_name': 'One'}, token, sid)
+        assert resp.status_code == 201, resp.content[:200]
+        assert resp.json()['employee_id'] == 'EMP-1001'
+
+        resp = api.post(STAFF_URL, {'first_name': 'Manual', 'last_name': 'Pick', 'employee_id': 'EMP-2000'}, token, sid)
+        assert resp.status_code == 201, resp.content[:200]
+        resp = api.post(STAFF_URL, {'first_name': 'Auto', 'last_name': 'Two'}, token, sid)
+        assert resp.json()['employee_id'] == 'EMP-2001'
+
+        # An ID written outside the API is never handed out again.
+        _staff(school, 'EMP-2002')
+        assert next_employee_id(school.id) == 'EMP-2003'
+
+    def test_seed_migration_records_the_highest_existing_numbers(self, seed_data):
+        school = seed_data['school_a']
+        year = seed_data['academic_year']
+        class_obj = seed_data['classes'][0]
+        _staff(school, 'EMP-042')
+        _staff(school, 'EMP-7')
+        student = Student.objects.create(school=school, class_obj=class_obj, roll_number='61', name='Seq')
+        StudentEnrollment.objects.create(
+            school=school, student=student, academic_year=year, class_obj=class_obj, roll_number='12',
+        )
+
+        migration = importlib.import_module('core.migrations.0005_seed_identifier_sequences')
+        migration.seed_identifier_sequences(apps, None)
+
+        values = {
+            (s.scope, s.academic_year_id): s.last_value
+            for s in IdentifierSequence.objects.filter(school=school)
+        }
+        assert values[(EMPLOYEE_ID_SCOPE, None)] == 42
+        assert values[(roll_scope(class_obj.id), year.id)] == 61
+
+        allocator = RollAllocatorService(school.id, year.id, class_obj.id)
+        assert allocator.resolve_roll() == '62'
+
+
+@pytest.mark.django_db
+class TestRollSequence:
+
+    def test_allocation_cost_does_not_grow_with_class_size(self, seed_data):
+        school, year = seed_data['school_a'], seed_data['academic_year']
+        class_obj = seed_data['classes'][0]
+        allocator = RollAllocatorService(school.id, year.id, class_obj.id)
+        allocator.resolve_roll()  # seeds the sequence
+
+        with CaptureQueriesContext(connection) as small:
+            first = allocator.resolve_roll()
+        for i in range(40):
+            Student.objects.create(school=school, class_obj=class_obj, roll_number=f'R{i}', name=f'Seq {i}')
+        with CaptureQueriesContext(connection) as large:
+            second = allocator.resolve_roll()
+        assert int(second) == int(first) + 1
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+        # A hand-picked roll moves the sequence past it.
+        assert allocator.resolve_roll(preferred_roll='90') == '90'
+        assert allocator.resolve_roll() == '91'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_employee_id_allocation_has_no_duplicates():
+    from schools.models import Organization, School
+
+    org = Organization.objects.create(name='Seq Org', slug='seq-org')
+    school = School.objects.create(organization=org, name='Seq School', subdomain='seq-school')
+    _staff(school, 'EMP-010')
+    allocated, failures = [], []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        try:
+            barrier.wait()
+            for _ in range(5):
+                while True:
+                    try:
+                        allocated.append(next_employee_id(school.id))
+                        break
+                    except OperationalError:
+                        # SQLite reports a locked table instead of waiting on the row lock.
+                        time.sleep(random.uniform(0.001, 0.01))
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            failures.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert failures == []
+    assert len(allocated) == 40
+    assert len(set(allocated)) == 40
+    assert sorted(allocated) == [f'EMP-{n:03d}' for n in range(11, 51)]
@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from notifications.engine import send_in_app_batch
+from notifications.models import NotificationLog
+from notifications.observability import REASON_FAILED_DISPATCH, mark_log_failed
+from notifications.unread_counter import get_unread_count, reconcile_unread_count
+
+
+UNREAD_URL = '/api/notifications/unread-count/'
+
+
+@pytest.mark.django_db
+class TestUnreadCounter:
+
+    def _create(self, seed_data, user, count=1, **overrides):
+        logs = []
+        for i in range(count):
+            fields = {
+                'school': seed_data['school_a'],
+                'channel': 'IN_APP',
+                'event_type': 'GENERAL',
+                'recipient_type': 'ADMIN',
+                'recipient_identifier': str(user.id),
+                'recipient_user': user,
+                'title': f"{seed_data['prefix']}Counter #{i + 1}",
+                'body': 'Counter body',
+                'status': 'SENT',
+            }
+            fields.update(overrides)
+            logs.append(NotificationLog.objects.create(**fields))
+        return logs
+
+    def _badge(self, seed_data, api):
+        resp = api.get(UNREAD_URL, seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert resp.status_code == 200
+        return resp.json()['unread_count']
+
+    def test_counter_tracks_creates_and_reads(self, seed_data, api):
+        admin = seed_data['users']['admin']
+        logs = self._create(seed_data, admin, count=3)
+        assert self._badge(seed_data, api) == 3
+
+        self._create(seed_data, admin, count=2)
+        self._create(seed_data, admin, channel='WHATSAPP')
+        assert self._badge(seed_data, api) == 5
+
+        api.post(f'/api/notifications/{logs[0].id}/mark-read/', {},
+                 seed_data['tokens']['admin'], seed_data['SID_A'])
+        # Marking the same log twice must not decrement again.
+        api.post(f'/api/notifications/{logs[0].id}/mark-read/', {},
+                 seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert self._badge(seed_data, api) == 4
+
+        api.post('/api/notifications/mark-all-read/', {},
+                 seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert self._badge(seed_data, api) == 0
+
+    def test_batch_insert_and_failure_keep_counter_exact(self, seed_data):
+        admin = seed_data['users']['admin']
+        assert get_unread_count(admin.id) == 0
+
+        send_in_app_batch([
+            {
+                'school': seed_data['school_a'],
+                'event_type': 'GENERAL',
+                'recipient_user': admin,
+                'recipient_type': 'ADMIN',
+                'title': f'Batch {i}',
+                'body': 'Batch body',
+            }
+            for i in range(4)
+        ])
+        assert get_unread_count(admin.id) == 4
+
+        log = NotificationLog.objects.filter(recipient_user=admin).first()
+        mark_log_failed(log, reason_code=REASON_FAILED_DISPATCH, error='boom')
+        assert get_unread_count(admin.id) == 3
+
+    def test_cached_badge_poll_does_not_hit_database(self, seed_data):
+        admin = seed_data['users']['admin']
+        self._create(seed_data, admin, count=25)
+        assert get_unread_count(admin.id) == 25
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert get_unread_count(admin.id) == 25
+        assert len(ctx.captured_queries) == 0
+
+    def test_reconcile_repairs_drift(self, seed_data):
+        admin = seed_data['users']['admin']
+        self._create(seed_data, admin, count=2)
+        assert get_unread_count(admin.id) == 2
+
+        # Raw updates bypass the counter hooks; reconcile restores the truth.
+        NotificationLog.objects.filter(recipient_user=admin).update(status='FAILED')
+        assert get_unread_count(admin.id) == 2
+        assert reconcile_unread_count(admin.id) == 0
+        assert get_unread_count(admin.id) == 0
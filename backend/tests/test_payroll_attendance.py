@@ -0,0 +1,95 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.models import SchoolCalendarEntry
+from core.models import BackgroundTask
+from core.task_utils import run_task_sync
+from hr.models import LeaveApplication, LeavePolicy, Payslip, SalaryStructure, StaffAttendance, StaffMember
+from hr.tasks import generate_payslips_task
+
+
+def _staff_with_salary(school, n):
+    staff = StaffMember.objects.create(
+        school=school, first_name=f'Payroll {n}', last_name='Staff', employee_id=f'PAY-{n:03d}',
+        employment_status='ACTIVE',
+    )
+    SalaryStructure.objects.create(
+        staff_member=staff, school=school, basic_salary=Decimal('30000'),
+        allowances={'house_rent': 6000}, deductions={'tax': 1000}, effective_from=date(2024, 1, 1),
+    )
+    return staff
+
+
+def _generate(env, month=2, year=2026):
+    return run_task_sync(
+        generate_payslips_task, BackgroundTask.TaskType.PAYSLIP_GENERATION, 'Payroll', env['SID_A'],
+        env['users']['admin'],
+        task_kwargs={'school_id': env['SID_A'], 'user_id': env['users']['admin'].id, 'month': month, 'year': year},
+    ).result_data
+
+
+@pytest.mark.django_db
+class TestAttendanceAwarePayroll:
+
+    def test_deductions_for_absences_half_days_lates_and_unpaid_leave(self, seed_data):
+        school = seed_data['school_a']
+        staff = _staff_with_salary(school, 1)
+        # February 2026: 28 days, 4 Sundays and one school holiday -> 23 working days.
+        SchoolCalendarEntry.objects.create(
+            school=school, academic_year=seed_data['academic_year'], name='Kashmir Day',
+            entry_kind=SchoolCalendarEntry.EntryKind.OFF_DAY,
+            off_day_type=SchoolCalendarEntry.OffDayType.OTHER,
+            start_date=date(2026, 2, 5), end_date=date(2026, 2, 5),
+        )
+        sick = LeavePolicy.objects.create(school=school, name='Sick', leave_type='SICK', days_allowed=10)
+        unpaid = LeavePolicy.objects.create(school=school, name='Unpaid', leave_type='UNPAID', days_allowed=30)
+        LeaveApplication.objects.create(
+            school=school, staff_member=staff, leave_policy=sick, status='APPROVED',
+            start_date=date(2026, 2, 3), end_date=date(2026, 2, 3), reason='Flu',
+        )
+        LeaveApplication.objects.create(
+            school=school, staff_member=staff, leave_policy=unpaid, status='APPROVED',
+            start_date=date(2026, 2, 15), end_date=date(2026, 2, 18), reason='Travel',
+        )
+        marks = {2: 'ABSENT', 3: 'ABSENT', 4: 'HALF_DAY', 9: 'LATE', 10: 'LATE', 11: 'LATE', 12: 'LATE', 13: 'PRESENT'}
+        for day, status in marks.items():
+            StaffAttendance.objects.create(school=school, staff_member=staff, date=date(2026, 2, day), status=status)
+
+        result = _generate(seed_data)
+        assert result['created'] >= 1
+
+        payslip = Payslip.objects.get(staff_member=staff, month=2, year=2026)
+        per_day = Decimal('1565.22')  # 36000 / 23
+        assert payslip.working_days == 23
+        assert payslip.present_days == 6
+        assert payslip.deductions_breakdown == {
+            'tax': 1000,
+            'absent_days': float(per_day),          # Feb 3 is covered by sick leave
+            'half_days': float(per_day / 2),
+            'late_marks': float(per_day),           # 4 lates -> 1 day
+            'unpaid_leave': float(per_day * 3),     # Feb 15 is a Sunday
+        }
+        assert payslip.total_deductions == Decimal('1000') + per_day * Decimal('5.5')
+        assert payslip.net_salary == Decimal('36000') - payslip.total_deductions
+        assert payslip.attendance_breakdown['unpaid_leave_days'] == 3
+        assert payslip.attendance_breakdown['late_marks'] == 4
+
+    def test_query_count_does_not_grow_with_staff(self, seed_data):
+        school = seed_data['school_a']
+        _staff_with_salary(school, 1)
+        with CaptureQueriesContext(connection) as small:
+            _generate(seed_data, month=3)
+
+        for n in range(2, 30):
+            staff = _staff_with_salary(school, n)
+            StaffAttendance.objects.create(school=school, staff_member=staff, date=date(2026, 4, 1), status='ABSENT')
+        with CaptureQueriesContext(connection) as large:
+            result = _generate(seed_data, month=4)
+        assert result['created'] >= 29
+        assert len(large.captured_queries) == len(small.captured_queries)
+        # BackgroundTask create + fetch around the task itself.
+        assert len(large.captured_queries) - 2 < 10
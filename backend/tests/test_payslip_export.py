@@ -0,0 +1,108 @@
+import io
+import re
+import zipfile
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import BackgroundTask
+from core.task_utils import run_task_sync
+from hr.models import Payslip, StaffDepartment, StaffMember
+from hr.tasks import export_payslips_task
+from reports.models import GeneratedReport
+
+EXPORT_URL = '/api/hr/payslips/export-pdf/'
+
+PAGE_PATTERN = re.compile(rb'/Type\s*/Page\b')
+
+
+def _payslips(env, count, month=5, year=2026, department=None, status='DRAFT'):
+    school = env['school_a']
+    offset = StaffMember.objects.filter(school=school).count()
+    payslips = []
+    for n in range(offset, offset + count):
+        staff = StaffMember.objects.create(
+            school=school, first_name=f'Export {n:03d}', last_name='Staff', employee_id=f'EXP-{n:03d}',
+            department=department,
+        )
+        payslips.append(Payslip.objects.create(
+            school=school, staff_member=staff, month=month, year=year, status=status,
+            basic_salary=Decimal('30000'), total_allowances=Decimal('5000'), total_deductions=Decimal('1000'),
+            net_salary=Decimal('34000'), allowances_breakdown={'house_rent': 5000},
+            deductions_breakdown={'tax': 1000},
+        ))
+    return payslips
+
+
+def _export(env, **kwargs):
+    task_kwargs = {'school_id': env['SID_A'], 'user_id': env['users']['admin'].id, 'month': 5, 'year': 2026}
+    task_kwargs.update(kwargs)
+    return run_task_sync(
+        export_payslips_task, BackgroundTask.TaskType.PAYSLIP_GENERATION, 'Export', env['SID_A'],
+        env['users']['admin'], task_kwargs=task_kwargs,
+    )
+
+
+def _report_bytes(task):
+    report = GeneratedReport.objects.get(id=task.result_data['report_id'])
+    with report.file.open('rb') as fh:
+        return report, fh.read()
+
+
+@pytest.mark.django_db
+class TestPayslipBatchExport:
+
+    def test_merged_pdf_has_one_page_per_payslip(self, seed_data, api):
+        _payslips(seed_data, 4)
+        _payslips(seed_data, 2, month=6)
+
+        resp = api.post(EXPORT_URL, {'month': 5, 'year': 2026},
+                        seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert resp.status_code == 202, resp.content[:300]
+
+        task = BackgroundTask.objects.get(celery_task_id=resp.json()['task_id'])
+        assert task.status == BackgroundTask.Status.SUCCESS, task.error_message
+        assert task.progress_total == 4 and task.progress_current == 4
+        report, content = _report_bytes(task)
+        assert report.report_type == 'PAYSLIPS' and report.format == 'PDF'
+        assert content.startswith(b'%PDF-')
+        assert len(PAGE_PATTERN.findall(content)) == 4
+
+    def test_zip_of_filtered_subset(self, seed_data, api):
+        department = StaffDepartment.objects.create(school=seed_data['school_a'], name='Export Dept')
+        in_department = _payslips(seed_data, 3, department=department)
+        _payslips(seed_data, 2)
+        Payslip.objects.filter(id=in_department[0].id).update(status='APPROVED')
+
+        task = _export(seed_data, output_format='ZIP', department_id=department.id, status='draft')
+        assert task.status == BackgroundTask.Status.SUCCESS, task.error_message
+        report, content = _report_bytes(task)
+        assert report.format == 'ZIP'
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            names = sorted(archive.namelist())
+            assert names == [f'payslip_{p.staff_member.full_name.replace(" ", "_")}_5_2026.pdf'
+                             for p in in_department[1:]]
+            assert all(archive.read(name).startswith(b'%PDF-') for name in names)
+
+        assert api.post(EXPORT_URL, {'month': 1, 'year': 2020},
+                        seed_data['tokens']['admin'], seed_data['SID_A']).status_code == 400
+
+    def test_batch_queries_are_constant_unlike_per_request_downloads(self, seed_data, api):
+        payslips = _payslips(seed_data, 3)
+        with CaptureQueriesContext(connection) as per_request:
+            for payslip in payslips:
+                resp = api.get(f'/api/hr/payslips/{payslip.id}/download-pdf/',
+                               seed_data['tokens']['admin'], seed_data['SID_A'])
+                assert resp.status_code == 200 and resp.content.startswith(b'%PDF-')
+        with CaptureQueriesContext(connection) as small:
+            _export(seed_data)
+
+        payslips += _payslips(seed_data, 27)
+        with CaptureQueriesContext(connection) as large:
+            task = _export(seed_data)
+        assert task.result_data['payslips'] == 30
+        # Only the throttled progress update is added for the extra 27 pages.
+        assert len(large.captured_queries) == len(small.captured_queries) + 1
+        assert len(large.captured_queries) < len(per_request.captured_queries)
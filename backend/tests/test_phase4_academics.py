@@ -1032,7 +1032,7 @@ class TestTimetableEntries:
         }, token, SID_A)
         assert resp.status_code == 400, f"D4 Duplicate class+day+slot -> 400, got {resp.status_code}"
 
-    def test_d5_teacher_conflict_rejected(self, seed_data, api):
+    def test_d5_teacher_conflict_rejected(self, seed_data, api, django_capture_on_commit_callbacks):
         """D5: Same teacher at same day+slot in different class returns 400."""
         prefix = seed_data['prefix']
         token = seed_data['tokens']['admin']
@@ -1043,14 +1043,15 @@ class TestTimetableEntries:
 
         slot_ids, subj_ids = self._setup_slots_and_subjects(seed_data, api, 'd5')
 
-        # Staff 3 in class_1 MON slot_p1
-        api.post('/api/academics/timetable-entries/', {
-            'class_obj': class_1.id,
-            'day': 'MON',
-            'slot': slot_ids['p1'],
-            'subject': subj_ids['math'],
-            'teacher': staff_3.id,
-        }, token, SID_A)
+        # Staff 3 in class_1 MON slot_p1 (committed, as a separate request would be)
+        with django_capture_on_commit_callbacks(execute=True):
+            api.post('/api/academics/timetable-entries/', {
+                'class_obj': class_1.id,
+                'day': 'MON',
+                'slot': slot_ids['p1'],
+                'subject': subj_ids['math'],
+                'teacher': staff_3.id,
+            }, token, SID_A)
 
         # Same teacher, same slot, different class -> conflict
         resp = api.post('/api/academics/timetable-entries/', {
@@ -1150,7 +1151,7 @@ class TestTimetableEntries:
         ).count()
         assert tue_count == 1, f"D8 Expected 1 TUE entry, got {tue_count}"
 
-    def test_d9_teacher_conflicts_endpoint_has_conflict(self, seed_data, api):
+    def test_d9_teacher_conflicts_endpoint_has_conflict(self, seed_data, api, django_capture_on_commit_callbacks):
         """D9: teacher_conflicts endpoint returns has_conflict=True when busy."""
         prefix = seed_data['prefix']
         token = seed_data['tokens']['admin']
@@ -1161,14 +1162,15 @@ class TestTimetableEntries:
 
         slot_ids, subj_ids = self._setup_slots_and_subjects(seed_data, api, 'd9')
 
-        # Book staff_3 on MON slot p1
-        api.post('/api/academics/timetable-entries/', {
-            'class_obj': class_1.id,
-            'day': 'MON',
-            'slot': slot_ids['p1'],
-            'subject': subj_ids['math'],
-            'teacher': staff_3.id,
-        }, token, SID_A)
+        # Book staff_3 on MON slot p1 (committed, as a separate request would be)
+        with django_capture_on_commit_callbacks(execute=True):
+            api.post('/api/academics/timetable-entries/', {
+                'class_obj': class_1.id,
+                'day': 'MON',
+                'slot': slot_ids['p1'],
+                'subject': subj_ids['math'],
+                'teacher': staff_3.id,
+            }, token, SID_A)
 
         resp = api.get(
             f'/api/academics/timetable-entries/teacher_conflicts/'
@@ -0,0 +1,170 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.bulk_promotion_service import BulkPromotionService
+from academic_sessions.models import AcademicYear, StudentEnrollment
+from academic_sessions.promotion_advisor_service import PromotionAdvisorService
+from academic_sessions.section_allocator_service import SectionAllocatorService
+from academics.models import Subject
+from attendance.models import AttendanceRecord
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from students.models import Class, Student
+
+
+def _add_class(env, index, size=4):
+    """A class with two exams, marks in one subject and a week of attendance."""
+    school, year = env['school_a'], env['academic_year']
+    class_obj = Class.objects.create(school=school, name=f'Advisor {index}', grade_level=2)
+    subject = Subject.objects.create(school=school, name=f'Advisor Subject {index}', code=f'ADV{index}')
+    exam_type = ExamType.objects.create(school=school, name=f'Advisor Type {index}')
+    exams = [
+        ExamSubject.objects.create(
+            school=school, subject=subject, total_marks=Decimal('100'), passing_marks=Decimal('33'),
+            exam=Exam.objects.create(
+                school=school, academic_year=year, exam_type=exam_type, class_obj=class_obj,
+                name=f'Advisor {index} Exam {n}', start_date=date(2025, 5 + 4 * n, 1),
+            ),
+        )
+        for n in range(2)
+    ]
+    students = []
+    for i in range(size):
+        student = Student.objects.create(
+            school=school, class_obj=class_obj, roll_number=str(i + 1), name=f'Advisor {index}-{i}',
+        )
+        StudentEnrollment.objects.create(
+            school=school, student=student, academic_year=year, class_obj=class_obj, roll_number=str(i + 1),
+        )
+        for n, exam_subject in enumerate(exams):
+            StudentMark.objects.create(
+                school=school, exam_subject=exam_subject, student=student,
+                marks_obtained=Decimal(25 + 20 * i + 10 * n * (i % 2)),
+            )
+        for day in range(5):
+            AttendanceRecord.objects.create(
+                school=school, academic_year=year, student=student, date=date(2025, 6, 2) + timedelta(days=day),
+                status='ABSENT' if day < i else 'PRESENT',
+            )
+        students.append(student)
+    return class_obj, students
+
+
+@pytest.mark.django_db
+class TestSchoolWidePromotionAdvisor:
+
+    def test_matches_per_class_results(self, seed_data):
+        classes = [_add_class(seed_data, n)[0] for n in range(3)]
+        service = PromotionAdvisorService(seed_data['school_a'].id, seed_data['academic_year'].id)
+
+        by_class = service.get_school_recommendations()
+
+        for class_obj in classes:
+            assert by_class[class_obj.id] == service.get_recommendations(class_obj.id)
+        recommendations = {r['recommendation'] for recs in by_class.values() for r in recs}
+        assert {'PROMOTE', 'RETAIN'} <= recommendations
+
+    def test_query_count_does_not_grow_with_classes(self, seed_data):
+        _add_class(seed_data, 0)
+        service = PromotionAdvisorService(seed_data['school_a'].id, seed_data['academic_year'].id)
+        with CaptureQueriesContext(connection) as small:
+            service._recommend()
+
+        for n in range(1, 6):
+            _add_class(seed_data, n)
+        with CaptureQueriesContext(connection) as large:
+            by_class = service._recommend()
+        assert len(by_class) == 6
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_results_are_cached_until_data_changes(self, seed_data):
+        class_obj, students = _add_class(seed_data, 0)
+        service = PromotionAdvisorService(seed_data['school_a'].id, seed_data['academic_year'].id)
+        first = service.get_school_recommendations()
+
+        with CaptureQueriesContext(connection) as cached:
+            assert service.get_school_recommendations() == first
+        assert len(cached.captured_queries) == 0
+
+        AttendanceRecord.objects.filter(student=students[0]).update(status='ABSENT')
+        AttendanceRecord.objects.filter(student=students[0]).first().save()
+        changed = service.get_school_recommendations()[class_obj.id]
+        row = next(r for r in changed if r['student_id'] == students[0].id)
+        assert row['attendance_rate'] == 0.0
+
+        StudentMark.objects.filter(student=students[0]).delete()
+        row = next(r for r in service.get_school_recommendations()[class_obj.id]
+                   if r['student_id'] == students[0].id)
+        assert row['average_score'] == 0.0 and row['subject_scores'] == []
+
+
+@pytest.mark.django_db
+class TestBulkEnrollmentWritersInvalidateAdvice:
+
+    def test_section_allocation_regroups_cached_advice(self, seed_data, django_capture_on_commit_callbacks):
+        class_obj, students = _add_class(seed_data, 0)
+        school = seed_data['school_a']
+        sections = [
+            Class.objects.create(school=school, name=f'Advisor 0-{name}', section=name, grade_level=8)
+            for name in ('A', 'B')
+        ]
+        service = PromotionAdvisorService(school.id, seed_data['academic_year'].id)
+        assert class_obj.id in service.get_school_recommendations()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            result = SectionAllocatorService(school.id).apply_allocation(
+                academic_year_id=seed_data['academic_year'].id, class_id=class_obj.id,
+                allocation_data={'sections': [
+                    {'section_name': section.section, 'students': [{'student_id': s.id} for s in students[i::2]]}
+                    for i, section in enumerate(sections)
+                ]},
+            )
+        assert result['success'], result
+
+        by_class = service.get_school_recommendations()
+        assert class_obj.id not in by_class
+        assert [len(by_class[section.id]) for section in sections] == [2, 2]
+
+    def test_bulk_promotion_invalidates_cached_advice(self, seed_data, django_capture_on_commit_callbacks):
+        class_obj, students = _add_class(seed_data, 0)
+        school, year = seed_data['school_a'], seed_data['academic_year']
+        target_year = AcademicYear.objects.create(
+            school=school, name='Advisor Next', start_date=date(2026, 4, 1), end_date=date(2027, 3, 31),
+        )
+        target_class = Class.objects.create(school=school, name='Advisor Next Grade', grade_level=3)
+        service = PromotionAdvisorService(school.id, year.id)
+        service.get_school_recommendations()
+
+        with CaptureQueriesContext(connection) as cached:
+            service.get_school_recommendations()
+        assert len(cached.captured_queries) == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            outcome = BulkPromotionService(school.id, year.id, target_year.id).run([
+                {'student_id': students[0].id, 'target_class_id': target_class.id, 'action': 'PROMOTE'},
+            ])
+        assert outcome['promoted'] == 1
+
+        with CaptureQueriesContext(connection) as refreshed:
+            service.get_school_recommendations()
+        assert len(refreshed.captured_queries) > 0
+
+
+@pytest.mark.django_db
+def test_endpoint_without_class_analyzes_every_class(seed_data, api):
+    _add_class(seed_data, 0, size=3)
+    _add_class(seed_data, 1, size=2)
+
+    resp = api.post('/api/sessions/promotion-advisor/', {
+        'academic_year': seed_data['academic_year'].id,
+    }, seed_data['tokens']['admin'], seed_data['SID_A'])
+
+    assert resp.status_code == 200, resp.content[:300]
+    result = resp.json()['result']
+    advisor_classes = [c for c in result['classes'] if c['class_name'].startswith('Advisor')]
+    assert [(c['class_name'], c['total']) for c in advisor_classes] == [('Advisor 0', 3), ('Advisor 1', 2)]
+    assert result['total'] == sum(c['total'] for c in result['classes'])
+    assert sum(result['summary'].values()) <= result['total']
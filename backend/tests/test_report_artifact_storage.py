@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+import os
+
+from django.http import FileResponse
+from django.utils import timezone
+
+import pytest
+
+from reports.models import GeneratedReport
+from reports.storage import store_report_artifact
+from reports.tasks import cleanup_expired_reports
+
+
+GENERATE_URL = '/api/reports/generate/'
+
+
+@pytest.mark.django_db
+class TestReportArtifactStorage:
+
+    def _report(self, seed_data, content=b'%PDF-1.4 test', **overrides):
+        fields = {
+            'school': seed_data['school_a'],
+            'report_type': 'ATTENDANCE_DAILY',
+            'title': 'Daily Attendance Report',
+            'format': 'PDF',
+        }
+        fields.update(overrides)
+        report = GeneratedReport(**fields)
+        store_report_artifact(report, content)
+        return report
+
+    def test_generated_report_is_stored_outside_database(self, seed_data, api):
+        resp = api.post(GENERATE_URL, {
+            'report_type': 'ATTENDANCE_DAILY',
+            'format': 'XLSX',
+            'parameters': {'date': str(date.today())},
+        }, seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert resp.status_code == 200, resp.content
+
+        report = GeneratedReport.objects.get(id=resp.json()['result']['report_id'])
+        assert report.file.name.startswith(f"reports/{seed_data['school_a'].id}/")
+        assert report.file_size == report.file.size > 0
+
+        download = api.get(f'/api/reports/{report.id}/download/',
+                           seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert download.status_code == 200
+        assert isinstance(download, FileResponse)
+        assert download['Content-Disposition'] == f'attachment; filename="report_{report.id}.xlsx"'
+        assert b''.join(download.streaming_content)[:2] == b'PK'
+
+    def test_download_is_tenant_scoped_and_handles_missing_artifact(self, seed_data, api):
+        report = self._report(seed_data)
+
+        other = api.get(f'/api/reports/{report.id}/download/',
+                        seed_data['tokens']['admin_b'], seed_data['SID_B'])
+        assert other.status_code == 404
+
+        os.remove(report.file.path)
+        missing = api.get(f'/api/reports/{report.id}/download/',
+                          seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert missing.status_code == 404
+
+    def test_retention_cleanup_removes_rows_and_files(self, seed_data):
+        old = self._report(seed_data)
+        fresh = self._report(seed_data)
+        GeneratedReport.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(days=45),
+        )
+        old_path = old.file.path
+
+        result = cleanup_expired_reports(days=30)
+
+        assert result == {'deleted_count': 1}
+        assert not os.path.exists(old_path)
+        assert os.path.exists(fresh.file.path)
+        assert list(GeneratedReport.objects.values_list('id', flat=True)) == [fresh.id]
@@ -0,0 +1,141 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from academic_sessions.models import StudentEnrollment
+from academics.models import Subject
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from reports.models import GeneratedReport
+from students.models import Class, Student
+
+
+SINGLE_URL = '/api/examinations/report-card/'
+BATCH_URL = '/api/examinations/report-card/batch/'
+
+
+@pytest.fixture
+def card_env(seed_data):
+    """Grade 8 with two sections, two published exams and three subjects each."""
+    school = seed_data['school_a']
+    year = seed_data['academic_year']
+    subjects = [
+        Subject.objects.create(school=school, name=f'Card Subject {i}', code=f'CS{i}')
+        for i in range(3)
+    ]
+    exam_types = [
+        ExamType.objects.create(school=school, name=f'Card Type {i}', weight=Decimal(w))
+        for i, w in enumerate(['40', '60'])
+    ]
+    sections = {}
+    for section in ('A', 'B'):
+        class_obj = Class.objects.create(school=school, name='Grade 8', section=section, grade_level=10)
+        students = []
+        for i in range(6):
+            student = Student.objects.create(
+                school=school, class_obj=class_obj, roll_number=str(i + 1), name=f'8{section} Student {i + 1}',
+            )
+            StudentEnrollment.objects.create(
+                school=school, student=student, academic_year=year,
+                class_obj=class_obj, roll_number=str(i + 1),
+            )
+            students.append(student)
+        for exam_type in exam_types:
+            exam = Exam.objects.create(
+                school=school, academic_year=year, term=seed_data['terms'][0], exam_type=exam_type,
+                class_obj=class_obj, name=f'{exam_type.name} 8{section}', status='PUBLISHED',
+            )
+            for j, subject in enumerate(subjects):
+                es = ExamSubject.objects.create(
+                    school=school, exam=exam, subject=subject,
+                    total_marks=Decimal('100'), passing_marks=Decimal('33'),
+                )
+                StudentMark.objects.bulk_create([
+                    StudentMark(
+                        school=school, exam_subject=es, student=student,
+                        marks_obtained=Decimal(30 + (i * 11 + j * 7) % 70),
+                    )
+                    for i, student in enumerate(students)
+                ])
+        sections[section] = {'class': class_obj, 'students': students}
+    return {**seed_data, 'sections': sections}
+
+
+@pytest.mark.django_db
+class TestReportCardBatch:
+
+    def test_batch_cards_match_single_student_endpoint(self, card_env, api):
+        section = card_env['sections']['A']
+        resp = api.get(
+            f"{BATCH_URL}?academic_year_id={card_env['academic_year'].id}&class_id={section['class'].id}",
+            card_env['tokens']['admin'], card_env['SID_A'],
+        )
+        assert resp.status_code == 200
+        cards = resp.json()['report_cards']
+        assert [c['student']['id'] for c in cards] == [s.id for s in section['students']]
+
+        for student, card in zip(section['students'], cards):
+            single = api.get(
+                f"{SINGLE_URL}?student_id={student.id}&academic_year_id={card_env['academic_year'].id}",
+                card_env['tokens']['admin'], card_env['SID_A'],
+            )
+            assert single.status_code == 200
+            assert single.json() == card
+
+    def test_batch_query_count_does_not_grow_with_students(self, card_env, api):
+        year_id = card_env['academic_year'].id
+        section = card_env['sections']['A']
+        # Warm the materialized results so both paths read the same state.
+        api.get(f"{BATCH_URL}?academic_year_id={year_id}&grade_level=10",
+                card_env['tokens']['admin'], card_env['SID_A'])
+
+        with CaptureQueriesContext(connection) as per_student:
+            for student in section['students']:
+                api.get(f"{SINGLE_URL}?student_id={student.id}&academic_year_id={year_id}",
+                        card_env['tokens']['admin'], card_env['SID_A'])
+        with CaptureQueriesContext(connection) as one_section:
+            api.get(f"{BATCH_URL}?academic_year_id={year_id}&class_id={section['class'].id}",
+                    card_env['tokens']['admin'], card_env['SID_A'])
+
+        StudentEnrollment.objects.filter(student__in=section['students'][3:]).update(is_active=False)
+        with CaptureQueriesContext(connection) as fewer_students:
+            api.get(f"{BATCH_URL}?academic_year_id={year_id}&class_id={section['class'].id}",
+                    card_env['tokens']['admin'], card_env['SID_A'])
+
+        assert len(one_section.captured_queries) == len(fewer_students.captured_queries)
+        assert len(one_section.captured_queries) * 3 < len(per_student.captured_queries)
+
+    def test_grade_level_mode_covers_every_section(self, card_env, api):
+        resp = api.get(
+            f"{BATCH_URL}?academic_year_id={card_env['academic_year'].id}&grade_level=10",
+            card_env['tokens']['admin'], card_env['SID_A'],
+        )
+        assert resp.status_code == 200
+        assert resp.json()['count'] == 12
+        assert {c['class_name'] for c in resp.json()['report_cards']} == {'Grade 8'}
+
+        assert api.get(f"{BATCH_URL}?grade_level=10", card_env['tokens']['admin'],
+                       card_env['SID_A']).status_code == 400
+        resp = api.get(f"{BATCH_URL}?academic_year_id=abc&grade_level=10", card_env['tokens']['admin'],
+                       card_env['SID_A'])
+        assert resp.status_code == 400
+        assert resp.json() == {'detail': 'academic_year_id must be an integer.'}
+
+    def test_background_pdf_is_stored_with_progress(self, card_env, api):
+        pytest.importorskip('reportlab')
+        from core.models import BackgroundTask
+
+        resp = api.post(BATCH_URL, {
+            'academic_year_id': card_env['academic_year'].id, 'grade_level': 10,
+        }, card_env['tokens']['admin'], card_env['SID_A'])
+        assert resp.status_code == 202
+
+        task = BackgroundTask.objects.get(celery_task_id=resp.json()['task_id'])
+        assert task.status == BackgroundTask.Status.SUCCESS, task.error_message
+        assert task.progress_total == 12 and task.progress_current == 12
+        report = GeneratedReport.objects.get(id=task.result_data['report_id'])
+        assert report.report_type == 'REPORT_CARDS'
+        with report.file.open('rb') as fh:
+            assert fh.read(5) == b'%PDF-'
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+
+from attendance.models import AttendanceRecord
+from reports.models import GeneratedReport
+from reports.result_cache import normalize_parameters, report_cache_key
+
+
+GENERATE_URL = '/api/reports/generate/'
+
+
+@pytest.mark.django_db
+class TestReportResultCache:
+
+    def _generate(self, seed_data, api, parameters, fmt='XLSX', report_type='ATTENDANCE_DAILY'):
+        resp = api.post(GENERATE_URL, {
+            'report_type': report_type,
+            'format': fmt,
+            'parameters': parameters,
+        }, seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert resp.status_code == 200, resp.content
+        return resp.json()['result']
+
+    def test_repeat_request_reuses_artifact(self, seed_data, api):
+        params = {'date': str(date.today())}
+
+        first = self._generate(seed_data, api, params)
+        second = self._generate(seed_data, api, {**params, 'class_id': ''})
+
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['report_id'] == first['report_id']
+        assert GeneratedReport.objects.filter(school=seed_data['school_a']).count() == 1
+
+    def test_repeat_pdf_request_returns_immediately(self, seed_data, api):
+        params = {'date': str(date.today())}
+        resp = api.post(GENERATE_URL, {
+            'report_type': 'ATTENDANCE_DAILY', 'format': 'PDF', 'parameters': params,
+        }, seed_data['tokens']['admin'], seed_data['SID_A'])
+        assert resp.status_code == 202
+
+        cached = self._generate(seed_data, api, params, fmt='PDF')
+        assert cached['cached'] is True
+        assert GeneratedReport.objects.filter(school=seed_data['school_a'], format='PDF').count() == 1
+
+    def test_source_change_invalidates(self, seed_data, api):
+        params = {'date': str(date.today())}
+        first = self._generate(seed_data, api, params)
+
+        student = seed_data['students'][0]
+        student.name = f"{student.name} Renamed"
+        student.save()
+        second = self._generate(seed_data, api, params)
+
+        assert second['cached'] is False
+        assert second['report_id'] != first['report_id']
+
+    def test_attendance_insert_moves_key(self, seed_data):
+        school_a = seed_data['school_a']
+        params = {'date': str(date.today())}
+        key = report_cache_key(school_a.id, 'ATTENDANCE_DAILY', 'PDF', params)
+
+        AttendanceRecord.objects.create(
+            school=school_a,
+            student=seed_data['students'][0],
+            date=date.today(),
+            status=AttendanceRecord.AttendanceStatus.ABSENT,
+        )
+
+        assert report_cache_key(school_a.id, 'ATTENDANCE_DAILY', 'PDF', params) != key
+
+    def test_key_ignores_other_schools_and_unrelated_tables(self, seed_data):
+        school_a = seed_data['school_a']
+        params = {'date': str(date.today())}
+        key = report_cache_key(school_a.id, 'ATTENDANCE_DAILY', 'XLSX', params)
+
+        from students.models import Class, Student
+        other_class = Class.objects.create(school=seed_data['school_b'], name='Other', grade_level=1)
+        Student.objects.create(
+            school=seed_data['school_b'], class_obj=other_class, roll_number='1', name='Other Student',
+        )
+        assert report_cache_key(school_a.id, 'ATTENDANCE_DAILY', 'XLSX', params) == key
+
+        assert report_cache_key(school_a.id, 'ATTENDANCE_DAILY', 'PDF', params) != key
+        assert report_cache_key(school_a.id, 'FEE_COLLECTION', 'XLSX', params) != key
+
+    def test_parameterless_period_reports_key_on_current_period(self, seed_data):
+        school_a = seed_data['school_a']
+        today = date.today()
+        for report_type, explicit in (
+            ('ATTENDANCE_DAILY', {'date': str(today)}),
+            ('ATTENDANCE_MONTHLY', {'month': today.month, 'year': today.year}),
+            ('FEE_COLLECTION', {'month': str(today.month), 'year': str(today.year)}),
+        ):
+            key = report_cache_key(school_a.id, report_type, 'PDF', {})
+            assert key == report_cache_key(school_a.id, report_type, 'PDF', explicit)
+
+            with mock.patch('reports.result_cache.date') as fake_date:
+                fake_date.today.return_value = today + timedelta(days=40)
+                assert report_cache_key(school_a.id, report_type, 'PDF', {}) != key
+
+    def test_normalize_parameters(self):
+        assert normalize_parameters({'b': 2, 'a': '', 'c': None, 'd': [1, '2']}) == {
+            'b': '2', 'd': ['1', '2'],
+        }
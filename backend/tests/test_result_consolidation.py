@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.models import StudentEnrollment
+from academics.models import Subject
+from examinations.consolidation import compute_consolidated_results, get_consolidated_results
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from students.models import Class, Student
+
+
+URL = '/api/examinations/results/consolidated/'
+
+# Term 1 marks per student: {exam type: (Maths, English)}; None = absent.
+TERM_ONE_MARKS = {
+    'S1': {'Mid': ('50', '100'), 'Final': ('80', '50')},
+    'S2': {'Mid': (None, '60'), 'Final': ('90', '60')},
+    'S3': {'Mid': ('70', '70'), 'Final': ('70', '70')},
+}
+
+
+def _sit(env, exam_type, term, marks, status='PUBLISHED'):
+    exam = Exam.objects.create(
+        school=env['school_a'], academic_year=env['academic_year'], term=term,
+        exam_type=exam_type, class_obj=env['class'], name=f'{exam_type.name} {term.name}', status=status,
+    )
+    for j, subject in enumerate(env['subjects']):
+        exam_subject = ExamSubject.objects.create(
+            school=env['school_a'], exam=exam, subject=subject,
+            total_marks=Decimal('100'), passing_marks=Decimal('33'),
+        )
+        for student in env['students']:
+            value = marks[student.name][j]
+            StudentMark.objects.create(
+                school=env['school_a'], exam_subject=exam_subject, student=student,
+                marks_obtained=None if value is None else Decimal(value), is_absent=value is None,
+            )
+    return exam
+
+
+@pytest.fixture
+def consolidation_env(seed_data):
+    school = seed_data['school_a']
+    class_obj = Class.objects.create(school=school, name='Consolidation', grade_level=13)
+    students = []
+    for i, name in enumerate(TERM_ONE_MARKS, start=1):
+        student = Student.objects.create(school=school, class_obj=class_obj, roll_number=str(i), name=name)
+        StudentEnrollment.objects.create(
+            school=school, student=student, academic_year=seed_data['academic_year'],
+            class_obj=class_obj, roll_number=str(i),
+        )
+        students.append(student)
+    env = {
+        **seed_data,
+        'class': class_obj,
+        'students': students,
+        'subjects': [
+            Subject.objects.create(school=school, name='Cons Maths', code='CONM'),
+            Subject.objects.create(school=school, name='Cons English', code='CONE'),
+        ],
+        'types': {
+            'Mid': ExamType.objects.create(school=school, name='Cons Mid', weight=Decimal('40')),
+            'Final': ExamType.objects.create(school=school, name='Cons Final', weight=Decimal('60')),
+        },
+    }
+    term = seed_data['terms'][0]
+    for type_name, exam_type in env['types'].items():
+        _sit(env, exam_type, term, {name: marks[type_name] for name, marks in TERM_ONE_MARKS.items()})
+    # Unpublished exams never count.
+    draft_type = ExamType.objects.create(school=school, name='Cons Draft', weight=Decimal('100'))
+    _sit(env, draft_type, term, {name: ('0', '0') for name in TERM_ONE_MARKS}, status='MARKS_ENTRY')
+    return env
+
+
+def _by_name(data):
+    return {row['student_name']: row for row in data['results']}
+
+
+@pytest.mark.django_db
+class TestResultConsolidation:
+
+    def test_term_results_are_weighted_by_exam_type(self, consolidation_env, api):
+        env = consolidation_env
+        resp = api.get(
+            f"{URL}?class_id={env['class'].id}&academic_year_id={env['academic_year'].id}"
+            f"&term_id={env['terms'][0].id}",
+            env['tokens']['admin'], env['SID_A'],
+        )
+        assert resp.status_code == 200, resp.content
+        data = resp.json()
+
+        assert len(data['exams']) == 2
+        rows = _by_name(data)
+        assert [r['student_name'] for r in data['results']] == ['S3', 'S1', 'S2']
+        assert [r['rank'] for r in data['results']] == [1, 2, 3]
+        assert [s['percentage'] for s in rows['S1']['subjects']] == [70.0, 68.0]  # English, Maths
+        assert rows['S1']['percentage'] == 69.0
+        assert rows['S2']['percentage'] == 57.0
+        assert rows['S2']['is_pass'] is False
+        assert [s['is_pass'] for s in rows['S2']['subjects']] == [True, False]
+        assert data['passed'] == 2
+
+    def test_cached_until_a_contributing_mark_changes(self, consolidation_env):
+        env = consolidation_env
+        args = (env['school_a'].id, env['class'], env['academic_year'].id, env['terms'][0].id)
+        first = get_consolidated_results(*args)
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert get_consolidated_results(*args) == first
+        assert len(ctx.captured_queries) == 0
+
+        mark = StudentMark.objects.get(
+            student=env['students'][1], exam_subject__subject=env['subjects'][0],
+            exam_subject__exam__exam_type=env['types']['Mid'],
+        )
+        mark.marks_obtained = Decimal('100')
+        mark.is_absent = False
+        mark.save()
+        assert _by_name(get_consolidated_results(*args))['S2']['percentage'] == 77.0
+
+        env['types']['Mid'].weight = Decimal('60')
+        env['types']['Mid'].save()
+        assert _by_name(get_consolidated_results(*args))['S1']['percentage'] == 70.0
+
+    def test_annual_query_count_does_not_grow_with_exams(self, consolidation_env):
+        env = consolidation_env
+        school_id, year_id = env['school_a'].id, env['academic_year'].id
+        with CaptureQueriesContext(connection) as term_ctx:
+            compute_consolidated_results(school_id, env['class'], year_id, env['terms'][0].id)
+
+        _sit(env, env['types']['Mid'], env['terms'][1], {name: ('100', '100') for name in TERM_ONE_MARKS})
+        with CaptureQueriesContext(connection) as annual_ctx:
+            annual = compute_consolidated_results(school_id, env['class'], year_id)
+
+        assert len(annual['exams']) == 3
+        assert len(annual_ctx.captured_queries) == len(term_ctx.captured_queries)
+        # Mid now covers 400 marks: S3 scores 340/400 = 85% there and 70% in Final.
+        assert _by_name(annual)['S3']['percentage'] == 76.0
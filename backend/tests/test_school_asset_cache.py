@@ -0,0 +1,97 @@
+import io
+
+import pytest
+from PIL import Image
+
+from core import school_assets
+
+
+def _png_bytes(color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def downloads(monkeypatch, tmp_path, settings):
+    """Replace the network fetch with a counting stub and isolate caches."""
+    settings.SCHOOL_ASSET_CACHE_DIR = str(tmp_path)
+    school_assets._memory_cache.clear()
+    school_assets._failures.clear()
+    calls = []
+    payloads = {}
+
+    def fake_download(url):
+        calls.append(url)
+        payload = payloads.get(url, _png_bytes())
+        if isinstance(payload, Exception):
+            raise payload
+        return payload
+
+    monkeypatch.setattr(school_assets, '_download', fake_download)
+    yield calls, payloads
+    school_assets._memory_cache.clear()
+    school_assets._failures.clear()
+
+
+@pytest.mark.django_db
+class TestSchoolAssetCache:
+
+    def test_batch_letter_render_downloads_letterhead_once(self, seed_data, downloads):
+        pytest.importorskip('reportlab')
+        from reports.generators.letter import LetterPDFGenerator
+
+        calls, _ = downloads
+        school = seed_data['school_a']
+        school.letterhead_url = 'https://assets.example.com/letterhead.png'
+        school.save(update_fields=['letterhead_url'])
+
+        for i in range(5):
+            pdf = LetterPDFGenerator(school, f'Recipient {i}', 'Subject', 'Body').generate()
+            assert pdf.startswith(b'%PDF')
+
+        assert calls == ['https://assets.example.com/letterhead.png']
+
+    def test_disk_cache_survives_process_memory_loss(self, seed_data, downloads):
+        calls, _ = downloads
+        school = seed_data['school_a']
+        school.logo = 'https://assets.example.com/logo.png'
+
+        assert school_assets.get_school_logo(school)
+        school_assets._memory_cache.clear()
+        assert school_assets.get_school_logo(school)
+        assert len(calls) == 1
+
+    def test_url_change_and_invalidation_refetch(self, seed_data, downloads):
+        calls, payloads = downloads
+        school = seed_data['school_a']
+        school.logo = 'https://assets.example.com/logo-v1.png'
+        payloads['https://assets.example.com/logo-v2.png'] = _png_bytes('blue')
+
+        first = school_assets.get_school_logo(school)
+        school.logo = 'https://assets.example.com/logo-v2.png'
+        second = school_assets.get_school_logo(school)
+        assert first != second
+
+        # Re-upload to the same URL: explicit invalidation forces a refetch.
+        school_assets.invalidate_school_assets(school.id)
+        school_assets.get_school_logo(school)
+        assert calls == [
+            'https://assets.example.com/logo-v1.png',
+            'https://assets.example.com/logo-v2.png',
+            'https://assets.example.com/logo-v2.png',
+        ]
+
+    def test_failed_or_invalid_download_is_not_retried_per_render(self, seed_data, downloads):
+        calls, payloads = downloads
+        school = seed_data['school_a']
+        school.logo = 'https://assets.example.com/broken.png'
+        payloads[school.logo] = b'<html>not an image</html>'
+
+        assert school_assets.get_school_logo(school) is None
+        assert school_assets.get_school_logo(school) is None
+        assert len(calls) == 1
+
+        school.logo = None
+        assert school_assets.get_school_logo(school) is None
+        assert len(calls) == 1
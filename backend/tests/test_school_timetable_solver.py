@@ -0,0 +1,95 @@
+from datetime import time
+
+import pytest
+
+from academics.ai_engine import DAYS, solve_school_timetable, timetable_objective
+from academics.models import ClassSubject, Subject, TimetableEntry, TimetableSlot
+from academics.timetable_benchmark import build_synthetic_school
+from core.models import BackgroundTask
+from students.models import Class
+
+
+URL = '/api/academics/timetable-entries/auto_generate_school/'
+
+
+def _assert_no_clashes(placements):
+    """placements: iterable of (class_id, teacher_id, day, slot_id)."""
+    class_cells, teacher_cells = set(), set()
+    for class_id, teacher_id, day, slot_id in placements:
+        assert (class_id, day, slot_id) not in class_cells
+        class_cells.add((class_id, day, slot_id))
+        if teacher_id:
+            assert (teacher_id, day, slot_id) not in teacher_cells
+            teacher_cells.add((teacher_id, day, slot_id))
+
+
+class TestSolveSchoolTimetable:
+
+    def test_neighbourhood_search_keeps_teachers_unique_and_improves(self):
+        pytest.importorskip('ortools')
+        demands, cells, morning = build_synthetic_school(num_classes=6, periods_per_day=4, classes_per_teacher=3)
+
+        solved = solve_school_timetable(
+            demands, cells, morning, time_limit_seconds=8, neighbourhood_size=2,
+        )
+
+        _assert_no_clashes(
+            (demands[i].class_id, demands[i].teacher_id, day, slot_id)
+            for i, day, slot_id in solved['assignments']
+        )
+        assert solved['rounds'] > 0
+        assert solved['objective_value'] <= solved['initial_objective']
+        assert solved['objective_value'] == timetable_objective(
+            demands, solved['assignments'], len(cells), morning,
+        )
+
+
+@pytest.mark.django_db
+class TestSchoolTimetableEndpoint:
+
+    def test_generates_all_selected_classes_in_one_task(self, seed_data, api):
+        pytest.importorskip('ortools')
+        school = seed_data['school_a']
+        teachers = seed_data['staff'][:2]
+        slots = [
+            TimetableSlot.objects.create(
+                school=school, name=f'Solver P{i}', slot_type='PERIOD',
+                start_time=time(8 + i), end_time=time(8 + i, 45), order=700 + i,
+            )
+            for i in range(3)
+        ]
+        subjects = [
+            Subject.objects.create(school=school, name=f'Solver Subject {i}', code=f'SOLV{i}')
+            for i in range(2)
+        ]
+        classes = [Class.objects.create(school=school, name=f'Solver {i}', grade_level=14) for i in range(3)]
+        for class_obj in classes:
+            for subject, teacher in zip(subjects, teachers):
+                ClassSubject.objects.create(
+                    school=school, class_obj=class_obj, subject=subject, teacher=teacher, periods_per_week=5,
+                )
+        # A class outside the selection keeps its entry and blocks the teacher.
+        outside = Class.objects.create(school=school, name='Solver Outside', grade_level=14)
+        TimetableEntry.objects.create(
+            school=school, class_obj=outside, day='MON', slot=slots[0], subject=subjects[0], teacher=teachers[0],
+        )
+
+        resp = api.post(URL, {
+            'class_ids': [c.id for c in classes], 'time_limit': 10,
+        }, seed_data['tokens']['admin'], seed_data['SID_A'])
+
+        assert resp.status_code == 202, resp.content
+        task = BackgroundTask.objects.get(celery_task_id=resp.json()['task_id'])
+        assert task.status == BackgroundTask.Status.SUCCESS, task.error_message
+        grids = task.result_data['grids']
+        assert set(grids) == {str(c.id) for c in classes}
+
+        placements = [
+            (class_id, entry['teacher_id'], day, entry['slot_id'])
+            for class_id, grid in grids.items() for day in DAYS for entry in grid[day]
+        ]
+        _assert_no_clashes(placements + [(str(outside.id), teachers[0].id, 'MON', slots[0].id)])
+        per_class = {}
+        for class_id, _, _, _ in placements:
+            per_class[class_id] = per_class.get(class_id, 0) + 1
+        assert per_class == {str(c.id): 10 for c in classes}
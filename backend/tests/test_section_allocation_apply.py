@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.models import StudentEnrollment
+from academic_sessions.section_allocator_service import SectionAllocatorService
+from students.models import Class, Student
+
+
+URL = '/api/sessions/section-allocator/'
+
+
+@pytest.fixture
+def split_env(seed_data):
+    school = seed_data['school_a']
+    source = Class.objects.create(school=school, name='Split 7', grade_level=7)
+    return {**seed_data, 'source': source}
+
+
+def _enroll(env, count, start=1):
+    students = []
+    for i in range(start, start + count):
+        student = Student.objects.create(
+            school=env['school_a'], class_obj=env['source'], roll_number=str(i), name=f'Split {i:03d}',
+        )
+        StudentEnrollment.objects.create(
+            school=env['school_a'], student=student, academic_year=env['academic_year'],
+            class_obj=env['source'], roll_number=str(i),
+        )
+        students.append(student)
+    return students
+
+
+def _allocation(env, students, num_sections=2):
+    return {'sections': [
+        {'section_name': chr(ord('A') + i), 'students': [{'student_id': s.id} for s in students[i::num_sections]]}
+        for i in range(num_sections)
+    ]}
+
+
+@pytest.mark.django_db
+class TestApplySectionAllocation:
+
+    def test_apply_endpoint_moves_enrollments_and_students(self, split_env, api):
+        students = _enroll(split_env, 6)
+        resp = api.post(URL, {
+            'class_id': split_env['source'].id, 'academic_year_id': split_env['academic_year'].id,
+            'num_sections': 2, 'action': 'apply',
+        }, split_env['tokens']['admin'], split_env['SID_A'])
+
+        assert resp.status_code == 200, resp.content[:300]
+        data = resp.json()
+        assert (data['sections_created'], data['students_moved'], data['errors']) == (2, 6, [])
+        sections = {c.id: c.name for c in Class.objects.filter(name__in=['Split 7-A', 'Split 7-B'])}
+        assert len(sections) == 2
+
+        enrolled = dict(StudentEnrollment.objects.filter(
+            student__in=students, academic_year=split_env['academic_year'],
+        ).values_list('student_id', 'class_obj_id'))
+        current = dict(Student.objects.filter(id__in=[s.id for s in students]).values_list('id', 'class_obj_id'))
+        assert enrolled == current
+        assert sorted(sections[c] for c in current.values()) == ['Split 7-A'] * 3 + ['Split 7-B'] * 3
+
+    def test_query_count_does_not_grow_with_students(self, split_env):
+        service = SectionAllocatorService(split_env['school_a'].id)
+        year_id = split_env['academic_year'].id
+        few = _enroll(split_env, 4)
+        service.apply_allocation(academic_year_id=year_id, allocation_data=_allocation(split_env, few),
+                                 class_id=split_env['source'].id)
+
+        many = _enroll(split_env, 60, start=100)
+        with CaptureQueriesContext(connection) as small:
+            service.apply_allocation(academic_year_id=year_id, allocation_data=_allocation(split_env, few),
+                                     class_id=split_env['source'].id)
+        with CaptureQueriesContext(connection) as large:
+            result = service.apply_allocation(academic_year_id=year_id, allocation_data=_allocation(split_env, many),
+                                              class_id=split_env['source'].id)
+        assert result['students_moved'] == 60
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_failure_rolls_back_the_whole_split(self, split_env):
+        students = _enroll(split_env, 4)
+        # Section B already has a roll 2 enrollment, so moving student 2 there clashes.
+        section_b = Class.objects.create(school=split_env['school_a'], name='Split 7-B', section='B', grade_level=7)
+        other = Student.objects.create(school=split_env['school_a'], class_obj=section_b, roll_number='2', name='Taken')
+        StudentEnrollment.objects.create(
+            school=split_env['school_a'], student=other, academic_year=split_env['academic_year'],
+            class_obj=section_b, roll_number='2',
+        )
+
+        result = SectionAllocatorService(split_env['school_a'].id).apply_allocation(
+            academic_year_id=split_env['academic_year'].id,
+            allocation_data=_allocation(split_env, students),
+            class_id=split_env['source'].id,
+        )
+
+        assert result['success'] is False
+        assert not Class.objects.filter(name='Split 7-A').exists()
+        assert set(StudentEnrollment.objects.filter(student__in=students).values_list('class_obj_id', flat=True)) == {
+            split_env['source'].id,
+        }
+        assert set(Student.objects.filter(id__in=[s.id for s in students]).values_list('class_obj_id', flat=True)) == {
+            split_env['source'].id,
+        }
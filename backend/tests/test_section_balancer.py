@@ -0,0 +1,142 @@
+import random
+import statistics
+import time
+from collections import Counter
+
+import pytest
+
+from academic_sessions.section_allocator_service import SectionAllocatorService
+from academic_sessions.section_balancer import SectionBalancer
+from finance.models import SiblingGroup, SiblingGroupMember
+from students.models import Class, Student
+
+
+def _cohort(size, families=30, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'student_id': i,
+            'avg_score': round(rng.uniform(30, 98), 1),
+            'gender': rng.choice('MMF'),
+            'special_needs': rng.random() < 0.05,
+            'family': f'fam{i // 3}' if i < families * 3 else None,
+        }
+        for i in range(size)
+    ]
+
+
+def _sibling_pairs(section):
+    return sum(n * (n - 1) // 2 for n in Counter(s['family'] for s in section if s['family']).values())
+
+
+class TestSectionBalancer:
+
+    def test_large_grade_balances_every_criterion_quickly(self):
+        cohort = _cohort(600)
+        started = time.perf_counter()
+        sections = SectionBalancer(cohort, 5, sibling_policy='apart', max_per_section=125).solve()
+        assert time.perf_counter() - started < 1.0
+
+        assert sorted(s['student_id'] for sec in sections for s in sec) == list(range(600))
+        assert [len(sec) for sec in sections] == [120] * 5
+        means = [statistics.fmean(s['avg_score'] for s in sec) for sec in sections]
+        assert max(means) - min(means) < 1.0
+        girls = [sum(1 for s in sec if s['gender'] == 'F') for sec in sections]
+        assert max(girls) - min(girls) <= 2
+        special = [sum(1 for s in sec if s['special_needs']) for sec in sections]
+        assert max(special) - min(special) <= 1
+        assert sum(_sibling_pairs(sec) for sec in sections) == 0
+
+    def test_together_policy_keeps_families_and_capacity(self):
+        cohort = _cohort(40, families=6)
+        sections = SectionBalancer(cohort, 3, sibling_policy='together', max_per_section=14).solve()
+
+        assert all(len(sec) <= 14 for sec in sections)
+        family_sections = {}
+        for index, sec in enumerate(sections):
+            for s in sec:
+                if s['family']:
+                    family_sections.setdefault(s['family'], set()).add(index)
+        assert len(family_sections) == 6
+        assert all(len(indexes) == 1 for indexes in family_sections.values())
+
+        with pytest.raises(ValueError):
+            SectionBalancer(cohort, 3, max_per_section=13)
+
+
+@pytest.mark.django_db
+def test_preview_reports_variance_per_criterion(seed_data, api):
+    school = seed_data['school_a']
+    source = Class.objects.create(school=school, name='Balance 8', grade_level=8)
+    students = [
+        Student.objects.create(
+            school=school, class_obj=source, roll_number=str(i), name=f'Balance {i:02d}',
+            gender='F' if i % 3 == 0 else 'M',
+            # Everyone shares the office phone; only the confirmed groups below are siblings.
+            parent_phone='0300-1111111',
+        )
+        for i in range(12)
+    ]
+    # Students 0-3 are two confirmed pairs of siblings.
+    for pair in (students[0:2], students[2:4]):
+        group = SiblingGroup.objects.create(school=school)
+        for order, student in enumerate(pair):
+            SiblingGroupMember.objects.create(group=group, student=student, order_index=order)
+
+    resp = api.post('/api/sessions/section-allocator/', {
+        'class_id': source.id, 'num_sections': 2, 'sibling_policy': 'together',
+        'special_needs_ids': [students[5].id, students[6].id], 'max_per_section': 6,
+        'weights': {'gender': 2},
+    }, seed_data['tokens']['admin'], seed_data['SID_A'])
+
+    assert resp.status_code == 200, resp.content[:300]
+    data = resp.json()
+    assert [s['count'] for s in data['sections']] == [6, 6]
+    assert [s['special_needs_count'] for s in data['sections']] == [1, 1]
+    criteria = data['balance_metrics']['criteria']
+    assert criteria['size'] == 0
+    assert criteria['special_needs'] == 0
+    assert set(criteria['gender']) == {'F', 'M'}
+    assert criteria['siblings'] == {
+        'policy': 'together', 'groups': 2, 'split_groups': 0, 'pairs_sharing_section': 2,
+    }
+    assert data['weights']['gender'] == 2.0
+    assert all('family' not in s for sec in data['sections'] for s in sec['students'])
+
+    resp = api.post('/api/sessions/section-allocator/', {
+        'class_id': source.id, 'num_sections': 2, 'sibling_policy': 'sometimes',
+    }, seed_data['tokens']['admin'], seed_data['SID_A'])
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_phone_matching_is_an_opt_in_fallback_to_confirmed_groups(seed_data):
+    school = seed_data['school_a']
+    source = Class.objects.create(school=school, name='Phones 8', grade_level=8)
+    phones = ['0300-1111111', '03001111111', '+03001111111', '0300 2222222', '0321 3333333', '0321-3333333']
+    students = [
+        Student.objects.create(school=school, class_obj=source, roll_number=str(i), name=f'Phone {i}',
+                               parent_phone=phone, guardian_phone='0300 9999999')
+        for i, phone in enumerate(phones)
+    ]
+    group = SiblingGroup.objects.create(school=school)
+    # Student 3 is confirmed as student 4's sibling despite a different phone.
+    for order, student in enumerate((students[3], students[4])):
+        SiblingGroupMember.objects.create(group=group, student=student, order_index=order)
+    inactive = SiblingGroup.objects.create(school=school, is_active=False)
+    SiblingGroupMember.objects.create(group=inactive, student=students[5])
+
+    def groups(**options):
+        result = SectionAllocatorService(school.id).allocate_students(
+            class_id=source.id, num_sections=2, sibling_policy='together', **options,
+        )
+        by_group = {}
+        for section in result['sections']:
+            for s in section['students']:
+                if s.get('sibling_group'):
+                    by_group.setdefault(s['sibling_group'], set()).add(s['student_id'])
+        return sorted(sorted(ids) for ids in by_group.values())
+
+    ids = [s.id for s in students]
+    assert groups() == [[ids[3], ids[4]]]
+    assert groups(match_siblings_by_phone=True) == sorted([[ids[0], ids[1], ids[2]], [ids[3], ids[4]]])
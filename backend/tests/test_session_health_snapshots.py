@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from academic_sessions.models import SessionHealthSnapshot
+from academic_sessions.session_health_service import SessionHealthService
+from academic_sessions.tasks import refresh_session_health_snapshots
+from academics.models import Subject
+from attendance.models import AttendanceRecord
+from examinations.models import Exam, ExamSubject, ExamType, StudentMark
+from finance.models import Account, FeePayment
+from hr.models import StaffAttendance, StaffMember
+
+MODULES = ('enrollment', 'attendance', 'fee_collection', 'exam_performance', 'staff')
+
+
+def _health_data(env, days=5):
+    school, year = env['school_a'], env['academic_year']
+    students = env['students'][:4]
+    exam = Exam.objects.create(
+        school=school, academic_year=year, exam_type=ExamType.objects.create(school=school, name='Health'),
+        class_obj=env['classes'][0], name='Health Exam',
+    )
+    exam_subject = ExamSubject.objects.create(
+        school=school, exam=exam, subject=Subject.objects.create(school=school, name='Health Sub', code='HLT'),
+        total_marks=Decimal('50'), passing_marks=Decimal('20'),
+    )
+    staff = StaffMember.objects.create(school=school, first_name='Health', last_name='Staff', employee_id='EMP-HLT')
+    account = Account.objects.create(
+        school=school, organization=env['org'], name='Health Cash', account_type=Account.AccountType.CASH,
+    )
+    for i, student in enumerate(students):
+        StudentMark.objects.create(
+            school=school, exam_subject=exam_subject, student=student, marks_obtained=Decimal(10 + 10 * i),
+        )
+        FeePayment.objects.create(
+            school=school, student=student, academic_year=year, month=5, year=2025,
+            amount_due=1000, amount_paid=1000 if i % 2 else 400, status='PAID' if i % 2 else 'PARTIAL',
+            payment_date=date(2025, 5, 10), account=account,
+        )
+        for day in range(days):
+            AttendanceRecord.objects.create(
+                school=school, academic_year=year, student=student, date=date(2025, 5, 5) + timedelta(days=day),
+                status='ABSENT' if day < i else 'PRESENT',
+            )
+    for day in range(days):
+        StaffAttendance.objects.create(
+            school=school, staff_member=staff, date=date(2025, 5, 5) + timedelta(days=day),
+            status='ABSENT' if day == 0 else 'PRESENT',
+        )
+    return {'students': students, 'exam_subject': exam_subject, 'staff': staff}
+
+
+def _modules(report):
+    return {name: report[name] for name in MODULES}
+
+
+@pytest.mark.django_db
+class TestSessionHealthSnapshots:
+
+    def test_incremental_report_matches_full_rebuild(self, seed_data):
+        data = _health_data(seed_data)
+        service = SessionHealthService(seed_data['school_a'].id, seed_data['academic_year'].id)
+        first = service.generate_health_report()
+        assert first['attendance']['total_records'] == 20
+        assert first['fee_collection']['total_expected'] == 4000.0
+        assert first['fee_collection']['defaulting_students'] == 2
+        assert SessionHealthSnapshot.objects.count() == 1
+
+        # Edits, inserts and a delete after the snapshot was taken.
+        record = AttendanceRecord.objects.filter(student=data['students'][3]).order_by('date').first()
+        record.status = 'PRESENT'
+        record.save()
+        payment = FeePayment.objects.get(student=data['students'][0])
+        payment.amount_paid, payment.status = 1000, 'PAID'
+        payment.save()
+        data['exam_subject'].passing_marks = Decimal('30')
+        data['exam_subject'].save()
+        StaffAttendance.objects.create(
+            school=seed_data['school_a'], staff_member=data['staff'], date=date(2025, 5, 20), status='ABSENT',
+        )
+        incremental = service.generate_health_report()
+        assert incremental['fee_collection']['defaulting_students'] == 1
+        assert incremental['exam_performance']['average_pass_rate'] == 50.0
+        assert incremental['staff']['staff_attendance_rate'] == round(4 / 6 * 100, 1)
+
+        SessionHealthSnapshot.objects.all().delete()
+        assert _modules(incremental) == _modules(service.generate_health_report())
+
+        AttendanceRecord.objects.filter(student=data['students'][1]).delete()
+        incremental = service.generate_health_report()
+        assert incremental['attendance']['total_records'] == 15
+        SessionHealthSnapshot.objects.all().delete()
+        assert _modules(incremental) == _modules(service.generate_health_report())
+
+    def test_report_cost_does_not_grow_with_the_year(self, seed_data):
+        _health_data(seed_data, days=2)
+        service = SessionHealthService(seed_data['school_a'].id, seed_data['academic_year'].id)
+        service.generate_health_report()
+        with CaptureQueriesContext(connection) as small:
+            service.generate_health_report()
+
+        for student in seed_data['students'][:4]:
+            AttendanceRecord.objects.bulk_create([
+                AttendanceRecord(
+                    school=seed_data['school_a'], academic_year=seed_data['academic_year'], student=student,
+                    date=date(2025, 6, 1) + timedelta(days=day), status='PRESENT',
+                )
+                for day in range(60)
+            ])
+        with CaptureQueriesContext(connection) as large:
+            report = service.generate_health_report()
+        assert report['attendance']['total_records'] == 8 + 240
+        assert len(large.captured_queries) == len(small.captured_queries)
+        assert SessionHealthSnapshot.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_daily_task_takes_snapshots_and_prunes_old_ones(seed_data):
+    _health_data(seed_data, days=1)
+    year = seed_data['academic_year']
+    year.is_current = True
+    year.save()
+    today = timezone.localdate()
+    for age in (40, 35):
+        SessionHealthSnapshot.objects.create(
+            school=seed_data['school_a'], academic_year=year, snapshot_date=today - timedelta(days=age),
+            taken_at=timezone.now() - timedelta(days=age),
+        )
+
+    result = refresh_session_health_snapshots()
+
+    assert result['refreshed'] >= 1
+    assert list(
+        SessionHealthSnapshot.objects.filter(academic_year=year).values_list('snapshot_date', flat=True)
+    ) == [today]
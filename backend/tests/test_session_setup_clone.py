@@ -0,0 +1,103 @@
+import json
+from datetime import date, time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academic_sessions.models import AcademicYear, Term
+from academic_sessions.session_setup_service import SessionSetupService
+from academics.models import ClassSubject, Subject, TimetableEntry, TimetableSlot
+
+
+def _source_data(env, periods):
+    school, year = env['school_a'], env['academic_year']
+    subjects = [Subject.objects.create(school=school, name=f'Clone {i}', code=f'CLN{i}') for i in range(3)]
+    slots = [
+        TimetableSlot.objects.create(
+            school=school, name=f'Clone P{i}', slot_type='PERIOD',
+            start_time=time(8, i), end_time=time(8, i + 30), order=700 + i,
+        )
+        for i in range(periods)
+    ]
+    for class_obj in env['classes'][:3]:
+        for subject in subjects:
+            ClassSubject.objects.create(
+                school=school, academic_year=year, class_obj=class_obj, subject=subject, periods_per_week=4,
+            )
+        for i, slot in enumerate(slots):
+            TimetableEntry.objects.create(
+                school=school, academic_year=year, class_obj=class_obj, day='MON', slot=slot,
+                subject=subjects[i % 3], room=f'R{i}',
+            )
+
+
+def _preview(env):
+    preview = SessionSetupService(env['school_a'].id).generate_setup_preview(
+        source_year_id=env['academic_year'].id, new_year_name='Clone 2026-27',
+        new_start_date=date(2026, 4, 1), new_end_date=date(2027, 3, 31),
+    )
+    # The view receives the preview back as JSON.
+    return json.loads(json.dumps(preview, default=str))
+
+
+def _writes(ctx, table):
+    return [q['sql'] for q in ctx.captured_queries
+            if table in q['sql'] and q['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))]
+
+
+@pytest.mark.django_db
+class TestSessionSetupBulkClone:
+
+    def test_clone_and_rerun_are_bulk_and_idempotent(self, seed_data):
+        _source_data(seed_data, periods=6)
+        service = SessionSetupService(seed_data['school_a'].id)
+        preview = _preview(seed_data)
+
+        with CaptureQueriesContext(connection) as first:
+            result = service.apply_setup(preview)
+        assert result['success'], result
+        new_year = AcademicYear.objects.get(id=result['academic_year_id'])
+        assert result['terms_created'] == len(preview['terms']) == Term.objects.filter(academic_year=new_year).count()
+        assert result['class_subjects_updated'] == 9
+        assert result['timetable_entries_updated'] == 18
+        assert ClassSubject.objects.filter(academic_year=new_year).count() == 9
+        assert TimetableEntry.objects.filter(academic_year=new_year).count() == 18
+        assert len(_writes(first, 'academics_timetableentry')) == 1
+
+        # Re-running with the same preview writes nothing new.
+        terms_before = list(Term.objects.filter(academic_year=new_year).values_list('id', 'updated_at'))
+        with CaptureQueriesContext(connection) as rerun:
+            again = service.apply_setup(preview)
+        assert again['success'] and again['sync_mode']
+        assert (again['terms_created'], again['class_subjects_created'], again['timetable_entries_created']) == (0, 0, 0)
+        assert again['terms_updated'] == len(preview['terms'])
+        assert again['timetable_entries_updated'] == 18
+        for table in ('academic_sessions_term', 'academics_classsubject', 'academics_timetableentry'):
+            assert _writes(rerun, table) == []
+        assert list(Term.objects.filter(academic_year=new_year).values_list('id', 'updated_at')) == terms_before
+
+    def test_query_count_does_not_grow_with_school_size(self, seed_data):
+        _source_data(seed_data, periods=2)
+        preview = _preview(seed_data)
+        with CaptureQueriesContext(connection) as small:
+            assert SessionSetupService(seed_data['school_a'].id).apply_setup(preview)['success']
+        TimetableEntry.objects.update(academic_year=seed_data['academic_year'])
+        ClassSubject.objects.update(academic_year=seed_data['academic_year'])
+        AcademicYear.objects.filter(name='Clone 2026-27').delete()
+
+        for i in range(2, 10):
+            slot = TimetableSlot.objects.create(
+                school=seed_data['school_a'], name=f'Clone Q{i}', slot_type='PERIOD',
+                start_time=time(9, i), end_time=time(9, i + 30), order=750 + i,
+            )
+            for class_obj in seed_data['classes'][:3]:
+                TimetableEntry.objects.create(
+                    school=seed_data['school_a'], academic_year=seed_data['academic_year'],
+                    class_obj=class_obj, day='TUE', slot=slot,
+                )
+        preview = _preview(seed_data)
+        with CaptureQueriesContext(connection) as large:
+            result = SessionSetupService(seed_data['school_a'].id).apply_setup(preview)
+        assert result['timetable_entries_updated'] == 6 + 24
+        assert len(large.captured_queries) == len(small.captured_queries)
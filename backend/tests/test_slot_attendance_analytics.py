@@ -0,0 +1,116 @@
+from datetime import date, time, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.analytics import AcademicsAnalytics
+from academics.models import Subject, TimetableEntry, TimetableSlot
+from attendance.models import AttendanceRecord
+from students.models import Class, Student
+
+
+URL = '/api/academics/analytics/'
+
+MONDAY = date(2026, 1, 5)
+
+
+@pytest.fixture
+def slot_env(seed_data):
+    """Maths in the morning on Mondays, English in the afternoon on Mondays and Tuesdays."""
+    school = seed_data['school_a']
+    morning, afternoon = [
+        TimetableSlot.objects.create(
+            school=school, name=f'Slot {i}', slot_type='PERIOD',
+            start_time=time(9 + i * 3), end_time=time(9 + i * 3, 45), order=i,
+        )
+        for i in range(2)
+    ]
+    maths = Subject.objects.create(school=school, name='Slot Maths', code='SLMA')
+    english = Subject.objects.create(school=school, name='Slot English', code='SLEN')
+    class_obj = Class.objects.create(school=school, name='Slot Class', grade_level=9)
+    TimetableEntry.objects.create(school=school, class_obj=class_obj, day='MON', slot=morning, subject=maths)
+    TimetableEntry.objects.create(school=school, class_obj=class_obj, day='MON', slot=afternoon, subject=english)
+    TimetableEntry.objects.create(school=school, class_obj=class_obj, day='TUE', slot=afternoon, subject=english)
+    students = [
+        Student.objects.create(school=school, class_obj=class_obj, roll_number=str(i), name=f'Slot {i}')
+        for i in range(1, 5)
+    ]
+    return {**seed_data, 'class': class_obj, 'students': students, 'slots': (morning, afternoon)}
+
+
+def _mark(env, day, absent):
+    for i, student in enumerate(env['students']):
+        AttendanceRecord.objects.create(
+            school=env['school_a'], student=student, date=day,
+            status='ABSENT' if i < absent else 'PRESENT',
+        )
+
+
+def _by_subject(data):
+    return {row['subject_name']: row for row in data['subjects']}
+
+
+@pytest.mark.django_db
+class TestSubjectAttendanceBySlot:
+
+    def test_rates_and_constant_query_count(self, slot_env):
+        _mark(slot_env, MONDAY, absent=0)
+        _mark(slot_env, MONDAY + timedelta(days=1), absent=2)
+        analytics = AcademicsAnalytics(slot_env['school_a'].id)
+
+        with CaptureQueriesContext(connection) as one_week:
+            rows = _by_subject(analytics._compute_subject_attendance_by_slot())
+
+        assert rows['Slot Maths']['morning_rate'] == 100.0
+        assert rows['Slot Maths']['afternoon_rate'] is None
+        # Monday 4/4 present, Tuesday 2/4 present.
+        assert rows['Slot English']['afternoon_rate'] == 75.0
+        assert rows['Slot English']['afternoon_periods'] == 2
+
+        for week in range(1, 6):
+            _mark(slot_env, MONDAY + timedelta(weeks=week), absent=1)
+        with CaptureQueriesContext(connection) as six_weeks:
+            analytics._compute_subject_attendance_by_slot()
+        assert len(six_weeks.captured_queries) == len(one_week.captured_queries) == 3
+
+    def test_cached_per_range_until_attendance_or_timetable_changes(self, slot_env):
+        _mark(slot_env, MONDAY, absent=1)
+        analytics = AcademicsAnalytics(slot_env['school_a'].id)
+        first = analytics.subject_attendance_by_slot(str(MONDAY), str(MONDAY))
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert analytics.subject_attendance_by_slot(str(MONDAY), str(MONDAY)) == first
+        assert len(ctx.captured_queries) == 0
+        assert _by_subject(first)['Slot Maths']['morning_rate'] == 75.0
+
+        record = AttendanceRecord.objects.get(student=slot_env['students'][0], date=MONDAY)
+        record.status = 'PRESENT'
+        record.save()
+        again = analytics.subject_attendance_by_slot(str(MONDAY), str(MONDAY))
+        assert _by_subject(again)['Slot Maths']['morning_rate'] == 100.0
+
+        TimetableEntry.objects.get(day='MON', subject__name='Slot English').delete()
+        entry = TimetableEntry.objects.get(day='MON', subject__name='Slot Maths')
+        entry.slot = slot_env['slots'][1]
+        entry.save()
+        moved = _by_subject(analytics.subject_attendance_by_slot(str(MONDAY), str(MONDAY)))
+        assert moved['Slot Maths']['morning_rate'] is None
+        assert moved['Slot Maths']['afternoon_rate'] == 100.0
+
+    def test_slot_recommendations_endpoint(self, slot_env, api):
+        _mark(slot_env, MONDAY, absent=0)
+        _mark(slot_env, MONDAY + timedelta(days=1), absent=2)
+        # Move Monday English into the morning: Monday attendance is higher.
+        TimetableEntry.objects.get(day='MON', subject__name='Slot Maths').delete()
+        entry = TimetableEntry.objects.get(day='MON', subject__name='Slot English')
+        entry.slot = slot_env['slots'][0]
+        entry.save()
+
+        resp = api.get(f'{URL}?type=slot_recommendations', slot_env['tokens']['admin'], slot_env['SID_A'])
+
+        assert resp.status_code == 200, resp.content
+        recs = resp.json()['recommendations']
+        assert [(r['subject_name'], r['recommended_time']) for r in recs] == [('Slot English', 'morning')]
+        assert recs[0]['morning_rate'] == 100.0
+        assert recs[0]['afternoon_rate'] == 50.0
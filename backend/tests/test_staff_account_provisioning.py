@@ -0,0 +1,110 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import BackgroundTask
+from hr.account_provisioning import provision_staff_accounts
+from hr.models import StaffMember
+from hr.tasks import bulk_create_staff_accounts_task
+from schools.models import UserSchoolMembership
+from users.models import User
+
+BULK_URL = '/api/hr/staff/bulk-create-accounts/'
+
+
+def _staff(env, count, prefix='Prov'):
+    return [
+        StaffMember.objects.create(
+            school=env['school_a'], first_name=f'{prefix}{n}', last_name='Member', employee_id=f'PRV-{prefix}-{n:03d}',
+        )
+        for n in range(count)
+    ]
+
+
+def _post(env, api, staff_ids):
+    return api.post(BULK_URL, {
+        'staff_ids': staff_ids, 'default_password': 'BulkStaff@123', 'default_role': 'TEACHER',
+    }, env['tokens']['admin'], env['SID_A'])
+
+
+@pytest.mark.django_db
+class TestBulkStaffAccountProvisioning:
+
+    def test_small_batch_returns_report_and_links_accounts(self, seed_data, api):
+        staff = _staff(seed_data, 4)
+        # First choice taken -> employee ID; first two choices taken -> name + staff ID.
+        User.objects.create_user(username='prov1_member', email='taken@example.com', password='x' * 8)
+        User.objects.create_user(username='prov2_member', email='taken@example.com', password='x' * 8)
+        User.objects.create_user(username='prv_prov_002', email='taken@example.com', password='x' * 8)
+        linked_user = User.objects.create_user(username='already_linked', email='taken@example.com', password='x' * 8)
+        StaffMember.objects.filter(id=staff[3].id).update(user=linked_user)
+
+        resp = _post(seed_data, api, [s.id for s in staff])
+
+        assert resp.status_code == 200, resp.content[:300]
+        body = resp.json()
+        assert (body['created_count'], body['skipped_count'], body['error_count']) == (3, 1, 0)
+        assert {c['staff_id']: c['username'] for c in body['created']} == {
+            staff[0].id: 'prov0_member',
+            staff[1].id: 'prv_prov_001',
+            staff[2].id: f'prov2_member_{staff[2].id}',
+        }
+        assert body['skipped'] == [{'staff_id': staff[3].id, 'name': 'Prov3 Member', 'reason': 'Already has account'}]
+        task = BackgroundTask.objects.get(celery_task_id=body['task_id'])
+        assert task.task_type == BackgroundTask.TaskType.ACCOUNT_PROVISIONING
+        assert task.status == BackgroundTask.Status.SUCCESS
+
+        users = {s.id: StaffMember.objects.get(id=s.id).user for s in staff[:3]}
+        assert all(u.check_password('BulkStaff@123') and u.role == 'TEACHER' for u in users.values())
+        # Each account gets its own salt.
+        assert len({u.password for u in users.values()}) == 3
+        assert UserSchoolMembership.objects.filter(
+            user__in=users.values(), school=seed_data['school_a'], role='TEACHER', is_default=True,
+        ).count() == 3
+
+    def test_large_batch_runs_in_background(self, seed_data, api):
+        staff = _staff(seed_data, 55)
+
+        resp = _post(seed_data, api, [s.id for s in staff])
+
+        assert resp.status_code == 202, resp.content[:300]
+        task = BackgroundTask.objects.get(celery_task_id=resp.json()['task_id'])
+        assert task.status == BackgroundTask.Status.SUCCESS, task.error_message
+        assert task.progress_total == 55 and task.progress_current == 55
+        assert task.result_data['created_count'] == 55
+        assert StaffMember.objects.filter(id__in=[s.id for s in staff], user__isnull=True).count() == 0
+
+    def test_query_count_does_not_grow_with_batch_size(self, seed_data):
+        small_batch = _staff(seed_data, 2, prefix='Small')
+        large_batch = _staff(seed_data, 40, prefix='Large')
+        school_id = seed_data['SID_A']
+
+        with CaptureQueriesContext(connection) as small:
+            result = provision_staff_accounts(school_id, [s.id for s in small_batch], 'BulkStaff@123', 'STAFF')
+        assert result['created_count'] == 2
+        with CaptureQueriesContext(connection) as large:
+            result = provision_staff_accounts(school_id, [s.id for s in large_batch], 'BulkStaff@123', 'STAFF')
+        assert result['created_count'] == 40
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_failed_task_returns_error_without_raw_password_in_kwargs(self, seed_data, api):
+        staff = _staff(seed_data, 2)
+        original_apply = bulk_create_staff_accounts_task.apply
+
+        def apply_without_propagating(*args, **kwargs):
+            # As in production, where eager task errors are not re-raised.
+            return original_apply(*args, throw=False, **kwargs)
+
+        with mock.patch('hr.account_provisioning.provision_staff_accounts', side_effect=RuntimeError('db down')), \
+                mock.patch.object(bulk_create_staff_accounts_task, 'apply',
+                                  side_effect=apply_without_propagating) as apply:
+            resp = _post(seed_data, api, [s.id for s in staff])
+
+        assert resp.status_code == 500
+        assert 'db down' in resp.json()['error']
+        task_kwargs = apply.call_args.kwargs['kwargs']
+        assert 'BulkStaff@123' not in str(task_kwargs)
+        assert set(task_kwargs) == {'school_id', 'staff_ids', 'password_token', 'default_role'}
+        assert BackgroundTask.objects.get(celery_task_id=resp.json()['task_id']).status == BackgroundTask.Status.FAILED
@@ -0,0 +1,111 @@
+from datetime import date, time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.ai_engine import SubstitutePeriod, SubstituteRanker
+from academics.models import ClassSubject, Subject, TimetableEntry, TimetableSlot
+from academics.occupancy import TeacherOccupancy
+from hr.models import StaffAttendance, StaffMember, StaffQualification
+
+
+MONDAY = date(2026, 1, 5)
+
+
+@pytest.fixture
+def cover_env(seed_data):
+    """An absent Physics teacher with two Monday periods and a dozen extra staff."""
+    school = seed_data['school_a']
+    slots = [
+        TimetableSlot.objects.create(
+            school=school, name=f'Cover P{i}', slot_type='PERIOD',
+            start_time=time(8 + i), end_time=time(8 + i, 45), order=900 + i,
+        )
+        for i in range(3)
+    ]
+    physics = Subject.objects.create(school=school, name='Physics', code='CPHY')
+    absent = seed_data['staff'][0]
+    extra = [
+        StaffMember.objects.create(
+            school=school, first_name='Cover', last_name=f'{i:02d}', employment_status='ACTIVE',
+        )
+        for i in range(12)
+    ]
+    classes = seed_data['classes']
+    for i, slot in enumerate(slots[:2]):
+        TimetableEntry.objects.create(
+            school=school, class_obj=classes[i], day='MON', slot=slot, subject=physics, teacher=absent,
+        )
+    # The best cover sorts last by name: qualified and already teaches Physics to class 1.
+    best = extra[-1]
+    StaffQualification.objects.create(school=school, staff_member=best, qualification_name='MSc Physics')
+    ClassSubject.objects.create(school=school, class_obj=classes[0], subject=physics, teacher=best)
+    # extra[0] is busy in period 0, extra[1] is on leave.
+    TimetableEntry.objects.create(
+        school=school, class_obj=classes[2], day='MON', slot=slots[0], subject=physics, teacher=extra[0],
+    )
+    StaffAttendance.objects.create(
+        school=school, staff_member=extra[1], date=MONDAY, status=StaffAttendance.Status.ON_LEAVE,
+    )
+    return {**seed_data, 'slots': slots, 'physics': physics, 'absent': absent, 'extra': extra, 'best': best}
+
+
+def _periods(env):
+    return [
+        SubstitutePeriod(
+            day='MON', slot_id=slot.id, subject_id=env['physics'].id, subject_name='Physics',
+            class_id=env['classes'][i].id, absent_teacher_id=env['absent'].id,
+        )
+        for i, slot in enumerate(env['slots'][:2])
+    ]
+
+
+@pytest.mark.django_db
+class TestSubstituteRanker:
+
+    def test_every_eligible_staff_member_is_scored(self, cover_env):
+        first, second = SubstituteRanker(cover_env['school_a'].id, MONDAY).rank(_periods(cover_env), limit=None)
+
+        assert first[0]['teacher_id'] == cover_env['best'].id
+        assert first[0]['score'] == 50 + 30 + 15 + 10
+        assert first[0]['reasons'][:3] == ['Qualified (MSc Physics)', 'Teaches Physics', 'Already teaches this class']
+        # In period 2 the best cover does not teach the class yet.
+        assert second[0]['teacher_id'] == cover_env['best'].id
+        assert second[0]['score'] == 50 + 30 + 15
+
+        first_ids = {c['teacher_id'] for c in first}
+        assert cover_env['absent'].id not in first_ids
+        assert cover_env['extra'][0].id not in first_ids  # busy in that slot
+        assert cover_env['extra'][1].id not in first_ids  # on leave
+        assert cover_env['extra'][0].id in {c['teacher_id'] for c in second}
+        busy_today = next(c for c in second if c['teacher_id'] == cover_env['extra'][0].id)
+        assert busy_today['today_periods'] == 1
+        assert busy_today['score'] == 47
+
+    def test_query_count_does_not_grow_with_periods_or_staff(self, cover_env):
+        periods = _periods(cover_env)
+        TeacherOccupancy.for_school(cover_env['school_a'].id)
+        with CaptureQueriesContext(connection) as one:
+            SubstituteRanker(cover_env['school_a'].id, MONDAY).rank(periods[:1])
+
+        for i in range(5):
+            StaffMember.objects.create(school=cover_env['school_a'], first_name='More', last_name=str(i))
+        with CaptureQueriesContext(connection) as many:
+            SubstituteRanker(cover_env['school_a'].id, MONDAY).rank(periods * 4)
+        assert len(many.captured_queries) == len(one.captured_queries)
+
+    def test_suggest_substitute_endpoint_returns_ranked_cover(self, cover_env, api):
+        resp = api.get(
+            f"/api/academics/timetable-entries/suggest_substitute/"
+            f"?teacher={cover_env['absent'].id}&date={MONDAY.isoformat()}",
+            cover_env['tokens']['admin'], cover_env['SID_A'],
+        )
+
+        assert resp.status_code == 200, resp.content
+        periods = resp.json()['entries_needing_cover']
+        assert len(periods) == 2
+        top = periods[0]['suggested_substitutes'][0]
+        assert top['teacher_id'] == cover_env['best'].id
+        assert top['reason'] == 'Qualified (MSc Physics)'
+        assert len(periods[0]['suggested_substitutes']) == 5
@@ -0,0 +1,137 @@
+from datetime import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from academics.ai_engine import ConflictResolver
+from academics.models import TimetableEntry, TimetableSlot
+from academics.occupancy import TeacherOccupancy
+
+
+URL = '/api/academics/timetable-entries/'
+
+
+@pytest.fixture
+def grid_env(seed_data):
+    school = seed_data['school_a']
+    slots = [
+        TimetableSlot.objects.create(
+            school=school, name=f'Occ P{i}', slot_type='PERIOD',
+            start_time=time(8 + i), end_time=time(8 + i, 45), order=800 + i,
+        )
+        for i in range(4)
+    ]
+    return {**seed_data, 'slots': slots}
+
+
+def _entry(env, class_idx, day, slot_idx, teacher_idx):
+    return TimetableEntry.objects.create(
+        school=env['school_a'], class_obj=env['classes'][class_idx], day=day,
+        slot=env['slots'][slot_idx], subject=env['subjects'][0], teacher=env['staff'][teacher_idx],
+    )
+
+
+@pytest.mark.django_db
+class TestTeacherOccupancy:
+
+    def test_cached_index_follows_entry_saves_and_deletes(self, grid_env, django_capture_on_commit_callbacks):
+        school_id = grid_env['school_a'].id
+        teacher = grid_env['staff'][0]
+        first = _entry(grid_env, 0, 'MON', 0, 0)
+        TeacherOccupancy.for_school(school_id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            second = _entry(grid_env, 1, 'MON', 1, 0)
+            first.slot = grid_env['slots'][2]
+            first.save()
+            second.delete()
+
+        with CaptureQueriesContext(connection) as ctx:
+            index = TeacherOccupancy.for_school(school_id)
+        assert len(ctx.captured_queries) == 0
+        assert index.teacher_slots(teacher.id) == {('MON', grid_env['slots'][2].id)}
+        assert index.conflicts(teacher.id, 'MON', grid_env['slots'][2].id) == {first.class_obj_id: first.id}
+        assert index.is_free(teacher.id, 'MON', grid_env['slots'][0].id)
+        assert index.cells == TeacherOccupancy.build(school_id).cells
+
+    def test_rolled_back_and_contended_updates_do_not_leave_stale_entries(
+            self, grid_env, django_capture_on_commit_callbacks):
+        school_id = grid_env['school_a'].id
+        teacher = grid_env['staff'][0]
+        TeacherOccupancy.for_school(school_id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    _entry(grid_env, 0, 'THU', 0, 0)
+                    raise RuntimeError('rolled back')
+            except RuntimeError:
+                pass
+        assert TeacherOccupancy.for_school(school_id).teacher_slots(teacher.id) == set()
+
+        # Another writer holds the lock: the index is rebuilt rather than patched.
+        cache.set(f'academics:teacher_occupancy:lock:{school_id}', 1)
+        with django_capture_on_commit_callbacks(execute=True):
+            entry = _entry(grid_env, 0, 'THU', 1, 0)
+        cache.delete(f'academics:teacher_occupancy:lock:{school_id}')
+        with CaptureQueriesContext(connection) as ctx:
+            index = TeacherOccupancy.for_school(school_id)
+        assert len(ctx.captured_queries) == 1
+        assert index.conflicts(teacher.id, 'THU', grid_env['slots'][1].id) == {entry.class_obj_id: entry.id}
+
+    def test_conflict_endpoint_and_bulk_save_use_the_index(self, grid_env, api):
+        token, sid = grid_env['tokens']['admin'], grid_env['SID_A']
+        taken = _entry(grid_env, 0, 'TUE', 1, 0)
+        teacher, slot = grid_env['staff'][0], grid_env['slots'][1]
+        TeacherOccupancy.for_school(grid_env['school_a'].id)
+
+        resp = api.get(
+            f"{URL}teacher_conflicts/?teacher={teacher.id}&day=tue&slot={slot.id}"
+            f"&exclude_class={grid_env['classes'][1].id}", token, sid,
+        )
+        assert resp.status_code == 200
+        assert resp.json()['has_conflict'] is True
+        assert [c['id'] for c in resp.json()['conflicts']] == [taken.id]
+
+        resp = api.get(
+            f"{URL}teacher_conflicts/?teacher={teacher.id}&day=TUE&slot={slot.id}"
+            f"&exclude_class={grid_env['classes'][0].id}", token, sid,
+        )
+        assert resp.json() == {'has_conflict': False, 'conflicts': []}
+
+        resp = api.post(f'{URL}bulk_save/', {
+            'class_obj': grid_env['classes'][1].id, 'day': 'TUE',
+            'entries': [
+                {'slot': grid_env['slots'][0].id, 'teacher': teacher.id},
+                {'slot': slot.id, 'teacher': teacher.id},
+            ],
+        }, token, sid)
+        assert resp.status_code == 400
+        assert resp.json()['detail'] == [
+            f"Row 2: Teacher is already assigned to {grid_env['classes'][0].name} at {slot.name}."
+        ]
+
+    def test_swap_suggestions_do_not_query_per_entry(self, grid_env, django_capture_on_commit_callbacks):
+        school_id = grid_env['school_a'].id
+        resolver = ConflictResolver(school_id)
+        # Teacher 0 is wanted by class 0 on MON P0 but teaches class 1 there.
+        _entry(grid_env, 1, 'MON', 0, 0)
+        _entry(grid_env, 0, 'MON', 1, 1)
+        _entry(grid_env, 1, 'MON', 1, 0)  # teacher 0 is busy at MON P1: no swap
+        _entry(grid_env, 0, 'TUE', 0, 1)
+        args = (grid_env['staff'][0].id, 'MON', grid_env['slots'][0].id, grid_env['classes'][0].id)
+        TeacherOccupancy.for_school(school_id)
+
+        with CaptureQueriesContext(connection) as small:
+            swaps = resolver.suggest_resolution(*args).swap_suggestions
+        assert [s['entry_day'] for s in swaps] == ['TUE']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for i in range(1, 4):
+                _entry(grid_env, 0, 'WED', i, 1 + i % 2)
+        with CaptureQueriesContext(connection) as large:
+            swaps = resolver.suggest_resolution(*args).swap_suggestions
+        assert len(swaps) == 4
+        assert len(large.captured_queries) == len(small.captured_queries)
@@ -0,0 +1,95 @@
+from datetime import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.ai_engine import CurriculumGapAnalyzer, WorkloadAnalyzer
+from academics.models import ClassSubject, Subject, TimetableEntry, TimetableSlot
+from hr.models import StaffQualification
+
+
+@pytest.fixture
+def load_env(seed_data):
+    school = seed_data['school_a']
+    slots = [
+        TimetableSlot.objects.create(
+            school=school, name=f'Load P{i}', slot_type='PERIOD',
+            start_time=time(8 + i), end_time=time(8 + i, 45), order=950 + i,
+        )
+        for i in range(4)
+    ]
+    chemistry = Subject.objects.create(school=school, name='Chemistry', code='LCHE')
+    teacher = seed_data['staff'][0]
+    class_obj = seed_data['classes'][0]
+    ClassSubject.objects.create(
+        school=school, class_obj=class_obj, subject=chemistry, teacher=teacher, periods_per_week=4,
+    )
+    ClassSubject.objects.create(
+        school=school, class_obj=seed_data['classes'][1], subject=chemistry, periods_per_week=2,
+    )
+    for slot in slots[:2]:
+        TimetableEntry.objects.create(
+            school=school, class_obj=class_obj, day='MON', slot=slot, subject=chemistry, teacher=teacher,
+        )
+    return {**seed_data, 'slots': slots, 'chemistry': chemistry, 'teacher': teacher}
+
+
+def _teacher_row(data, teacher):
+    return next(t for t in data['teachers'] if t['teacher_id'] == teacher.id)
+
+
+@pytest.mark.django_db
+class TestTimetableAnalyzers:
+
+    def test_workload_is_aggregated_and_cached_until_timetable_changes(self, load_env):
+        school_id = load_env['school_a'].id
+        with CaptureQueriesContext(connection) as cold:
+            first = WorkloadAnalyzer(school_id).analyze()
+        row = _teacher_row(first, load_env['teacher'])
+        assert row['timetabled_periods_week'] == 2
+        assert row['periods_per_day']['MON'] == 2
+        assert row['assigned_periods_week'] == 4
+        assert row['subjects_taught'] == ['Chemistry']
+
+        with CaptureQueriesContext(connection) as warm:
+            assert WorkloadAnalyzer(school_id).analyze() == first
+        assert len(warm.captured_queries) == 0
+
+        for day in ('TUE', 'WED', 'THU'):
+            TimetableEntry.objects.create(
+                school=load_env['school_a'], class_obj=load_env['classes'][0], day=day,
+                slot=load_env['slots'][0], subject=load_env['chemistry'], teacher=load_env['teacher'],
+            )
+        with CaptureQueriesContext(connection) as more:
+            updated = WorkloadAnalyzer(school_id).analyze()
+        assert _teacher_row(updated, load_env['teacher'])['timetabled_periods_week'] == 5
+        assert len(more.captured_queries) == len(cold.captured_queries)
+
+    def test_curriculum_gaps_follow_class_subject_and_qualification_changes(self, load_env):
+        school_id = load_env['school_a'].id
+        gaps = CurriculumGapAnalyzer(school_id).analyze()
+
+        unmet = [(u['class_name'], u['actual'], u['deficit']) for u in gaps['unmet_periods']
+                 if u['subject_name'] == 'Chemistry']
+        assert sorted(unmet) == sorted([
+            (load_env['classes'][0].name, 2, 2), (load_env['classes'][1].name, 0, 2),
+        ])
+        assert [u['class_name'] for u in gaps['unassigned_teachers'] if u['subject_name'] == 'Chemistry'] == [
+            load_env['classes'][1].name,
+        ]
+
+        StaffQualification.objects.create(
+            school=load_env['school_a'], staff_member=load_env['teacher'], qualification_name='BSc Biology',
+        )
+        ClassSubject.objects.filter(teacher__isnull=True, subject=load_env['chemistry']).get().delete()
+
+        gaps = CurriculumGapAnalyzer(school_id).analyze()
+        assert not [u for u in gaps['unassigned_teachers'] if u['subject_name'] == 'Chemistry']
+        mismatch = [m for m in gaps['qualification_mismatches'] if m['subject_name'] == 'Chemistry']
+        assert mismatch == [{
+            'teacher_name': load_env['teacher'].full_name,
+            'subject_name': 'Chemistry',
+            'class_name': load_env['classes'][0].name,
+            'teacher_qualifications': ['BSc Biology'],
+        }]
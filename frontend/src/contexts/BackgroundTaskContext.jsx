@@ -21,6 +21,8 @@ const QUERY_INVALIDATION_MAP = {
   BULK_PROMOTION: [['enrollments'], ['enrollmentsByClass']],
   PROMOTION_ADVISOR: [['promotionAdvisor']],
   FACE_ATTENDANCE: [['faceSessions'], ['pendingFaceReviews'], ['faceEnrollments']],
+  REPORT_COMMENTS: [['examResults']],
+  ACCOUNT_PROVISIONING: [['hrStaff']],
 }
 
 export function BackgroundTaskProvider({ children }) {
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { examinationsApi, sessionsApi } from '../../services/api'
+import { useBackgroundTask } from '../../hooks/useBackgroundTask'
 import ClassSelector from '../../components/ClassSelector'
 import { useAcademicYear } from '../../contexts/AcademicYearContext'
 import { useSessionClasses } from '../../hooks/useSessionClasses'
@@ -53,14 +54,14 @@ export default function ResultsPage() {
   })
 
   // AI comment generation
-  const generateCommentsMut = useMutation({
+  const generateCommentsMut = useBackgroundTask({
     mutationFn: ({ examId, force }) => examinationsApi.generateComments(examId, force),
-    onSuccess: (res) => {
-      const d = res.data
+    taskType: 'REPORT_COMMENTS',
+    title: 'Generating report card comments',
+    onSuccess: (d) => {
       setCommentMsg(`Generated ${d.generated} comments (${d.skipped} skipped, ${d.errors} errors).`)
       queryClient.invalidateQueries(['examResults', selectedExamId])
     },
-    onError: () => setCommentMsg('Failed to generate comments.'),
   })
 
   const years = yearsRes?.data?.results || yearsRes?.data || []
@@ -5,6 +5,7 @@ import { Link } from 'react-router-dom'
 import { hrApi, usersApi } from '../../services/api'
 import { useAuth } from '../../contexts/AuthContext'
 import { useToast } from '../../components/Toast'
+import { useBackgroundTasks } from '../../contexts/BackgroundTaskContext'
 import { useDebounce } from '../../hooks/useDebounce'
 import WhatsAppTick from '../../components/WhatsAppTick'
 
@@ -36,6 +37,7 @@ const isTeachingMember = (member) => {
 export default function StaffDirectoryPage() {
   const queryClient = useQueryClient()
   const { showError, showSuccess } = useToast()
+  const { addTask } = useBackgroundTasks()
   const { getAllowableRoles } = useAuth()
 
   const [search, setSearch] = useState('')
@@ -344,9 +346,17 @@ export default function StaffDirectoryPage() {
         default_password: bulkConvertPassword,
         default_role: bulkConvertRole,
       })
+      setSelectedStaff(new Set())
+      if (response.status === 202) {
+        // Large batches run in the background; show the report when the task finishes.
+        addTask(response.data.task_id, 'Creating staff user accounts', 'ACCOUNT_PROVISIONING', (result) => {
+          if (result) setConvertResults(result)
+        })
+        showSuccess(response.data.message || 'Account creation started.')
+        return
+      }
       setConvertResults(response.data)
       queryClient.invalidateQueries({ queryKey: ['hrStaff'] })
-      setSelectedStaff(new Set())
       showSuccess(`Created ${response.data.created_count} user account(s)!`)
     } catch (err) {
       setBulkConvertError(err?.response?.data?.error || err?.response?.data?.detail || 'Bulk conversion failed')
@@ -31,6 +31,12 @@ vi.mock('../../../hooks/useDebounce', () => ({
   useDebounce: (value) => value,
 }))
 
+// Mock background task tracking (large bulk conversions run as tasks)
+const mockAddTask = vi.fn()
+vi.mock('../../../contexts/BackgroundTaskContext', () => ({
+  useBackgroundTasks: () => ({ addTask: mockAddTask }),
+}))
+
 // Helper: page renders both mobile cards + desktop table, so names appear twice.
 function expectTextPresent(text) {
   const matches = screen.getAllByText(text)
@@ -386,4 +392,48 @@ describe('StaffDirectoryPage — User Conversion Features', () => {
       expect(created).toBeInTheDocument()
     })
   })
+
+  it('tracks large bulk conversions as a background task', async () => {
+    server.use(
+      http.post('/api/hr/staff/bulk-create-accounts/', async () => {
+        return HttpResponse.json(
+          { task_id: 'task-accounts-1', message: 'Account creation started for 60 staff members.' },
+          { status: 202 }
+        )
+      })
+    )
+
+    const user = userEvent.setup()
+    renderWithProviders(<StaffDirectoryPage />)
+
+    await waitFor(() => {
+      expectTextPresent(/Sara/)
+    })
+
+    const checkboxes = screen.getAllByRole('checkbox')
+    if (checkboxes.length > 1) await user.click(checkboxes[1])
+
+    await waitFor(() => {
+      const buttons = screen.getAllByText(/Create Accounts/i)
+      expect(buttons.length).toBeGreaterThanOrEqual(1)
+    })
+    await user.click(screen.getAllByText(/Create Accounts/i)[0])
+
+    await waitFor(() => {
+      expect(screen.getByText(/Bulk Create/i)).toBeInTheDocument()
+    })
+
+    const passwordField = screen.getByPlaceholderText(/default password|password/i)
+    await user.type(passwordField, 'BulkStaff@123')
+
+    const submitBtn = screen.getByRole('button', { name: /create.*accounts|confirm|submit/i })
+    await user.click(submitBtn)
+
+    await waitFor(() => {
+      expect(mockAddTask).toHaveBeenCalledWith(
+        'task-accounts-1', expect.any(String), 'ACCOUNT_PROVISIONING', expect.any(Function),
+      )
+    })
+    expect(mockShowSuccess).toHaveBeenCalledWith('Account creation started for 60 staff members.')
+  })
 })
@@ -507,6 +507,8 @@ export const academicsApi = {
   // AI Features
   autoGenerateTimetable: (data) =>
     api.post('/api/academics/timetable-entries/auto_generate/', data),
+  autoGenerateSchoolTimetable: (data) =>
+    api.post('/api/academics/timetable-entries/auto_generate_school/', data),
   suggestConflictResolution: (params) =>
     api.get('/api/academics/timetable-entries/suggest_resolution/', { params }),
   getTimetableQualityScore: (classId) =>
@@ -651,6 +653,7 @@ export const examinationsApi = {
 
   // Report Card
   getReportCard: (params) => api.get('/api/examinations/report-card/', { params }),
+  getConsolidatedResults: (params) => api.get('/api/examinations/results/consolidated/', { params }),
 
   // AI Comments
   generateComments: (examId, force = false) =>